@@ -0,0 +1,167 @@
+# mame_batch_export.py
+"""
+Batch export engine: renders preview images for many ROMs on a pool of worker processes
+
+Processed game data is prepared up front with precache_games, so workers only read it from the
+shared game cache. Each worker runs Qt on the offscreen platform and paints every image with the
+widget-free layout renderer, keeping its QGuiApplication and registered fonts for its whole life;
+a worker is replaced after EXPORT_MAX_TASKS_PER_WORKER ROMs so the memory a long export
+accumulates stays bounded.
+Results stream back as ROMs finish, and cancelling lets the in-flight renders complete.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from mame_game_cache import CacheSettings, get_game_cache
+from mame_data_utils import get_game_data, precache_games
+
+# Qt platform the workers render on - no windows, no focus stealing
+EXPORT_QT_PLATFORM = "offscreen"
+
+# Every worker holds a Qt application, fonts and the artwork it last drew
+EXPORT_MAX_WORKERS = 8
+
+# ROMs a worker renders before it is replaced by a fresh process
+EXPORT_MAX_TASKS_PER_WORKER = 100
+
+# How often the parent checks for cancellation while it waits for a result (seconds)
+EXPORT_POLL_INTERVAL = 0.2
+
+# A worker that dies mid-render loses its ROM, so the wait for results gives up after this long (seconds)
+EXPORT_STALL_TIMEOUT = 120.0
+
+def get_default_export_workers() -> int:
+    """One worker per core, leaving a core for the GUI"""
+    return max(1, min(EXPORT_MAX_WORKERS, (os.cpu_count() or 2) - 1))
+
+# ============================================================================
+# WORKERS
+# ============================================================================
+
+# Per-process state of an export worker, set up once by _init_export_worker
+_export_worker_state = {}
+
+def _init_export_worker(mame_dir: str, settings: CacheSettings, output_dir: str, image_format: str,
+                        cancel_event, quiet: bool = True):
+    """Start the worker's offscreen QGuiApplication and remember the job settings"""
+    import mame_data_utils
+
+    if quiet:
+        # Per-ROM debug output from the preview code would flood the parent's console
+        sys.stdout = open(os.devnull, 'w')
+    # Only the parent process writes cfg_cache.pickle
+    mame_data_utils._cfg_cache_flush_registered = True
+
+    os.environ["QT_QPA_PLATFORM"] = EXPORT_QT_PLATFORM
+    from PyQt5.QtGui import QGuiApplication
+
+    app = QGuiApplication.instance() or QGuiApplication([sys.argv[0]])
+
+    _export_worker_state.update(
+        app=app,
+        mame_dir=mame_dir,
+        settings=settings,
+        output_dir=output_dir,
+        image_format=image_format,
+        cancel_event=cancel_event,
+        game_cache=get_game_cache(os.path.join(mame_dir, "preview", "cache"))
+    )
+
+def _export_worker(rom_name: str) -> Tuple[str, str, Optional[str]]:
+    """Export one ROM; returns (rom_name, 'exported' | 'failed' | 'missing' | 'cancelled', error)"""
+    # Imported here so the GUI that drives the export does not load PyQt5
+    from mame_layout_renderer import export_layout_image
+
+    state = _export_worker_state
+    if state['cancel_event'].is_set():
+        return rom_name, 'cancelled', None
+
+    try:
+        game_data = state['game_cache'].get(rom_name, state['settings'], record_access=False)
+        if not game_data:
+            return rom_name, 'missing', "no game data"
+
+        output_path = os.path.join(state['output_dir'], f"{rom_name}.{state['image_format']}")
+        if export_layout_image(rom_name, game_data, state['mame_dir'], output_path, state['image_format']):
+            return rom_name, 'exported', None
+        return rom_name, 'failed', "image was not written"
+    except Exception as e:
+        return rom_name, 'failed', str(e)
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def export_games(rom_names: Iterable[str], mame_dir: str, output_dir: str, settings: CacheSettings,
+                 gamedata_json: Dict, parent_lookup: Dict, db_path: Optional[str] = None,
+                 image_format: str = "png", workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int, int, str], None]] = None,
+                 cancelled: Optional[Callable[[], bool]] = None,
+                 prepare_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+    """
+    Export preview images for rom_names into output_dir
+    prepare_progress(done, total) is called while game data is built for ROMs the cache lacks, and
+    progress(done, total, failed, rom_name) as each ROM is exported. Once cancelled() returns True
+    no further ROMs are started and the ones in flight are allowed to finish.
+    Returns counts of 'exported', 'failed', 'missing' and 'cancelled' ROMs
+    """
+    rom_names = list(dict.fromkeys(rom_names))
+    counts = {'exported': 0, 'failed': 0, 'missing': 0, 'cancelled': 0}
+    if not rom_names:
+        return counts
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Processed data for every ROM, built in parallel and skipped where the cache is current
+    cache_dir = os.path.join(mame_dir, "preview", "cache")
+    precache_games(rom_names, mame_dir, settings, get_game_cache(cache_dir),
+                   lambda rom: get_game_data(rom, gamedata_json, parent_lookup, db_path),
+                   progress=(lambda done, total, failed: prepare_progress(done, total)) if prepare_progress else None,
+                   cancelled=cancelled)
+    if cancelled and cancelled():
+        print("Batch export cancelled while preparing game data")
+        counts['cancelled'] = len(rom_names)
+        return counts
+
+    workers = max(1, min(workers or get_default_export_workers(), len(rom_names)))
+    context = multiprocessing.get_context()
+    cancel_event = context.Event()
+
+    total = len(rom_names)
+    done = 0
+    with context.Pool(workers, initializer=_init_export_worker,
+                      initargs=(mame_dir, settings, output_dir, image_format, cancel_event),
+                      maxtasksperchild=EXPORT_MAX_TASKS_PER_WORKER) as pool:
+        results = pool.imap_unordered(_export_worker, rom_names)
+        last_result_time = time.monotonic()
+        while done < total:
+            if cancelled and cancelled() and not cancel_event.is_set():
+                print("Batch export cancelled, finishing the ROMs in progress")
+                cancel_event.set()
+            try:
+                rom_name, status, error = results.next(timeout=EXPORT_POLL_INTERVAL)
+            except multiprocessing.TimeoutError:
+                if time.monotonic() - last_result_time > EXPORT_STALL_TIMEOUT:
+                    print(f"Batch export stalled, giving up on the last {total - done} ROMs")
+                    counts['failed'] += total - done
+                    break
+                continue
+
+            last_result_time = time.monotonic()
+            done += 1
+            counts[status] += 1
+            if error:
+                print(f"Could not export {rom_name}: {error}")
+            if progress and status != 'cancelled':
+                progress(done, total, counts['failed'] + counts['missing'], rom_name)
+
+        if done == total:
+            pool.close()
+            pool.join()
+        # Otherwise leaving the with block terminates the stuck workers
+
+    return counts
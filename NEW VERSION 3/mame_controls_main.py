@@ -6,6 +6,7 @@ which speeds up preview rendering when the user presses pause
 import atexit
 import gc
 import json
+import multiprocessing
 import os
 import signal
 import sys
@@ -54,6 +55,34 @@ def cleanup_on_exit():
 
 atexit.register(cleanup_on_exit)
 
+# Status file the MAME plugin polls instead of waiting on this process (--status-file)
+_status_file = None
+
+def write_status_file(path, status):
+    """Replace the status file in one step so the plugin never reads half a line"""
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(status + "\n")
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Could not write status file {path}: {e}")
+
+def start_status_file(path):
+    global _status_file
+    _status_file = path
+    write_status_file(path, f"running {os.getpid()}")
+
+def finish_status_file(exit_code):
+    """Report the exit code once; later calls are ignored"""
+    global _status_file
+    if _status_file:
+        path, _status_file = _status_file, None
+        write_status_file(path, f"done {exit_code}")
+
 def validate_mame_directory(mame_dir):
     """
     Validate that the directory is a valid MAME installation
@@ -323,6 +352,7 @@ DATABASE vs JSON MODES:
 PERFORMANCE MODES:
   • --preview-only: Generates preview from game data (slower, full features)
   • --image-only: Loads pre-saved screenshot (fastest, display only)
+  • --serve + --show: Resident preview server, previews appear without a PyQt start-up
 """
 
     # Examples section
@@ -352,6 +382,14 @@ python mame_controls_main.py --preview-only --game pacman --image
   python mame_controls_main.py --preview-only --game pacman --no-buttons
     └─ Show preview with buttons hidden
 
+Resident Preview Server:
+  python mame_controls_main.py --serve
+    └─ Keep Qt, fonts and game data loaded and wait for preview requests
+  
+  python mame_controls_main.py --show pacman --clean-preview
+    └─ Ask the server for pacman's preview and wait until it is closed
+       (runs the preview itself when no server is running)
+
 Fast Image Display (NEW):
   python mame_controls_main.py --image-only --game sf2
     └─ Load pre-saved sf2.png from preview/screenshots (FASTEST!)
@@ -365,17 +403,32 @@ Cache Management:
   
   python mame_controls_main.py --precache --game pacman --use-db
     └─ Pre-build cache for pacman from database only (no fallback)
+  
+  python mame_controls_main.py --precache-all
+    └─ Pre-build cache for every ROM in your roms folders, using all CPU cores
+  
+  python mame_controls_main.py --precache-list favourites.txt
+    └─ Pre-build cache for the ROMs listed in favourites.txt (one per line)
+  
+  python mame_controls_main.py --precache --game pacman --status-file preview/cache/job.status
+    └─ Pre-build cache for pacman and report "running"/"done <code>" in job.status
+       (how the MAME plugin launches without waiting on the process)
+
+Database Maintenance:
+  python mame_controls_main.py --rebuild-db
+    └─ Drop and rebuild gamedata.db from gamedata.json
 
 Batch Operations:
-  for game in pacman galaga frogger; do
-    python mame_controls_main.py --precache --game $game
-  done
-    └─ Pre-cache multiple games for faster preview loading
+  python mame_controls_main.py --precache-all
+    └─ Pre-cache all games for faster preview loading (already cached games are skipped)
 
 Export Operations (if supported):
   python mame_controls_main.py --export-image --game pacman --output pacman.png
     └─ Export control layout as image file
 
+  python mame_controls_main.py --export-image --game pacman --output pacman.png --check-export
+    └─ Export, then verify the image against what the preview window's Save Image draws
+
 Advanced Options:
   python mame_controls_main.py --preview-only --game pacman --screen 2
     └─ Show preview on secondary monitor
@@ -441,11 +494,39 @@ COMMON WORKFLOWS:
         action='store_true',
         help='Pre-build cache for faster preview loading (requires --game)'
     )
+    mode_group.add_argument(
+        '--serve', 
+        action='store_true',
+        help='Run the resident preview server that --show, the GUI and the MAME plugin send requests to '
+             '(stops after an hour without requests, or when MAME exits)'
+    )
+    mode_group.add_argument(
+        '--show', 
+        type=str, 
+        metavar='ROMNAME',
+        help='Show a preview through the preview server, falling back to --preview-only when none is running'
+    )
+    mode_group.add_argument(
+        '--precache-all', 
+        action='store_true',
+        help='Pre-build cache for every ROM found in the roms folders (skips games already cached)'
+    )
+    mode_group.add_argument(
+        '--precache-list', 
+        type=str, 
+        metavar='FILE',
+        help='Pre-build cache for the ROMs listed in FILE, one per line (# starts a comment)'
+    )
     mode_group.add_argument(
         '--export-image', 
         action='store_true',
         help='Export control layout as image (requires --game and --output)'
     )
+    mode_group.add_argument(
+        '--rebuild-db', 
+        action='store_true',
+        help='Fully rebuild gamedata.db from gamedata.json (the GUI normally only syncs changed games)'
+    )
     
     # Game specification
     game_group = parser.add_argument_group('GAME SPECIFICATION', 'Specify which ROM to work with')
@@ -519,6 +600,20 @@ COMMON WORKFLOWS:
         action='store_true',
         help='Exclude logo in exported image'
     )
+    export_group.add_argument(
+        '--check-export', 
+        action='store_true',
+        help='Also draw the ROM in a hidden preview window and fail if the exported image differs from it'
+    )
+    
+    # Plugin options
+    plugin_group = parser.add_argument_group('PLUGIN OPTIONS', 'Used by the MAME plugin, which launches without waiting')
+    plugin_group.add_argument(
+        '--status-file', 
+        type=str, 
+        metavar='FILEPATH',
+        help='Write "running <pid>" to FILEPATH on start and "done <exit code>" on exit [works with every mode]'
+    )
     
     return parser
 
@@ -542,14 +637,22 @@ def validate_arguments(args):
     if args.export_image and not args.output:
         errors.append("--export-image requires --output parameter")
     
+    if args.precache_list and not os.path.isfile(args.precache_list):
+        errors.append(f"ROM list not found: {args.precache_list}")
+    
     # Check for conflicting modes
-    mode_count = sum([args.preview_only, args.image_only, args.precache, args.export_image])
+    mode_count = sum([args.preview_only, args.image_only, args.precache, args.precache_all,
+                      bool(args.precache_list), args.export_image, args.rebuild_db, args.serve, bool(args.show)])
     if mode_count > 1:
-        errors.append("Cannot combine --preview-only, --image-only, --precache, and --export-image modes")
+        errors.append("Cannot combine --preview-only, --image-only, --precache, --precache-all, --precache-list, "
+                      "--export-image, --rebuild-db, --serve and --show modes")
+    
+    if args.show and args.game:
+        errors.append("--show takes the ROM name itself, --game is not needed")
     
     # Check for options that only work with certain modes
-    if args.clean_preview and not args.preview_only:
-        errors.append("--clean-preview only works with --preview-only mode")
+    if args.clean_preview and not (args.preview_only or args.show):
+        errors.append("--clean-preview only works with --preview-only or --show modes")
     
     if args.image and not args.preview_only:
         errors.append("--image only works with --preview-only mode")
@@ -557,12 +660,14 @@ def validate_arguments(args):
     if args.auto_close and not (args.preview_only or args.image_only):
         errors.append("--auto-close works with --preview-only or --image-only modes")
     
-    if args.no_buttons and not (args.preview_only or args.export_image):
-        errors.append("--no-buttons only works with --preview-only or --export-image modes")
+    if args.no_buttons and not (args.preview_only or args.show or args.export_image):
+        errors.append("--no-buttons only works with --preview-only, --show or --export-image modes")
     
     # Database options only work with modes that need game data
-    if args.use_db and not (args.preview_only or args.precache or args.export_image):
-        errors.append("--use-db only works with --preview-only, --precache, or --export-image modes")
+    if args.use_db and not (args.preview_only or args.precache or args.precache_all or args.precache_list
+                            or args.export_image):
+        errors.append("--use-db only works with --preview-only, --precache, --precache-all, --precache-list, "
+                      "or --export-image modes")
     
     # Export-specific validations
     if args.no_bezel and not args.export_image:
@@ -574,9 +679,14 @@ def validate_arguments(args):
     if args.format != 'png' and not args.export_image:
         errors.append("--format only works with --export-image mode")
     
+    if args.check_export and not args.export_image:
+        errors.append("--check-export only works with --export-image mode")
+    
+    if args.check_export and (args.no_bezel or args.no_logo):
+        errors.append("--check-export compares against the preview window, which always shows bezel and logo settings")
+    
     # File path validation
     if args.output:
-        import os
         output_dir = os.path.dirname(args.output)
         if output_dir and not os.path.exists(output_dir):
             errors.append(f"Output directory does not exist: {output_dir}")
@@ -931,6 +1041,102 @@ def validate_cache_file(cache_file: str, rom_name: str) -> bool:
         return False
 
 # Replace the argument parsing section in main() with this:
+def read_rom_list(list_path):
+    """Read ROM names from a text file, one per line; blank lines and # comments are ignored"""
+    rom_names = []
+    with open(list_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            rom_name = line.split('#', 1)[0].strip()
+            if rom_name and rom_name not in rom_names:
+                rom_names.append(rom_name)
+    return rom_names
+
+def precache_many_games(mame_dir, list_path=None, db_path=None, db_only=False):
+    """
+    Pre-build the cache for every available ROM, or the ROMs in list_path
+    gamedata, default.cfg and the settings are loaded once rather than once per ROM
+    """
+    import time
+    from mame_data_utils import (
+        load_gamedata_json, get_game_data, get_game_data_from_db, scan_roms_directory,
+        precache_games, clean_cache_directory
+    )
+    from mame_game_cache import get_game_cache, load_cache_settings, load_cache_limits
+    
+    preview_dir = os.path.join(mame_dir, "preview")
+    settings_dir = os.path.join(preview_dir, "settings")
+    cache_dir = os.path.join(preview_dir, "cache")
+    start_time = time.time()
+    
+    if list_path:
+        rom_names = read_rom_list(list_path)
+        print(f"📋 {len(rom_names)} ROMs listed in {list_path}")
+    else:
+        rom_names = sorted(scan_roms_directory(mame_dir))
+    
+    if not rom_names:
+        print("❌ No ROMs to precache")
+        return 1
+    
+    if db_only:
+        load_game_data = lambda rom_name: get_game_data_from_db(rom_name, db_path)
+    else:
+        gamedata_path = os.path.join(settings_dir, "gamedata.json")
+        if not os.path.exists(gamedata_path):
+            print(f"❌ ERROR: gamedata.json not found at {gamedata_path}")
+            return 1
+        gamedata_json, parent_lookup, _ = load_gamedata_json(gamedata_path)
+        load_game_data = lambda rom_name: get_game_data(rom_name, gamedata_json, parent_lookup, db_path)
+    
+    cache_settings = load_cache_settings(settings_dir)
+    game_cache = get_game_cache(cache_dir)
+    workers = os.cpu_count() or 1
+    print(f"🎮 Cache settings: mode={cache_settings.input_mode}, xinput_only={cache_settings.xinput_only_mode}, "
+          f"friendly={cache_settings.friendly_names}")
+    print(f"📦 Precaching {len(rom_names)} ROMs with up to {workers} worker processes...")
+    
+    process_start = [0.0]
+    last_report = [0.0]
+    
+    def report_progress(done, total, failed):
+        now = time.time()
+        if done == 0:
+            # Cache validity checks are done - throughput counts from here
+            process_start[0] = last_report[0] = now
+            print(f"  {total} ROMs need processing")
+            return
+        if done < total and now - last_report[0] < 1.0:
+            return
+        last_report[0] = now
+        elapsed = max(now - process_start[0], 1e-6)
+        print(f"  [{done}/{total}] {done * 100 // total}% - {done / elapsed:.0f} ROMs/s"
+              f"{f' - {failed} failed' if failed else ''}")
+    
+    counts = precache_games(rom_names, mame_dir, cache_settings, game_cache, load_game_data,
+                            workers=workers, progress=report_progress)
+    
+    elapsed = time.time() - start_time
+    print("=" * 50)
+    print(f"✅ PRECACHE COMPLETE")
+    print(f"📦 Cached: {counts['cached']}")
+    print(f"⏭️  Already up to date: {counts['skipped']}")
+    if counts['missing']:
+        print(f"❓ No game data: {counts['missing']}")
+    if counts['failed']:
+        print(f"❌ Failed: {counts['failed']}")
+    print(f"⏱️  Time: {elapsed:.1f} seconds ({len(rom_names) / max(elapsed, 1e-6):.0f} ROMs/s)")
+    
+    cache_limits = load_cache_limits(settings_dir)
+    if cache_limits.auto_cleanup:
+        clean_cache_directory(cache_dir, cache_limits.max_age_days, cache_limits.max_size_mb)
+        cache_stats = game_cache.stats()
+        if cache_stats['roms'] < counts['cached'] + counts['skipped']:
+            print(f"⚠️  The {cache_limits.max_size_mb} MB cache budget cannot hold every game; "
+                  f"raise max_size_mb in cache_settings.json to keep them all")
+    print("=" * 50)
+    
+    return 1 if counts['failed'] else 0
+
 def main():
     """Main entry point for the application with improved path handling and comprehensive argument parsing"""
     print("Starting MAME Controls application...")
@@ -962,6 +1168,9 @@ def main():
         parser = create_argument_parser()
         args = parser.parse_args()
         
+        if args.status_file:
+            start_status_file(args.status_file)
+        
         # Validate argument combinations
         validation_errors = validate_arguments(args)
         if validation_errors:
@@ -973,6 +1182,26 @@ def main():
         
         print("✅ Arguments parsed and validated.")
         
+        # Client of the preview server - answered before any of the heavy imports below
+        if args.show:
+            from mame_preview_server import request_preview
+            
+            reply = request_preview(mame_dir, args.show, clean_mode=args.clean_preview,
+                                    hide_buttons=args.no_buttons, screen=args.screen)
+            if reply is not None and not reply.get('dropped'):
+                if reply.get('status') == 'error':
+                    print(f"❌ Preview server: {reply.get('message')}")
+                    return 1
+                return 0
+            
+            if reply is None:
+                print("No preview server running, showing the preview directly")
+            else:
+                # The server died with the request, so MAME's pause would show nothing
+                print(f"❌ Preview server dropped the request ({reply.get('message')}), showing the preview directly")
+            args.game = args.show
+            args.preview_only = True
+        
         # Make sure the path is properly set for module imports
         script_dir = os.path.dirname(os.path.abspath(__file__))
         sys.path.append(script_dir)
@@ -1018,6 +1247,36 @@ def main():
             print("📄 No database found, will use JSON lookup")
             use_database = False
 
+        # Handle full database rebuild (no GUI needed)
+        if args.rebuild_db:
+            from mame_data_utils import load_gamedata_json, build_gamedata_db
+            
+            gamedata_path = os.path.join(settings_dir, "gamedata.json")
+            if not os.path.exists(gamedata_path):
+                print(f"❌ ERROR: gamedata.json not found at {gamedata_path}")
+                return 1
+            
+            print(f"🗃️  Rebuilding database from {gamedata_path}")
+            gamedata_json, _, _ = load_gamedata_json(gamedata_path)
+            if build_gamedata_db(gamedata_json, db_path):
+                print(f"✅ Database rebuilt: {db_path}")
+                return 0
+            print("❌ Database rebuild failed")
+            return 1
+        
+        # Resident preview server (runs until stopped)
+        if args.serve:
+            from mame_preview_server import run_preview_server
+            return run_preview_server(mame_dir)
+        
+        # Handle bulk precache (no GUI needed)
+        if args.precache_all or args.precache_list:
+            if args.use_db and not use_database:
+                print("❌ Cannot use --use-db: database not available")
+                return 1
+            return precache_many_games(mame_dir, args.precache_list, db_path if use_database else None,
+                                       db_only=args.use_db)
+        
         # Handle precache mode separately (no GUI needed)
         if args.game and args.precache:
             print(f"📦 Precaching game data for: {args.game}")
@@ -1036,39 +1295,21 @@ def main():
             cache_dir = os.path.join(preview_dir, "cache")
             settings_dir = os.path.join(preview_dir, "settings")
             os.makedirs(cache_dir, exist_ok=True)
-            cache_file = os.path.join(cache_dir, f"{args.game}_cache.json")
-            
-            # Check if we have an old format cache that needs migration
-            needs_migration = False
-            if os.path.exists(cache_file):
-                try:
-                    with open(cache_file, 'r') as f:
-                        existing_cache = json.load(f)
-                    
-                    # Check if it's old format (direct game data without wrapper)
-                    if isinstance(existing_cache, dict) and 'players' in existing_cache and 'game_data' not in existing_cache:
-                        print(f"🔄 Found OLD format cache for {args.game} - will migrate to new format")
-                        needs_migration = True
-                    elif isinstance(existing_cache, dict) and 'game_data' in existing_cache:
-                        print(f"✅ Found NEW format cache for {args.game} - will refresh with latest data")
-                    else:
-                        print(f"❓ Found unrecognized cache format for {args.game} - will rebuild")
-                        needs_migration = True
-                        
-                except Exception as e:
-                    print(f"⚠️  Error reading existing cache: {e} - will rebuild")
-                    needs_migration = True
             
             try:
                 # Import data utilities directly
                 from mame_data_utils import (
-                    load_gamedata_json, load_custom_configs, load_default_config,
-                    parse_cfg_controls, convert_mapping, update_game_data_with_custom_mappings,
-                    filter_xinput_controls, get_game_data, get_game_data_from_db
+                    load_gamedata_json, load_default_config, process_game_data,
+                    get_game_data, get_game_data_from_db, compute_game_input_hash, get_game_input_files,
+                    clean_cache_directory
                 )
+                from mame_game_cache import CacheSettings, get_game_cache, load_cache_limits
                 
                 # Load input mode and settings from settings file
                 input_mode, xinput_only_mode, friendly_names = load_input_mode_from_settings(preview_dir)
+                cache_settings = CacheSettings(input_mode, friendly_names, xinput_only_mode)
+                game_cache = get_game_cache(cache_dir)
+                cache_file = game_cache.db_path
                 
                 print(f"🎮 Cache settings: mode={input_mode}, xinput_only={xinput_only_mode}, friendly={friendly_names}")
                 
@@ -1127,62 +1368,35 @@ def main():
                 
                 print(f"📋 Data source: {game_data.get('source', 'unknown')}")
                 
-                # Process custom mappings (same for both database and JSON)
-                cfg_controls = {}
-                
-                # Load custom configs and default controls for processing
-                if not args.use_db or not use_database:
-                    # Only load these if we're not in pure database mode
-                    custom_configs = load_custom_configs(mame_dir)
-                    default_controls, original_default_controls = load_default_config(mame_dir)
-                else:
-                    # In pure database mode, we still need these for custom mapping processing
-                    print("🔧 Loading configs for custom mapping processing...")
-                    custom_configs = load_custom_configs(mame_dir)
-                    default_controls, original_default_controls = load_default_config(mame_dir)
+                # Load default controls for processing
+                default_controls, original_default_controls = load_default_config(mame_dir)
                 
-                # Process custom mappings if they exist
-                if args.game in custom_configs:
-                    cfg_content = custom_configs[args.game]
-                    parsed_controls = parse_cfg_controls(cfg_content, input_mode)
-                    if parsed_controls:
-                        print(f"🎛️  Found {len(parsed_controls)} control mappings in ROM CFG")
-                        cfg_controls = {
-                            control: convert_mapping(mapping, input_mode)
-                            for control, mapping in parsed_controls.items()
-                        }
-                    else:
-                        print(f"📄 ROM CFG exists but contains no control mappings")
-                
-                # Apply custom mappings and input mode processing
-                game_data = update_game_data_with_custom_mappings(
-                    game_data=game_data,
-                    cfg_controls=cfg_controls,
-                    default_controls=default_controls,
-                    original_default_controls=original_default_controls,
-                    input_mode=input_mode
-                )
+                if os.path.exists(os.path.join(mame_dir, "cfg", f"{args.game}.cfg")):
+                    print(f"🎛️  Applying control mappings from ROM CFG")
                 
-                # Apply XInput-only filtering if enabled
-                if xinput_only_mode:
-                    game_data = filter_xinput_controls(game_data)
-                    print(f"🎯 Applied XInput-only filter")
+                # An entry built from the same gamedata, cfg files and mapping tables is still valid
+                input_hash = compute_game_input_hash(args.game, game_data, mame_dir)
+                cached_game_data = game_cache.get(args.game, cache_settings, input_hash)
                 
-                # Save the processed game data to NEW cache format
                 try:
-                    # Create cache in new format with metadata wrapper
-                    new_cache_data = {
-                        'rom_name': args.game,
-                        'input_mode': input_mode,
-                        'friendly_names': friendly_names,
-                        'xinput_only_mode': xinput_only_mode,
-                        'cached_timestamp': time.time(),
-                        'cache_version': '2.0',  # Mark as new format
-                        'game_data': game_data  # The actual game data
-                    }
-                    
-                    with open(cache_file, 'w') as f:
-                        json.dump(new_cache_data, f, indent=2)
+                    if cached_game_data is not None:
+                        print(f"✅ Cache for {args.game} is up to date")
+                        game_data = cached_game_data
+                    else:
+                        # Same processing as the GUI: cfg mappings, MAME defaults and XInput-only filter
+                        game_data = process_game_data(args.game, game_data, mame_dir, cache_settings,
+                                                      default_controls, original_default_controls)
+                        
+                        # Save the processed game data to the shared cache
+                        if not game_cache.put(args.game, cache_settings, game_data, input_hash,
+                                              get_game_input_files(mame_dir, args.game)):
+                            print(f"❌ Could not write to cache store: {cache_file}")
+                            return 1
+                        
+                        # The store only grows on a write, so this is where it is kept within budget
+                        cache_limits = load_cache_limits(settings_dir)
+                        if cache_limits.auto_cleanup:
+                            clean_cache_directory(cache_dir, cache_limits.max_age_days, cache_limits.max_size_mb)
                     
                     load_time = time.time() - start_time
                     
@@ -1195,11 +1409,7 @@ def main():
                     print(f"🎛️  Input Mode: {input_mode}")
                     print(f"🎯 XInput-only: {xinput_only_mode}")
                     print(f"🎨 Friendly Names: {friendly_names}")
-                    print(f"📁 Cache File: {os.path.basename(cache_file)}")
-                    print(f"📋 Cache Version: 2.0 (NEW FORMAT)")
-                    
-                    if needs_migration:
-                        print(f"🔄 Successfully migrated from old cache format")
+                    print(f"📁 Cache Store: {os.path.basename(cache_file)}")
                     
                     if use_database and args.use_db:
                         print(f"🗃️  Database Mode: FORCED (bypassed cache)")
@@ -1304,10 +1514,10 @@ def main():
             # PERFORMANCE FIX 1: Quick cache check only
             preview_dir = os.path.join(mame_dir, "preview")
             cache_dir = os.path.join(preview_dir, "cache")
-            cache_file = os.path.join(cache_dir, f"{args.game}_cache.json")
             
-            # For standard preview mode, just check cache exists (skip heavy validation)
-            if not args.use_db and not os.path.exists(cache_file):
+            # For standard preview mode, just check the ROM is cached (the preview validates the entry)
+            from mame_game_cache import get_game_cache
+            if not args.use_db and not get_game_cache(cache_dir).has_rom(args.game):
                 print(f"❌ No cache for '{args.game}' - run precache first")
                 return 1
             
@@ -1362,11 +1572,13 @@ def main():
                 return 1
                 
             try:
-                # Initialize PyQt for the export
-                from PyQt5.QtWidgets import QApplication
+                # Rendering needs fonts and images but no widgets - unless it is checked against a preview window
+                if args.check_export:
+                    from PyQt5.QtWidgets import QApplication as QGuiApplication
+                else:
+                    from PyQt5.QtGui import QGuiApplication
                 
-                # Create QApplication
-                app = QApplication(sys.argv)
+                app = QGuiApplication(sys.argv)
                 app.setApplicationName("MAME Control Preview Export")
                 
                 # Get application paths
@@ -1374,19 +1586,14 @@ def main():
                 mame_dir = get_mame_parent_dir(app_dir)
                 
                 # Get game data (using cached data if available)
+                from mame_game_cache import get_game_cache, load_cache_settings
                 preview_dir = os.path.join(mame_dir, "preview")
                 cache_dir = os.path.join(preview_dir, "cache")
-                cache_file = os.path.join(cache_dir, f"{args.game}_cache.json")
                 
-                game_data = None
-                if os.path.exists(cache_file):
-                    try:
-                        import json
-                        with open(cache_file, 'r') as f:
-                            game_data = json.load(f)
-                        print(f"Using cached data for {args.game}")
-                    except Exception as e:
-                        print(f"Error loading cache: {e}")
+                game_data = get_game_cache(cache_dir).get(
+                    args.game, load_cache_settings(os.path.join(preview_dir, "settings")))
+                if game_data:
+                    print(f"Using cached data for {args.game}")
                 
                 if not game_data:
                     # Import module for game data
@@ -1400,47 +1607,30 @@ def main():
                         
                     # Create config to access game data
                     config = MAMEControlConfig(preview_only=True)
-                    game_data = config.get_unified_game_data(args.game)
+                    game_data = config.build_processed_game_data(
+                        args.game, load_cache_settings(os.path.join(preview_dir, "settings")))
                     
                     if not game_data:
                         print(f"ERROR: No game data found for {args.game}")
                         return 1
                 
-                # Import the PreviewWindow class
-                try:
-                    from mame_controls_preview import PreviewWindow
-                except ImportError:
-                    print("ERROR: Could not import PreviewWindow class")
-                    return 1
-                    
-                # Create the preview window (not visible)
-                preview = PreviewWindow(
-                    args.game, 
-                    game_data, 
-                    mame_dir,
-                    hide_buttons=True,  # Always hide buttons in export mode
-                    clean_mode=True     # Always use clean mode in export mode
-                )
-                
-                # Configure bezel/logo visibility
-                if args.no_bezel and hasattr(preview, 'bezel_visible'):
-                    preview.bezel_visible = False
-                    
-                if args.no_logo and hasattr(preview, 'logo_visible'):
-                    preview.logo_visible = False
-                    if hasattr(preview, 'logo_label') and preview.logo_label:
-                        preview.logo_label.setVisible(False)
+                from mame_layout_renderer import export_layout_image
                 
-                # Export the image
-                if hasattr(preview, 'export_image_headless'):
-                    if preview.export_image_headless(args.output, args.format):
-                        print(f"Successfully exported preview for {args.game} to {args.output}")
-                        return 0
-                    else:
-                        print(f"Failed to export preview for {args.game}")
-                        return 1
+                # Paint the layout straight into an image - no preview window is created
+                if export_layout_image(args.game, game_data, mame_dir, args.output, args.format,
+                                       show_bezel=not args.no_bezel, show_logo=not args.no_logo):
+                    print(f"Successfully exported preview for {args.game} to {args.output}")
+                    if args.check_export:
+                        from mame_layout_renderer import check_against_preview
+                        
+                        differing = check_against_preview(args.game, game_data, mame_dir)
+                        if differing:
+                            print(f"CHECK FAILED: {differing} pixels differ from the preview window's image")
+                            return 1
+                        print("Check passed: export matches the preview window's image")
+                    return 0
                 else:
-                    print("ERROR: Export method not available")
+                    print(f"Failed to export preview for {args.game}")
                     return 1
                     
             except Exception as e:
@@ -1518,38 +1708,12 @@ def main():
                 pass
 
 def load_input_mode_from_settings(preview_dir):
-    """Load the current input mode from settings file with enhanced error handling"""
-    settings_dir = os.path.join(preview_dir, "settings")
-    settings_path = os.path.join(settings_dir, "control_config_settings.json")
-    
-    # Default to xinput if no settings found
-    default_input_mode = 'xinput'
-    default_xinput_only_mode = True
-    default_friendly_names = True
+    """Load the current input mode, XInput-only and friendly names settings from the settings file"""
+    from mame_game_cache import load_cache_settings
     
-    try:
-        if os.path.exists(settings_path):
-            with open(settings_path, 'r') as f:
-                settings = json.load(f)
-            
-            # Load input mode
-            input_mode = settings.get('input_mode', default_input_mode)
-            if input_mode not in ['joycode', 'xinput', 'dinput', 'keycode']:
-                print(f"Invalid input mode '{input_mode}' in settings, using default: {default_input_mode}")
-                input_mode = default_input_mode
-            
-            # Load other settings that affect cache
-            xinput_only_mode = settings.get('xinput_only_mode', default_xinput_only_mode)
-            friendly_names = settings.get('friendly_names', default_friendly_names)
-                
-            print(f"Loaded settings: mode={input_mode}, xinput_only={xinput_only_mode}, friendly={friendly_names}")
-            return input_mode, xinput_only_mode, friendly_names
-        else:
-            print(f"No settings file found at {settings_path}, using defaults")
-            return default_input_mode, default_xinput_only_mode, default_friendly_names
-    except Exception as e:
-        print(f"Error loading settings: {e}, using defaults")
-        return default_input_mode, default_xinput_only_mode, default_friendly_names
+    settings = load_cache_settings(os.path.join(preview_dir, "settings"))
+    print(f"Loaded settings: mode={settings.input_mode}, xinput_only={settings.xinput_only_mode}, friendly={settings.friendly_names}")
+    return settings.input_mode, settings.xinput_only_mode, settings.friendly_names
 
 def set_dark_theme(app):
     """Apply a dark theme to the PyQt application"""
@@ -1671,13 +1835,21 @@ def set_dark_theme(app):
 
 
 if __name__ == "__main__":
+    # Worker processes of --precache-all start from this entry point in the frozen build
+    multiprocessing.freeze_support()
+    exit_code = 1
     try:
-        main()
+        exit_code = main()
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
     except Exception as e:
         print(f"Unhandled exception: {e}")
         import traceback
         traceback.print_exc()
     finally:
+        # Tell the MAME plugin this launch is over, however it ended
+        finish_status_file(exit_code if isinstance(exit_code, int) else 0)
+        
         # Make sure cleanup happens even after exceptions
         cleanup_on_exit()
         
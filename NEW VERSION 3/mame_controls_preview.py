@@ -9,6 +9,20 @@ from PyQt5.QtWidgets import (QGridLayout, QLayout, QLineEdit, QMainWindow, QMess
 from PyQt5.QtGui import QBrush, QLinearGradient, QPalette, QPixmap, QFont, QColor, QPainter, QPen, QFontMetrics
 from PyQt5.QtCore import Qt, QPoint, QTimer
 
+# Font file path -> Qt font id, so a resident preview server registers each font file only once
+_registered_fonts = {}
+
+def register_application_font(font_path):
+    """QFontDatabase.addApplicationFont that remembers fonts already registered in this process"""
+    from PyQt5.QtGui import QFontDatabase
+    
+    font_id = _registered_fonts.get(font_path)
+    if font_id is None:
+        font_id = QFontDatabase.addApplicationFont(font_path)
+        if font_id >= 0:
+            _registered_fonts[font_path] = font_id
+    return font_id
+
 # Helper function that should be at the top of the file
 def get_application_path():
     """Get the base path for the application (handles PyInstaller bundling)"""
@@ -34,6 +48,525 @@ def get_mame_parent_dir(app_path=None):
         # We're already in the MAME directory
         return app_path
     
+def find_bezel_image(preview_dir, rom_name):
+    """Find bezel image path for a ROM name with updated paths that work regardless of MAME folder name"""
+    # Get the parent directory of where the exe runs
+    parent_dir = get_mame_parent_dir()
+
+    # Define possible locations for bezels
+    possible_paths = [
+        # Priority 1: First look in preview/bezels directory
+        os.path.join(preview_dir, "bezels", f"{rom_name}.png"),
+        os.path.join(preview_dir, "bezels", f"{rom_name}_bezel.png"),
+
+        # Priority 2: Check in preview/artwork directory 
+        os.path.join(preview_dir, "artwork", rom_name, "Bezel.png"),
+        os.path.join(preview_dir, "artwork", rom_name, "bezel.png"),
+        os.path.join(preview_dir, "artwork", rom_name, f"{rom_name}_bezel.png"),
+
+        # Priority 3: Look in parent directory's artwork folder (works regardless of MAME folder name)
+        os.path.join(parent_dir, "artwork", rom_name, "Bezel.png"),
+        os.path.join(parent_dir, "artwork", rom_name, "bezel.png"),
+        os.path.join(parent_dir, "artwork", rom_name, f"{rom_name}_bezel.png"),
+        os.path.join(parent_dir, "bezels", f"{rom_name}.png"),
+        os.path.join(parent_dir, "bezels", f"{rom_name}_bezel.png"),
+
+        # Priority 4: Check common artwork subdirectories in parent folder
+        os.path.join(parent_dir, "artwork", "bezels", f"{rom_name}.png"),
+        os.path.join(parent_dir, "artwork", "bezels", f"{rom_name}_bezel.png"),
+    ]
+
+    # Check each possible path
+    for path in possible_paths:
+        if os.path.exists(path):
+            print(f"Found bezel at: {path}")
+            return path
+
+    print(f"No bezel found for {rom_name}")
+    return None
+
+def find_logo_image(preview_dir, rom_name):
+    """Find logo path for a ROM name with updated paths that work regardless of MAME folder name"""
+    # Get the parent directory of where the exe runs
+    parent_dir = get_mame_parent_dir()
+
+    # Define possible locations for logos
+    possible_paths = [
+        # Priority 1: First look in preview/logos directory
+        os.path.join(preview_dir, "logos", f"{rom_name}.png"),
+        os.path.join(preview_dir, "logos", f"{rom_name}.jpg"),
+
+        # Priority 2: Check in collections path (if it exists)
+        os.path.join(parent_dir, "..", "..", "collections", "Arcades", "medium_artwork", "logo", f"{rom_name}.png"),
+        os.path.join(parent_dir, "..", "..", "collections", "Arcades", "medium_artwork", "logo", f"{rom_name}.jpg"),
+
+        # Priority 3: Check in parent directory's artwork/logos
+        os.path.join(parent_dir, "artwork", "logos", f"{rom_name}.png"),
+        os.path.join(parent_dir, "artwork", "logos", f"{rom_name}.jpg"),
+
+        # Priority 4: Check for logos in parent directory's common locations
+        os.path.join(parent_dir, "logos", f"{rom_name}.png"),
+        os.path.join(parent_dir, "logos", f"{rom_name}.jpg"),
+    ]
+
+    # Check each possible path
+    for path in possible_paths:
+        if os.path.exists(path):
+            print(f"Found logo at: {path}")
+            return path
+
+    # If not found by exact name, try case-insensitive search in priority directories
+    logo_dirs = [
+        os.path.join(preview_dir, "logos"),
+        os.path.join(parent_dir, "..", "..", "collections", "Arcades", "medium_artwork", "logo"),
+        os.path.join(parent_dir, "artwork", "logos"),
+        os.path.join(parent_dir, "logos")
+    ]
+
+    for logo_dir in logo_dirs:
+        if os.path.exists(logo_dir):
+            for filename in os.listdir(logo_dir):
+                file_base, file_ext = os.path.splitext(filename.lower())
+                if file_base == rom_name.lower() and file_ext.lower() in ['.png', '.jpg', '.jpeg']:
+                    logo_path = os.path.join(logo_dir, filename)
+                    print(f"Found logo with case-insensitive match: {logo_path}")
+                    return logo_path
+
+    print(f"No logo found for {rom_name}")
+    return None
+
+def get_button_prefix_for_control(control_name):
+    """Generate button prefix based on control name with support for specialized controls"""
+    # Standard XInput control prefixes
+    standard_prefixes = {
+        'P1_BUTTON1': 'A',
+        'P1_BUTTON2': 'B',
+        'P1_BUTTON3': 'X',
+        'P1_BUTTON4': 'Y',
+        'P1_BUTTON5': 'LB',
+        'P1_BUTTON6': 'RB', 
+        'P1_BUTTON7': 'LT',
+        'P1_BUTTON8': 'RT',
+        'P1_BUTTON9': 'LS',
+        'P1_BUTTON10': 'RS',
+        'P1_START': 'START',
+        'P1_SELECT': 'BACK',
+        # Left joystick - both naming conventions
+        'P1_JOYSTICK_UP': 'LS↑',
+        'P1_JOYSTICK_DOWN': 'LS↓',
+        'P1_JOYSTICK_LEFT': 'LS←',
+        'P1_JOYSTICK_RIGHT': 'LS→',
+        'P1_JOYSTICKLEFT_UP': 'LS↑',     # Add this
+        'P1_JOYSTICKLEFT_DOWN': 'LS↓',   # Add this 
+        'P1_JOYSTICKLEFT_LEFT': 'LS←',   # Add this
+        'P1_JOYSTICKLEFT_RIGHT': 'LS→',  # Add this
+
+        # Right joystick mappings
+        'P1_JOYSTICKRIGHT_UP': 'RS↑',
+        'P1_JOYSTICKRIGHT_DOWN': 'RS↓',
+        'P1_JOYSTICKRIGHT_LEFT': 'RS←',
+        'P1_JOYSTICKRIGHT_RIGHT': 'RS→',
+    }
+
+    # Add specialized MAME control prefixes
+    specialized_prefixes = {
+        # Rotary controls
+        'P1_DIAL': 'DIAL',
+        'P1_DIAL_V': 'DIAL↑↓',
+        'P1_PADDLE': 'PDL',
+
+        # Trackball controls
+        'P1_TRACKBALL_X': 'TRK←→',
+        'P1_TRACKBALL_Y': 'TRK↑↓',
+
+        # Mouse controls
+        'P1_MOUSE_X': 'MSE←→',
+        'P1_MOUSE_Y': 'MSE↑↓',
+
+        # Light gun controls
+        'P1_LIGHTGUN_X': 'GUN←→',
+        'P1_LIGHTGUN_Y': 'GUN↑↓',
+
+        # Analog stick controls
+        'P1_AD_STICK_X': 'ASX',
+        'P1_AD_STICK_Y': 'ASY',
+        'P1_AD_STICK_Z': 'ASZ',
+
+        # Pedal inputs
+        'P1_PEDAL': 'PED1',
+        'P1_PEDAL2': 'PED2',
+
+        # Positional control
+        'P1_POSITIONAL': 'POS',
+
+        # Gambling controls
+        'P1_GAMBLE_HIGH': 'HIGH',
+        'P1_GAMBLE_LOW': 'LOW',
+    }
+
+    # Combine standard and specialized prefixes
+    all_prefixes = {**standard_prefixes, **specialized_prefixes}
+
+    # Return the prefix if found, otherwise empty string
+    return all_prefixes.get(control_name, "")
+
+def get_button_prefix_from_mapping(mapping, use_xinput=True):
+    """Get the button prefix based on mapping string, including multiple button assignments and new MAME codes"""
+    # Standard XINPUT mappings
+    xinput_to_prefix = {
+        "XINPUT_1_A": "A",
+        "XINPUT_1_B": "B",
+        "XINPUT_1_X": "X",
+        "XINPUT_1_Y": "Y",
+        "XINPUT_1_SHOULDER_L": "LB",
+        "XINPUT_1_SHOULDER_R": "RB",
+        "XINPUT_1_TRIGGER_L": "LT",
+        "XINPUT_1_TRIGGER_R": "RT",
+        "XINPUT_1_THUMB_L": "LS",
+        "XINPUT_1_THUMB_R": "RS",
+        "XINPUT_1_DPAD_UP": "D↑",
+        "XINPUT_1_DPAD_DOWN": "D↓",
+        "XINPUT_1_DPAD_LEFT": "D←",
+        "XINPUT_1_DPAD_RIGHT": "D→",
+        "XINPUT_1_START": "START",
+        "XINPUT_1_SELECT": "BACK",
+
+        # ADD THESE FOR DUAL-STICK GAMES LIKE SMASH T.V.:
+        "XINPUT_1_LEFTY_POS": "LS↓",      # Left stick down
+        "XINPUT_1_LEFTY_NEG": "LS↑",      # Left stick up  
+        "XINPUT_1_LEFTX_POS": "LS→",      # Left stick right
+        "XINPUT_1_LEFTX_NEG": "LS←",      # Left stick left
+        "XINPUT_1_RIGHTY_POS": "RS↓",     # Right stick down
+        "XINPUT_1_RIGHTY_NEG": "RS↑",     # Right stick up
+        "XINPUT_1_RIGHTX_POS": "RS→",     # Right stick right
+        "XINPUT_1_RIGHTX_NEG": "RS←",     # Right stick left
+    }
+
+    # Add DirectInput mappings - EXPANDED WITH MISSING SLIDER MAPPINGS
+    dinput_to_prefix = {
+        # Buttons - Start from 1 as users expect (even though DirectInput is 0-based internally)
+        "DINPUT_1_BUTTON0": "B1",   # First button = Button 1 to user
+        "DINPUT_1_BUTTON1": "B2",   # Second button = Button 2 to user
+        "DINPUT_1_BUTTON2": "B3",   # Third button = Button 3 to user
+        "DINPUT_1_BUTTON3": "B4",
+        "DINPUT_1_BUTTON4": "B5",
+        "DINPUT_1_BUTTON5": "B6",
+        "DINPUT_1_BUTTON6": "B7",
+        "DINPUT_1_BUTTON7": "B8",
+        "DINPUT_1_BUTTON8": "B9",
+        "DINPUT_1_BUTTON9": "B10",
+
+        # POV Hat (D-Pad equivalent)
+        "DINPUT_1_POV_UP": "HAT↑",
+        "DINPUT_1_POV_DOWN": "HAT↓",
+        "DINPUT_1_POV_LEFT": "HAT←",
+        "DINPUT_1_POV_RIGHT": "HAT→",
+
+        # Primary Axes - More descriptive
+        "DINPUT_1_XAXIS_NEG": "X-",     # X-axis negative (left)
+        "DINPUT_1_XAXIS_POS": "X+",     # X-axis positive (right)
+        "DINPUT_1_YAXIS_NEG": "Y-",     # Y-axis negative (up/forward)
+        "DINPUT_1_YAXIS_POS": "Y+",     # Y-axis positive (down/back)
+
+        # Rotation Axes
+        "DINPUT_1_ZAXIS": "Z-AXIS",     # Z rotation
+        "DINPUT_1_RZAXIS": "RZ-AXIS",   # RZ rotation
+
+        # ADD THESE MISSING SLIDER MAPPINGS FOR OUT RUN:
+        "DINPUT_1_SLIDER0": "SL1",       # Slider 0 (full axis)
+        "DINPUT_1_SLIDER0_NEG": "SL1-",  # Slider 0 negative (brake)
+        "DINPUT_1_SLIDER0_POS": "SL1+",  # Slider 0 positive
+        "DINPUT_1_SLIDER1": "SL2",       # Slider 1 (full axis)
+        "DINPUT_1_SLIDER1_NEG": "SL2-",  # Slider 1 negative (accelerate)
+        "DINPUT_1_SLIDER1_POS": "SL2+",  # Slider 1 positive
+        "DINPUT_1_SLIDER2": "SL3",       # Slider 2 (full axis)
+        "DINPUT_1_SLIDER2_NEG": "SL3-",  # Slider 2 negative
+        "DINPUT_1_SLIDER2_POS": "SL3+",  # Slider 2 positive
+    }
+
+    # MAME specialized control mappings
+    mame_to_prefix = {
+        # Analog mappings
+        "JOYCODE_1_XAXIS": "ASX",
+        "JOYCODE_1_YAXIS": "ASY",
+        "JOYCODE_1_ZAXIS": "ASZ",
+
+        # Mouse mappings
+        "MOUSECODE_1_XAXIS": "MSE←→",
+        "MOUSECODE_1_YAXIS": "MSE↑↓",
+
+        # Trackball mappings
+        "TRACKCODE_1_XAXIS": "TRK←→",
+        "TRACKCODE_1_YAXIS": "TRK↑↓",
+
+        # Lightgun mappings  
+        "GUNCODE_1_XAXIS": "GUN←→",
+        "GUNCODE_1_YAXIS": "GUN↑↓",
+
+        # Dial/Paddle mappings
+        "DIALCODE_1_XAXIS": "DIAL",
+        "DIALCODE_1_YAXIS": "DIAL↕",
+        "PADDLE_1_X": "PDL",
+
+        # Pedal mappings
+        "PEDALCODE_1": "PED1",
+        "PEDALCODE_2": "PED2",
+
+        # Positional
+        "POSITIONAL_1": "POS",
+
+        # Additional dial-type control codes
+        "MOUSECODE_1_XAXIS_POS_FAST": "MSE→+",
+        "MOUSECODE_1_XAXIS_NEG_FAST": "MSE←+",
+        "MOUSECODE_1_YAXIS_POS_FAST": "MSE↓+",
+        "MOUSECODE_1_YAXIS_NEG_FAST": "MSE↑+",
+        "TRACKCODE_1_XAXIS_POS_FAST": "TRK→+",
+        "TRACKCODE_1_XAXIS_NEG_FAST": "TRK←+",
+        "TRACKCODE_1_YAXIS_POS_FAST": "TRK↓+",
+        "TRACKCODE_1_YAXIS_NEG_FAST": "TRK↑+"
+    }
+
+    # Add directional joystick mappings (including both old and new formats)
+    directional_to_prefix = {
+        # Left stick mappings - STANDARD FORMAT
+        "JOYCODE_1_XAXIS_RIGHT_SWITCH": "→",
+        "JOYCODE_1_XAXIS_LEFT_SWITCH": "←",
+        "JOYCODE_1_YAXIS_UP_SWITCH": "↑",
+        "JOYCODE_1_YAXIS_DOWN_SWITCH": "↓",
+
+        # Left stick mappings - NEW SLIDER2 FORMAT
+        "JOYCODE_1_SLIDER2_LEFT_SWITCH": "←",
+        "JOYCODE_1_SLIDER2_RIGHT_SWITCH": "→",
+        "JOYCODE_1_SLIDER2_UP_SWITCH": "↑",
+        "JOYCODE_1_SLIDER2_DOWN_SWITCH": "↓",
+
+        # RIGHT STICK MAPPINGS
+        "JOYCODE_1_RXAXIS_POS_SWITCH": "RS→",   # Right stick right
+        "JOYCODE_1_RXAXIS_NEG_SWITCH": "RS←",   # Right stick left  
+        "JOYCODE_1_RYAXIS_NEG_SWITCH": "RS↑",   # Right stick up
+        "JOYCODE_1_RYAXIS_POS_SWITCH": "RS↓",   # Right stick down
+
+        # D-pad mappings - OLD FORMAT (for backward compatibility)
+        "JOYCODE_1_DPADUP": "D↑",
+        "JOYCODE_1_DPADDOWN": "D↓",
+        "JOYCODE_1_DPADLEFT": "D←",
+        "JOYCODE_1_DPADRIGHT": "D→",
+
+        # D-pad mappings - NEW FORMAT (HAT controls)
+        "JOYCODE_1_HAT1UP": "D↑",
+        "JOYCODE_1_HAT1DOWN": "D↓",
+        "JOYCODE_1_HAT1LEFT": "D←",
+        "JOYCODE_1_HAT1RIGHT": "D→",
+    }
+
+    # Add trigger/analog axis mappings (including both old and new formats)
+    trigger_to_prefix = {
+        # OLD FORMAT - for backward compatibility
+        "JOYCODE_1_ZAXIS_NEG_SWITCH": "LT",
+        "JOYCODE_1_ZAXIS_POS_SWITCH": "LT+",
+        "JOYCODE_1_RZAXIS_NEG_SWITCH": "RT",
+        "JOYCODE_1_RZAXIS_POS_SWITCH": "RT+",
+        "JOYCODE_1_ZAXIS": "LT",         # Left Trigger full axis
+        "JOYCODE_1_RZAXIS": "RT",        # Right Trigger full axis
+
+        # NEW FORMAT - SLIDER controls
+        "JOYCODE_1_SLIDER2_NEG_SWITCH": "LT",
+        "JOYCODE_1_SLIDER2_POS_SWITCH": "LT+",
+
+        # Other axis mappings
+        "JOYCODE_1_XAXIS": "LS←→",       # Left Stick X
+        "JOYCODE_1_YAXIS": "LS↑↓",       # Left Stick Y
+        "JOYCODE_1_RXAXIS": "RS←→",      # Right Stick X
+        "JOYCODE_1_RYAXIS": "RS↑↓" 
+    }
+
+    # Keyboard-specific mappings
+    keyboard_to_prefix = {
+        # Arrow keys
+        "KEYCODE_UP": "↑",
+        "KEYCODE_DOWN": "↓", 
+        "KEYCODE_LEFT": "←",
+        "KEYCODE_RIGHT": "→",
+
+        # Common action keys
+        "KEYCODE_Z": "Z",
+        "KEYCODE_X": "X",
+        "KEYCODE_C": "C",
+        "KEYCODE_A": "A",
+        "KEYCODE_S": "S",
+        "KEYCODE_D": "D",
+        "KEYCODE_Q": "Q",
+        "KEYCODE_W": "W",
+        "KEYCODE_E": "E",
+        "KEYCODE_R": "R",
+
+        # Numeric keys
+        "KEYCODE_1": "1",
+        "KEYCODE_2": "2",
+        "KEYCODE_3": "3",
+        "KEYCODE_4": "4",
+        "KEYCODE_5": "5",
+
+        # Function/special keys
+        "KEYCODE_SPACE": "SPC",
+        "KEYCODE_ENTER": "↵",
+        "KEYCODE_LSHIFT": "⇧",
+        "KEYCODE_RSHIFT": "⇧",
+        "KEYCODE_LCONTROL": "Ctrl",
+        "KEYCODE_RCONTROL": "Ctrl",
+        "KEYCODE_LALT": "Alt",
+        "KEYCODE_RALT": "Alt",
+        "KEYCODE_TAB": "⇥",
+        "KEYCODE_ESC": "Esc",
+
+        # Player 2 common keys
+        "KEYCODE_I": "I",
+        "KEYCODE_J": "J", 
+        "KEYCODE_K": "K",
+        "KEYCODE_L": "L"
+    }
+
+    # JOYCODE mappings - including both old and new button mappings
+    joycode_to_prefix = {
+        # Buttons - use getattr with fallback to avoid AttributeError
+        "JOYCODE_1_BUTTON1": "A" if use_xinput else "B1",
+        "JOYCODE_1_BUTTON2": "B" if use_xinput else "B2",
+        "JOYCODE_1_BUTTON3": "X" if use_xinput else "B3",
+        "JOYCODE_1_BUTTON4": "Y" if use_xinput else "B4",
+        "JOYCODE_1_BUTTON5": "LB" if use_xinput else "B5",
+        "JOYCODE_1_BUTTON6": "RB" if use_xinput else "B6",
+        "JOYCODE_1_BUTTON7": "LT" if use_xinput else "B7",
+
+        # OLD FORMAT - Button 8 and 9 (for backward compatibility)
+        "JOYCODE_1_BUTTON8": "BACK" if use_xinput else "B8",
+        "JOYCODE_1_BUTTON9": "START" if use_xinput else "B9",
+
+        # NEW FORMAT - Named buttons
+        "JOYCODE_1_SELECT": "BACK",
+        "JOYCODE_1_START": "START",
+
+        # Axes - CRITICAL: These should work regardless of input mode
+        "JOYCODE_1_ZAXIS": "LT" if use_xinput else "Z-AXIS",
+        "JOYCODE_1_RZAXIS": "RT" if use_xinput else "RZ-AXIS",
+        "JOYCODE_1_ZAXIS_NEG_SWITCH": "LT",
+        "JOYCODE_1_RZAXIS_NEG_SWITCH": "RT",
+
+        # NEW SLIDER FORMAT
+        "JOYCODE_1_SLIDER2_NEG_SWITCH": "LT",
+        "JOYCODE_1_SLIDER2_POS_SWITCH": "LT+",
+    }
+
+    # Combine all mappings
+    all_mappings = {**xinput_to_prefix, **dinput_to_prefix, **joycode_to_prefix, 
+                    **keyboard_to_prefix, **directional_to_prefix, **trigger_to_prefix}
+
+    # Handle multiple button assignments with BOTH ||| and space separators
+    if "|||" in mapping or " " in mapping:
+        # Determine which separator to use
+        if "|||" in mapping:
+            parts = [part.strip() for part in mapping.split("|||")]
+        else:
+            # Handle space-separated mappings (like JOYCODE_1_BUTTON1 JOYCODE_1_BUTTON2)
+            parts = [part.strip() for part in mapping.split(" ") if part.strip()]
+
+        prefixes = []
+
+        for part in parts:
+            # Look up the prefix for this part
+            if part in all_mappings:
+                prefixes.append(all_mappings[part])
+            # Handle other special cases
+            elif "DINPUT_1_BUTTON" in part:
+                try:
+                    button_num = int(part.replace("DINPUT_1_BUTTON", ""))
+                    prefixes.append(f"B{button_num}")
+                except:
+                    pass
+            elif "JOYCODE_1_BUTTON" in part:
+                try:
+                    button_num = int(part.replace("JOYCODE_1_BUTTON", ""))
+                    if button_num <= 10:
+                        standard_buttons = ["", "A", "B", "X", "Y", "LB", "RB", "LT", "RT", "LS", "RS"]
+                        if button_num < len(standard_buttons):
+                            prefixes.append(standard_buttons[button_num])
+                        else:
+                            prefixes.append(f"B{button_num}")
+                except:
+                    pass
+
+        # Enhanced handling for common combinations
+        if len(prefixes) >= 2:
+            # Sort prefixes for consistent display
+            prefixes.sort()
+
+            # Special cases for common button combinations
+            if set(prefixes) == {"A", "B"}:
+                return "A+B"  # Your specific case!
+            elif set(prefixes) == {"X", "Y"}:
+                return "X+Y"
+            elif set(prefixes) == {"LB", "RB"}:
+                return "LB+RB"
+            elif set(prefixes) == {"LT", "RT"}:
+                return "LT+RT"
+            # Handle directional pairs (keep your existing logic)
+            elif "←" in prefixes and "→" in prefixes:
+                return "←/→"
+            elif "↑" in prefixes and "↓" in prefixes:
+                return "↑/↓"
+            elif "D←" in prefixes and "D→" in prefixes:
+                return "D←/→"
+            elif "D↑" in prefixes and "D↓" in prefixes:
+                return "D↑/↓"
+            else:
+                # For other combinations, use + for simultaneous presses
+                return "+".join(prefixes)
+        elif len(prefixes) == 1:
+            return prefixes[0]
+        else:
+            return ""  # No valid prefixes found
+
+    # Check for direct match in standard mappings
+    if mapping in all_mappings:
+        return all_mappings[mapping]
+
+    # Special handling for DirectInput buttons not explicitly listed
+    if "DINPUT_1_BUTTON" in mapping:
+        try:
+            # Extract button number
+            button_num = int(mapping.replace("DINPUT_1_BUTTON", ""))
+            return f"B{button_num}"
+        except:
+            pass
+
+    # Special handling for keyboard keys not explicitly listed
+    if mapping.startswith("KEYCODE_"):
+        # Extract the key name
+        key_name = mapping.replace("KEYCODE_", "")
+        # For most keys, just return the key name
+        if len(key_name) == 1:  # Single character keys
+            return key_name
+        else:
+            return key_name[:3]  # First 3 chars for longer key names
+
+    # If no direct match, try partial matching for JOYCODE buttons
+    if "JOYCODE_1_BUTTON" in mapping:
+        try:
+            # Extract button number
+            button_num = int(mapping.replace("JOYCODE_1_BUTTON", ""))
+            if button_num <= 10:
+                # Use standard button mapping (1=A, 2=B, etc.)
+                standard_buttons = ["", "A", "B", "X", "Y", "LB", "RB", "LT", "RT", "LS", "RS"]
+                if button_num < len(standard_buttons):
+                    return standard_buttons[button_num]
+                else:
+                    return f"B{button_num}"
+        except:
+            pass
+
+    # Return empty string for unknown mappings
+    return ""
+
+
 class PreviewWindow(QMainWindow):
     """Window for displaying game controls preview"""
     def __init__(self, rom_name, game_data, mame_dir, parent=None, hide_buttons=False, clean_mode=False, font_registry=None):
@@ -415,6 +948,109 @@ class PreviewWindow(QMainWindow):
         print(f"=== FINALIZATION COMPLETE ===")
         print(f"Tasks performed: {', '.join(tasks_performed) if tasks_performed else 'none (already done)'}")
     
+    def load_game(self, rom_name, game_data):
+        """
+        Switch the preview to another ROM in place
+        The window, background, fonts and control labels are reused; settings are read again
+        as a new window would, and only the ROM's positions, labels and artwork are rebuilt.
+        Returns False if there is no game data to show
+        """
+        import time
+        start_time = time.time()
+
+        if not game_data:
+            print(f"No game data for {rom_name}, keeping {self.rom_name}")
+            return False
+
+        self.rom_name = rom_name
+        self.game_data = game_data
+        self.use_xinput = game_data.get('input_mode') == 'xinput'
+        self.setWindowTitle(f"Control Preview: {rom_name}")
+
+        # Saved positions are per ROM
+        if hasattr(self, '_cached_positions'):
+            del self._cached_positions
+
+        # Settings may have been changed from the GUI since the last ROM
+        previous_font = (self.text_settings.get("font_family"), self.text_settings.get("font_size"),
+                         self.text_settings.get("bold_strength"))
+        self.text_settings = self.load_text_settings()
+        if "show_button_prefix" not in self.text_settings:
+            self.text_settings["show_button_prefix"] = True
+        self.logo_settings = self.load_logo_settings()
+        self.logo_visible = self.logo_settings.get("logo_visible", True)
+        bezel_settings = self.load_bezel_settings_with_directional()
+        self.bezel_visible = bezel_settings.get("bezel_visible", False)
+
+        # Registered fonts are kept; only a different font needs loading
+        current_font = (self.text_settings.get("font_family"), self.text_settings.get("font_size"),
+                        self.text_settings.get("bold_strength"))
+        if current_font != previous_font:
+            self._fonts_loaded = False
+            self.load_and_register_fonts()
+
+        # Same directional decision as __init__
+        self.analyze_game_controls_improved()
+        self.should_show_directional = self.joystick_visible
+        if self.is_directional_only_game and self.auto_show_directionals_for_directional_only:
+            self.should_show_directional = True
+
+        # Back to the ROM's own controls
+        self.current_view_state = 'normal'
+        if hasattr(self, 'controls_mode_button'):
+            self.controls_mode_button.setText("Show All Controls")
+
+        self.release_control_labels()
+        self.create_control_labels(clean_mode=self.clean_mode)
+
+        # Force a full reapply even if the text settings did not change
+        if hasattr(self, '_last_settings_hash'):
+            del self._last_settings_hash
+        self.apply_text_settings()
+
+        self.load_game_artwork()
+        self.apply_directional_mode()
+        self.create_no_buttons_notification()
+        self.enforce_layer_order()
+        self.update_no_buttons_visibility()
+
+        print(f"🔁 Switched preview to {rom_name} in {time.time() - start_time:.3f} seconds")
+        return True
+
+    def load_game_artwork(self):
+        """Swap the bezel and logo for the current ROM's, keeping the logo label"""
+        bezel_path = self.find_bezel_path(self.rom_name)
+        self.has_bezel = bezel_path is not None
+
+        if hasattr(self, 'bezel_button'):
+            self.bezel_button.setEnabled(self.has_bezel)
+            if not self.has_bezel:
+                self.bezel_button.setText("No Bezel")
+                self.bezel_button.setToolTip(f"No bezel found for {self.rom_name}")
+            else:
+                self.bezel_button.setText("Hide Bezel" if self.bezel_visible else "Show Bezel")
+
+        if self.has_bezel and self.bezel_visible:
+            self.show_bezel_with_background()
+        elif getattr(self, 'bezel_label', None):
+            self.bezel_label.hide()
+
+        logo_label = getattr(self, 'logo_label', None)
+        logo_path = self.find_logo_path(self.rom_name) if self.logo_visible else None
+        logo_pixmap = QPixmap(logo_path) if logo_path else None
+
+        if logo_pixmap is None or logo_pixmap.isNull():
+            if logo_label:
+                logo_label.hide()
+        elif logo_label:
+            self.original_logo_pixmap = logo_pixmap
+            self.update_logo_display()
+            logo_label.show()
+            self.force_logo_resize()
+        else:
+            self.add_logo()
+            self.force_logo_resize()
+
     def create_no_buttons_notification(self):
         """Create the 'No Buttons Used' notification label"""
         
@@ -1783,7 +2419,7 @@ class PreviewWindow(QMainWindow):
                         print(f"MATCH FOUND! Loading font: {font_path}")
                         
                         # Register the font
-                        font_id = QFontDatabase.addApplicationFont(font_path)
+                        font_id = register_application_font(font_path)
                         if font_id >= 0:
                             families = QFontDatabase.applicationFontFamilies(font_id)
                             if families and len(families) > 0:
@@ -2475,40 +3111,7 @@ class PreviewWindow(QMainWindow):
     # Add method to find bezel path
     def find_bezel_path(self, rom_name):
         """Find bezel image path for a ROM name with updated paths that work regardless of MAME folder name"""
-        # Get the parent directory of where the exe runs
-        parent_dir = get_mame_parent_dir()
-        
-        # Define possible locations for bezels
-        possible_paths = [
-            # Priority 1: First look in preview/bezels directory
-            os.path.join(self.preview_dir, "bezels", f"{rom_name}.png"),
-            os.path.join(self.preview_dir, "bezels", f"{rom_name}_bezel.png"),
-            
-            # Priority 2: Check in preview/artwork directory 
-            os.path.join(self.preview_dir, "artwork", rom_name, "Bezel.png"),
-            os.path.join(self.preview_dir, "artwork", rom_name, "bezel.png"),
-            os.path.join(self.preview_dir, "artwork", rom_name, f"{rom_name}_bezel.png"),
-            
-            # Priority 3: Look in parent directory's artwork folder (works regardless of MAME folder name)
-            os.path.join(parent_dir, "artwork", rom_name, "Bezel.png"),
-            os.path.join(parent_dir, "artwork", rom_name, "bezel.png"),
-            os.path.join(parent_dir, "artwork", rom_name, f"{rom_name}_bezel.png"),
-            os.path.join(parent_dir, "bezels", f"{rom_name}.png"),
-            os.path.join(parent_dir, "bezels", f"{rom_name}_bezel.png"),
-            
-            # Priority 4: Check common artwork subdirectories in parent folder
-            os.path.join(parent_dir, "artwork", "bezels", f"{rom_name}.png"),
-            os.path.join(parent_dir, "artwork", "bezels", f"{rom_name}_bezel.png"),
-        ]
-        
-        # Check each possible path
-        for path in possible_paths:
-            if os.path.exists(path):
-                print(f"Found bezel at: {path}")
-                return path
-        
-        print(f"No bezel found for {rom_name}")
-        return None
+        return find_bezel_image(self.preview_dir, rom_name)
 
     def show_bezel_with_background(self):
         """Display bezel while preserving background with proper layering"""
@@ -2528,24 +3131,19 @@ class PreviewWindow(QMainWindow):
             # Create a fresh bezel label on the canvas
             self.bezel_label = QLabel(self.canvas)
             
-            # Load bezel image
-            self.original_bezel_pixmap = QPixmap(bezel_path)
-            if self.original_bezel_pixmap.isNull():
-                print(f"Error loading bezel image from {bezel_path}")
-                self.bezel_visible = False
-                return
-            
             # Resize bezel to match window while preserving aspect ratio
             window_width = self.canvas.width()
             window_height = self.canvas.height()
             
-            # Scale with high quality
-            bezel_pixmap = self.original_bezel_pixmap.scaled(
-                window_width,
-                window_height,
-                Qt.KeepAspectRatio,  # Keep aspect ratio
-                Qt.SmoothTransformation  # High quality scaling
-            )
+            # Scaled image comes from the renderer's artwork cache, so showing the same bezel
+            # again (toggling, switching ROMs with load_game) skips decoding and scaling
+            from mame_layout_renderer import load_scaled_artwork
+            bezel_image = load_scaled_artwork(bezel_path, window_width, window_height, Qt.KeepAspectRatio)
+            if bezel_image is None:
+                print(f"Error loading bezel image from {bezel_path}")
+                self.bezel_visible = False
+                return
+            bezel_pixmap = QPixmap.fromImage(bezel_image)
             
             # Store this for saving to image later
             self.bezel_pixmap = bezel_pixmap
@@ -4782,53 +5380,7 @@ class PreviewWindow(QMainWindow):
     
     def find_logo_path(self, rom_name):
         """Find logo path for a ROM name with updated paths that work regardless of MAME folder name"""
-        # Get the parent directory of where the exe runs
-        parent_dir = get_mame_parent_dir()
-        
-        # Define possible locations for logos
-        possible_paths = [
-            # Priority 1: First look in preview/logos directory
-            os.path.join(self.preview_dir, "logos", f"{rom_name}.png"),
-            os.path.join(self.preview_dir, "logos", f"{rom_name}.jpg"),
-            
-            # Priority 2: Check in collections path (if it exists)
-            os.path.join(parent_dir, "..", "..", "collections", "Arcades", "medium_artwork", "logo", f"{rom_name}.png"),
-            os.path.join(parent_dir, "..", "..", "collections", "Arcades", "medium_artwork", "logo", f"{rom_name}.jpg"),
-            
-            # Priority 3: Check in parent directory's artwork/logos
-            os.path.join(parent_dir, "artwork", "logos", f"{rom_name}.png"),
-            os.path.join(parent_dir, "artwork", "logos", f"{rom_name}.jpg"),
-            
-            # Priority 4: Check for logos in parent directory's common locations
-            os.path.join(parent_dir, "logos", f"{rom_name}.png"),
-            os.path.join(parent_dir, "logos", f"{rom_name}.jpg"),
-        ]
-        
-        # Check each possible path
-        for path in possible_paths:
-            if os.path.exists(path):
-                print(f"Found logo at: {path}")
-                return path
-        
-        # If not found by exact name, try case-insensitive search in priority directories
-        logo_dirs = [
-            os.path.join(self.preview_dir, "logos"),
-            os.path.join(parent_dir, "..", "..", "collections", "Arcades", "medium_artwork", "logo"),
-            os.path.join(parent_dir, "artwork", "logos"),
-            os.path.join(parent_dir, "logos")
-        ]
-        
-        for logo_dir in logo_dirs:
-            if os.path.exists(logo_dir):
-                for filename in os.listdir(logo_dir):
-                    file_base, file_ext = os.path.splitext(filename.lower())
-                    if file_base == rom_name.lower() and file_ext.lower() in ['.png', '.jpg', '.jpeg']:
-                        logo_path = os.path.join(logo_dir, filename)
-                        print(f"Found logo with case-insensitive match: {logo_path}")
-                        return logo_path
-        
-        print(f"No logo found for {rom_name}")
-        return None
+        return find_logo_image(self.preview_dir, rom_name)
         
     def delete_rom_specific_settings(self):
         """Delete ROM-specific settings files and refresh preview with global settings"""
@@ -4925,6 +5477,198 @@ class PreviewWindow(QMainWindow):
             traceback.print_exc()
             return False
     
+    def render_canvas_image(self):
+        """Paint the canvas as save_image writes it: background, bezel, logo and visible control labels"""
+        # Create a new image with the same size as the canvas
+        # Use QImage with Format_ARGB32 to support transparency
+        from PyQt5.QtGui import QImage
+        image = QImage(
+            self.canvas.width(),
+            self.canvas.height(),
+            QImage.Format_ARGB32
+        )
+        # Fill with transparent background
+        image.fill(Qt.transparent)
+
+        # Create painter for the image
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+        # Draw the background image if it's not the default transparent one
+        if hasattr(self, 'background_pixmap') and self.background_pixmap and not self.background_pixmap.isNull():
+            # Check if this is the default transparent background
+            if hasattr(self, 'original_background_pixmap') and self.original_background_pixmap:
+                bg_path = self.original_background_pixmap.cacheKey()
+                default_path = os.path.join(self.preview_dir, "images", "default.png")
+
+                # If it's not the default transparent background, draw it
+                bg_pixmap = self.background_pixmap
+
+                # Calculate position to center the pixmap
+                x = (self.canvas.width() - bg_pixmap.width()) // 2
+                y = (self.canvas.height() - bg_pixmap.height()) // 2
+
+                # Draw the pixmap
+                painter.drawPixmap(x, y, bg_pixmap)
+
+        # Draw the bezel if it's visible
+        if hasattr(self, 'bezel_visible') and self.bezel_visible and hasattr(self, 'bezel_pixmap') and not self.bezel_pixmap.isNull():
+            bezel_pixmap = self.bezel_pixmap
+            # Position bezel in center
+            x = (self.canvas.width() - bezel_pixmap.width()) // 2
+            y = (self.canvas.height() - bezel_pixmap.height()) // 2
+            painter.drawPixmap(x, y, bezel_pixmap)
+
+        # Draw the logo if visible
+        if hasattr(self, 'logo_label') and self.logo_label and self.logo_label.isVisible():
+            logo_pixmap = self.logo_label.pixmap()
+            if logo_pixmap and not logo_pixmap.isNull():
+                painter.drawPixmap(self.logo_label.pos(), logo_pixmap)
+
+        # Draw control labels with color preservation
+        if hasattr(self, 'control_labels'):
+            for control_name, control_data in self.control_labels.items():
+                label = control_data['label']
+
+                # Skip if not visible
+                if not label.isVisible():
+                    continue
+
+                # Get font and position information
+                font = label.font()
+                painter.setFont(font)
+                metrics = QFontMetrics(font)
+
+                # Get label position
+                pos = label.pos()
+
+                # Get settings and properties from the label
+                settings = getattr(label, 'settings', {})
+                prefix = getattr(label, 'prefix', '')
+                action = getattr(label, 'action', label.text())
+
+                # Calculate vertical position - centered in the label
+                y = int(pos.y() + (label.height() + metrics.ascent() - metrics.descent()) / 2)
+
+                # Check for the label's text alignment mode - default to left alignment
+                text_alignment = getattr(label, 'text_alignment', Qt.AlignLeft | Qt.AlignVCenter)
+
+                # FIXED: Use fixed left margin to match label classes
+                # This ensures consistent text positioning between preview and saved image
+                left_margin = 10  # Same as in ColoredDraggableLabel and GradientDraggableLabel
+                x = int(pos.x() + left_margin)  # Fixed left margin
+
+                # Handle colored/gradient text
+                if prefix and ": " in label.text():
+                    prefix_text = f"{prefix}: "
+
+                    # Calculate widths
+                    prefix_width = metrics.horizontalAdvance(prefix_text)
+
+                    # Draw prefix with its color or gradient
+                    if hasattr(label, 'use_prefix_gradient') and getattr(label, 'use_prefix_gradient', False):
+                        # Handle gradient prefix
+                        start_color = getattr(label, 'prefix_gradient_start', 
+                                            QColor(settings.get("prefix_gradient_start", "#FFC107")))
+                        end_color = getattr(label, 'prefix_gradient_end', 
+                                        QColor(settings.get("prefix_gradient_end", "#FF5722")))
+
+                        # Create gradient
+                        prefix_rect = metrics.boundingRect(prefix_text)
+                        prefix_rect.moveLeft(int(x))
+                        prefix_rect.moveTop(int(y - metrics.ascent()))
+
+                        # Create vertical gradient (top to bottom)
+                        gradient = QLinearGradient(
+                            prefix_rect.left(), prefix_rect.top(),
+                            prefix_rect.left(), prefix_rect.bottom()
+                        )
+                        # Set colors in top-to-bottom order
+                        gradient.setColorAt(0, start_color)
+                        gradient.setColorAt(1, end_color)
+
+                        # Apply gradient
+                        painter.setPen(QPen(QBrush(gradient), 1))
+                    else:
+                        # Solid color
+                        prefix_color = QColor(settings.get("prefix_color", "#FFC107"))
+                        painter.setPen(prefix_color)
+
+                    # Draw prefix
+                    painter.drawText(int(x), int(y), prefix_text)
+
+                    # Draw action text with its color or gradient
+                    if hasattr(label, 'use_action_gradient') and getattr(label, 'use_action_gradient', False):
+                        # Handle gradient action
+                        start_color = getattr(label, 'action_gradient_start', 
+                                            QColor(settings.get("action_gradient_start", "#2196F3")))
+                        end_color = getattr(label, 'action_gradient_end', 
+                                        QColor(settings.get("action_gradient_end", "#4CAF50")))
+
+                        # Create gradient
+                        action_rect = metrics.boundingRect(action)
+                        action_rect.moveLeft(int(x + prefix_width))
+                        action_rect.moveTop(int(y - metrics.ascent()))
+
+                        # Create vertical gradient (top to bottom)
+                        gradient = QLinearGradient(
+                            action_rect.left(), action_rect.top(),
+                            action_rect.left(), action_rect.bottom()
+                        )
+                        # Set colors in top-to-bottom order
+                        gradient.setColorAt(0, start_color)
+                        gradient.setColorAt(1, end_color)
+
+                        # Apply gradient
+                        painter.setPen(QPen(QBrush(gradient), 1))
+                    else:
+                        # Solid color
+                        action_color = QColor(settings.get("action_color", "#FFFFFF"))
+                        painter.setPen(action_color)
+
+                    # Draw action
+                    painter.drawText(int(x + prefix_width), int(y), action)
+                else:
+                    # Single text - use same left alignment as label classes
+
+                    # Use action color/gradient for the whole text
+                    if hasattr(label, 'use_action_gradient') and getattr(label, 'use_action_gradient', False):
+                        # Handle gradient
+                        start_color = getattr(label, 'action_gradient_start', 
+                                            QColor(settings.get("action_gradient_start", "#2196F3")))
+                        end_color = getattr(label, 'action_gradient_end', 
+                                        QColor(settings.get("action_gradient_end", "#4CAF50")))
+
+                        # Create gradient
+                        text_rect = metrics.boundingRect(label.text())
+                        text_rect.moveLeft(int(x))
+                        text_rect.moveTop(int(y - metrics.ascent()))
+
+                        # Create vertical gradient (top to bottom)
+                        gradient = QLinearGradient(
+                            text_rect.left(), text_rect.top(),
+                            text_rect.left(), text_rect.bottom()
+                        )
+                        # Set colors in top-to-bottom order
+                        gradient.setColorAt(0, start_color)
+                        gradient.setColorAt(1, end_color)
+
+                        # Apply gradient
+                        painter.setPen(QPen(QBrush(gradient), 1))
+                    else:
+                        # Solid color
+                        action_color = QColor(settings.get("action_color", "#FFFFFF"))
+                        painter.setPen(action_color)
+
+                    # Draw text
+                    painter.drawText(int(x), int(y), label.text())
+
+        # End painting
+        painter.end()
+        return image
+
     def save_image(self):
         """Enhanced save_image method that uses toast notifications"""
         try:
@@ -4946,194 +5690,7 @@ class PreviewWindow(QMainWindow):
                 ) != QMessageBox.Yes:
                     return False
             
-            # Create a new image with the same size as the canvas
-            # Use QImage with Format_ARGB32 to support transparency
-            from PyQt5.QtGui import QImage
-            image = QImage(
-                self.canvas.width(),
-                self.canvas.height(),
-                QImage.Format_ARGB32
-            )
-            # Fill with transparent background
-            image.fill(Qt.transparent)
-            
-            # Create painter for the image
-            painter = QPainter(image)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setRenderHint(QPainter.TextAntialiasing)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            
-            # Draw the background image if it's not the default transparent one
-            if hasattr(self, 'background_pixmap') and self.background_pixmap and not self.background_pixmap.isNull():
-                # Check if this is the default transparent background
-                if hasattr(self, 'original_background_pixmap') and self.original_background_pixmap:
-                    bg_path = self.original_background_pixmap.cacheKey()
-                    default_path = os.path.join(self.preview_dir, "images", "default.png")
-                    
-                    # If it's not the default transparent background, draw it
-                    bg_pixmap = self.background_pixmap
-                    
-                    # Calculate position to center the pixmap
-                    x = (self.canvas.width() - bg_pixmap.width()) // 2
-                    y = (self.canvas.height() - bg_pixmap.height()) // 2
-                    
-                    # Draw the pixmap
-                    painter.drawPixmap(x, y, bg_pixmap)
-            
-            # Draw the bezel if it's visible
-            if hasattr(self, 'bezel_visible') and self.bezel_visible and hasattr(self, 'bezel_pixmap') and not self.bezel_pixmap.isNull():
-                bezel_pixmap = self.bezel_pixmap
-                # Position bezel in center
-                x = (self.canvas.width() - bezel_pixmap.width()) // 2
-                y = (self.canvas.height() - bezel_pixmap.height()) // 2
-                painter.drawPixmap(x, y, bezel_pixmap)
-            
-            # Draw the logo if visible
-            if hasattr(self, 'logo_label') and self.logo_label and self.logo_label.isVisible():
-                logo_pixmap = self.logo_label.pixmap()
-                if logo_pixmap and not logo_pixmap.isNull():
-                    painter.drawPixmap(self.logo_label.pos(), logo_pixmap)
-            
-            # Draw control labels with color preservation
-            if hasattr(self, 'control_labels'):
-                for control_name, control_data in self.control_labels.items():
-                    label = control_data['label']
-                    
-                    # Skip if not visible
-                    if not label.isVisible():
-                        continue
-                    
-                    # Get font and position information
-                    font = label.font()
-                    painter.setFont(font)
-                    metrics = QFontMetrics(font)
-                    
-                    # Get label position
-                    pos = label.pos()
-                    
-                    # Get settings and properties from the label
-                    settings = getattr(label, 'settings', {})
-                    prefix = getattr(label, 'prefix', '')
-                    action = getattr(label, 'action', label.text())
-                    
-                    # Calculate vertical position - centered in the label
-                    y = int(pos.y() + (label.height() + metrics.ascent() - metrics.descent()) / 2)
-                    
-                    # Check for the label's text alignment mode - default to left alignment
-                    text_alignment = getattr(label, 'text_alignment', Qt.AlignLeft | Qt.AlignVCenter)
-                    
-                    # FIXED: Use fixed left margin to match label classes
-                    # This ensures consistent text positioning between preview and saved image
-                    left_margin = 10  # Same as in ColoredDraggableLabel and GradientDraggableLabel
-                    x = int(pos.x() + left_margin)  # Fixed left margin
-                    
-                    # Handle colored/gradient text
-                    if prefix and ": " in label.text():
-                        prefix_text = f"{prefix}: "
-                        
-                        # Calculate widths
-                        prefix_width = metrics.horizontalAdvance(prefix_text)
-                        
-                        # Draw prefix with its color or gradient
-                        if hasattr(label, 'use_prefix_gradient') and getattr(label, 'use_prefix_gradient', False):
-                            # Handle gradient prefix
-                            start_color = getattr(label, 'prefix_gradient_start', 
-                                                QColor(settings.get("prefix_gradient_start", "#FFC107")))
-                            end_color = getattr(label, 'prefix_gradient_end', 
-                                            QColor(settings.get("prefix_gradient_end", "#FF5722")))
-                            
-                            # Create gradient
-                            prefix_rect = metrics.boundingRect(prefix_text)
-                            prefix_rect.moveLeft(int(x))
-                            prefix_rect.moveTop(int(y - metrics.ascent()))
-                            
-                            # Create vertical gradient (top to bottom)
-                            gradient = QLinearGradient(
-                                prefix_rect.left(), prefix_rect.top(),
-                                prefix_rect.left(), prefix_rect.bottom()
-                            )
-                            # Set colors in top-to-bottom order
-                            gradient.setColorAt(0, start_color)
-                            gradient.setColorAt(1, end_color)
-                            
-                            # Apply gradient
-                            painter.setPen(QPen(QBrush(gradient), 1))
-                        else:
-                            # Solid color
-                            prefix_color = QColor(settings.get("prefix_color", "#FFC107"))
-                            painter.setPen(prefix_color)
-                        
-                        # Draw prefix
-                        painter.drawText(int(x), int(y), prefix_text)
-                        
-                        # Draw action text with its color or gradient
-                        if hasattr(label, 'use_action_gradient') and getattr(label, 'use_action_gradient', False):
-                            # Handle gradient action
-                            start_color = getattr(label, 'action_gradient_start', 
-                                                QColor(settings.get("action_gradient_start", "#2196F3")))
-                            end_color = getattr(label, 'action_gradient_end', 
-                                            QColor(settings.get("action_gradient_end", "#4CAF50")))
-                            
-                            # Create gradient
-                            action_rect = metrics.boundingRect(action)
-                            action_rect.moveLeft(int(x + prefix_width))
-                            action_rect.moveTop(int(y - metrics.ascent()))
-                            
-                            # Create vertical gradient (top to bottom)
-                            gradient = QLinearGradient(
-                                action_rect.left(), action_rect.top(),
-                                action_rect.left(), action_rect.bottom()
-                            )
-                            # Set colors in top-to-bottom order
-                            gradient.setColorAt(0, start_color)
-                            gradient.setColorAt(1, end_color)
-                            
-                            # Apply gradient
-                            painter.setPen(QPen(QBrush(gradient), 1))
-                        else:
-                            # Solid color
-                            action_color = QColor(settings.get("action_color", "#FFFFFF"))
-                            painter.setPen(action_color)
-                        
-                        # Draw action
-                        painter.drawText(int(x + prefix_width), int(y), action)
-                    else:
-                        # Single text - use same left alignment as label classes
-                        
-                        # Use action color/gradient for the whole text
-                        if hasattr(label, 'use_action_gradient') and getattr(label, 'use_action_gradient', False):
-                            # Handle gradient
-                            start_color = getattr(label, 'action_gradient_start', 
-                                                QColor(settings.get("action_gradient_start", "#2196F3")))
-                            end_color = getattr(label, 'action_gradient_end', 
-                                            QColor(settings.get("action_gradient_end", "#4CAF50")))
-                            
-                            # Create gradient
-                            text_rect = metrics.boundingRect(label.text())
-                            text_rect.moveLeft(int(x))
-                            text_rect.moveTop(int(y - metrics.ascent()))
-                            
-                            # Create vertical gradient (top to bottom)
-                            gradient = QLinearGradient(
-                                text_rect.left(), text_rect.top(),
-                                text_rect.left(), text_rect.bottom()
-                            )
-                            # Set colors in top-to-bottom order
-                            gradient.setColorAt(0, start_color)
-                            gradient.setColorAt(1, end_color)
-                            
-                            # Apply gradient
-                            painter.setPen(QPen(QBrush(gradient), 1))
-                        else:
-                            # Solid color
-                            action_color = QColor(settings.get("action_color", "#FFFFFF"))
-                            painter.setPen(action_color)
-                        
-                        # Draw text
-                        painter.drawText(int(x), int(y), label.text())
-            
-            # End painting
-            painter.end()
+            image = self.render_canvas_image()
             
             # Save the image as PNG to preserve transparency
             if image.save(output_path, "PNG"):
@@ -6215,78 +6772,7 @@ class PreviewWindow(QMainWindow):
     # 1. Enhanced get_button_prefix method for PreviewWindow class
     def get_button_prefix(self, control_name):
         """Generate button prefix based on control name with support for specialized controls"""
-        # Standard XInput control prefixes
-        standard_prefixes = {
-            'P1_BUTTON1': 'A',
-            'P1_BUTTON2': 'B',
-            'P1_BUTTON3': 'X',
-            'P1_BUTTON4': 'Y',
-            'P1_BUTTON5': 'LB',
-            'P1_BUTTON6': 'RB', 
-            'P1_BUTTON7': 'LT',
-            'P1_BUTTON8': 'RT',
-            'P1_BUTTON9': 'LS',
-            'P1_BUTTON10': 'RS',
-            'P1_START': 'START',
-            'P1_SELECT': 'BACK',
-            # Left joystick - both naming conventions
-            'P1_JOYSTICK_UP': 'LS↑',
-            'P1_JOYSTICK_DOWN': 'LS↓',
-            'P1_JOYSTICK_LEFT': 'LS←',
-            'P1_JOYSTICK_RIGHT': 'LS→',
-            'P1_JOYSTICKLEFT_UP': 'LS↑',     # Add this
-            'P1_JOYSTICKLEFT_DOWN': 'LS↓',   # Add this 
-            'P1_JOYSTICKLEFT_LEFT': 'LS←',   # Add this
-            'P1_JOYSTICKLEFT_RIGHT': 'LS→',  # Add this
-            
-            # Right joystick mappings
-            'P1_JOYSTICKRIGHT_UP': 'RS↑',
-            'P1_JOYSTICKRIGHT_DOWN': 'RS↓',
-            'P1_JOYSTICKRIGHT_LEFT': 'RS←',
-            'P1_JOYSTICKRIGHT_RIGHT': 'RS→',
-        }
-        
-        # Add specialized MAME control prefixes
-        specialized_prefixes = {
-            # Rotary controls
-            'P1_DIAL': 'DIAL',
-            'P1_DIAL_V': 'DIAL↑↓',
-            'P1_PADDLE': 'PDL',
-            
-            # Trackball controls
-            'P1_TRACKBALL_X': 'TRK←→',
-            'P1_TRACKBALL_Y': 'TRK↑↓',
-            
-            # Mouse controls
-            'P1_MOUSE_X': 'MSE←→',
-            'P1_MOUSE_Y': 'MSE↑↓',
-            
-            # Light gun controls
-            'P1_LIGHTGUN_X': 'GUN←→',
-            'P1_LIGHTGUN_Y': 'GUN↑↓',
-            
-            # Analog stick controls
-            'P1_AD_STICK_X': 'ASX',
-            'P1_AD_STICK_Y': 'ASY',
-            'P1_AD_STICK_Z': 'ASZ',
-            
-            # Pedal inputs
-            'P1_PEDAL': 'PED1',
-            'P1_PEDAL2': 'PED2',
-            
-            # Positional control
-            'P1_POSITIONAL': 'POS',
-            
-            # Gambling controls
-            'P1_GAMBLE_HIGH': 'HIGH',
-            'P1_GAMBLE_LOW': 'LOW',
-        }
-        
-        # Combine standard and specialized prefixes
-        all_prefixes = {**standard_prefixes, **specialized_prefixes}
-        
-        # Return the prefix if found, otherwise empty string
-        return all_prefixes.get(control_name, "")
+        return get_button_prefix_for_control(control_name)
     
     def get_current_mapping(self):
         """Get the mapping value for the current ROM"""
@@ -7100,6 +7586,42 @@ class PreviewWindow(QMainWindow):
         except Exception as e:
             print(f"Error saving directional mode settings: {e}")
     
+    def take_control_label(self, display_text, use_gradient):
+        """Return a pooled control label of the right type reset to display_text, or a new one"""
+        label_class = GradientDraggableLabel if use_gradient else ColoredDraggableLabel
+        pool = getattr(self, '_label_pool', {}).get(label_class)
+        if not pool:
+            return label_class(display_text, self.canvas, settings=self.text_settings)
+
+        # Put the label back in the state a new one starts in; create_control_labels does the rest
+        label = pool.pop()
+        label.settings = self.text_settings
+        label.setText(display_text)
+        label.parse_text(display_text)
+        label.dragging = False
+        label.setWordWrap(True)
+        return label
+
+    def release_control_labels(self):
+        """Hide all control labels and keep them for the next create_control_labels"""
+        if not hasattr(self, '_label_pool'):
+            self._label_pool = {}
+
+        for control_name, control_data in self.control_labels.items():
+            label = control_data.get('label')
+            if not label:
+                continue
+            if control_name != "NO_BUTTONS_NOTIFICATION" and type(label) in (ColoredDraggableLabel, GradientDraggableLabel):
+                label.hide()
+                self._label_pool.setdefault(type(label), []).append(label)
+            else:
+                label.setParent(None)
+                label.deleteLater()
+
+        self.control_labels = {}
+        self.no_buttons_label = None
+        self.no_buttons_visible = False
+
     def create_control_labels(self, clean_mode=False):
         """Create control labels with directional mode support and batch optimization"""
         if not self.game_data or 'players' not in self.game_data:
@@ -7275,13 +7797,8 @@ class PreviewWindow(QMainWindow):
                 use_gradient = use_prefix_gradient or use_action_gradient
                 
                 try:
-                    # Create the appropriate label type
-                    if use_gradient:
-                        # Use the gradient-enabled label
-                        label = GradientDraggableLabel(display_text, self.canvas, settings=self.text_settings)
-                    else:
-                        # Use the color-enabled label
-                        label = ColoredDraggableLabel(display_text, self.canvas, settings=self.text_settings)
+                    # Get the appropriate label type, reusing one from an earlier ROM if possible
+                    label = self.take_control_label(display_text, use_gradient)
                     
                     # CRITICAL FIX: Apply font with priority order and debug info
                     # OPTIMIZED: Use pre-calculated font (much faster)
@@ -7406,359 +7923,7 @@ class PreviewWindow(QMainWindow):
 
     def get_button_prefix_from_mapping(self, mapping):
         """Get the button prefix based on mapping string, including multiple button assignments and new MAME codes"""
-        # Standard XINPUT mappings
-        xinput_to_prefix = {
-            "XINPUT_1_A": "A",
-            "XINPUT_1_B": "B",
-            "XINPUT_1_X": "X",
-            "XINPUT_1_Y": "Y",
-            "XINPUT_1_SHOULDER_L": "LB",
-            "XINPUT_1_SHOULDER_R": "RB",
-            "XINPUT_1_TRIGGER_L": "LT",
-            "XINPUT_1_TRIGGER_R": "RT",
-            "XINPUT_1_THUMB_L": "LS",
-            "XINPUT_1_THUMB_R": "RS",
-            "XINPUT_1_DPAD_UP": "D↑",
-            "XINPUT_1_DPAD_DOWN": "D↓",
-            "XINPUT_1_DPAD_LEFT": "D←",
-            "XINPUT_1_DPAD_RIGHT": "D→",
-            "XINPUT_1_START": "START",
-            "XINPUT_1_SELECT": "BACK",
-
-            # ADD THESE FOR DUAL-STICK GAMES LIKE SMASH T.V.:
-            "XINPUT_1_LEFTY_POS": "LS↓",      # Left stick down
-            "XINPUT_1_LEFTY_NEG": "LS↑",      # Left stick up  
-            "XINPUT_1_LEFTX_POS": "LS→",      # Left stick right
-            "XINPUT_1_LEFTX_NEG": "LS←",      # Left stick left
-            "XINPUT_1_RIGHTY_POS": "RS↓",     # Right stick down
-            "XINPUT_1_RIGHTY_NEG": "RS↑",     # Right stick up
-            "XINPUT_1_RIGHTX_POS": "RS→",     # Right stick right
-            "XINPUT_1_RIGHTX_NEG": "RS←",     # Right stick left
-        }
-        
-        # Add DirectInput mappings - EXPANDED WITH MISSING SLIDER MAPPINGS
-        dinput_to_prefix = {
-            # Buttons - Start from 1 as users expect (even though DirectInput is 0-based internally)
-            "DINPUT_1_BUTTON0": "B1",   # First button = Button 1 to user
-            "DINPUT_1_BUTTON1": "B2",   # Second button = Button 2 to user
-            "DINPUT_1_BUTTON2": "B3",   # Third button = Button 3 to user
-            "DINPUT_1_BUTTON3": "B4",
-            "DINPUT_1_BUTTON4": "B5",
-            "DINPUT_1_BUTTON5": "B6",
-            "DINPUT_1_BUTTON6": "B7",
-            "DINPUT_1_BUTTON7": "B8",
-            "DINPUT_1_BUTTON8": "B9",
-            "DINPUT_1_BUTTON9": "B10",
-            
-            # POV Hat (D-Pad equivalent)
-            "DINPUT_1_POV_UP": "HAT↑",
-            "DINPUT_1_POV_DOWN": "HAT↓",
-            "DINPUT_1_POV_LEFT": "HAT←",
-            "DINPUT_1_POV_RIGHT": "HAT→",
-            
-            # Primary Axes - More descriptive
-            "DINPUT_1_XAXIS_NEG": "X-",     # X-axis negative (left)
-            "DINPUT_1_XAXIS_POS": "X+",     # X-axis positive (right)
-            "DINPUT_1_YAXIS_NEG": "Y-",     # Y-axis negative (up/forward)
-            "DINPUT_1_YAXIS_POS": "Y+",     # Y-axis positive (down/back)
-            
-            # Rotation Axes
-            "DINPUT_1_ZAXIS": "Z-AXIS",     # Z rotation
-            "DINPUT_1_RZAXIS": "RZ-AXIS",   # RZ rotation
-            
-            # ADD THESE MISSING SLIDER MAPPINGS FOR OUT RUN:
-            "DINPUT_1_SLIDER0": "SL1",       # Slider 0 (full axis)
-            "DINPUT_1_SLIDER0_NEG": "SL1-",  # Slider 0 negative (brake)
-            "DINPUT_1_SLIDER0_POS": "SL1+",  # Slider 0 positive
-            "DINPUT_1_SLIDER1": "SL2",       # Slider 1 (full axis)
-            "DINPUT_1_SLIDER1_NEG": "SL2-",  # Slider 1 negative (accelerate)
-            "DINPUT_1_SLIDER1_POS": "SL2+",  # Slider 1 positive
-            "DINPUT_1_SLIDER2": "SL3",       # Slider 2 (full axis)
-            "DINPUT_1_SLIDER2_NEG": "SL3-",  # Slider 2 negative
-            "DINPUT_1_SLIDER2_POS": "SL3+",  # Slider 2 positive
-        }
-        
-        # MAME specialized control mappings
-        mame_to_prefix = {
-            # Analog mappings
-            "JOYCODE_1_XAXIS": "ASX",
-            "JOYCODE_1_YAXIS": "ASY",
-            "JOYCODE_1_ZAXIS": "ASZ",
-            
-            # Mouse mappings
-            "MOUSECODE_1_XAXIS": "MSE←→",
-            "MOUSECODE_1_YAXIS": "MSE↑↓",
-            
-            # Trackball mappings
-            "TRACKCODE_1_XAXIS": "TRK←→",
-            "TRACKCODE_1_YAXIS": "TRK↑↓",
-            
-            # Lightgun mappings  
-            "GUNCODE_1_XAXIS": "GUN←→",
-            "GUNCODE_1_YAXIS": "GUN↑↓",
-            
-            # Dial/Paddle mappings
-            "DIALCODE_1_XAXIS": "DIAL",
-            "DIALCODE_1_YAXIS": "DIAL↕",
-            "PADDLE_1_X": "PDL",
-            
-            # Pedal mappings
-            "PEDALCODE_1": "PED1",
-            "PEDALCODE_2": "PED2",
-            
-            # Positional
-            "POSITIONAL_1": "POS",
-            
-            # Additional dial-type control codes
-            "MOUSECODE_1_XAXIS_POS_FAST": "MSE→+",
-            "MOUSECODE_1_XAXIS_NEG_FAST": "MSE←+",
-            "MOUSECODE_1_YAXIS_POS_FAST": "MSE↓+",
-            "MOUSECODE_1_YAXIS_NEG_FAST": "MSE↑+",
-            "TRACKCODE_1_XAXIS_POS_FAST": "TRK→+",
-            "TRACKCODE_1_XAXIS_NEG_FAST": "TRK←+",
-            "TRACKCODE_1_YAXIS_POS_FAST": "TRK↓+",
-            "TRACKCODE_1_YAXIS_NEG_FAST": "TRK↑+"
-        }
-        
-        # Add directional joystick mappings (including both old and new formats)
-        directional_to_prefix = {
-            # Left stick mappings - STANDARD FORMAT
-            "JOYCODE_1_XAXIS_RIGHT_SWITCH": "→",
-            "JOYCODE_1_XAXIS_LEFT_SWITCH": "←",
-            "JOYCODE_1_YAXIS_UP_SWITCH": "↑",
-            "JOYCODE_1_YAXIS_DOWN_SWITCH": "↓",
-            
-            # Left stick mappings - NEW SLIDER2 FORMAT
-            "JOYCODE_1_SLIDER2_LEFT_SWITCH": "←",
-            "JOYCODE_1_SLIDER2_RIGHT_SWITCH": "→",
-            "JOYCODE_1_SLIDER2_UP_SWITCH": "↑",
-            "JOYCODE_1_SLIDER2_DOWN_SWITCH": "↓",
-            
-            # RIGHT STICK MAPPINGS
-            "JOYCODE_1_RXAXIS_POS_SWITCH": "RS→",   # Right stick right
-            "JOYCODE_1_RXAXIS_NEG_SWITCH": "RS←",   # Right stick left  
-            "JOYCODE_1_RYAXIS_NEG_SWITCH": "RS↑",   # Right stick up
-            "JOYCODE_1_RYAXIS_POS_SWITCH": "RS↓",   # Right stick down
-            
-            # D-pad mappings - OLD FORMAT (for backward compatibility)
-            "JOYCODE_1_DPADUP": "D↑",
-            "JOYCODE_1_DPADDOWN": "D↓",
-            "JOYCODE_1_DPADLEFT": "D←",
-            "JOYCODE_1_DPADRIGHT": "D→",
-            
-            # D-pad mappings - NEW FORMAT (HAT controls)
-            "JOYCODE_1_HAT1UP": "D↑",
-            "JOYCODE_1_HAT1DOWN": "D↓",
-            "JOYCODE_1_HAT1LEFT": "D←",
-            "JOYCODE_1_HAT1RIGHT": "D→",
-        }
-
-        # Add trigger/analog axis mappings (including both old and new formats)
-        trigger_to_prefix = {
-            # OLD FORMAT - for backward compatibility
-            "JOYCODE_1_ZAXIS_NEG_SWITCH": "LT",
-            "JOYCODE_1_ZAXIS_POS_SWITCH": "LT+",
-            "JOYCODE_1_RZAXIS_NEG_SWITCH": "RT",
-            "JOYCODE_1_RZAXIS_POS_SWITCH": "RT+",
-            "JOYCODE_1_ZAXIS": "LT",         # Left Trigger full axis
-            "JOYCODE_1_RZAXIS": "RT",        # Right Trigger full axis
-            
-            # NEW FORMAT - SLIDER controls
-            "JOYCODE_1_SLIDER2_NEG_SWITCH": "LT",
-            "JOYCODE_1_SLIDER2_POS_SWITCH": "LT+",
-            
-            # Other axis mappings
-            "JOYCODE_1_XAXIS": "LS←→",       # Left Stick X
-            "JOYCODE_1_YAXIS": "LS↑↓",       # Left Stick Y
-            "JOYCODE_1_RXAXIS": "RS←→",      # Right Stick X
-            "JOYCODE_1_RYAXIS": "RS↑↓" 
-        }
-
-        # Keyboard-specific mappings
-        keyboard_to_prefix = {
-            # Arrow keys
-            "KEYCODE_UP": "↑",
-            "KEYCODE_DOWN": "↓", 
-            "KEYCODE_LEFT": "←",
-            "KEYCODE_RIGHT": "→",
-            
-            # Common action keys
-            "KEYCODE_Z": "Z",
-            "KEYCODE_X": "X",
-            "KEYCODE_C": "C",
-            "KEYCODE_A": "A",
-            "KEYCODE_S": "S",
-            "KEYCODE_D": "D",
-            "KEYCODE_Q": "Q",
-            "KEYCODE_W": "W",
-            "KEYCODE_E": "E",
-            "KEYCODE_R": "R",
-            
-            # Numeric keys
-            "KEYCODE_1": "1",
-            "KEYCODE_2": "2",
-            "KEYCODE_3": "3",
-            "KEYCODE_4": "4",
-            "KEYCODE_5": "5",
-            
-            # Function/special keys
-            "KEYCODE_SPACE": "SPC",
-            "KEYCODE_ENTER": "↵",
-            "KEYCODE_LSHIFT": "⇧",
-            "KEYCODE_RSHIFT": "⇧",
-            "KEYCODE_LCONTROL": "Ctrl",
-            "KEYCODE_RCONTROL": "Ctrl",
-            "KEYCODE_LALT": "Alt",
-            "KEYCODE_RALT": "Alt",
-            "KEYCODE_TAB": "⇥",
-            "KEYCODE_ESC": "Esc",
-            
-            # Player 2 common keys
-            "KEYCODE_I": "I",
-            "KEYCODE_J": "J", 
-            "KEYCODE_K": "K",
-            "KEYCODE_L": "L"
-        }
-        
-        # JOYCODE mappings - including both old and new button mappings
-        joycode_to_prefix = {
-            # Buttons - use getattr with fallback to avoid AttributeError
-            "JOYCODE_1_BUTTON1": "A" if getattr(self, 'use_xinput', True) else "B1",
-            "JOYCODE_1_BUTTON2": "B" if getattr(self, 'use_xinput', True) else "B2",
-            "JOYCODE_1_BUTTON3": "X" if getattr(self, 'use_xinput', True) else "B3",
-            "JOYCODE_1_BUTTON4": "Y" if getattr(self, 'use_xinput', True) else "B4",
-            "JOYCODE_1_BUTTON5": "LB" if getattr(self, 'use_xinput', True) else "B5",
-            "JOYCODE_1_BUTTON6": "RB" if getattr(self, 'use_xinput', True) else "B6",
-            "JOYCODE_1_BUTTON7": "LT" if getattr(self, 'use_xinput', True) else "B7",
-            
-            # OLD FORMAT - Button 8 and 9 (for backward compatibility)
-            "JOYCODE_1_BUTTON8": "BACK" if getattr(self, 'use_xinput', True) else "B8",
-            "JOYCODE_1_BUTTON9": "START" if getattr(self, 'use_xinput', True) else "B9",
-            
-            # NEW FORMAT - Named buttons
-            "JOYCODE_1_SELECT": "BACK",
-            "JOYCODE_1_START": "START",
-            
-            # Axes - CRITICAL: These should work regardless of input mode
-            "JOYCODE_1_ZAXIS": "LT" if getattr(self, 'use_xinput', True) else "Z-AXIS",
-            "JOYCODE_1_RZAXIS": "RT" if getattr(self, 'use_xinput', True) else "RZ-AXIS",
-            "JOYCODE_1_ZAXIS_NEG_SWITCH": "LT",
-            "JOYCODE_1_RZAXIS_NEG_SWITCH": "RT",
-            
-            # NEW SLIDER FORMAT
-            "JOYCODE_1_SLIDER2_NEG_SWITCH": "LT",
-            "JOYCODE_1_SLIDER2_POS_SWITCH": "LT+",
-        }
-        
-        # Combine all mappings
-        all_mappings = {**xinput_to_prefix, **dinput_to_prefix, **joycode_to_prefix, 
-                        **keyboard_to_prefix, **directional_to_prefix, **trigger_to_prefix}
-        
-        # Handle multiple button assignments with BOTH ||| and space separators
-        if "|||" in mapping or " " in mapping:
-            # Determine which separator to use
-            if "|||" in mapping:
-                parts = [part.strip() for part in mapping.split("|||")]
-            else:
-                # Handle space-separated mappings (like JOYCODE_1_BUTTON1 JOYCODE_1_BUTTON2)
-                parts = [part.strip() for part in mapping.split(" ") if part.strip()]
-            
-            prefixes = []
-            
-            for part in parts:
-                # Look up the prefix for this part
-                if part in all_mappings:
-                    prefixes.append(all_mappings[part])
-                # Handle other special cases
-                elif "DINPUT_1_BUTTON" in part:
-                    try:
-                        button_num = int(part.replace("DINPUT_1_BUTTON", ""))
-                        prefixes.append(f"B{button_num}")
-                    except:
-                        pass
-                elif "JOYCODE_1_BUTTON" in part:
-                    try:
-                        button_num = int(part.replace("JOYCODE_1_BUTTON", ""))
-                        if button_num <= 10:
-                            standard_buttons = ["", "A", "B", "X", "Y", "LB", "RB", "LT", "RT", "LS", "RS"]
-                            if button_num < len(standard_buttons):
-                                prefixes.append(standard_buttons[button_num])
-                            else:
-                                prefixes.append(f"B{button_num}")
-                    except:
-                        pass
-            
-            # Enhanced handling for common combinations
-            if len(prefixes) >= 2:
-                # Sort prefixes for consistent display
-                prefixes.sort()
-                
-                # Special cases for common button combinations
-                if set(prefixes) == {"A", "B"}:
-                    return "A+B"  # Your specific case!
-                elif set(prefixes) == {"X", "Y"}:
-                    return "X+Y"
-                elif set(prefixes) == {"LB", "RB"}:
-                    return "LB+RB"
-                elif set(prefixes) == {"LT", "RT"}:
-                    return "LT+RT"
-                # Handle directional pairs (keep your existing logic)
-                elif "←" in prefixes and "→" in prefixes:
-                    return "←/→"
-                elif "↑" in prefixes and "↓" in prefixes:
-                    return "↑/↓"
-                elif "D←" in prefixes and "D→" in prefixes:
-                    return "D←/→"
-                elif "D↑" in prefixes and "D↓" in prefixes:
-                    return "D↑/↓"
-                else:
-                    # For other combinations, use + for simultaneous presses
-                    return "+".join(prefixes)
-            elif len(prefixes) == 1:
-                return prefixes[0]
-            else:
-                return ""  # No valid prefixes found
-        
-        # Check for direct match in standard mappings
-        if mapping in all_mappings:
-            return all_mappings[mapping]
-        
-        # Special handling for DirectInput buttons not explicitly listed
-        if "DINPUT_1_BUTTON" in mapping:
-            try:
-                # Extract button number
-                button_num = int(mapping.replace("DINPUT_1_BUTTON", ""))
-                return f"B{button_num}"
-            except:
-                pass
-        
-        # Special handling for keyboard keys not explicitly listed
-        if mapping.startswith("KEYCODE_"):
-            # Extract the key name
-            key_name = mapping.replace("KEYCODE_", "")
-            # For most keys, just return the key name
-            if len(key_name) == 1:  # Single character keys
-                return key_name
-            else:
-                return key_name[:3]  # First 3 chars for longer key names
-        
-        # If no direct match, try partial matching for JOYCODE buttons
-        if "JOYCODE_1_BUTTON" in mapping:
-            try:
-                # Extract button number
-                button_num = int(mapping.replace("JOYCODE_1_BUTTON", ""))
-                if button_num <= 10:
-                    # Use standard button mapping (1=A, 2=B, etc.)
-                    standard_buttons = ["", "A", "B", "X", "Y", "LB", "RB", "LT", "RT", "LS", "RS"]
-                    if button_num < len(standard_buttons):
-                        return standard_buttons[button_num]
-                    else:
-                        return f"B{button_num}"
-            except:
-                pass
-                
-        # Return empty string for unknown mappings
-        return ""
+        return get_button_prefix_from_mapping(mapping, getattr(self, 'use_xinput', True))
 
     def apply_text_settings(self, uppercase_changed=False):
         """Apply current text settings to all controls with both font and gradient support"""
@@ -7831,7 +7996,7 @@ class PreviewWindow(QMainWindow):
                 
                 if os.path.exists(font_path):
                     print(f"Loading font directly from: {font_path}")
-                    font_id = QFontDatabase.addApplicationFont(font_path)
+                    font_id = register_application_font(font_path)
                     
                     if font_id >= 0:
                         families = QFontDatabase.applicationFontFamilies(font_id)
@@ -7868,7 +8033,7 @@ class PreviewWindow(QMainWindow):
                         font_path = os.path.join(fonts_dir, file_name)
                         if os.path.exists(font_path):
                             print(f"Loading custom font: {font_path}")
-                            font_id = QFontDatabase.addApplicationFont(font_path)
+                            font_id = register_application_font(font_path)
                             
                             if font_id >= 0:
                                 families = QFontDatabase.applicationFontFamilies(font_id)
@@ -7890,7 +8055,7 @@ class PreviewWindow(QMainWindow):
                                 font_path = os.path.join(fonts_dir, filename)
                                 print(f"Trying font: {font_path}")
                                 
-                                font_id = QFontDatabase.addApplicationFont(font_path)
+                                font_id = register_application_font(font_path)
                                 if font_id >= 0:
                                     families = QFontDatabase.applicationFontFamilies(font_id)
                                     for family in families:
@@ -8293,31 +8458,41 @@ class PreviewWindow(QMainWindow):
         gc.collect()
         print("Garbage collection completed")
     
-    # Add this function to mame_controls_preview.py
+    def get_layout_settings(self):
+        """The window's current layout as LayoutSettings for the widget-free renderer"""
+        from mame_layout_renderer import LayoutSettings
+
+        positions = {}
+        for control_name, control_data in self.control_labels.items():
+            original_pos = control_data.get('original_pos')
+            if original_pos is not None:
+                positions[control_name] = [original_pos.x(), original_pos.y()]
+
+        background_path = os.path.join(self.preview_dir, "images", "default.png")
+        return LayoutSettings(
+            positions=positions,
+            text_settings=dict(self.text_settings),
+            bezel_settings={
+                "bezel_visible": bool(getattr(self, 'bezel_visible', False)),
+                "directional_mode": getattr(self, 'directional_mode', 'show_all'),
+                "auto_show_directionals_for_directional_only": getattr(self, 'auto_show_directionals_for_directional_only', True)
+            },
+            logo_settings=dict(self.logo_settings, logo_visible=bool(getattr(self, 'logo_visible', True))),
+            background_path=background_path if os.path.exists(background_path) else None,
+            bezel_path=self.find_bezel_path(self.rom_name),
+            logo_path=self.find_logo_path(self.rom_name),
+            fonts_dir=self.fonts_dir
+        )
+
     def export_image_headless(self, output_path, format="png"):
-        """Export preview image in headless mode using existing save_image functionality"""
+        """Export the preview image to output_path with the widget-free renderer (no dialogs)"""
         try:
+            from mame_layout_renderer import render_layout_image, save_layout_image
+
             print(f"Exporting preview image to {output_path}")
-            
-            # If the original save_image function exists, use it
-            if hasattr(self, 'save_image'):
-                # Get the current output path to restore it later
-                original_output_path = getattr(self, '_output_path', None)
-                
-                # Set the output path temporarily
-                self._output_path = output_path
-                
-                # Call the existing save_image function
-                result = self.save_image()
-                
-                # Restore original path
-                if original_output_path:
-                    self._output_path = original_output_path
-                
-                return result
-            else:
-                print("ERROR: save_image method not available")
-                return False
+            image = render_layout_image(self.game_data, self.get_layout_settings(),
+                                        (self.canvas.width(), self.canvas.height()))
+            return save_layout_image(image, output_path, format)
         except Exception as e:
             print(f"Error in export_image_headless: {e}")
             import traceback
@@ -8698,7 +8873,7 @@ class TextSettingsDialog(QDialog):
                         font_path = os.path.join(fonts_dir, filename)
                         
                         # Load font into QFontDatabase to get proper family name
-                        font_id = QFontDatabase.addApplicationFont(font_path)
+                        font_id = register_application_font(font_path)
                         if font_id >= 0:
                             # Get the actual font family names
                             font_families = QFontDatabase.applicationFontFamilies(font_id)
@@ -10,6 +10,7 @@ from mame_utils import (
     get_mame_parent_dir, 
     find_file_in_standard_locations
 )
+from mame_game_cache import get_game_cache, get_file_signatures, load_cache_settings
 
 class PositionManager:
     """A simplified position manager for the PyQt implementation"""
@@ -293,24 +294,50 @@ class MAMEControlConfig:
         return settings
     
     def load_game_data_from_cache(self, rom_name):
-        """Load game data from cache with fallback to defaults for controls without names"""
-        cache_path = os.path.join(self.cache_dir, f"{rom_name}_cache.json")
-        
-        if not os.path.exists(cache_path):
-            print(f"No cache file found for {rom_name}")
-            return None
-            
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                game_data = json.load(f)
-                
-            # Apply defaults to any unnamed controls
-            game_data = self.apply_default_control_names(game_data)
-                        
-            return game_data
-        except Exception as e:
-            print(f"Error loading cache for {rom_name}: {e}")
+        """Load game data from the shared cache with fallback to defaults for controls without names"""
+        game_data = get_game_cache(self.cache_dir).get(rom_name, load_cache_settings(self.settings_dir))
+        if game_data is None:
+            print(f"No cache entry found for {rom_name}")
             return None
+        
+        # Apply defaults to any unnamed controls
+        return self.apply_default_control_names(game_data)
+    
+    def load_processing_inputs(self):
+        """
+        gamedata and default.cfg for processing ROMs that have no cache entry
+        Kept until either file changes, so a resident preview server loads them once
+        """
+        default_cfg_path = os.path.join(self.mame_dir, "cfg", "default.cfg")
+        signatures = get_file_signatures([self.gamedata_path, default_cfg_path])
+        cached = getattr(self, '_processing_inputs', None)
+        if cached and cached[0] == signatures:
+            return cached[1]
+        
+        from mame_data_utils import load_gamedata_json, load_default_config
+        
+        gamedata_json, parent_lookup, _ = load_gamedata_json(self.gamedata_path)
+        default_controls, original_default_controls = load_default_config(self.mame_dir)
+        inputs = (gamedata_json, parent_lookup, default_controls, original_default_controls)
+        self._processing_inputs = (signatures, inputs)
+        return inputs
+    
+    def build_processed_game_data(self, rom_name, cache_settings):
+        """Process a ROM the same way the GUI does and store it in the shared cache"""
+        from mame_data_utils import get_game_data, get_processed_game_data
+        
+        gamedata_json, parent_lookup, default_controls, original_default_controls = self.load_processing_inputs()
+        db_path = self.db_path if os.path.exists(self.db_path) else None
+        
+        return get_processed_game_data(
+            rom_name,
+            cache_settings,
+            get_game_cache(self.cache_dir),
+            lambda rom: get_game_data(rom, gamedata_json, parent_lookup, db_path),
+            self.mame_dir,
+            default_controls,
+            original_default_controls
+        )
     
     def apply_default_control_names(self, game_data):
         """Apply default control names for any unnamed controls in the game data"""
@@ -500,8 +527,33 @@ class MAMEControlConfig:
             print(f"❌ Error loading cache file: {e}")
             return None
 
-    def show_preview_standalone(self, rom_name, auto_close=False, clean_mode=False):
-        """Show the preview for a specific ROM - OPTIMIZED VERSION"""
+    def load_preview_game_data(self, rom_name):
+        """Processed game data for a preview, from the game cache when it has a current entry"""
+        start_time = time.time()
+        cache_settings = load_cache_settings(self.settings_dir)
+        self.input_mode = cache_settings.input_mode
+        game_data = get_game_cache(self.cache_dir).get(rom_name, cache_settings)
+        
+        if game_data:
+            cache_load_time = time.time() - start_time
+            print(f"📊 Cache loaded in {cache_load_time:.3f} seconds")
+            return game_data
+        
+        # Only do heavy processing if the cache has no entry for the current settings
+        print(f"📂 Loading fresh data...")
+        self.hide_preview_buttons = getattr(self, 'hide_preview_buttons', False)
+        
+        game_data = self.build_processed_game_data(rom_name, cache_settings)
+        if not game_data:
+            print(f"❌ No game data found for {rom_name}")
+        return game_data
+    
+    def show_preview_standalone(self, rom_name, auto_close=False, clean_mode=False, standalone=True):
+        """
+        Show the preview for a specific ROM - OPTIMIZED VERSION
+        standalone=True quits the application when the preview closes; the preview server passes False.
+        Returns the preview window, or None if it could not be shown
+        """
         print(f"🚀 Starting optimized preview for ROM: {rom_name}")
         start_time = time.time()
         
@@ -513,46 +565,10 @@ class MAMEControlConfig:
         self.cache_dir = os.path.join(self.preview_dir, "cache")
         self.current_game = rom_name
         
-        # PERFORMANCE FIX 2: Fast cache loading
-        cache_file = os.path.join(self.cache_dir, f"{rom_name}_cache.json")
-        game_data = None
-        
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                
-                # Handle both cache formats quickly
-                if isinstance(cache_data, dict) and 'game_data' in cache_data:
-                    game_data = cache_data['game_data']
-                    print(f"✅ Loaded from NEW format cache")
-                elif isinstance(cache_data, dict) and 'players' in cache_data:
-                    game_data = cache_data
-                    print(f"✅ Loaded from OLD format cache")
-                
-                if game_data:
-                    cache_load_time = time.time() - start_time
-                    print(f"📊 Cache loaded in {cache_load_time:.3f} seconds")
-            except Exception as e:
-                print(f"⚠️ Cache error: {e}")
-        
-        # Only do heavy processing if cache failed
+        # PERFORMANCE FIX 2: Fast cache loading from the entry the GUI or precache wrote
+        game_data = self.load_preview_game_data(rom_name)
         if not game_data:
-            print(f"📂 Loading fresh data...")
-            # Initialize ROM data cache if needed
-            if not hasattr(self, 'rom_data_cache'):
-                self.rom_data_cache = {}
-            
-            # Load minimal settings
-            self.input_mode = getattr(self, 'input_mode', 'xinput')
-            self.hide_preview_buttons = getattr(self, 'hide_preview_buttons', False)
-            
-            # Use unified game data getter
-            game_data = self.get_unified_game_data(rom_name)
-            
-            if not game_data:
-                print(f"❌ No game data found for {rom_name}")
-                return
+            return None
         
         # PERFORMANCE FIX 3: Skip auto_close setup unless needed
         if auto_close:
@@ -577,7 +593,7 @@ class MAMEControlConfig:
             )
             
             # PERFORMANCE FIX 5: Minimal window setup
-            self.preview_window.standalone_mode = True
+            self.preview_window.standalone_mode = standalone
             
             # Apply fullscreen settings quickly
             from PyQt5.QtCore import Qt
@@ -603,11 +619,13 @@ class MAMEControlConfig:
             
             total_time = time.time() - start_time
             print(f"⚡ Total startup time: {total_time:.3f} seconds")
+            return self.preview_window
             
         except Exception as e:
             print(f"❌ Error showing preview: {str(e)}")
             import traceback
             traceback.print_exc()
+            return None
     
     def ensure_full_dimensions(self, window, screen_geometry):
         """Ensure the window and all children use the full dimensions"""
@@ -12,12 +12,15 @@ from typing import Dict, Set, Tuple
 import xml.etree.ElementTree as ET
 import customtkinter as ctk
 from tkinter import messagebox, StringVar
-from functools import lru_cache
 import tkinter as tk
 from tkinter import ttk, messagebox
 from screeninfo import get_monitors
 from mame_data_utils import cleanup_database_connections
 cleanup_database_connections()
+from mame_file_watcher import FileWatcher
+from mame_game_cache import CacheSettings, get_game_cache, load_cache_limits, DEFAULT_CACHE_LIMITS
+from mame_preview_server import request_preview
+from mame_batch_export import export_games
 from mame_utils import (
     get_application_path, 
     get_mame_parent_dir, 
@@ -26,21 +29,24 @@ from mame_utils import (
 # Add this import after your existing imports
 from mame_data_utils import (
     # Data loading functions
-    load_gamedata_json, get_game_data,
-    build_gamedata_db, check_db_update_needed, rom_exists_in_db,
+    load_gamedata_json, get_game_data, get_games_data, get_games_data_bulk,
+    get_category_roms_from_db, get_category_counts_from_db, search_games,
+    build_gamedata_db, sync_gamedata_db, check_db_update_needed, rom_exists_in_db,
     
     # Config parsing functions
-    load_custom_configs, load_default_config, parse_cfg_controls,
+    load_custom_configs, read_custom_config, load_default_config, parse_cfg_controls, get_cfg_controls,
     
     # Mapping conversion functions
     convert_mapping,
     
     # Data processing functions
     update_game_data_with_custom_mappings, filter_xinput_controls,
-    scan_roms_directory,
+    get_processed_game_data,
+    scan_roms_directory, scan_rom_manifest, get_rom_paths, rom_name_from_filename, load_rom_exclusion_list,
+    add_roms_to_exclusion_list, flush_exclusion_list,
     
     # Cache management functions
-    clean_cache_directory
+    clean_cache_directory, perform_cache_clear
 )
 
 # Theme settings for the application
@@ -207,7 +213,6 @@ class MAMEControlConfig(ctk.CTk):
 
         # Add ROM data cache to improve performance
         self.rom_data_cache = {}
-        self.processed_cache = {}  # ADD THIS LINE for processed data cache
 
         try:
             # Initialize with super().__init__ but don't show the window yet
@@ -245,6 +250,9 @@ class MAMEControlConfig(ctk.CTk):
             # Initialize directory structure
             self.initialize_directory_structure()
             
+            # Processed game data shared with the preview and CLI through preview/cache
+            self.game_cache = get_game_cache(self.cache_dir)
+            
             # Add ROM data cache to improve performance
             self.rom_data_cache = {}
             
@@ -429,6 +437,14 @@ class MAMEControlConfig(ctk.CTk):
         
         # REMOVED: self.debug_rom_source_state()
         
+        # Keep ROMs, cfg files and settings current while the app is running
+        self._start_file_watcher()
+        
+        # Trim the game cache to its size budget once the app has settled
+        self.load_cache_settings()
+        if self.cache_auto_cleanup:
+            self.after(10000, self.clean_cache_directory)
+        
         # Schedule showing the main window FIRST
         self.after(500, self.show_application)
         
@@ -859,9 +875,8 @@ class MAMEControlConfig(ctk.CTk):
     def check_and_build_db_if_needed(self):
         """Check and build the database only if needed"""
         if check_db_update_needed(self.gamedata_path, self.db_path):
-            print("Database needs updating, rebuilding...")
-            from mame_data_utils import build_gamedata_db
-            return build_gamedata_db(self.gamedata_json, self.db_path)
+            print("Database needs updating, syncing...")
+            return sync_gamedata_db(self.gamedata_json, self.db_path)
         else:
             print("Database is up to date, skipping rebuild")
             return False
@@ -913,43 +928,31 @@ class MAMEControlConfig(ctk.CTk):
 
     def load_cache_settings(self):
         """Load cache management settings from JSON file"""
-        default_settings = {
-            "max_age_days": 9999,
-            "max_files": 100,
-            "auto_cleanup_enabled": True
-        }
-        
         settings_file = os.path.join(self.settings_dir, "cache_settings.json")
+        limits = load_cache_limits(self.settings_dir)
+        
+        self.cache_max_age = limits.max_age_days
+        self.cache_max_size_mb = limits.max_size_mb
+        self.cache_auto_cleanup = limits.auto_cleanup
         
         try:
-            if os.path.exists(settings_file):
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-                    
-                # Validate and use settings, falling back to defaults if needed
-                self.cache_max_age = int(settings.get("max_age_days", default_settings["max_age_days"]))
-                self.cache_max_files = int(settings.get("max_files", default_settings["max_files"]))
-                self.cache_auto_cleanup = bool(settings.get("auto_cleanup_enabled", default_settings["auto_cleanup_enabled"]))
-            else:
-                # Use defaults
-                self.cache_max_age = default_settings["max_age_days"]
-                self.cache_max_files = default_settings["max_files"]
-                self.cache_auto_cleanup = default_settings["auto_cleanup_enabled"]
-                
-                # Create default settings file
-                self.save_cache_settings()
+            with open(settings_file, 'r') as f:
+                outdated = 'max_size_mb' not in json.load(f)
+        except FileNotFoundError:
+            outdated = True
         except Exception as e:
             print(f"Error loading cache settings: {e}")
-            # Use defaults on error
-            self.cache_max_age = default_settings["max_age_days"]
-            self.cache_max_files = default_settings["max_files"]
-            self.cache_auto_cleanup = default_settings["auto_cleanup_enabled"]
+            outdated = False
+        
+        # Create the settings file, or replace the old max_files limit with the size budget
+        if outdated:
+            self.save_cache_settings()
 
     def save_cache_settings(self):
         """Save cache management settings to JSON file"""
         settings = {
             "max_age_days": self.cache_max_age,
-            "max_files": self.cache_max_files,
+            "max_size_mb": self.cache_max_size_mb,
             "auto_cleanup_enabled": self.cache_auto_cleanup
         }
         
@@ -962,14 +965,14 @@ class MAMEControlConfig(ctk.CTk):
         except Exception as e:
             print(f"Error saving cache settings: {e}")
     
-    def clean_cache_directory(self, max_age_days=None, max_files=None):
+    def clean_cache_directory(self, max_age_days=None, max_size_mb=None):
         """Clean cache using utility function"""
         if max_age_days is None:
-            max_age_days = getattr(self, 'cache_max_age', 7)
-        if max_files is None:
-            max_files = getattr(self, 'cache_max_files', 100)
+            max_age_days = getattr(self, 'cache_max_age', DEFAULT_CACHE_LIMITS.max_age_days)
+        if max_size_mb is None:
+            max_size_mb = getattr(self, 'cache_max_size_mb', DEFAULT_CACHE_LIMITS.max_size_mb)
         
-        return clean_cache_directory(self.cache_dir, max_age_days, max_files)
+        return clean_cache_directory(self.cache_dir, max_age_days, max_size_mb)
 
     def clear_cache(self):
         """Show cache management dialog with options to clear cache and configure settings - FIXED"""
@@ -981,25 +984,15 @@ class MAMEControlConfig(ctk.CTk):
             # Create the dialog window using CTkToplevel instead of tk.Toplevel
             dialog = ctk.CTkToplevel(self)
             dialog.title("Cache Management")
-            dialog.geometry("450x400")
+            dialog.geometry("450x520")
             dialog.resizable(False, False)
             dialog.transient(self)  # Make dialog modal
             dialog.grab_set()
             
-            # Count existing cache files
+            # Entry counts and size come from the cache store index
             cache_dir = os.path.join(self.preview_dir, "cache")
-            if not os.path.exists(cache_dir):
-                os.makedirs(cache_dir, exist_ok=True)
-                cache_files = []
-            else:
-                cache_files = [f for f in os.listdir(cache_dir) if f.endswith('_cache.json')]
-            
-            # Calculate cache size
-            total_size = 0
-            for filename in cache_files:
-                filepath = os.path.join(cache_dir, filename)
-                if os.path.exists(filepath):
-                    total_size += os.path.getsize(filepath)
+            cache_stats = get_game_cache(cache_dir).stats()
+            total_size = cache_stats['file_bytes']
             
             # Convert size to readable format
             if total_size < 1024:
@@ -1022,12 +1015,43 @@ class MAMEControlConfig(ctk.CTk):
             
             ctk.CTkLabel(
                 frame, 
-                text=f"Total cache files: {len(cache_files)}"
+                text=f"Cached games: {cache_stats['roms']} ({cache_stats['entries']} variants)"
             ).pack(anchor="w", padx=20, pady=2)
             
             ctk.CTkLabel(
                 frame, 
                 text=f"Total cache size: {size_str}"
+            ).pack(anchor="w", padx=20, pady=2)
+            
+            ctk.CTkLabel(
+                frame, 
+                text=f"Pinned (frequently played): {cache_stats['pinned_roms']}    "
+                     f"Evicted: {cache_stats['evicted_roms']}"
+            ).pack(anchor="w", padx=20, pady=2)
+            
+            # Hit/miss counts across the GUI, preview and precache runs, for tuning the size budget
+            if cache_stats['lookups']:
+                hit_text = (f"Hit rate: {cache_stats['hit_rate']:.0%} of {cache_stats['lookups']} lookups "
+                            f"({cache_stats['hits']} memory, {cache_stats['disk_hits']} disk, "
+                            f"{cache_stats['misses']} misses)")
+            else:
+                hit_text = "Hit rate: no lookups recorded yet"
+            ctk.CTkLabel(
+                frame, 
+                text=hit_text
+            ).pack(anchor="w", padx=20, pady=2)
+            
+            def reset_cache_stats():
+                """Start counting hits and misses again, e.g. after changing the size budget"""
+                get_game_cache(cache_dir).reset_stats()
+                dialog.destroy()
+                self.clear_cache()
+            
+            ctk.CTkButton(
+                frame, 
+                text="Reset Statistics", 
+                width=120,
+                command=reset_cache_stats
             ).pack(anchor="w", padx=20, pady=(2, 20))
             
             # Settings section
@@ -1052,7 +1076,7 @@ class MAMEControlConfig(ctk.CTk):
             # Max age setting
             ctk.CTkLabel(
                 settings_frame, 
-                text="Maximum age of cache files (days):"
+                text="Maximum age of cache entries (days):"
             ).grid(row=0, column=0, sticky="w", pady=5)
             
             self.max_age_var = tk.StringVar(value=str(self.cache_max_age))
@@ -1063,19 +1087,19 @@ class MAMEControlConfig(ctk.CTk):
             )
             max_age_entry.grid(row=0, column=1, padx=(10, 0), pady=5)
             
-            # Max files setting
+            # Size budget setting
             ctk.CTkLabel(
                 settings_frame, 
-                text="Maximum number of cache files:"
+                text="Maximum cache size (MB):"
             ).grid(row=1, column=0, sticky="w", pady=5)
             
-            self.max_files_var = tk.StringVar(value=str(self.cache_max_files))
-            max_files_entry = ctk.CTkEntry(
+            self.max_size_var = tk.StringVar(value=str(self.cache_max_size_mb))
+            max_size_entry = ctk.CTkEntry(
                 settings_frame, 
                 width=70, 
-                textvariable=self.max_files_var
+                textvariable=self.max_size_var
             )
-            max_files_entry.grid(row=1, column=1, padx=(10, 0), pady=5)
+            max_size_entry.grid(row=1, column=1, padx=(10, 0), pady=5)
             
             # FIXED: Correct cache clearing functions
             def clear_all_cache():
@@ -1090,11 +1114,9 @@ class MAMEControlConfig(ctk.CTk):
                         # Show success message
                         messagebox.showinfo("Cache Cleared", "All cache files have been cleared successfully.")
                         
-                        # Clear in-memory caches too
+                        # Clear in-memory caches too (perform_cache_clear already dropped the game cache)
                         if hasattr(self, 'rom_data_cache'):
                             self.rom_data_cache.clear()
-                        if hasattr(self, 'processed_cache'):
-                            self.processed_cache.clear()
                         
                         print("All cache cleared successfully")
                     else:
@@ -1107,10 +1129,11 @@ class MAMEControlConfig(ctk.CTk):
                 """Clear old cache files based on settings"""
                 try:
                     max_age = int(self.max_age_var.get()) if self.max_age_var.get().isdigit() else 7
-                    max_files = int(self.max_files_var.get()) if self.max_files_var.get().isdigit() else 100
+                    max_size_mb = (int(self.max_size_var.get()) if self.max_size_var.get().isdigit()
+                                   else DEFAULT_CACHE_LIMITS.max_size_mb)
                     
                     from mame_data_utils import clean_cache_directory
-                    success = clean_cache_directory(cache_dir, max_age, max_files)
+                    success = clean_cache_directory(cache_dir, max_age, max_size_mb)
                     
                     if success:
                         dialog.destroy()
@@ -1175,18 +1198,18 @@ class MAMEControlConfig(ctk.CTk):
                 self.cache_max_age = 7  # Default if invalid value
                 
             try:
-                self.cache_max_files = int(self.max_files_var.get())
-                #if self.cache_max_files < 10:
-                    #self.cache_max_files = 10
+                self.cache_max_size_mb = int(self.max_size_var.get())
+                if self.cache_max_size_mb < 1:
+                    self.cache_max_size_mb = 1
             except ValueError:
-                self.cache_max_files = 100  # Default if invalid value
+                self.cache_max_size_mb = DEFAULT_CACHE_LIMITS.max_size_mb  # Default if invalid value
             
             # Save to file
             self.save_cache_settings()
             
             # Run cleanup with new settings if enabled
             if self.cache_auto_cleanup:
-                clean_cache_directory(self.cache_dir, self.cache_max_age, self.cache_max_files)
+                clean_cache_directory(self.cache_dir, self.cache_max_age, self.cache_max_size_mb)
             
             messagebox.showinfo("Settings Saved", "Cache settings have been saved.", parent=dialog)
         except Exception as e:
@@ -1258,11 +1281,19 @@ class MAMEControlConfig(ctk.CTk):
         if hasattr(self, 'async_loader'):
             self.async_loader.stop_worker()
         
+        # Stop the file watcher
+        if getattr(self, 'file_watcher', None):
+            self.file_watcher.stop()
+            self.file_watcher = None
+        
+        # Write any exclusion list edits still waiting on their save timer
+        flush_exclusion_list()
+        
         # Clear caches to free memory
         if hasattr(self, 'rom_data_cache'):
             self.rom_data_cache.clear()
-        if hasattr(self, 'processed_cache'):
-            self.processed_cache.clear()
+        if hasattr(self, 'game_cache'):
+            self.game_cache.clear_memory()
         
         # Cancel any pending timers
         for attr_name in dir(self):
@@ -1675,31 +1706,8 @@ class MAMEControlConfig(ctk.CTk):
                 self.rom_data_cache.clear()
                 print(f"Cleared rom_data_cache ({cleared_count} entries) after config reload")
             
-            if hasattr(self, 'processed_cache'):
-                cleared_count = len(self.processed_cache)
-                self.processed_cache.clear()
-                print(f"Cleared processed_cache ({cleared_count} entries) after config reload")
-            
-            # ALSO clear the @lru_cache on get_game_data if it exists
-            if hasattr(self.get_game_data, 'cache_clear'):
-                self.get_game_data.cache_clear()
-                print("Cleared LRU cache on get_game_data method after config reload")
-            
-            # ENHANCED: Clear disk cache files to force complete regeneration
-            if hasattr(self, 'cache_dir') and self.cache_dir:
-                try:
-                    import os
-                    cache_files_removed = 0
-                    for filename in os.listdir(self.cache_dir):
-                        if filename.endswith('_cache.json'):
-                            try:
-                                os.remove(os.path.join(self.cache_dir, filename))
-                                cache_files_removed += 1
-                            except Exception as e:
-                                print(f"Error removing cache file {filename}: {e}")
-                    print(f"Removed {cache_files_removed} disk cache files to force cfg updates")
-                except Exception as e:
-                    print(f"Error clearing disk cache: {e}")
+            # Processed entries carry a hash of their cfg and gamedata inputs, so only the
+            # ROMs whose inputs changed are reprocessed
             
             # Update splash message
             self.update_splash_message("Reloading game database...")
@@ -1713,9 +1721,8 @@ class MAMEControlConfig(ctk.CTk):
             
             # Check if database needs rebuilding
             if check_db_update_needed(self.gamedata_path, self.db_path):
-                print("Rebuilding database...")
-                from mame_data_utils import build_gamedata_db
-                build_gamedata_db(self.gamedata_json, self.db_path)
+                print("Syncing database...")
+                sync_gamedata_db(self.gamedata_json, self.db_path)
             
             # Update splash message
             self.update_splash_message("Scanning ROMs...")
@@ -2403,28 +2410,13 @@ class MAMEControlConfig(ctk.CTk):
         self.current_view = "all"
 
     def toggle_friendly_names(self):
-        """Toggle between friendly names and raw mapping display - ENHANCED CACHE CLEARING"""
+        """Toggle between friendly names and raw mapping display"""
         # Get the toggle state directly instead of inverting it
         self.show_friendly_names = self.friendly_names_toggle.get()
         
         print(f"DEBUG: Toggled friendly names to: {self.show_friendly_names}")
         
-        # CRITICAL: Clear processed cache to force reprocessing with new setting
-        if hasattr(self, 'processed_cache'):
-            cleared_count = len(self.processed_cache)
-            self.processed_cache.clear()
-            print(f"DEBUG: Cleared processed cache ({cleared_count} entries) for friendly names toggle")
-        
-        # CRITICAL: Also clear ROM data cache to force fresh processing
-        if hasattr(self, 'rom_data_cache'):
-            cleared_count = len(self.rom_data_cache)
-            self.rom_data_cache.clear()
-            print(f"DEBUG: Cleared rom_data_cache ({cleared_count} entries) for friendly names toggle")
-        
-        # Clear LRU cache if it exists
-        if hasattr(self.get_game_data, 'cache_clear'):
-            self.get_game_data.cache_clear()
-            print("DEBUG: Cleared LRU cache for friendly names toggle")
+        # Friendly names are part of the cache key - both variants stay cached
         
         # Save the setting
         self.save_settings()
@@ -3162,8 +3154,8 @@ class MAMEControlConfig(ctk.CTk):
         config_text = ctk.CTkTextbox(frame, font=("Consolas", 12))
         config_text.pack(fill="both", expand=True, padx=5, pady=5)
         
-        # Insert the configuration text
-        config_text.insert("1.0", self.custom_configs[rom_name])
+        # Insert the configuration text (read on demand - only the manifest is kept in memory)
+        config_text.insert("1.0", read_custom_config(self.mame_dir, rom_name) or "")
         config_text.configure(state="disabled")  # Make read-only
         
         # Add a close button
@@ -3186,22 +3178,8 @@ class MAMEControlConfig(ctk.CTk):
         # Get all ROMs
         available_roms = sorted(self.available_roms)
         
-        # Prepare lists for different categories
-        with_controls = []
-        missing_controls = []
-        with_custom_config = []
-        generic_controls = []
-        custom_actions_roms = []
         clone_roms = []
 
-        # NEW CATEGORIES
-        no_buttons_roms = []
-        specialized_roms = []
-        analog_roms = []
-        multiplayer_roms = []
-        singleplayer_roms = []
-        mixed_controls_roms = []
-        
         # Build parent->clone lookup if needed
         if not hasattr(self, 'parent_lookup') or not self.parent_lookup:
             self.parent_lookup = {}
@@ -3217,115 +3195,14 @@ class MAMEControlConfig(ctk.CTk):
                         self.parent_lookup[clone_rom] = parent_rom
                         clone_roms.append(clone_rom)
         
-        # Process and categorize ROMs using the FIXED categorization
-        for rom in available_roms:
-            # Check if ROM is a clone
-            if rom not in clone_roms and rom in self.parent_lookup:
-                clone_roms.append(rom)
-                
-            # Check if ROM has custom config
-            has_custom = rom in self.custom_configs
-            if has_custom:
-                with_custom_config.append(rom)
-            
-            # Use the FIXED categorization method
-            categories = self.categorize_controls_properly(rom)
-            
-            if categories['has_controls']:
-                with_controls.append(rom)
-                
-                # FIXED: Now properly distinguishes between generic and custom
-                if categories['has_generic_controls']:
-                    generic_controls.append(rom)
-                elif categories['has_custom_controls']:
-                    custom_actions_roms.append(rom)
-                
-                # ADD THIS NEW SECTION HERE - RIGHT AFTER THE ABOVE if/elif BLOCK:
-                # Check for mixed controls (some with names, some without)
-                if self.has_mixed_controls(rom):
-                    mixed_controls_roms.append(rom)
-                
-                # Get game data for additional categorization
-                from mame_data_utils import get_game_data
-                game_data = get_game_data(rom, self.gamedata_json, self.parent_lookup, 
-                                        self.db_path, getattr(self, 'rom_data_cache', {}))
-                if game_data:
-                    # Player count categorization
-                    player_count = int(game_data.get('numPlayers', 1))
-                    if player_count == 1:
-                        singleplayer_roms.append(rom)
-                    elif player_count > 1:
-                        multiplayer_roms.append(rom)
-                    
-                    # Control type analysis
-                    has_specialized = False
-                    has_analog = False
-                    has_buttons = False
-                    
-                    specialized_types = [
-                        "TRACKBALL", "LIGHTGUN", "MOUSE", "DIAL", "PADDLE", 
-                        "POSITIONAL", "GAMBLE", "AD_STICK"
-                    ]
-                    
-                    analog_types = [
-                        "AD_STICK", "DIAL", "PADDLE", "PEDAL", "POSITIONAL"
-                    ]
-                    
-                    # Check each player's controls
-                    for player in game_data.get('players', []):
-                        for label in player.get('labels', []):
-                            control_name = label['name']
-                            
-                            if "BUTTON" in control_name:
-                                has_buttons = True
-                            
-                            for specialized_type in specialized_types:
-                                if specialized_type in control_name:
-                                    has_specialized = True
-                                    break
-                                    
-                            for analog_type in analog_types:
-                                if analog_type in control_name:
-                                    has_analog = True
-                                    break
-                    
-                    if has_specialized:
-                        specialized_roms.append(rom)
-                    if has_analog:
-                        analog_roms.append(rom)
-                    if not has_buttons:
-                        no_buttons_roms.append(rom)
-            else:
-                missing_controls.append(rom)
-        
-        # Filter list based on current view
-        display_roms = []
-        if self.current_view == "all":
-            display_roms = available_roms
-        elif self.current_view == "with_controls":
-            display_roms = with_controls
-        elif self.current_view == "missing":
-            display_roms = missing_controls
-        elif self.current_view == "custom_config":
-            display_roms = with_custom_config
-        elif self.current_view == "generic":
-            display_roms = generic_controls
-        elif self.current_view == "clones":
-            display_roms = sorted(clone_roms)
-        elif self.current_view == "custom_actions":
-            display_roms = custom_actions_roms
-        elif self.current_view == "mixed_controls":
-            display_roms = mixed_controls_roms
-        elif self.current_view == "no_buttons":
-            display_roms = no_buttons_roms
-        elif self.current_view == "specialized":
-            display_roms = specialized_roms
-        elif self.current_view == "analog":
-            display_roms = analog_roms
-        elif self.current_view == "multiplayer":
-            display_roms = multiplayer_roms
-        elif self.current_view == "singleplayer":
-            display_roms = singleplayer_roms
+        # Indexed lookup in the precomputed game_traits table when the database has it,
+        # full per-ROM categorization otherwise
+        display_roms = self._get_category_roms_from_traits(available_roms, clone_roms)
+        if display_roms is None:
+            display_roms = self._categorize_roms_for_view(available_roms, clone_roms)
+        else:
+            # The list below still shows names, so load the displayed ROMs in bulk
+            self._prefetch_game_data(display_roms)
         
         # Apply search filter if needed
         search_text = ""
@@ -3533,85 +3410,6 @@ class MAMEControlConfig(ctk.CTk):
             )
             add_button.pack(anchor="w", padx=15, pady=(5, 15))
     
-    def load_processed_cache_from_disk(self, rom_name):
-        """Load processed data from disk cache if it matches current settings"""
-        try:
-            if not hasattr(self, 'cache_dir') or not self.cache_dir:
-                return None
-                
-            cache_filename = f"{rom_name}_cache.json"
-            cache_path = os.path.join(self.cache_dir, cache_filename)
-            
-            if not os.path.exists(cache_path):
-                return None
-            
-            # Load the cache file
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-            
-            # Validate cache matches current settings
-            current_settings = {
-                'input_mode': self.input_mode,
-                'friendly_names': getattr(self, 'show_friendly_names', True),
-                'xinput_only_mode': getattr(self, 'xinput_only_mode', True)
-            }
-            
-            cached_settings = {
-                'input_mode': cache_data.get('input_mode'),
-                'friendly_names': cache_data.get('friendly_names', True),
-                'xinput_only_mode': cache_data.get('xinput_only_mode', True)
-            }
-            
-            # Check if settings match
-            if cached_settings == current_settings:
-                print(f"Loaded valid disk cache for {rom_name}")
-                return cache_data.get('game_data')
-            else:
-                print(f"Disk cache for {rom_name} is outdated (settings changed)")
-                # Optionally remove outdated cache
-                try:
-                    os.remove(cache_path)
-                    print(f"Removed outdated cache file for {rom_name}")
-                except:
-                    pass
-                return None
-            
-        except Exception as e:
-            print(f"Error loading disk cache for {rom_name}: {e}")
-            return None
-    
-    def save_processed_cache_to_disk(self, rom_name, game_data):
-        """Save processed data to disk cache with clean ROM-based filename"""
-        try:
-            if not hasattr(self, 'cache_dir') or not self.cache_dir:
-                return
-                
-            # CLEAN filename - just ROM name
-            cache_filename = f"{rom_name}_cache.json"
-            cache_path = os.path.join(self.cache_dir, cache_filename)
-            
-            # Create cache directory if needed
-            os.makedirs(self.cache_dir, exist_ok=True)
-            
-            # ENHANCED: Store cache metadata in the JSON to track what settings were used
-            cache_data = {
-                'rom_name': rom_name,
-                'input_mode': self.input_mode,
-                'friendly_names': getattr(self, 'show_friendly_names', True),
-                'xinput_only_mode': getattr(self, 'xinput_only_mode', True),
-                'cached_timestamp': time.time(),
-                'game_data': game_data
-            }
-            
-            # Save to disk
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2)
-                
-            print(f"Saved processed cache for {rom_name} (mode: {self.input_mode}, friendly: {getattr(self, 'show_friendly_names', True)})")
-            
-        except Exception as e:
-            print(f"Warning: Could not save cache for {rom_name}: {e}")
-    
     def debug_cache_state(self):
         """Debug method to check current cache state"""
         print(f"\n=== CACHE DEBUG ===")
@@ -3619,10 +3417,10 @@ class MAMEControlConfig(ctk.CTk):
         print(f"Current friendly_names: {getattr(self, 'show_friendly_names', 'not set')}")
         print(f"Current game: {getattr(self, 'current_game', 'not set')}")
         
-        if hasattr(self, 'processed_cache'):
-            print(f"Processed cache entries: {len(self.processed_cache)}")
-            for key in list(self.processed_cache.keys())[:5]:  # Show first 5
-                print(f"  Cache key: {key}")
+        if hasattr(self, 'game_cache'):
+            print(f"Processed cache entries: {len(self.game_cache)} "
+                  f"(hits: {self.game_cache.hits}, disk hits: {self.game_cache.disk_hits}, misses: {self.game_cache.misses})")
+            print(f"  Current key: {self.game_cache.make_key(self.current_game, self._cache_settings())}")
         else:
             print("No processed cache")
             
@@ -3645,13 +3443,8 @@ class MAMEControlConfig(ctk.CTk):
             if hasattr(self, 'update_toolbar_status'):
                 self.update_toolbar_status()
             
-            # Initialize processed cache if it doesn't exist
-            if not hasattr(self, 'processed_cache'):
-                self.processed_cache = {}
-            
-            # FIXED: Include input_mode AND friendly_names in cache key
-            cache_key = f"{rom_name}_{self.input_mode}_{getattr(self, 'show_friendly_names', True)}"
-            print(f"Using cache key: {cache_key}")
+            # Input mode, friendly names and XInput-only mode all select a different cache entry
+            cache_settings = self._cache_settings()
             
             # Initialize cfg_controls for all code paths
             cfg_controls = {}
@@ -3659,64 +3452,29 @@ class MAMEControlConfig(ctk.CTk):
             # Use provided processed data or get from cache or process fresh
             if processed_data:
                 game_data = processed_data
-                self.processed_cache[cache_key] = processed_data
-            elif cache_key in self.processed_cache:
-                print(f"Using in-memory cached data for {rom_name}")
-                game_data = self.processed_cache[cache_key]
             else:
-                # Try loading from disk cache first
-                disk_cached_data = self.load_processed_cache_from_disk(rom_name)
-                if disk_cached_data:
-                    print(f"Using valid disk cached data for {rom_name}")
-                    game_data = disk_cached_data
-                    # Store in memory cache too
-                    self.processed_cache[cache_key] = disk_cached_data
-                else:
-                    print(f"Processing fresh data for {rom_name} with mode={self.input_mode}, friendly_names={getattr(self, 'show_friendly_names', True)}")
-                    
-                    # Update splash during processing
-                    if hasattr(self, 'splash_window') and getattr(self, 'splash_window', None):
-                        self.update_splash_message(f"Processing {rom_name} data...")
-                    
-                    # Get raw game data ONCE
-                    game_data = self.get_game_data(rom_name)
-                    
-                    if not game_data:
-                        self.display_no_control_data(rom_name)
-                        return
-
-                    # IMPORTANT: Apply custom mappings ONCE here
-                    if rom_name in self.custom_configs:
-                        cfg_controls = parse_cfg_controls(self.custom_configs[rom_name], self.input_mode)
-                        cfg_controls = {
-                            control: convert_mapping(mapping, self.input_mode)
-                            for control, mapping in cfg_controls.items()
-                        }
-
-                    # Apply all processing ONCE - PASS friendly_names parameter
-                    game_data = update_game_data_with_custom_mappings(
-                        game_data, 
-                        cfg_controls, 
-                        getattr(self, 'default_controls', {}),
-                        getattr(self, 'original_default_controls', {}),
-                        self.input_mode,
-                        getattr(self, 'show_friendly_names', True)  # CRITICAL: Pass the toggle setting
-                    )
-
-                    # Apply XInput filtering if enabled
-                    if hasattr(self, 'xinput_only_mode') and self.xinput_only_mode:
-                        game_data = filter_xinput_controls(game_data)
-                    
-                    # Cache the processed result with the CORRECT cache key
-                    self.processed_cache[cache_key] = game_data
-                    print(f"Cached processed data with key: {cache_key}")
-                    
-                    # Save to disk cache asynchronously (with clean filename)
-                    self.after_idle(lambda: self.save_processed_cache_to_disk(rom_name, game_data))
+                # Entries are reused only while the gamedata entry, cfg files and mapping tables are unchanged
+                game_data = get_processed_game_data(
+                    rom_name,
+                    cache_settings,
+                    self.game_cache,
+                    self.get_game_data,
+                    self.mame_dir,
+                    getattr(self, 'default_controls', {}),
+                    getattr(self, 'original_default_controls', {}),
+                    write_to_disk=False
+                )
+                
+                if not game_data:
+                    self.display_no_control_data(rom_name)
+                    return
+                
+                # Write a newly processed entry to the shared disk cache once the UI is idle
+                self.after_idle(lambda: self.game_cache.save_to_disk(rom_name, cache_settings))
 
             # For cached data, we need to regenerate cfg_controls if it exists
             if not cfg_controls and rom_name in self.custom_configs:
-                cfg_controls = parse_cfg_controls(self.custom_configs[rom_name], self.input_mode)
+                cfg_controls = get_cfg_controls(self.mame_dir, rom_name, self.input_mode)
                 cfg_controls = {
                     control: convert_mapping(mapping, self.input_mode)
                     for control, mapping in cfg_controls.items()
@@ -3801,16 +3559,171 @@ class MAMEControlConfig(ctk.CTk):
                                         command=lambda: self.show_custom_config(rom_name))
                 
                 context_menu.add_command(label="Clear Cache for this ROM", 
-                                    command=lambda: self.perform_cache_clear(None, all_files=False, rom_name=rom_name))
+                                    command=lambda: self._invalidate_rom_caches(rom_name))
+                
+                if getattr(self, 'rom_source_mode', 'physical') == 'physical':
+                    context_menu.add_command(label="Exclude ROM from List", 
+                                        command=lambda: self.exclude_roms([rom_name]))
                 
                 # Display the context menu
                 context_menu.tk_popup(event.x_root, event.y_root)
         
-        except Exception as e:
-            print(f"Error showing context menu: {e}")
-            import traceback
-            traceback.print_exc()
-    
+        except Exception as e:
+            print(f"Error showing context menu: {e}")
+            import traceback
+            traceback.print_exc()
+    
+    def _get_category_roms_from_traits(self, available_roms, clone_roms=()):
+        """
+        Get the ROM list for the current view from gamedata.db game_traits
+        Returns None when the view or database can't be served that way
+        """
+        if self.current_view == "all":
+            return available_roms
+        if self.current_view == "clones":
+            return sorted(set(clone_roms) | {rom for rom in available_roms if rom in self.parent_lookup})
+        if self.current_view == "custom_config":
+            return [rom for rom in available_roms if rom in self.custom_configs]
+        
+        return get_category_roms_from_db(self.current_view, available_roms, self.db_path)
+
+    def _categorize_roms_for_view(self, available_roms, clone_roms):
+        """Categorize every ROM individually and return the list for the current view (no database traits)"""
+        # Prepare lists for different categories
+        with_controls = []
+        missing_controls = []
+        with_custom_config = []
+        generic_controls = []
+        custom_actions_roms = []
+
+        # NEW CATEGORIES
+        no_buttons_roms = []
+        specialized_roms = []
+        analog_roms = []
+        multiplayer_roms = []
+        singleplayer_roms = []
+        mixed_controls_roms = []
+        
+        # Fetch game data for every ROM in bulk up front
+        games_data = self._prefetch_game_data(available_roms)
+        
+        # Process and categorize ROMs using the FIXED categorization
+        for rom in available_roms:
+            # Check if ROM is a clone
+            if rom not in clone_roms and rom in self.parent_lookup:
+                clone_roms.append(rom)
+                
+            # Check if ROM has custom config
+            has_custom = rom in self.custom_configs
+            if has_custom:
+                with_custom_config.append(rom)
+            
+            # Use the FIXED categorization method
+            categories = self.categorize_controls_properly(rom)
+            
+            if categories['has_controls']:
+                with_controls.append(rom)
+                
+                # FIXED: Now properly distinguishes between generic and custom
+                if categories['has_generic_controls']:
+                    generic_controls.append(rom)
+                elif categories['has_custom_controls']:
+                    custom_actions_roms.append(rom)
+                
+                # ADD THIS NEW SECTION HERE - RIGHT AFTER THE ABOVE if/elif BLOCK:
+                # Check for mixed controls (some with names, some without)
+                if self.has_mixed_controls(rom):
+                    mixed_controls_roms.append(rom)
+                
+                # Get game data for additional categorization
+                game_data = games_data.get(rom)
+                if game_data:
+                    # Player count categorization
+                    player_count = int(game_data.get('numPlayers', 1))
+                    if player_count == 1:
+                        singleplayer_roms.append(rom)
+                    elif player_count > 1:
+                        multiplayer_roms.append(rom)
+                    
+                    # Control type analysis
+                    has_specialized = False
+                    has_analog = False
+                    has_buttons = False
+                    
+                    specialized_types = [
+                        "TRACKBALL", "LIGHTGUN", "MOUSE", "DIAL", "PADDLE", 
+                        "POSITIONAL", "GAMBLE", "AD_STICK"
+                    ]
+                    
+                    analog_types = [
+                        "AD_STICK", "DIAL", "PADDLE", "PEDAL", "POSITIONAL"
+                    ]
+                    
+                    # Check each player's controls
+                    for player in game_data.get('players', []):
+                        for label in player.get('labels', []):
+                            control_name = label['name']
+                            
+                            if "BUTTON" in control_name:
+                                has_buttons = True
+                            
+                            for specialized_type in specialized_types:
+                                if specialized_type in control_name:
+                                    has_specialized = True
+                                    break
+                                    
+                            for analog_type in analog_types:
+                                if analog_type in control_name:
+                                    has_analog = True
+                                    break
+                    
+                    if has_specialized:
+                        specialized_roms.append(rom)
+                    if has_analog:
+                        analog_roms.append(rom)
+                    if not has_buttons:
+                        no_buttons_roms.append(rom)
+            else:
+                missing_controls.append(rom)
+        
+        # Filter list based on current view
+        display_roms = []
+        if self.current_view == "all":
+            display_roms = available_roms
+        elif self.current_view == "with_controls":
+            display_roms = with_controls
+        elif self.current_view == "missing":
+            display_roms = missing_controls
+        elif self.current_view == "custom_config":
+            display_roms = with_custom_config
+        elif self.current_view == "generic":
+            display_roms = generic_controls
+        elif self.current_view == "clones":
+            display_roms = sorted(clone_roms)
+        elif self.current_view == "custom_actions":
+            display_roms = custom_actions_roms
+        elif self.current_view == "mixed_controls":
+            display_roms = mixed_controls_roms
+        elif self.current_view == "no_buttons":
+            display_roms = no_buttons_roms
+        elif self.current_view == "specialized":
+            display_roms = specialized_roms
+        elif self.current_view == "analog":
+            display_roms = analog_roms
+        elif self.current_view == "multiplayer":
+            display_roms = multiplayer_roms
+        elif self.current_view == "singleplayer":
+            display_roms = singleplayer_roms
+        
+        return display_roms
+
+    def _prefetch_game_data(self, roms):
+        """Load game data for many ROMs in bulk so later per-ROM lookups hit rom_data_cache"""
+        if not hasattr(self, 'rom_data_cache'):
+            self.rom_data_cache = {}
+        return get_games_data(roms, self.gamedata_json, self.parent_lookup,
+                              self.db_path, self.rom_data_cache)
+
     def _get_category_roms(self):
         """Get the ROM list for the current category without any search filtering"""
         # Get all ROMs
@@ -3835,23 +3748,37 @@ class MAMEControlConfig(ctk.CTk):
             # These we can get directly
             return sorted(self.custom_configs.keys())
         
+        # Indexed lookup in the precomputed game_traits table when the database has it
+        db_category_roms = get_category_roms_from_db(self.current_view, available_roms, self.db_path)
+        if db_category_roms is not None:
+            return db_category_roms
+        
+        # Fetch what the remaining categories need in bulk instead of per ROM
+        db_games_data = {}
+        games_data = {}
+        if self.current_view in ("with_controls", "missing"):
+            pending_roms = [rom for rom in available_roms if rom not in self.rom_data_cache]
+            db_games_data = get_games_data_bulk(pending_roms, self.db_path)
+            self.rom_data_cache.update(db_games_data)
+        elif self.current_view == "generic":
+            games_data = self._prefetch_game_data(available_roms)
+        
        # For these categories we need to check each ROM's data
         for rom in available_roms:
             # Quick check for category - only load data if absolutely necessary
             if self.current_view == "with_controls":
                 # Check if ROM has cached data or exists in database
-                if rom in self.rom_data_cache or rom_exists_in_db(rom, self.db_path):
+                if rom in self.rom_data_cache or rom in db_games_data:
                     with_controls.append(rom)
                 
             elif self.current_view == "missing":
                 # Opposite of with_controls
-                if rom not in self.rom_data_cache and not rom_exists_in_db(rom, self.db_path):
+                if rom not in self.rom_data_cache and rom not in db_games_data:
                     missing_controls.append(rom)
                     
             elif self.current_view == "generic":
                 # This requires actual data inspection, more expensive
-                game_data = get_game_data(rom, self.gamedata_json, self.parent_lookup, 
-                                        self.db_path, getattr(self, 'rom_data_cache', {}))
+                game_data = games_data.get(rom)
                 if not game_data:
                     continue
                     
@@ -3892,6 +3819,13 @@ class MAMEControlConfig(ctk.CTk):
         # If no search text, return original list
         if not search_text:
             return rom_list
+        
+        # Ranked full-text search (ROM name, description and control actions) when
+        # gamedata.db has the search index - also finds games by button action
+        ranked_roms = search_games(search_text, self.db_path)
+        if ranked_roms is not None:
+            allowed_roms = set(rom_list)
+            return [rom for rom in ranked_roms if rom in allowed_roms]
             
         filtered_roms = []
         
@@ -4333,7 +4267,7 @@ class MAMEControlConfig(ctk.CTk):
             # Apply custom mappings if they exist
             cfg_controls = {}
             if rom_name in self.custom_configs:
-                cfg_controls = parse_cfg_controls(self.custom_configs[rom_name], self.input_mode)
+                cfg_controls = get_cfg_controls(self.mame_dir, rom_name, self.input_mode)
                 cfg_controls = {
                     control: convert_mapping(mapping, self.input_mode)
                     for control, mapping in cfg_controls.items()
@@ -6370,42 +6304,23 @@ class MAMEControlConfig(ctk.CTk):
                             f"Game '{current_rom_name}' {action_text} gamedata.json with {controls_added} control mappings", 
                             parent=editor)
                 
-                # SIMPLE FIX: Clear the LRU cache on get_game_data
-                if hasattr(self.get_game_data, 'cache_clear'):
-                    self.get_game_data.cache_clear()
-                    print("Cleared LRU cache on get_game_data method")
-
-                # Also clear the manual caches
+                # Clear the raw game data cache; processed entries for the edited
+                # game no longer match its input hash and are rebuilt on display
                 if hasattr(self, 'rom_data_cache'):
                     self.rom_data_cache.clear()
                     print("Cleared rom_data_cache")
 
-                if hasattr(self, 'processed_cache'):
-                    self.processed_cache.clear() 
-                    print("Cleared processed_cache")
-
                 # Refresh data using startup logic
                 if hasattr(self, 'gamedata_json'):
                     del self.gamedata_json
                 from mame_data_utils import load_gamedata_json
                 self.gamedata_json, self.parent_lookup, self.clone_parents = load_gamedata_json(self.gamedata_path)
 
-                # Database rebuild (same as before)
-                needs_rebuild = False
-                if is_editing_clone:
-                    print(f"Rebuilding database because we edited parent {current_rom_name} through clone {original_rom_being_edited}")
-                    needs_rebuild = True
-                elif hasattr(self, 'clone_parents') and current_rom_name in self.clone_parents:
-                    print(f"Rebuilding database because {current_rom_name} has clone ROMs")
-                    needs_rebuild = True
-                elif hasattr(self, 'db_path') and self.db_path:
-                    from mame_data_utils import check_db_update_needed
-                    if check_db_update_needed(self.gamedata_path, self.db_path):
-                        needs_rebuild = True
-
-                if needs_rebuild and hasattr(self, 'db_path') and self.db_path:
-                    from mame_data_utils import build_gamedata_db
-                    build_gamedata_db(self.gamedata_json, self.db_path)
+                # Database sync - only the edited ROM (and any clones inheriting from it) are rewritten
+                if hasattr(self, 'db_path') and self.db_path:
+                    if is_editing_clone:
+                        print(f"Syncing database after editing parent {current_rom_name} through clone {original_rom_being_edited}")
+                    sync_gamedata_db(self.gamedata_json, self.db_path)
 
                 # Update UI
                 if hasattr(self, 'update_game_list_by_category'):
@@ -6658,11 +6573,11 @@ class MAMEControlConfig(ctk.CTk):
                 self.rom_data_cache = {}
                 print("Cleared ROM data cache to force refresh")
             
-            # Rebuild SQLite database if it's being used
+            # Sync SQLite database if it's being used
             if hasattr(self, 'db_path') and self.db_path:
-                print("Rebuilding SQLite database to reflect game removal...")
-                self.build_gamedata_db()
-                print("Database rebuild complete")
+                print("Syncing SQLite database to reflect game removal...")
+                sync_gamedata_db(self.gamedata_json, self.db_path)
+                print("Database sync complete")
             
             messagebox.showinfo(
                 "Success", 
@@ -6711,10 +6626,8 @@ class MAMEControlConfig(ctk.CTk):
                     (rom_name, control_name, display_name)
                 )
 
-    # Update your get_game_data method in tkinter:
-    @lru_cache(maxsize=128)  # Keep the cache decorator in tkinter
     def get_game_data(self, romname):
-        """Get game data using utility function with manual caching"""
+        """Get raw game data using utility function, memoized in rom_data_cache"""
         # Check manual cache first
         if hasattr(self, 'rom_data_cache') and romname in self.rom_data_cache:
             return self.rom_data_cache[romname]
@@ -7125,83 +7038,27 @@ class MAMEControlConfig(ctk.CTk):
             messagebox.showinfo("No Game Selected", "Please select a game first")
             return
         
-        # PERFORMANCE OPTIMIZATION 1: Quick validation without full data loading
-        cache_file = os.path.join(self.cache_dir, f"{self.current_game}_cache.json")
-        
-        # Check if we have a valid cache first (fastest path)
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_peek = json.load(f)
-                
-                # Quick validation - if it has basic structure, we're good
-                if isinstance(cache_peek, dict) and ('players' in cache_peek or 'game_data' in cache_peek):
-                    print(f"✅ Valid cache found for {self.current_game} - launching preview directly")
-                    self._launch_preview_process()
-                    return
-                else:
-                    print(f"🔄 Invalid cache structure detected - will rebuild")
-            except Exception as e:
-                print(f"⚠️ Cache read error: {e} - will rebuild")
+        # The preview process reads the same cache entry, keyed by the saved settings
+        cache_settings = self._cache_settings()
+        if self.game_cache.contains(self.current_game, cache_settings):
+            print(f"✅ Valid cache found for {self.current_game} - launching preview directly")
+            self._launch_preview_process()
+            return
         
-        # PERFORMANCE OPTIMIZATION 2: Only get minimal data for validation
         print(f"📦 Building cache for {self.current_game}...")
-        
-        # Get game data efficiently (this method should already be optimized)
-        game_data = self.get_game_data(self.current_game)
+        game_data = get_processed_game_data(
+            self.current_game,
+            cache_settings,
+            self.game_cache,
+            self.get_game_data,
+            self.mame_dir,
+            getattr(self, 'default_controls', {}),
+            getattr(self, 'original_default_controls', {})
+        )
         if not game_data:
             messagebox.showinfo("No Control Data", f"No control data found for {self.current_game}")
             return
-        
-        # PERFORMANCE OPTIMIZATION 3: Process custom configs only if they exist
-        cfg_controls = {}
-        if self.current_game in self.custom_configs:
-            print(f"🎛️ Processing custom config for {self.current_game}")
-            # Parse the custom config
-            cfg_controls = parse_cfg_controls(self.custom_configs[self.current_game], self.input_mode)
-            
-            # Convert based on current input mode
-            current_mode = getattr(self, 'input_mode', 'xinput' if self.use_xinput else 'joycode')
-            cfg_controls = {
-                control: convert_mapping(mapping, current_mode)
-                for control, mapping in cfg_controls.items()
-            }
-            
-            # Modify game_data to include custom mappings
-            game_data = update_game_data_with_custom_mappings(
-                game_data, 
-                cfg_controls, 
-                getattr(self, 'default_controls', {}),
-                getattr(self, 'original_default_controls', {}),
-                self.input_mode
-            )
-        else:
-            print(f"📄 No custom config found for {self.current_game}")
-
-        # PERFORMANCE OPTIMIZATION 4: Apply XInput filtering only if needed
-        if hasattr(self, 'xinput_only_mode') and self.xinput_only_mode:
-            game_data = filter_xinput_controls(game_data)
-            print(f"🎯 Applied XInput-only filter")
-        
-        # PERFORMANCE OPTIMIZATION 5: Streamlined cache creation
-        try:
-            # Create cache in new format with metadata wrapper
-            cache_data = {
-                'rom_name': self.current_game,
-                'input_mode': getattr(self, 'input_mode', 'xinput'),
-                'friendly_names': getattr(self, 'friendly_names', True),
-                'xinput_only_mode': getattr(self, 'xinput_only_mode', True),
-                'cached_timestamp': time.time(),
-                'cache_version': '2.0',
-                'game_data': game_data
-            }
-            
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2)
-            print(f"💾 Cache created for {self.current_game}")
-            
-        except Exception as e:
-            print(f"⚠️ Error saving cache: {e} - preview will still launch")
+        print(f"💾 Cache created for {self.current_game}")
         
         # Launch the preview
         self._launch_preview_process()
@@ -7209,6 +7066,13 @@ class MAMEControlConfig(ctk.CTk):
     def _launch_preview_process(self):
         """Optimized preview launch process"""
         
+        # A running preview server (--serve) shows it without starting a process
+        reply = request_preview(self.mame_dir, self.current_game, hide_buttons=self.hide_preview_buttons,
+                                screen=getattr(self, 'preferred_preview_screen', 1), wait='sent')
+        if reply is not None:
+            print(f"🛰️  Preview requested from preview server")
+            return
+        
         # PERFORMANCE OPTIMIZATION 6: Handle PyInstaller frozen executable (fastest path)
         if getattr(sys, 'frozen', False):
             command = [
@@ -7374,6 +7238,211 @@ class MAMEControlConfig(ctk.CTk):
         }
 
     # 4. ALWAYS start physical in _load_secondary_data but load database ROMs too:
+    def _start_background_db_update(self, full_rebuild=False):
+        """Build or sync gamedata.db on a worker thread and refresh the UI when it is swapped in"""
+        if getattr(self, '_db_update_thread', None) and self._db_update_thread.is_alive():
+            print("Database update already running")
+            return
+        
+        gamedata_json = self.gamedata_json
+        db_path = self.db_path
+        update_func = build_gamedata_db if full_rebuild else sync_gamedata_db
+        self._db_update_result = None
+        
+        def worker():
+            try:
+                self._db_update_result = update_func(gamedata_json, db_path)
+            except Exception as e:
+                print(f"Error updating database in background: {e}")
+                traceback.print_exc()
+                self._db_update_result = False
+        
+        self._db_update_thread = threading.Thread(target=worker, name="gamedata-db-update", daemon=True)
+        self._db_update_thread.start()
+        self.after(200, self._check_background_db_update)
+
+    def _check_background_db_update(self):
+        """Poll the background database update from the Tk thread"""
+        if self._db_update_thread.is_alive():
+            self.after(200, self._check_background_db_update)
+            return
+        
+        if not self._db_update_result:
+            print("❌ Background database update failed")
+            return
+        
+        print("✅ Background database update completed")
+        
+        # Categories and counts come from the new database now
+        try:
+            if hasattr(self, 'stats_label'):
+                self.update_stats_label()
+            if hasattr(self, 'game_listbox') and hasattr(self, 'update_game_list_by_category'):
+                self.update_game_list_by_category(auto_select_first=False)
+        except Exception as e:
+            print(f"Error refreshing after database update: {e}")
+
+    def _start_file_watcher(self):
+        """Watch roms, cfg and settings folders so lists and caches update without rescans"""
+        if getattr(self, 'file_watcher', None):
+            return
+        
+        self.excluded_roms = load_rom_exclusion_list(self.mame_dir)
+        self._file_change_queue = queue.Queue()
+        folders = [('rom', rom_path) for rom_path in get_rom_paths(self.mame_dir)]
+        folders += [
+            ('cfg', os.path.join(self.mame_dir, "cfg")),
+            ('settings', self.settings_dir),
+        ]
+        self.file_watcher = FileWatcher(
+            folders,
+            callback=self._file_change_queue.put
+        )
+        
+        if self.file_watcher.start():
+            self.after(500, self._process_file_changes)
+        else:
+            self.file_watcher = None
+
+    def _process_file_changes(self):
+        """Apply change batches queued by the file watcher thread on the Tk thread"""
+        if not getattr(self, 'file_watcher', None):
+            return
+        
+        changes = []
+        while True:
+            try:
+                changes.extend(self._file_change_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        if changes:
+            try:
+                self._apply_file_changes(changes)
+            except Exception as e:
+                print(f"Error applying file changes: {e}")
+                traceback.print_exc()
+        
+        self.after(500, self._process_file_changes)
+
+    def _apply_file_changes(self, changes):
+        """Incrementally update ROMs, cfg manifest, exclusions and caches from watcher events"""
+        physical_mode = getattr(self, 'rom_source_mode', 'physical') == 'physical'
+        list_changed = False
+        rescan_roms = False
+        refresh_current = False
+        removed_roms = set()
+        
+        for change in changes:
+            if change.kind == 'rom':
+                if change.action == 'rescan':
+                    rescan_roms = True
+                    continue
+                rom_name = rom_name_from_filename(change.name, change.is_dir)
+                if not rom_name or not physical_mode or rom_name in self.excluded_roms:
+                    continue
+                if change.action == 'added':
+                    self.available_roms.add(rom_name)
+                    list_changed = True
+                elif change.action == 'removed':
+                    # The ROM may still exist as another zip/7z/folder or in another rompath
+                    removed_roms.add(rom_name)
+            
+            elif change.kind == 'cfg':
+                if change.action == 'rescan':
+                    self.custom_configs = load_custom_configs(self.mame_dir)
+                    list_changed = refresh_current = True
+                    continue
+                if not change.name.endswith('.cfg'):
+                    continue
+                rom_name = change.name[:-4]
+                try:
+                    stat = os.stat(os.path.join(change.directory, change.name))
+                    self.custom_configs[rom_name] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    self.custom_configs.pop(rom_name, None)
+                
+                # Processed entries hash their cfg inputs, so nothing has to be dropped here
+                if rom_name == 'default':
+                    # default.cfg feeds every ROM's mappings
+                    self.default_controls, self.original_default_controls = load_default_config(self.mame_dir)
+                    refresh_current = True
+                else:
+                    refresh_current = refresh_current or rom_name == self.current_game
+                list_changed = True
+                print(f"cfg {change.action}: {change.name}")
+            
+            elif change.kind == 'settings':
+                if change.name == 'gamedata.json' and change.action != 'removed':
+                    print("gamedata.json changed, reloading...")
+                    self.load_gamedata_json()
+                    # Raw entries are reloaded; processed ones are rebuilt only where the entry changed
+                    self.rom_data_cache.clear()
+                    self._start_background_db_update(full_rebuild=False)
+                    if not physical_mode:
+                        self.load_database_roms()
+                        self.available_roms = self.database_roms.copy()
+                    list_changed = refresh_current = True
+                elif change.name == 'excluded_roms.txt' or change.action == 'rescan':
+                    excluded_roms = load_rom_exclusion_list(self.mame_dir)
+                    newly_excluded = excluded_roms - self.excluded_roms
+                    newly_included = self.excluded_roms - excluded_roms
+                    self.excluded_roms = excluded_roms
+                    if physical_mode and newly_excluded:
+                        self.available_roms -= newly_excluded
+                        list_changed = True
+                    if physical_mode and newly_included:
+                        # Only a scan can tell which of them are actually in the roms folder
+                        rescan_roms = True
+        
+        if rescan_roms and physical_mode:
+            self.available_roms = scan_roms_directory(self.mame_dir)
+            list_changed = True
+        elif removed_roms:
+            rom_manifest = scan_rom_manifest(self.mame_dir)
+            gone_roms = {rom_name for rom_name in removed_roms if rom_name not in rom_manifest}
+            if gone_roms & self.available_roms:
+                self.available_roms -= gone_roms
+                list_changed = True
+        
+        if list_changed:
+            self.update_game_list_by_category(auto_select_first=False)
+            self.update_stats_label()
+        
+        if refresh_current and self.current_game:
+            self.display_game_info(self.current_game)
+
+    def exclude_roms(self, rom_names):
+        """Hide ROMs from the list and add them to excluded_roms.txt with a single deferred write"""
+        rom_names = set(rom_names)
+        if not rom_names:
+            return
+        
+        add_roms_to_exclusion_list(self.mame_dir, rom_names)
+        self.excluded_roms = load_rom_exclusion_list(self.mame_dir)
+        self.available_roms -= rom_names
+        if self.current_game in rom_names:
+            self.current_game = None
+        
+        self.update_game_list_by_category(auto_select_first=False)
+        self.update_stats_label()
+
+    def _cache_settings(self):
+        """Settings that select the processed game cache entry"""
+        return CacheSettings(
+            self.input_mode,
+            getattr(self, 'show_friendly_names', True),
+            getattr(self, 'xinput_only_mode', True)
+        )
+
+    def _invalidate_rom_caches(self, rom_name=None):
+        """Drop memory and disk caches for one ROM, or for every ROM when rom_name is None"""
+        if rom_name is None:
+            self.rom_data_cache.clear()
+        else:
+            self.rom_data_cache.pop(rom_name, None)
+        self.game_cache.invalidate(rom_name)
+
     def _load_secondary_data(self):
         """Load secondary data - ALWAYS start physical but prep database ROMs for toggle"""
         try:
@@ -7397,8 +7466,9 @@ class MAMEControlConfig(ctk.CTk):
                 from mame_data_utils import load_gamedata_json
                 self.gamedata_json, self.parent_lookup, self.clone_parents = load_gamedata_json(self.gamedata_path)
             
-            # Database check and rebuild logic (unchanged)
+            # Database check - full rebuild for missing/broken databases, incremental sync otherwise
             needs_rebuild = False
+            needs_sync = False
             
             if not os.path.exists(self.db_path):
                 print("Database file doesn't exist, will create new one")
@@ -7417,8 +7487,8 @@ class MAMEControlConfig(ctk.CTk):
                     else:
                         print(f"Database found with {game_count} games")
                         if check_db_update_needed(self.gamedata_path, self.db_path):
-                            print("gamedata.json is newer than database, rebuilding...")
-                            needs_rebuild = True
+                            print("gamedata.json is newer than database, syncing...")
+                            needs_sync = True
                         else:
                             print("Database is up to date, no rebuild needed")
                             
@@ -7426,26 +7496,26 @@ class MAMEControlConfig(ctk.CTk):
                     print(f"Database appears corrupted ({e}), rebuilding...")
                     needs_rebuild = True
             
+            # Build/sync in the background - lookups keep using the current database file
+            # (or gamedata.json if there is none yet) until the new one is swapped in
             if needs_rebuild:
-                self.update_splash_message("Building database...")
-                print(f"Building database with {len(self.gamedata_json)} game entries...")
+                print(f"Building database with {len(self.gamedata_json)} game entries in the background...")
                 
                 if self.gamedata_json:
-                    from mame_data_utils import build_gamedata_db
-                    success = build_gamedata_db(self.gamedata_json, self.db_path)
-                    if success:
-                        print("✅ Database build completed successfully")
-                    else:
-                        print("❌ Database build failed")
+                    self._start_background_db_update(full_rebuild=True)
                 else:
                     print("❌ ERROR: No gamedata available for database building!")
+            elif needs_sync:
+                print("Updating database in the background...")
+                self._start_background_db_update(full_rebuild=False)
             
             # STARTUP STRATEGY: Always start with physical ROMs
             self.update_splash_message("Loading ROM sources...")
             
-            # Load physical ROMs (for startup)
-            print("Loading physical ROMs for startup...")
-            self.available_roms = scan_roms_directory(self.mame_dir)
+            # Physical ROMs were already scanned by _load_essential_data
+            if not self.available_roms:
+                print("Loading physical ROMs for startup...")
+                self.available_roms = scan_roms_directory(self.mame_dir)
             
             # Also load database ROMs in background (for toggle)
             print("Loading database ROMs in background for toggle...")
@@ -8168,43 +8238,14 @@ class MAMEControlConfig(ctk.CTk):
             return self.theme_colors["primary"]  # Default blue
     
     def toggle_input_mode(self):
-        """Handle toggling between input modes with CLEAN cache clearing"""
+        """Handle toggling between input modes"""
         if hasattr(self, 'input_mode_var'):
             old_mode = self.input_mode
             self.input_mode = self.input_mode_var.get()
             print(f"Input mode changed from {old_mode} to {self.input_mode}")
             
-            # CRITICAL: Clear in-memory caches when mode changes
-            if hasattr(self, 'rom_data_cache'):
-                cleared_count = len(self.rom_data_cache)
-                self.rom_data_cache.clear()
-                print(f"Cleared rom_data_cache ({cleared_count} entries)")
-                
-            if hasattr(self, 'processed_cache'):
-                cleared_count = len(self.processed_cache)
-                self.processed_cache.clear()
-                print(f"Cleared processed_cache ({cleared_count} entries)")
-            
-            # ALSO clear the @lru_cache on get_game_data if it exists
-            if hasattr(self.get_game_data, 'cache_clear'):
-                self.get_game_data.cache_clear()
-                print("Cleared LRU cache on get_game_data method")
-            
-            # ALSO clear any disk cache files for ALL games to force regeneration
-            if hasattr(self, 'cache_dir') and self.cache_dir:
-                try:
-                    import os
-                    cache_files_removed = 0
-                    for filename in os.listdir(self.cache_dir):
-                        if filename.endswith('_cache.json'):
-                            try:
-                                os.remove(os.path.join(self.cache_dir, filename))
-                                cache_files_removed += 1
-                            except Exception as e:
-                                print(f"Error removing cache file {filename}: {e}")
-                    print(f"Removed {cache_files_removed} disk cache files")
-                except Exception as e:
-                    print(f"Error clearing disk cache: {e}")
+            # The input mode is part of the cache key, so entries for the other modes stay
+            # cached and switching back is instant
             
             # Save the setting
             self.save_settings()
@@ -8212,7 +8253,7 @@ class MAMEControlConfig(ctk.CTk):
             # Refresh current game display if one is selected
             if self.current_game:
                 print(f"Refreshing display for {self.current_game} with new input mode {self.input_mode}")
-                # This will trigger fresh processing with new input mode
+                # Uses the cached variant for the new mode if there is one
                 self.display_game_info(self.current_game)
                 
                 # Update status message
@@ -8295,30 +8336,42 @@ class MAMEControlConfig(ctk.CTk):
             with_cfg_files = 0
             clone_roms = 0
             
-            for rom in self.available_roms:
-                # Check if it's a clone
-                if hasattr(self, 'parent_lookup') and rom in self.parent_lookup:
-                    clone_roms += 1
+            # Single indexed SELECT over game_traits when the database has it
+            db_counts = get_category_counts_from_db(self.available_roms, self.db_path)
+            if db_counts is not None:
+                with_controls = db_counts['with_controls']
+                missing_controls = db_counts['missing']
+                generic_controls = db_counts['generic']
+                custom_controls = db_counts['custom_actions']
+                mixed_controls = db_counts['mixed_controls']
+                with_cfg_files = sum(1 for rom in self.available_roms if rom in self.custom_configs)
+                if hasattr(self, 'parent_lookup'):
+                    clone_roms = sum(1 for rom in self.available_roms if rom in self.parent_lookup)
+            else:
+                for rom in self.available_roms:
+                    # Check if it's a clone
+                    if hasattr(self, 'parent_lookup') and rom in self.parent_lookup:
+                        clone_roms += 1
                 
-                # Categorize controls
-                categories = self.categorize_controls_properly(rom)
+                    # Categorize controls
+                    categories = self.categorize_controls_properly(rom)
                 
-                if categories['has_controls']:
-                    with_controls += 1
+                    if categories['has_controls']:
+                        with_controls += 1
                     
-                    if categories['has_generic_controls']:
-                        generic_controls += 1
-                    elif categories['has_custom_controls']:
-                        custom_controls += 1
+                        if categories['has_generic_controls']:
+                            generic_controls += 1
+                        elif categories['has_custom_controls']:
+                            custom_controls += 1
                     
-                    # Check for mixed controls
-                    if self.has_mixed_controls(rom):
-                        mixed_controls += 1
-                else:
-                    missing_controls += 1
+                        # Check for mixed controls
+                        if self.has_mixed_controls(rom):
+                            mixed_controls += 1
+                    else:
+                        missing_controls += 1
                 
-                if categories['has_cfg_file']:
-                    with_cfg_files += 1
+                    if categories['has_cfg_file']:
+                        with_cfg_files += 1
             
             # SIMPLIFIED stats format (no mode indicator)
             stats = (
@@ -8468,6 +8521,9 @@ class MAMEControlConfig(ctk.CTk):
             # Apply filter directly to this list
             filtered_roms = self._filter_rom_list(category_roms, search_text)
             
+            # Load display names for the matches in bulk
+            self._prefetch_game_data(filtered_roms)
+            
             # Update the listbox with filtered roms (reusing code from update_game_list_by_category)
             self.game_list_data = []
             list_display_items = []
@@ -8808,278 +8864,6 @@ class MAMEControlConfig(ctk.CTk):
             traceback.print_exc()
             return False
     
-    def preview_export_image(self, rom_name, game_data, output_dir, format="png"):
-        """Export a preview image for a ROM with proper handling of bezel and text layering"""
-        try:
-            print(f"Exporting {rom_name} to {output_dir}")
-            
-            # Make sure output directory exists
-            os.makedirs(output_dir, exist_ok=True)
-            output_path = os.path.join(output_dir, f"{rom_name}.{format}")
-            
-            # IMPORTANT: Add this section to apply custom mappings from ROM CFG
-            # Check if ROM has a custom CFG file and apply those mappings
-            cfg_controls = {}
-            if rom_name in self.custom_configs:
-                # Parse the custom config
-                cfg_controls = parse_cfg_controls(self.custom_configs[rom_name], self.input_mode)
-                
-                # Convert if XInput is enabled
-                if self.use_xinput:
-                    cfg_controls = {
-                        control: convert_mapping(mapping, 'xinput')
-                        for control, mapping in cfg_controls.items()
-                    }
-                
-                # Update game_data with custom mappings - PASS friendly_names (always True for export)
-                game_data = update_game_data_with_custom_mappings(
-                    game_data, cfg_controls, 
-                    getattr(self, 'default_controls', {}),
-                    getattr(self, 'original_default_controls', {}),
-                    self.input_mode,
-                    True  # Always use friendly names for export
-                )
-                print(f"Applied custom mapping from ROM CFG for {rom_name}")
-            
-            # NEW CODE: Filter out non-XInput controls if in XInput Only mode
-            if hasattr(self, 'xinput_only_mode') and self.xinput_only_mode:
-                game_data = filter_xinput_controls(game_data)
-                print(f"Applied XInput filter for preview")
-            
-            # Create PreviewWindow directly
-            from PyQt5.QtWidgets import QApplication, QMessageBox
-            from PyQt5.QtCore import Qt
-            import sys
-            
-            # Initialize PyQt app if needed
-            app = QApplication.instance()
-            if app is None:
-                app = QApplication(sys.argv)
-            
-            # Import the preview module
-            from mame_controls_preview import PreviewWindow
-            
-            # Create dummy messagebox class to suppress all popups
-            class DummyMessageBox:
-                @staticmethod
-                def information(*args, **kwargs): return QMessageBox.Ok
-                @staticmethod
-                def showinfo(*args, **kwargs): return
-                @staticmethod
-                def warning(*args, **kwargs): return QMessageBox.Ok
-                @staticmethod
-                def error(*args, **kwargs): return QMessageBox.Ok
-                @staticmethod
-                def critical(*args, **kwargs): return QMessageBox.Ok
-                @staticmethod
-                def question(*args, **kwargs): return QMessageBox.Yes
-            
-            # Create preview window but NEVER make it visible
-            preview = PreviewWindow(
-                rom_name,
-                game_data,
-                self.mame_dir,
-                hide_buttons=True,
-                clean_mode=True
-            )
-            
-            # IMPORTANT: Set window to never be visible
-            preview.setAttribute(Qt.WA_ShowWithoutActivating, True)
-            preview.setAttribute(Qt.WA_DontShowOnScreen, True)
-            preview.show()  # Must still call show() for proper rendering
-            
-            # Block all window activation and focus events
-            preview.setAttribute(Qt.WA_ShowWithoutActivating, True)
-            preview.setAttribute(Qt.WA_DontShowOnScreen, True)
-            
-            # Patch messagebox functions
-            preview.messagebox = DummyMessageBox
-            original_qmessagebox = QMessageBox.information
-            QMessageBox.information = lambda *args, **kwargs: QMessageBox.Ok
-            
-            # CRITICAL FIX: Process events multiple times to ensure full initialization
-            import time  # Import time at the top to avoid conflicts
-            for i in range(5):  # Process events multiple times
-                app.processEvents()
-                time.sleep(0.02)  # Small delay between processing
-            
-            print(f"Preview window initialized for {rom_name}")
-            
-            # CRITICAL FIX: Wait for window to be fully ready
-            time.sleep(0.1)  # Give window time to fully initialize
-            
-            # Force another round of event processing
-            app.processEvents()
-            
-            # FIXED: Load all settings properly even when no cache exists
-            try:
-                # Get settings directory
-                settings_dir = os.path.join(self.preview_dir, "settings")
-                
-                # 1. Load bezel settings
-                bezel_settings_path = os.path.join(settings_dir, "bezel_settings.json")
-                rom_bezel_settings_path = os.path.join(settings_dir, f"{rom_name}_bezel_settings.json")
-                
-                # Choose which settings file to use
-                settings_path = rom_bezel_settings_path if os.path.exists(rom_bezel_settings_path) else bezel_settings_path
-                
-                if os.path.exists(settings_path):
-                    with open(settings_path, 'r') as f:
-                        bezel_settings = json.load(f)
-                        
-                    # Apply bezel settings
-                    preview.bezel_visible = bezel_settings.get("bezel_visible", True)
-                    preview.logo_visible = bezel_settings.get("logo_visible", True)
-                    
-                    # CRITICAL FIX: Apply logo size settings
-                    if 'logo_width_percentage' in bezel_settings:
-                        preview.logo_width_percentage = bezel_settings['logo_width_percentage']
-                    if 'logo_height_percentage' in bezel_settings:
-                        preview.logo_height_percentage = bezel_settings['logo_height_percentage']
-                    
-                    print(f"Loaded bezel settings: logo size {preview.logo_width_percentage}% x {preview.logo_height_percentage}%")
-                else:
-                    # CRITICAL FIX: Load global logo settings even when no bezel settings exist
-                    global_settings_path = os.path.join(settings_dir, "global_settings.json")
-                    if os.path.exists(global_settings_path):
-                        with open(global_settings_path, 'r') as f:
-                            global_settings = json.load(f)
-                        
-                        # Apply logo size from global settings
-                        if 'logo_width_percentage' in global_settings:
-                            preview.logo_width_percentage = global_settings['logo_width_percentage']
-                        if 'logo_height_percentage' in global_settings:
-                            preview.logo_height_percentage = global_settings['logo_height_percentage']
-                        
-                        print(f"Loaded global logo settings: {preview.logo_width_percentage}% x {preview.logo_height_percentage}%")
-                    else:
-                        # CRITICAL FIX: Use proper default logo sizes (not tiny defaults)
-                        preview.logo_width_percentage = getattr(self, 'logo_width_percentage', 15)
-                        preview.logo_height_percentage = getattr(self, 'logo_height_percentage', 15)
-                        print(f"Using fallback logo settings: {preview.logo_width_percentage}% x {preview.logo_height_percentage}%")
-                
-                # 3. Load text appearance settings to ensure proper text rendering
-                text_settings_path = os.path.join(settings_dir, "text_appearance_settings.json")
-                rom_text_settings_path = os.path.join(settings_dir, f"{rom_name}_text_appearance_settings.json")
-                
-                text_settings_file = rom_text_settings_path if os.path.exists(rom_text_settings_path) else text_settings_path
-                
-                if os.path.exists(text_settings_file):
-                    with open(text_settings_file, 'r') as f:
-                        text_settings = json.load(f)
-                    
-                    # Apply text settings to preview
-                    if hasattr(preview, 'text_settings'):
-                        preview.text_settings.update(text_settings)
-                    else:
-                        preview.text_settings = text_settings
-                    
-                    print(f"Loaded text appearance settings for proper text rendering")
-                
-                # CRITICAL FIX: Ensure logo is resized properly if it exists
-                if hasattr(preview, 'logo_label') and preview.logo_label and hasattr(preview, 'resize_logo'):
-                    preview.resize_logo()
-                    print(f"Resized logo to {preview.logo_width_percentage}% x {preview.logo_height_percentage}%")
-                
-                # Update UI based on settings
-                if preview.bezel_visible and hasattr(preview, 'has_bezel') and preview.has_bezel:
-                    # First show the bezel
-                    if hasattr(preview, 'show_bezel_with_background'):
-                        preview.show_bezel_with_background()
-                        
-                    # Force bezel to top of z-order
-                    if hasattr(preview, 'bezel_label') and preview.bezel_label:
-                        preview.bezel_label.raise_()
-                else:
-                    # Explicitly hide bezel
-                    if hasattr(preview, 'hide_bezel'):
-                        preview.hide_bezel()
-                    elif hasattr(preview, 'bezel_label') and preview.bezel_label:
-                        preview.bezel_label.setVisible(False)
-                
-                # Handle logo visibility
-                if hasattr(preview, 'logo_label') and preview.logo_label:
-                    preview.logo_label.setVisible(preview.logo_visible)
-                    
-            except Exception as e:
-                print(f"Error loading settings for {rom_name}: {e}")
-                # CRITICAL FIX: Even on error, ensure proper logo sizes
-                if hasattr(preview, 'logo_width_percentage'):
-                    if not hasattr(preview, 'logo_width_percentage') or preview.logo_width_percentage < 5:
-                        preview.logo_width_percentage = getattr(self, 'logo_width_percentage', 15)
-                    if not hasattr(preview, 'logo_height_percentage') or preview.logo_height_percentage < 5:
-                        preview.logo_height_percentage = getattr(self, 'logo_height_percentage', 15)
-            
-            # CRITICAL: Ensure controls are above bezel
-            if hasattr(preview, 'raise_controls_above_bezel'):
-                preview.raise_controls_above_bezel()
-            else:
-                # Manual raising of controls if method doesn't exist
-                if hasattr(preview, 'control_labels'):
-                    for control_name, control_data in preview.control_labels.items():
-                        if 'label' in control_data and control_data['label']:
-                            control_data['label'].raise_()
-            
-            # CRITICAL FIX: Final processing to ensure everything is rendered properly
-            for i in range(5):
-                app.processEvents()
-                time.sleep(0.03)
-            
-            print(f"Final UI processing completed for {rom_name}")
-            
-            # Use direct image generation instead of showing window first
-            success = False
-            try:
-                # Create a direct rendering of the canvas to an image
-                from PyQt5.QtGui import QImage, QPainter, QPixmap, QColor
-                
-                # Process pending events to ensure components are ready
-                app.processEvents()
-                
-                if hasattr(preview, 'export_image_headless'):
-                    result = preview.export_image_headless(output_path, format)
-                    success = result and os.path.exists(output_path)
-                else:
-                    # Fallback to standard rendering method
-                    # Create the image
-                    image = QImage(
-                        preview.canvas.width(),
-                        preview.canvas.height(),
-                        QImage.Format_ARGB32
-                    )
-                    image.fill(Qt.transparent)
-                    
-                    # Create painter for the image
-                    painter = QPainter(image)
-                    painter.setRenderHint(QPainter.Antialiasing)
-                    painter.setRenderHint(QPainter.TextAntialiasing)
-                    painter.setRenderHint(QPainter.SmoothPixmapTransform)
-                    
-                    # Render the canvas and all its children directly to the image
-                    preview.canvas.render(painter)
-                    
-                    # End painting
-                    painter.end()
-                    
-                    # Save the image
-                    success = image.save(output_path, format.upper())
-                    
-                print(f"Exported {rom_name} with result: {success}")
-            finally:
-                # Restore QMessageBox
-                QMessageBox.information = original_qmessagebox
-                
-                # Close and destroy the window immediately
-                preview.close()
-                preview.deleteLater()
-                
-            return success
-        except Exception as e:
-            print(f"Error during export of {rom_name}: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-    
     def batch_export_images(self):
         """Enhanced batch export dialog for ROM preview images with fixed directory selection"""
         # Create dialog with improved styling 
@@ -9522,78 +9306,49 @@ class MAMEControlConfig(ctk.CTk):
             def process_roms():
                 nonlocal processed, failed
                 
-                for i, rom_name in enumerate(roms_to_process):
-                    # Check for cancellation request
+                # Game data is prepared first, then the ROMs are rendered on worker processes
+                dialog.after(0, lambda: update_status(f"Preparing game data for {total_roms} ROMs..."))
+                start_time = time.time()
+                
+                def report_progress(done, total, failed_so_far, rom_name):
+                    elapsed = time.time() - start_time
+                    rate = done / elapsed if elapsed > 0 else 0.0
+                    eta = int((total - done) / rate) if rate > 0 else 0
+                    status = (f"Exported {done}/{total}: {rom_name} - {rate:.1f} ROMs/s, "
+                              f"about {eta // 60}m {eta % 60:02d}s left")
+                    if failed_so_far:
+                        status += f" ({failed_so_far} failed)"
+                    dialog.after(0, lambda s=status: update_status(s))
+                    dialog.after(0, lambda v=done / total: update_progress(v))
+                
+                def report_prepare_progress(done, total):
                     if cancel_processing[0]:
-                        # Update status safely using the main thread
-                        dialog.after(0, lambda s=f"Cancelled after processing {processed}/{total_roms} ROMs": update_status(s))
-                        break
-                    
-                    # Update status safely using the main thread
-                    dialog.after(0, lambda s=f"Processing {i+1}/{total_roms}: {rom_name}": update_status(s))
-                    dialog.after(0, lambda v=(i + 0.5) / total_roms: update_progress(v))
-                    
-                    # Generate and save the image
-                    try:
-                        # Get the game data
-                        game_data = self.get_game_data(rom_name)
-                        if not game_data:
-                            raise ValueError(f"No control data found for {rom_name}")
-                        
-                        # IMPORTANT: Add the custom mapping code that was missing
-                        # Check if ROM has a custom CFG file and apply those mappings
-                        cfg_controls = {}
-                        if rom_name in self.custom_configs:
-                            # Parse the custom config
-                            cfg_controls = parse_cfg_controls(self.custom_configs[rom_name], self.input_mode)
-                            
-                            # Convert if XInput is enabled
-                            if self.use_xinput:
-                                cfg_controls = {
-                                    control: convert_mapping(mapping, True)
-                                    for control, mapping in cfg_controls.items()
-                                }
-                            
-                            # Update game_data with custom mappings - PASS friendly_names (always True for batch export)
-                            game_data = update_game_data_with_custom_mappings(
-                                game_data, 
-                                cfg_controls, 
-                                getattr(self, 'default_controls', {}),
-                                getattr(self, 'original_default_controls', {}),
-                                self.input_mode,
-                                True  # Always use friendly names for batch export
-                            )
-                            print(f"Applied custom mapping from ROM CFG for {rom_name}")
-                        
-                        # Export the image using preview_export_image which respects settings
-                        file_format = settings["format"].lower()
-                        
-                        # Set output path
-                        output_path = os.path.join(settings["output_dir"], f"{rom_name}.{file_format}")
-                        
-                        # Use preview_export_image which will use existing settings
-                        success = self.preview_export_image(
-                            rom_name, 
-                            game_data,
-                            settings["output_dir"],
-                            file_format
-                        )
-                        
-                        if success:
-                            processed += 1
-                        else:
-                            failed += 1
-                    except Exception as e:
-                        print(f"Error processing {rom_name}: {e}")
-                        import traceback
-                        traceback.print_exc()
-                        failed += 1
-                    
-                    # Update progress safely using the main thread
-                    dialog.after(0, lambda v=(i + 1) / total_roms: update_progress(v))
-                    
-                    # Small sleep to allow UI updates
-                    time.sleep(0.1)
+                        return
+                    status = f"Preparing game data: {done}/{total} ROMs processed"
+                    dialog.after(0, lambda s=status: update_status(s))
+                    dialog.after(0, lambda v=done / total: update_progress(v))
+                
+                try:
+                    counts = export_games(
+                        roms_to_process,
+                        self.mame_dir,
+                        settings["output_dir"],
+                        # Exported images always use friendly names
+                        CacheSettings(self.input_mode, True, getattr(self, 'xinput_only_mode', True)),
+                        self.gamedata_json,
+                        self.parent_lookup,
+                        self.db_path if os.path.exists(self.db_path) else None,
+                        settings["format"],
+                        progress=report_progress,
+                        cancelled=lambda: cancel_processing[0],
+                        prepare_progress=report_prepare_progress
+                    )
+                    processed = counts['exported']
+                    failed = counts['failed'] + counts['missing']
+                except Exception as e:
+                    print(f"Error during batch export: {e}")
+                    traceback.print_exc()
+                    failed = total_roms - processed
                 
                 # All done - update status
                 final_status = ""
@@ -4,23 +4,186 @@ Core data processing utilities for MAME Controls Configuration
 Handles gamedata loading, config parsing, mapping conversions, and cache management
 """
 
+import atexit
+import copy
+import gc
+import hashlib
+import itertools
 import os
 import json
+import pickle
 import sqlite3
+import sys
+import threading
 import time
 import re
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from io import StringIO
+from types import MappingProxyType
+from urllib.request import pathname2url
 from typing import Dict, Set, Tuple, Optional, List, Any
 
+from mame_game_cache import (
+    CacheSettings, GameDataCache, get_game_cache, DEFAULT_CACHE_MAX_AGE_DAYS, DEFAULT_CACHE_MAX_SIZE_MB
+)
+
 # ============================================================================
 # DATA LOADING AND DATABASE METHODS
 # ============================================================================
 
-def load_gamedata_json(gamedata_path: str) -> Tuple[Dict, Dict, Dict]:
+# Compiled snapshot of the processed gamedata.json, stored next to gamedata.db
+GAMEDATA_SNAPSHOT_NAME = "gamedata.snapshot"
+GAMEDATA_SNAPSHOT_VERSION = 1
+
+def get_gamedata_snapshot_path(gamedata_path: str) -> str:
+    """Get the path of the compiled snapshot that belongs to a gamedata.json file"""
+    return os.path.join(os.path.dirname(os.path.abspath(gamedata_path)), GAMEDATA_SNAPSHOT_NAME)
+
+def _process_gamedata(data: Dict) -> Tuple[Dict, Dict, Dict]:
+    """Resolve clone entries and parent lookups for raw gamedata.json content"""
+    gamedata_json = {}
+    parent_lookup = {}
+    clone_parents = {}  # Dictionary to track which parents have which clones
+    
+    for rom_name, game_data in data.items():
+        gamedata_json[rom_name] = game_data
+            
+        # Build parent-child relationship
+        if 'clones' in game_data and isinstance(game_data['clones'], dict):
+            # Track all this parent's clones
+            clone_parents[rom_name] = list(game_data['clones'].keys())
+            
+            for clone_name, clone_data in game_data['clones'].items():
+                # Store parent reference in the clone data
+                clone_data['parent'] = rom_name
+                parent_lookup[clone_name] = rom_name
+                
+                # IMPORTANT: Add clone to main gamedata for direct lookup
+                if clone_name not in gamedata_json:
+                    # Create clone entry that preserves clone's own description
+                    clone_entry = {
+                        'description': clone_data.get('description', f"{clone_name} (Clone)"),
+                        'parent': rom_name,
+                        'playercount': clone_data.get('playercount', game_data.get('playercount', '1')),
+                        'buttons': clone_data.get('buttons', game_data.get('buttons', '0')),
+                        'sticks': clone_data.get('sticks', game_data.get('sticks', '0')),
+                        'alternating': clone_data.get('alternating', game_data.get('alternating', False)),
+                        'console': clone_data.get('console', game_data.get('console', False)),  # NEW: Preserve console field
+                        # Clone inherits parent's controls unless it has its own
+                        'controls': clone_data.get('controls', game_data.get('controls', {}))
+                    }
+                    gamedata_json[clone_name] = clone_entry
+    
+    return gamedata_json, parent_lookup, clone_parents
+
+def _intern_strings(obj, memo: Dict[str, str]):
+    """Share identical strings so the pickled snapshot stores each one only once"""
+    if isinstance(obj, str):
+        return memo.setdefault(obj, obj)
+    if isinstance(obj, dict):
+        for key in list(obj.keys()):
+            obj[key] = _intern_strings(obj[key], memo)
+    elif isinstance(obj, list):
+        for index, value in enumerate(obj):
+            obj[index] = _intern_strings(value, memo)
+    return obj
+
+def load_gamedata_snapshot(gamedata_path: str, snapshot_path: str = None) -> Optional[Tuple[Dict, Dict, Dict]]:
+    """
+    Load the compiled gamedata snapshot if it still matches gamedata.json
+    
+    The snapshot header records the mtime, size and SHA-1 of the gamedata.json it was
+    built from. A matching mtime and size is trusted as-is; otherwise the file is hashed
+    so a touched-but-unchanged gamedata.json does not force a JSON reparse.
+    
+    Returns:
+        Tuple of (gamedata_json, parent_lookup, clone_parents), or None if stale/missing
+    """
+    if snapshot_path is None:
+        snapshot_path = get_gamedata_snapshot_path(gamedata_path)
+    
+    if not os.path.exists(snapshot_path) or not os.path.exists(gamedata_path):
+        return None
+    
+    try:
+        source_stat = os.stat(gamedata_path)
+        with open(snapshot_path, 'rb') as f:
+            header = pickle.load(f)
+            
+            if not isinstance(header, dict) or header.get('version') != GAMEDATA_SNAPSHOT_VERSION:
+                print("Gamedata snapshot has an old format, ignoring it")
+                return None
+            
+            if header.get('source_size') != source_stat.st_size:
+                return None
+            
+            if header.get('source_mtime_ns') != source_stat.st_mtime_ns:
+                # Timestamp changed - only trust the snapshot if the content is identical
+                with open(gamedata_path, 'rb') as source:
+                    content_hash = hashlib.sha1(source.read()).hexdigest()
+                if content_hash != header.get('source_hash'):
+                    return None
+                print("gamedata.json timestamp changed but content is identical, using snapshot")
+            
+            # Unpickling creates ~100k small objects; keep the cyclic GC out of the way
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                gamedata_json, parent_lookup, clone_parents = pickle.load(f)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+        
+        return gamedata_json, parent_lookup, clone_parents
+    except Exception as e:
+        print(f"Error loading gamedata snapshot, falling back to JSON: {e}")
+        return None
+
+def save_gamedata_snapshot(gamedata_path: str, gamedata: Tuple[Dict, Dict, Dict],
+                           source_bytes: bytes = None, snapshot_path: str = None) -> bool:
+    """Write the compiled gamedata snapshot atomically next to gamedata.db"""
+    if snapshot_path is None:
+        snapshot_path = get_gamedata_snapshot_path(gamedata_path)
+    
+    temp_path = f"{snapshot_path}.tmp"
+    try:
+        source_stat = os.stat(gamedata_path)
+        if source_bytes is None:
+            with open(gamedata_path, 'rb') as f:
+                source_bytes = f.read()
+        
+        header = {
+            'version': GAMEDATA_SNAPSHOT_VERSION,
+            'source_mtime_ns': source_stat.st_mtime_ns,
+            'source_size': len(source_bytes),
+            'source_hash': hashlib.sha1(source_bytes).hexdigest()
+        }
+        
+        _intern_strings(list(gamedata), {})
+        
+        with open(temp_path, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(tuple(gamedata), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, snapshot_path)
+        return True
+    except Exception as e:
+        print(f"Error saving gamedata snapshot: {e}")
+        try:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+
+def load_gamedata_json(gamedata_path: str, use_snapshot: bool = True) -> Tuple[Dict, Dict, Dict]:
     """
     Load gamedata.json from the specified path with improved clone handling
     
+    Uses the compiled snapshot when it matches gamedata.json and falls back to
+    parsing the JSON (and refreshing the snapshot) otherwise.
+    
     Returns:
         Tuple of (gamedata_json, parent_lookup, clone_parents)
     """
@@ -28,43 +191,21 @@ def load_gamedata_json(gamedata_path: str) -> Tuple[Dict, Dict, Dict]:
         print(f"ERROR: gamedata.json not found at {gamedata_path}")
         return {}, {}, {}
     
+    if use_snapshot:
+        snapshot = load_gamedata_snapshot(gamedata_path)
+        if snapshot is not None:
+            return snapshot
+    
     try:
-        with open(gamedata_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(gamedata_path, 'rb') as f:
+            raw_bytes = f.read()
+        data = json.loads(raw_bytes.decode('utf-8'))
         
         # Process the data for main games and clones
-        gamedata_json = {}
-        parent_lookup = {}
-        clone_parents = {}  # Dictionary to track which parents have which clones
+        gamedata_json, parent_lookup, clone_parents = _process_gamedata(data)
         
-        for rom_name, game_data in data.items():
-            gamedata_json[rom_name] = game_data
-                
-            # Build parent-child relationship
-            if 'clones' in game_data and isinstance(game_data['clones'], dict):
-                # Track all this parent's clones
-                clone_parents[rom_name] = list(game_data['clones'].keys())
-                
-                for clone_name, clone_data in game_data['clones'].items():
-                    # Store parent reference in the clone data
-                    clone_data['parent'] = rom_name
-                    parent_lookup[clone_name] = rom_name
-                    
-                    # IMPORTANT: Add clone to main gamedata for direct lookup
-                    if clone_name not in gamedata_json:
-                        # Create clone entry that preserves clone's own description
-                        clone_entry = {
-                            'description': clone_data.get('description', f"{clone_name} (Clone)"),
-                            'parent': rom_name,
-                            'playercount': clone_data.get('playercount', game_data.get('playercount', '1')),
-                            'buttons': clone_data.get('buttons', game_data.get('buttons', '0')),
-                            'sticks': clone_data.get('sticks', game_data.get('sticks', '0')),
-                            'alternating': clone_data.get('alternating', game_data.get('alternating', False)),
-                            'console': clone_data.get('console', game_data.get('console', False)),  # NEW: Preserve console field
-                            # Clone inherits parent's controls unless it has its own
-                            'controls': clone_data.get('controls', game_data.get('controls', {}))
-                        }
-                        gamedata_json[clone_name] = clone_entry
+        if use_snapshot:
+            save_gamedata_snapshot(gamedata_path, (gamedata_json, parent_lookup, clone_parents), raw_bytes)
         
         return gamedata_json, parent_lookup, clone_parents
     
@@ -349,256 +490,528 @@ def get_game_data_from_db(romname: str, db_path: str) -> Optional[Dict]:
             conn.close()
         return None
 
-def build_gamedata_db(gamedata_json: Dict, db_path: str) -> bool:
-    """Build SQLite database from gamedata.json with console field support - UPDATED"""
-    start_time = time.time()
+# Bump when the table layout or row contents change so existing databases get a full rebuild
+GAMEDATA_DB_VERSION = 4
+
+# Above this many changed ROMs a sync refills the search index instead of patching it
+SEARCH_INDEX_REBUILD_THRESHOLD = 100
+
+# Connection settings used while bulk loading - the whole build is one transaction
+# that gets thrown away on failure, so durability is traded for speed
+GAMEDATA_DB_BUILD_PRAGMAS = (
+    "PRAGMA journal_mode = MEMORY",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA temp_store = MEMORY",
+)
+
+def _create_gamedata_tables(cursor):
+    """Create the gamedata tables (indices are added by _create_gamedata_indexes)"""
+    cursor.execute('''
+    CREATE TABLE games (
+        rom_name TEXT PRIMARY KEY,
+        game_name TEXT,
+        player_count INTEGER,
+        buttons INTEGER,
+        sticks INTEGER,
+        alternating BOOLEAN,
+        console BOOLEAN,
+        is_clone BOOLEAN,
+        parent_rom TEXT,
+        mappings TEXT
+    )
+    ''')
     
-    if not gamedata_json:
-        print("ERROR: No gamedata available to build database")
-        return False
+    cursor.execute('''
+    CREATE TABLE game_controls (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        rom_name TEXT,
+        control_name TEXT,
+        display_name TEXT,
+        FOREIGN KEY (rom_name) REFERENCES games (rom_name)
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE clone_relationships (
+        parent_rom TEXT,
+        clone_rom TEXT,
+        PRIMARY KEY (parent_rom, clone_rom),
+        FOREIGN KEY (parent_rom) REFERENCES games (rom_name),
+        FOREIGN KEY (clone_rom) REFERENCES games (rom_name)
+    )
+    ''')
+    
+    # Precomputed per-ROM classification flags for the sidebar categories
+    cursor.execute('''
+    CREATE TABLE game_traits (
+        rom_name TEXT PRIMARY KEY,
+        player_count INTEGER,
+        is_clone BOOLEAN,
+        has_controls BOOLEAN,
+        has_named_controls BOOLEAN,
+        has_mixed_controls BOOLEAN,
+        has_buttons BOOLEAN,
+        is_specialized BOOLEAN,
+        is_analog BOOLEAN,
+        generic_actions_only BOOLEAN
+    )
+    ''')
+    
+    # Per-ROM content hashes used by sync_gamedata_db to find changed entries
+    cursor.execute('''
+    CREATE TABLE game_hashes (
+        rom_name TEXT PRIMARY KEY,
+        entry_hash TEXT
+    )
+    ''')
+
+def _create_search_index(cursor) -> bool:
+    """
+    Create the FTS5 trigram search table over ROM name, description and control actions
     
+    Returns False if this SQLite build has no FTS5/trigram support (search then falls
+    back to scanning the game list)
+    """
     try:
-        # Clear any cached connections to the old database
-        clear_database_cache()
-        
-        # Create database connection
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Drop existing tables if they exist (clean slate)
-        cursor.execute("DROP TABLE IF EXISTS games")
-        cursor.execute("DROP TABLE IF EXISTS game_controls")
-        cursor.execute("DROP TABLE IF EXISTS clone_relationships")
-        
-        # Create tables - UPDATED to include console column
         cursor.execute('''
-        CREATE TABLE games (
-            rom_name TEXT PRIMARY KEY,
-            game_name TEXT,
-            player_count INTEGER,
-            buttons INTEGER,
-            sticks INTEGER,
-            alternating BOOLEAN,
-            console BOOLEAN,
-            is_clone BOOLEAN,
-            parent_rom TEXT,
-            mappings TEXT
+        CREATE VIRTUAL TABLE game_search USING fts5(
+            rom_name, game_name, actions, tokenize = 'trigram'
         )
         ''')
+        return True
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search index not available in this SQLite build: {e}")
+        return False
+
+def _has_search_index(cursor) -> bool:
+    """Check if the database has the game_search table"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'game_search'")
+    return cursor.fetchone() is not None
+
+def _create_gamedata_indexes(cursor):
+    """Create indices for faster lookups (after bulk loading, so they are built in one go)"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_game_controls_rom ON game_controls (rom_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_clone_parent ON clone_relationships (parent_rom)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_clone_child ON clone_relationships (clone_rom)")
+
+def _build_traits_row(game_row: Tuple, raw_controls: Dict, control_rows: List[Tuple[str, str, str]]) -> Tuple:
+    """Build the game_traits row for a ROM from its games row, raw gamedata controls and control rows"""
+    raw_flags = classify_raw_controls(raw_controls)
+    
+    # Only player 1/2 controls end up as labels in the standard game data format
+    labels = [
+        (control_name, display_name) for _, control_name, display_name in control_rows
+        if control_name.startswith(('P1_', 'P2_'))
+    ]
+    label_flags = classify_control_labels(labels)
+    
+    return (
+        game_row[0],
+        game_row[2],
+        game_row[7],
+        int(raw_flags['has_controls']),
+        int(raw_flags['has_named_controls']),
+        int(raw_flags['has_mixed_controls']),
+        int(label_flags['has_buttons']),
+        int(label_flags['is_specialized']),
+        int(label_flags['is_analog']),
+        int(label_flags['generic_actions_only'])
+    )
+
+def _collect_gamedata_rows(gamedata_json: Dict) -> Dict[str, Tuple]:
+    """
+    Convert gamedata.json entries into database rows
+    
+    Returns:
+        Dict of rom_name -> (games row, list of game_controls rows, parent rom or None, game_traits row)
+    """
+    default_actions = get_default_control_actions()
+    rom_rows = {}
+    
+    # PASS 1: Process all parent games first
+    for rom_name, game_data in gamedata_json.items():
+        # Skip if this entry has a 'parent' field (it's a clone)
+        if 'parent' in game_data:
+            continue
         
-        cursor.execute('''
-        CREATE TABLE game_controls (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            rom_name TEXT,
-            control_name TEXT,
-            display_name TEXT,
-            FOREIGN KEY (rom_name) REFERENCES games (rom_name)
-        )
-        ''')
-        
-        cursor.execute('''
-        CREATE TABLE clone_relationships (
-            parent_rom TEXT,
-            clone_rom TEXT,
-            PRIMARY KEY (parent_rom, clone_rom),
-            FOREIGN KEY (parent_rom) REFERENCES games (rom_name),
-            FOREIGN KEY (clone_rom) REFERENCES games (rom_name)
-        )
-        ''')
-        
-        # Create indices for faster lookups
-        cursor.execute("CREATE INDEX idx_game_controls_rom ON game_controls (rom_name)")
-        cursor.execute("CREATE INDEX idx_clone_parent ON clone_relationships (parent_rom)")
-        cursor.execute("CREATE INDEX idx_clone_child ON clone_relationships (clone_rom)")
-        
-        # Process the data
-        games_inserted = 0
-        controls_inserted = 0
-        clones_inserted = 0
-        
-        # Track processed ROM names to avoid duplicates
-        processed_roms = set()
-        
-        # PASS 1: Process all parent games first
-        for rom_name, game_data in gamedata_json.items():
-            # Skip if this entry has a 'parent' field (it's a clone)
-            if 'parent' in game_data:
-                continue
-            
-            # Skip if already processed
-            if rom_name in processed_roms:
-                continue
+        try:
+            # HANDLE MAPPINGS - store as JSON string
+            mappings_json = None
+            if 'mappings' in game_data and game_data['mappings']:
+                mappings_json = json.dumps(game_data['mappings'])
             
-            try:
-                # Extract basic game properties for parent
-                game_name = game_data.get('description', rom_name)
-                player_count = int(game_data.get('playercount', 1))
-                buttons = int(game_data.get('buttons', 0))
-                sticks = int(game_data.get('sticks', 0))
-                alternating = 1 if game_data.get('alternating', False) else 0
-                console = 1 if game_data.get('console', False) else 0  # NEW: Handle console field
-                is_clone = 0  # Parent entries aren't clones
-                parent_rom = None
-                
-                # HANDLE MAPPINGS - store as JSON string
-                mappings_json = None
-                if 'mappings' in game_data and game_data['mappings']:
-                    import json
-                    mappings_json = json.dumps(game_data['mappings'])
-                
-                # Insert parent game - UPDATED query with console field
-                cursor.execute(
-                    "INSERT OR IGNORE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (rom_name, game_name, player_count, buttons, sticks, alternating, console, is_clone, parent_rom, mappings_json)
-                )
-                
-                if cursor.rowcount > 0:
-                    games_inserted += 1
-                    processed_roms.add(rom_name)
-                
-                # Insert parent controls
-                if 'controls' in game_data:
-                    _insert_controls(cursor, rom_name, game_data['controls'])
-                    controls_inserted += len(game_data['controls'])
-                    
-            except Exception as e:
-                continue
+            game_row = (
+                rom_name,
+                game_data.get('description', rom_name),
+                int(game_data.get('playercount', 1)),
+                int(game_data.get('buttons', 0)),
+                int(game_data.get('sticks', 0)),
+                1 if game_data.get('alternating', False) else 0,
+                1 if game_data.get('console', False) else 0,
+                0,  # Parent entries aren't clones
+                None,
+                mappings_json
+            )
+            raw_controls = game_data.get('controls', {})
+            control_rows = _build_control_rows(rom_name, raw_controls, default_actions)
+            traits_row = _build_traits_row(game_row, raw_controls, control_rows)
+            rom_rows[rom_name] = (game_row, control_rows, None, traits_row)
+        except Exception:
+            continue
+    
+    # PASS 2: Process all clone games
+    for rom_name, game_data in gamedata_json.items():
+        # Only process entries that have a 'parent' field (clones)
+        if 'parent' not in game_data or rom_name in rom_rows:
+            continue
         
-        # PASS 2: Process all clone games
-        for rom_name, game_data in gamedata_json.items():
-            # Only process entries that have a 'parent' field (clones)
-            if 'parent' not in game_data:
-                continue
+        try:
+            parent_rom = game_data['parent']
             
-            # Skip if already processed
-            if rom_name in processed_roms:
-                continue
+            # HANDLE CLONE MAPPINGS - inherit from parent or use own
+            mappings_json = None
+            if 'mappings' in game_data and game_data['mappings']:
+                mappings_json = json.dumps(game_data['mappings'])
+            elif parent_rom in gamedata_json and 'mappings' in gamedata_json[parent_rom]:
+                mappings_json = json.dumps(gamedata_json[parent_rom]['mappings'])
             
-            try:
-                parent_rom = game_data['parent']
-                
-                # Extract clone properties (inherit from parent if not specified)
-                clone_game_name = game_data.get('description', rom_name)
-                clone_player_count = int(game_data.get('playercount', 1))
-                clone_buttons = int(game_data.get('buttons', 0))
-                clone_sticks = int(game_data.get('sticks', 0))
-                clone_alternating = 1 if game_data.get('alternating', False) else 0
-                
-                # HANDLE CLONE MAPPINGS - inherit from parent or use own
-                mappings_json = None
-                if 'mappings' in game_data and game_data['mappings']:
-                    import json
-                    mappings_json = json.dumps(game_data['mappings'])
-                elif parent_rom in gamedata_json and 'mappings' in gamedata_json[parent_rom]:
-                    import json
-                    mappings_json = json.dumps(gamedata_json[parent_rom]['mappings'])
-                
-                # Insert clone as a game - UPDATED query with mappings
-                cursor.execute(
-                    "INSERT OR IGNORE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (rom_name, clone_game_name, clone_player_count, clone_buttons, clone_sticks, 
-                    clone_alternating, 1, parent_rom, mappings_json)
-                )
+            game_row = (
+                rom_name,
+                game_data.get('description', rom_name),
+                int(game_data.get('playercount', 1)),
+                int(game_data.get('buttons', 0)),
+                int(game_data.get('sticks', 0)),
+                1 if game_data.get('alternating', False) else 0,
+                1 if game_data.get('console', False) else 0,
+                1,
+                parent_rom,
+                mappings_json
+            )
+            raw_controls = game_data.get('controls', {})
+            control_rows = _build_control_rows(rom_name, raw_controls, default_actions)
+            traits_row = _build_traits_row(game_row, raw_controls, control_rows)
+            rom_rows[rom_name] = (game_row, control_rows, parent_rom, traits_row)
+        except Exception:
+            continue
+    
+    # PASS 3: Handle old-style clones (nested under parent's 'clones' key)
+    for parent_rom, parent_data in gamedata_json.items():
+        if 'parent' in parent_data:  # Skip clones processed above
+            continue
+        
+        if 'clones' in parent_data and isinstance(parent_data['clones'], dict):
+            for clone_name, clone_data in parent_data['clones'].items():
+                # Skip if already processed in pass 2
+                if clone_name in rom_rows:
+                    continue
                 
-                if cursor.rowcount > 0:
-                    games_inserted += 1
-                    processed_roms.add(rom_name)
+                try:
+                    # HANDLE MAPPINGS for old-style clones
+                    mappings_json = None
+                    if 'mappings' in clone_data and clone_data['mappings']:
+                        mappings_json = json.dumps(clone_data['mappings'])
+                    elif 'mappings' in parent_data and parent_data['mappings']:
+                        mappings_json = json.dumps(parent_data['mappings'])
                     
-                    # Add clone relationship
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO clone_relationships VALUES (?, ?)",
-                        (parent_rom, rom_name)
+                    # Extract clone properties (inherit from parent)
+                    game_row = (
+                        clone_name,
+                        clone_data.get('description', clone_name),
+                        int(parent_data.get('playercount', 1)),
+                        int(parent_data.get('buttons', 0)),
+                        int(parent_data.get('sticks', 0)),
+                        1 if parent_data.get('alternating', False) else 0,
+                        1 if parent_data.get('console', False) else 0,
+                        1,
+                        parent_rom,
+                        mappings_json
                     )
-                    clones_inserted += 1
                     
-                    # Insert clone controls
-                    if 'controls' in game_data:
-                        _insert_controls(cursor, rom_name, game_data['controls'])
-                        controls_inserted += len(game_data['controls'])
-                        
-            except Exception as e:
-                continue
-        
-        # PASS 3: Handle old-style clones (nested under parent's 'clones' key)
-        for parent_rom, parent_data in gamedata_json.items():
-            if 'parent' in parent_data:  # Skip clones processed above
-                continue
-                
-            if 'clones' in parent_data and isinstance(parent_data['clones'], dict):
-                for clone_name, clone_data in parent_data['clones'].items():
-                    # Skip if already processed in pass 2
-                    if clone_name in processed_roms:
-                        continue
-                    
-                    try:
-                        # Extract clone properties (inherit from parent)
-                        clone_game_name = clone_data.get('description', clone_name)
-                        clone_player_count = int(parent_data.get('playercount', 1))
-                        clone_buttons = int(parent_data.get('buttons', 0))
-                        clone_sticks = int(parent_data.get('sticks', 0))
-                        clone_alternating = 1 if parent_data.get('alternating', False) else 0
-                        
-                        # HANDLE MAPPINGS for old-style clones
-                        mappings_json = None
-                        if 'mappings' in clone_data and clone_data['mappings']:
-                            import json
-                            mappings_json = json.dumps(clone_data['mappings'])
-                        elif 'mappings' in parent_data and parent_data['mappings']:
-                            import json
-                            mappings_json = json.dumps(parent_data['mappings'])
-                        
-                        # Insert clone as a game - UPDATED query with mappings
-                        cursor.execute(
-                            "INSERT OR IGNORE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                            (clone_name, clone_game_name, clone_player_count, clone_buttons, clone_sticks, 
-                            clone_alternating, 1, parent_rom, mappings_json)
-                        )
-                        
-                        if cursor.rowcount > 0:
-                            games_inserted += 1
-                            processed_roms.add(clone_name)
-                            
-                            # Add clone relationship
-                            cursor.execute(
-                                "INSERT OR IGNORE INTO clone_relationships VALUES (?, ?)",
-                                (parent_rom, clone_name)
-                            )
-                            clones_inserted += 1
-                            
-                            # Clone inherits parent's controls unless it has its own
-                            clone_controls = clone_data.get('controls', parent_data.get('controls', {}))
-                            if clone_controls:
-                                _insert_controls(cursor, clone_name, clone_controls)
-                                controls_inserted += len(clone_controls)
-                                
-                    except Exception as e:
-                        continue
-        
-        # Commit changes and close connection
-        conn.commit()
-        conn.close()
-        
-        elapsed_time = time.time() - start_time
-        print(f"Database built in {elapsed_time:.2f}s with {games_inserted} games, {controls_inserted} controls, {clones_inserted} clones")
-        
-        # Clear cache again after building
-        clear_database_cache()
-        
-        return games_inserted > 0
-        
+                    # Clone inherits parent's controls unless it has its own
+                    clone_controls = clone_data.get('controls', parent_data.get('controls', {}))
+                    control_rows = _build_control_rows(clone_name, clone_controls, default_actions)
+                    traits_row = _build_traits_row(game_row, clone_controls, control_rows)
+                    rom_rows[clone_name] = (game_row, control_rows, parent_rom, traits_row)
+                except Exception:
+                    continue
+    
+    return rom_rows
+
+def _hash_game_rows(rows: Tuple) -> str:
+    """Hash the database rows of a single ROM so changes can be detected"""
+    return hashlib.sha1(json.dumps(rows, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+def _write_game_rows(cursor, rom_rows: Dict[str, Tuple], report: bool = False) -> Tuple[int, int, int]:
+    """
+    Bulk insert the rows of the given ROMs and record their hashes
+    
+    Each table is loaded in its own executemany pass fed by a generator, so no
+    per-row Python round trips are made into SQLite.
+    """
+    def run_pass(label, sql, rows):
+        pass_start = time.perf_counter()
+        cursor.executemany(sql, rows)
+        count = max(cursor.rowcount, 0)
+        if report:
+            elapsed = time.perf_counter() - pass_start
+            rate = count / elapsed if elapsed > 0 else 0
+            print(f"  {label}: {count} rows in {elapsed:.3f}s ({rate:,.0f} rows/s)")
+        return count
+    
+    games_inserted = run_pass(
+        "games",
+        "INSERT OR IGNORE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (rows[0] for rows in rom_rows.values())
+    )
+    clones_inserted = run_pass(
+        "clone_relationships",
+        "INSERT OR IGNORE INTO clone_relationships VALUES (?, ?)",
+        ((rows[2], rom_name) for rom_name, rows in rom_rows.items() if rows[2])
+    )
+    controls_inserted = run_pass(
+        "game_controls",
+        "INSERT INTO game_controls (rom_name, control_name, display_name) VALUES (?, ?, ?)",
+        itertools.chain.from_iterable(rows[1] for rows in rom_rows.values())
+    )
+    run_pass(
+        "game_traits",
+        "INSERT OR REPLACE INTO game_traits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (rows[3] for rows in rom_rows.values())
+    )
+    run_pass(
+        "game_hashes",
+        "INSERT OR REPLACE INTO game_hashes VALUES (?, ?)",
+        ((rom_name, _hash_game_rows(rows)) for rom_name, rows in rom_rows.items())
+    )
+    
+    return games_inserted, controls_inserted, clones_inserted
+
+def _write_search_rows(cursor, rom_rows: Dict[str, Tuple], report: bool = False) -> int:
+    """Insert the game_search rows (rom name, description, distinct control actions) of the given ROMs"""
+    def search_rows():
+        for rom_name, rows in rom_rows.items():
+            game_row, control_rows = rows[0], rows[1]
+            actions = " ".join(dict.fromkeys(display_name for _, _, display_name in control_rows))
+            yield (rom_name, game_row[1], actions)
+    
+    pass_start = time.perf_counter()
+    cursor.executemany("INSERT INTO game_search (rom_name, game_name, actions) VALUES (?, ?, ?)", search_rows())
+    if report:
+        print(f"  game_search: {len(rom_rows)} rows in {time.perf_counter() - pass_start:.3f}s")
+    return len(rom_rows)
+
+# Serializes builds/syncs within this process (the GUI runs them on a worker thread)
+_db_build_lock = threading.RLock()
+
+def _get_shadow_db_path(db_path: str) -> str:
+    """Get the temporary path a new database is built at before being swapped in"""
+    return f"{db_path}.building"
+
+def _remove_db_file(path: str):
+    """Remove a database file and any journal left next to it"""
+    for leftover in (path, f"{path}-journal"):
+        try:
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        except OSError as e:
+            print(f"Could not remove {leftover}: {e}")
+
+def _swap_in_shadow_db(shadow_path: str, db_path: str) -> bool:
+    """
+    Atomically replace db_path with the finished shadow database
+    
+    Readers that already have the old file open keep reading that snapshot until they
+    reconnect. Windows refuses the rename while another handle is open (including other
+    threads' pooled connections, which only they may close), so after a few retries the
+    pages are copied in through the SQLite backup API (a single write transaction for readers).
+    """
+    for attempt in range(5):
+        try:
+            os.replace(shadow_path, db_path)
+            _invalidate_pooled_connections()
+            return True
+        except PermissionError:
+            time.sleep(0.1 * (attempt + 1))
+    
+    print("Database file is in use by another process, copying new database into place")
+    try:
+        source = sqlite3.connect(shadow_path)
+        target = sqlite3.connect(db_path, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        _remove_db_file(shadow_path)
+        _invalidate_pooled_connections()
+        return True
     except sqlite3.Error as e:
-        print(f"SQLite error: {e}")
-        if 'conn' in locals():
-            conn.close()
-        clear_database_cache()
+        print(f"ERROR swapping in new database: {e}")
         return False
-    except Exception as e:
-        print(f"ERROR building database: {e}")
-        if 'conn' in locals():
+
+def build_gamedata_db(gamedata_json: Dict, db_path: str) -> bool:
+    """
+    Build SQLite database from gamedata.json from scratch (full rebuild)
+    
+    The database is written to a shadow file and swapped in with an atomic rename,
+    so readers never see a half-built database.
+    """
+    start_time = time.time()
+    
+    if not gamedata_json:
+        print("ERROR: No gamedata available to build database")
+        return False
+    
+    shadow_path = _get_shadow_db_path(db_path)
+    
+    with _db_build_lock:
+        try:
+            # Start from a clean shadow file (a previous build may have been interrupted)
+            _remove_db_file(shadow_path)
+            
+            # Create database connection
+            conn = sqlite3.connect(shadow_path)
+            cursor = conn.cursor()
+            for pragma in GAMEDATA_DB_BUILD_PRAGMAS:
+                cursor.execute(pragma)
+            
+            _create_gamedata_tables(cursor)
+            has_search = _create_search_index(cursor)
+            
+            collect_start = time.perf_counter()
+            rom_rows = _collect_gamedata_rows(gamedata_json)
+            print(f"  collected rows for {len(rom_rows)} games in {time.perf_counter() - collect_start:.3f}s")
+            
+            games_inserted, controls_inserted, clones_inserted = _write_game_rows(cursor, rom_rows, report=True)
+            if has_search:
+                _write_search_rows(cursor, rom_rows, report=True)
+            
+            index_start = time.perf_counter()
+            _create_gamedata_indexes(cursor)
+            print(f"  indexes built in {time.perf_counter() - index_start:.3f}s")
+            
+            cursor.execute(f"PRAGMA user_version = {GAMEDATA_DB_VERSION}")
+            
+            # Commit changes and close connection
+            conn.commit()
             conn.close()
-        clear_database_cache()
+            
+            if games_inserted == 0:
+                print("ERROR: No games were written, keeping the existing database")
+                _remove_db_file(shadow_path)
+                return False
+            
+            if not _swap_in_shadow_db(shadow_path, db_path):
+                _remove_db_file(shadow_path)
+                return False
+            
+            elapsed_time = time.time() - start_time
+            print(f"Database built in {elapsed_time:.2f}s with {games_inserted} games, {controls_inserted} controls, {clones_inserted} clones")
+            
+            return True
+            
+        except sqlite3.Error as e:
+            print(f"SQLite error: {e}")
+            if 'conn' in locals():
+                conn.close()
+            _remove_db_file(shadow_path)
+            return False
+        except Exception as e:
+            print(f"ERROR building database: {e}")
+            if 'conn' in locals():
+                conn.close()
+            _remove_db_file(shadow_path)
+            return False
+
+def sync_gamedata_db(gamedata_json: Dict, db_path: str) -> bool:
+    """
+    Incrementally bring the SQLite database in line with gamedata.json
+    
+    Compares the stored per-ROM hashes with the current gamedata and only rewrites
+    the ROMs that were added, changed or removed, in place and in a single write
+    transaction, so readers see either the old or the new data. Falls back to a full
+    rebuild (shadow file and swap) when the database is missing or was built by an
+    older version.
+    """
+    start_time = time.time()
+    
+    if not gamedata_json:
+        print("ERROR: No gamedata available to sync database")
         return False
     
+    if not os.path.exists(db_path):
+        return build_gamedata_db(gamedata_json, db_path)
+    
+    with _db_build_lock:
+        try:
+            # Readers may hold the file briefly; wait for them rather than failing the commit
+            conn = sqlite3.connect(db_path, timeout=30)
+            cursor = conn.cursor()
+            
+            cursor.execute("PRAGMA user_version")
+            db_version = cursor.fetchone()[0]
+            if db_version != GAMEDATA_DB_VERSION:
+                conn.close()
+                print(f"Database version {db_version} is outdated, doing a full rebuild...")
+                return build_gamedata_db(gamedata_json, db_path)
+            
+            rom_rows = _collect_gamedata_rows(gamedata_json)
+            stored_hashes = dict(cursor.execute("SELECT rom_name, entry_hash FROM game_hashes").fetchall())
+            
+            changed_rows = {
+                rom_name: rows for rom_name, rows in rom_rows.items()
+                if stored_hashes.get(rom_name) != _hash_game_rows(rows)
+            }
+            removed_roms = [rom_name for rom_name in stored_hashes if rom_name not in rom_rows]
+            
+            if changed_rows or removed_roms:
+                stale_roms = [(rom_name,) for rom_name in list(changed_rows) + removed_roms]
+                cursor.executemany("DELETE FROM games WHERE rom_name = ?", stale_roms)
+                cursor.executemany("DELETE FROM game_controls WHERE rom_name = ?", stale_roms)
+                cursor.executemany("DELETE FROM clone_relationships WHERE clone_rom = ?", stale_roms)
+                cursor.executemany("DELETE FROM game_traits WHERE rom_name = ?", stale_roms)
+                cursor.executemany("DELETE FROM game_hashes WHERE rom_name = ?", stale_roms)
+                
+                _write_game_rows(cursor, changed_rows)
+                
+                # FTS5 deletes by rom_name scan the whole index, so large diffs just refill it
+                if _has_search_index(cursor):
+                    if len(stale_roms) > SEARCH_INDEX_REBUILD_THRESHOLD:
+                        cursor.execute("DELETE FROM game_search")
+                        _write_search_rows(cursor, rom_rows)
+                    else:
+                        cursor.executemany("DELETE FROM game_search WHERE rom_name = ?", stale_roms)
+                        _write_search_rows(cursor, changed_rows)
+                
+                conn.commit()
+                _invalidate_pooled_connections()
+            
+            conn.close()
+            
+            # Mark the database as current so check_db_update_needed stops reporting it
+            os.utime(db_path, None)
+            
+            elapsed_time = time.time() - start_time
+            if changed_rows or removed_roms:
+                print(f"Database synced in {elapsed_time:.2f}s: {len(changed_rows)} games updated, {len(removed_roms)} removed")
+            else:
+                print(f"Database synced in {elapsed_time:.2f}s: already up to date")
+            
+            return True
+            
+        except sqlite3.Error as e:
+            print(f"SQLite error during sync ({e}), doing a full rebuild...")
+            if 'conn' in locals():
+                # Closing without a commit rolls the partial sync back
+                conn.close()
+            return build_gamedata_db(gamedata_json, db_path)
+        except Exception as e:
+            print(f"ERROR syncing database: {e}")
+            if 'conn' in locals():
+                conn.close()
+            return False
+
 def get_game_data_from_db_debug(romname: str, db_path: str) -> Optional[Dict]:
     """Debug version of get_game_data_from_db to see what's happening"""
     
@@ -749,10 +1162,9 @@ def get_game_data_from_db_debug(romname: str, db_path: str) -> Optional[Dict]:
             conn.close()
         return None
 
-def _insert_controls(cursor, rom_name: str, controls_dict: Dict):
-    """Helper method to insert controls into the database"""
-    
-    default_actions = get_default_control_actions()
+def _build_control_rows(rom_name: str, controls_dict: Dict, default_actions: Dict[str, str]) -> List[Tuple[str, str, str]]:
+    """Helper method to build the game_controls rows for a ROM"""
+    control_rows = []
     
     for control_name, control_data in controls_dict.items():
         display_name = ""
@@ -775,14 +1187,108 @@ def _insert_controls(cursor, rom_name: str, controls_dict: Dict):
             else:
                 display_name = control_name
         
-        # Always insert the control
+        # Always include the control
+        control_rows.append((rom_name, control_name, display_name))
+    
+    return control_rows
+
+# Global connection cache to avoid repeated database connections
+# Keyed by (thread id, absolute db path) - sqlite connections are kept per thread.
+# Values are (connection, file signature, last signature check time, pool generation)
+_db_connection_cache = {}
+_db_connection_lock = threading.Lock()
+
+# Bumped after this process swaps in a new database so every thread reconnects
+_db_pool_generation = 0
+
+# How often a pooled connection checks whether the database file was swapped out
+DB_SWAP_CHECK_INTERVAL = 1.0
+
+# Read-only connection tuning
+DB_MMAP_SIZE = 256 * 1024 * 1024
+DB_CACHED_STATEMENTS = 256
+
+def get_db_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Get the pooled read-only connection for db_path on the current thread
+    
+    Connections are opened in read-only URI mode with memory-mapped I/O and a larger
+    prepared statement cache. They stay open until clear_database_cache() is called or
+    the database file is replaced by a rebuild, which is noticed within
+    DB_SWAP_CHECK_INTERVAL seconds. Each connection is only used and closed by its own thread.
+    """
+    db_path = os.path.abspath(db_path)
+    key = (threading.get_ident(), db_path)
+    
+    cached = _db_connection_cache.get(key)
+    if cached is not None:
+        conn, signature, checked_at, generation = cached
+        now = time.monotonic()
+        if generation == _db_pool_generation:
+            if now - checked_at < DB_SWAP_CHECK_INTERVAL:
+                return conn
+            
+            if _get_db_file_signature(db_path) == signature:
+                _db_connection_cache[key] = (conn, signature, now, generation)
+                return conn
+        
+        # A rebuild swapped in a new file - drop the connection to the old snapshot
+        with _db_connection_lock:
+            _db_connection_cache.pop(key, None)
         try:
-            cursor.execute(
-                "INSERT INTO game_controls (rom_name, control_name, display_name) VALUES (?, ?, ?)",
-                (rom_name, control_name, display_name)
-            )
+            conn.close()
         except Exception:
-            pass  # Skip errors silently
+            pass
+    
+    signature = _get_db_file_signature(db_path)
+    conn = sqlite3.connect(
+        f"file:{pathname2url(db_path)}?mode=ro",
+        uri=True,
+        cached_statements=DB_CACHED_STATEMENTS
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+    
+    with _db_connection_lock:
+        _db_connection_cache[key] = (conn, signature, time.monotonic(), _db_pool_generation)
+    return conn
+
+def _get_db_file_signature(db_path: str) -> Optional[Tuple[int, int]]:
+    """Identify the current database file so a swapped-in rebuild can be detected"""
+    try:
+        stat = os.stat(db_path)
+        return stat.st_ino, stat.st_mtime_ns
+    except OSError:
+        return None
+
+def _invalidate_pooled_connections():
+    """Make every thread reopen its pooled connection on next use (each closes its own)"""
+    global _db_pool_generation
+    with _db_connection_lock:
+        _db_pool_generation += 1
+
+def _close_pooled_connections():
+    """
+    Close the calling thread's pooled connections and make every other thread close its
+    own on next use - another thread may be in the middle of a query on its connection
+    """
+    global _db_pool_generation
+    thread_id = threading.get_ident()
+    live_threads = {thread.ident for thread in threading.enumerate()}
+    
+    with _db_connection_lock:
+        _db_pool_generation += 1
+        own_keys = [key for key in _db_connection_cache if key[0] == thread_id]
+        connections = [_db_connection_cache.pop(key)[0] for key in own_keys]
+        # Connections of finished threads are closed when they are garbage collected
+        for key in [key for key in _db_connection_cache if key[0] not in live_threads]:
+            del _db_connection_cache[key]
+    
+    for conn in connections:
+        try:
+            conn.close()
+        except Exception:
+            pass
 
 def rom_exists_in_db(romname: str, db_path: str) -> bool:
     """Quick check if ROM exists in database without loading full data"""
@@ -790,30 +1296,104 @@ def rom_exists_in_db(romname: str, db_path: str) -> bool:
         return False
         
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1 FROM games WHERE rom_name = ? LIMIT 1", (romname,))
-        result = cursor.fetchone() is not None
-        conn.close()
-        return result
-    except:
+        cursor = get_db_connection(db_path).execute(
+            "SELECT 1 FROM games WHERE rom_name = ? LIMIT 1", (romname,)
+        )
+        return cursor.fetchone() is not None
+    except sqlite3.Error:
         return False
 
-# Global connection cache to avoid repeated database connections
-_db_connection_cache = {}
-
 # 2. Update get_game_data_from_db function to include mappings
+def _build_game_data_from_db_rows(romname: str, first_row, control_rows, default_actions: Dict[str, str] = None) -> Dict:
+    """
+    Convert the games row and (control_name, display_name) rows of one ROM into
+    the standard game data format
+    """
+    game_data = {
+        'romname': romname,
+        'gamename': first_row['game_name'],
+        'numPlayers': first_row['player_count'],
+        'alternating': bool(first_row['alternating']),
+        'console': bool(first_row['console']),  # NEW: Include console field
+        'mirrored': False,
+        'miscDetails': f"Buttons: {first_row['buttons']}, Sticks: {first_row['sticks']}",
+        'players': [],
+        'source': 'gamedata.db'
+    }
+    
+    # ADD MAPPINGS if they exist
+    if first_row['mappings']:
+        try:
+            # Mappings are stored as JSON string in database
+            import json
+            game_data['mappings'] = json.loads(first_row['mappings'])
+        except (json.JSONDecodeError, TypeError):
+            # If it's already a list or parsing fails, use as-is
+            game_data['mappings'] = first_row['mappings']
+    
+    # Process controls efficiently in single pass
+    p1_controls = []
+    p2_controls = []
+    
+    if default_actions is None:
+        default_actions = get_default_control_actions()
+    
+    for control_name, display_name in control_rows:
+        if not control_name:
+            continue
+        
+        # Use default if no display name
+        if not display_name and control_name in default_actions:
+            display_name = default_actions[control_name]
+        
+        # Generate fallback display name
+        if not display_name:
+            parts = control_name.split('_')
+            if len(parts) > 1:
+                display_name = parts[-1].replace('_', ' ').title()
+            else:
+                display_name = control_name
+        
+        control_entry = {
+            'name': control_name,
+            'value': display_name
+        }
+        
+        # Add to appropriate player list
+        if control_name.startswith('P1_'):
+            p1_controls.append(control_entry)
+        elif control_name.startswith('P2_'):
+            p2_controls.append(control_entry)
+    
+    # Sort controls once at the end for consistent order
+    p1_controls.sort(key=lambda x: x['name'])
+    p2_controls.sort(key=lambda x: x['name'])
+    
+    # Add players if they have controls
+    if p1_controls:
+        game_data['players'].append({
+            'number': 1,
+            'numButtons': first_row['buttons'],
+            'labels': p1_controls
+        })
+    
+    if p2_controls:
+        game_data['players'].append({
+            'number': 2,
+            'numButtons': first_row['buttons'],
+            'labels': p2_controls
+        })
+    
+    return game_data
+
 def get_game_data_from_db(romname: str, db_path: str) -> Optional[Dict]:
     """Get control data from SQLite database with console field support - UPDATED"""
     
     if not os.path.exists(db_path):
         return None
     
-    conn = None
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = get_db_connection(db_path).cursor()
         
         # Updated query to include console column
         cursor.execute("""
@@ -836,126 +1416,182 @@ def get_game_data_from_db(romname: str, db_path: str) -> Optional[Dict]:
             parent_result = cursor.fetchone()
             
             if parent_result:
-                conn.close()
                 return get_game_data_from_db(parent_result['parent_rom'], db_path)
             
-            conn.close()
             return None
         
-        # Process all rows at once
-        first_row = rows[0]
-        game_data = {
-            'romname': romname,
-            'gamename': first_row['game_name'],
-            'numPlayers': first_row['player_count'],
-            'alternating': bool(first_row['alternating']),
-            'console': bool(first_row['console']),  # NEW: Include console field
-            'mirrored': False,
-            'miscDetails': f"Buttons: {first_row['buttons']}, Sticks: {first_row['sticks']}",
-            'players': [],
-            'source': 'gamedata.db'
-        }
-        
-        # ADD MAPPINGS if they exist
-        if first_row['mappings']:
-            try:
-                # Mappings are stored as JSON string in database
-                import json
-                game_data['mappings'] = json.loads(first_row['mappings'])
-            except (json.JSONDecodeError, TypeError):
-                # If it's already a list or parsing fails, use as-is
-                game_data['mappings'] = first_row['mappings']
-        
-        # Process controls efficiently in single pass
-        p1_controls = []
-        p2_controls = []
+        control_rows = [(row['control_name'], row['display_name']) for row in rows]
+        return _build_game_data_from_db_rows(romname, rows[0], control_rows)
         
-        default_actions = get_default_control_actions()
-        
-        for row in rows:
-            if not row['control_name']:
-                continue
-                
-            control_name = row['control_name']
-            display_name = row['display_name']
-            
-            # Use default if no display name
-            if not display_name and control_name in default_actions:
-                display_name = default_actions[control_name]
-            
-            # Generate fallback display name
-            if not display_name:
-                parts = control_name.split('_')
-                if len(parts) > 1:
-                    display_name = parts[-1].replace('_', ' ').title()
-                else:
-                    display_name = control_name
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return None
+
+# Stay well below SQLITE_MAX_VARIABLE_NUMBER (999 on older builds)
+DB_BULK_CHUNK_SIZE = 500
+
+def get_games_data_bulk(romnames, db_path: str, parent_lookup: Dict = None) -> Dict[str, Dict]:
+    """
+    Get control data for many ROMs from the SQLite database in a few set-based queries
+    
+    ROMs are fetched in chunks with a single JOIN per chunk. If parent_lookup is given,
+    clones missing from the database are resolved to their parent's data in the same pass.
+    
+    Returns:
+        Dict of rom_name -> game data for every ROM that was found (missing ROMs are omitted)
+    """
+    results = {}
+    
+    if not db_path or not os.path.exists(db_path):
+        return results
+    
+    romnames = list(dict.fromkeys(romnames))
+    default_actions = get_default_control_actions()
+    
+    def fetch(names):
+        fetched = {}
+        cursor = get_db_connection(db_path).cursor()
+        for start in range(0, len(names), DB_BULK_CHUNK_SIZE):
+            chunk = names[start:start + DB_BULK_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
             
-            control_entry = {
-                'name': control_name,
-                'value': display_name
-            }
+            # Two indexed queries per chunk are cheaper than one wide JOIN that repeats
+            # every games column for each control row
+            cursor.execute(f"""
+                SELECT rom_name, game_name, player_count, buttons, sticks, 
+                       alternating, console, is_clone, parent_rom, mappings
+                FROM games WHERE rom_name IN ({placeholders})
+            """, chunk)
+            game_rows = cursor.fetchall()
             
-            # Add to appropriate player list
-            if control_name.startswith('P1_'):
-                p1_controls.append(control_entry)
-            elif control_name.startswith('P2_'):
-                p2_controls.append(control_entry)
-        
-        # Sort controls once at the end for consistent order
-        p1_controls.sort(key=lambda x: x['name'])
-        p2_controls.sort(key=lambda x: x['name'])
-        
-        # Add players if they have controls
-        if p1_controls:
-            game_data['players'].append({
-                'number': 1,
-                'numButtons': first_row['buttons'],
-                'labels': p1_controls
-            })
-        
-        if p2_controls:
-            game_data['players'].append({
-                'number': 2,
-                'numButtons': first_row['buttons'],
-                'labels': p2_controls
-            })
+            cursor.execute(f"""
+                SELECT rom_name, control_name, display_name
+                FROM game_controls WHERE rom_name IN ({placeholders})
+            """, chunk)
+            controls_by_rom = {}
+            for rom_name, control_name, display_name in cursor.fetchall():
+                controls_by_rom.setdefault(rom_name, []).append((control_name, display_name))
+            
+            for game_row in game_rows:
+                rom_name = game_row['rom_name']
+                fetched[rom_name] = _build_game_data_from_db_rows(
+                    rom_name, game_row, controls_by_rom.get(rom_name, ()), default_actions
+                )
+        return fetched
+    
+    try:
+        results = fetch(romnames)
         
-        conn.close()
-        return game_data
+        # Clone fallback - fetch all missing parents at once
+        if parent_lookup:
+            missing_clones = {
+                rom: parent_lookup[rom] for rom in romnames
+                if rom not in results and rom in parent_lookup
+            }
+            if missing_clones:
+                parent_names = [parent for parent in set(missing_clones.values()) if parent not in results]
+                parents = fetch(parent_names)
+                parents.update({name: results[name] for name in missing_clones.values() if name in results})
+                for clone_rom, parent_rom in missing_clones.items():
+                    if parent_rom in parents:
+                        # Each clone gets its own copy named after itself, like get_game_data
+                        clone_data = copy.deepcopy(parents[parent_rom])
+                        clone_data['romname'] = clone_rom
+                        clone_data['gamename'] = f"{clone_rom} (Clone of {parent_rom})"
+                        results[clone_rom] = clone_data
+        
+        return results
         
     except sqlite3.Error as e:
         print(f"Database error: {e}")
-        if conn:
-            conn.close()
+        return results
+
+def search_games(search_text: str, db_path: str, limit: int = None) -> Optional[List[str]]:
+    """
+    Search ROM names, descriptions and control actions through the game_search FTS5 index
+    
+    Every whitespace separated term has to match (as a substring, case-insensitive).
+    ROM name hits rank above description hits, which rank above control action hits.
+    
+    Returns:
+        Ranked list of ROM names, or None if the index can't answer the query
+        (no index, or a term shorter than the 3 characters trigrams need)
+    """
+    terms = search_text.split()
+    if not terms or any(len(term) < 3 for term in terms):
+        return None
+    
+    if not db_path or not os.path.exists(db_path):
+        return None
+    
+    # Quote every term so FTS5 query syntax characters are matched literally
+    match_query = " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+    
+    try:
+        conn = get_db_connection(db_path)
+        if not _has_search_index(conn.cursor()):
+            return None
+        
+        sql = """
+            SELECT rom_name FROM game_search
+            WHERE game_search MATCH ?
+            ORDER BY bm25(game_search, 10.0, 5.0, 1.0)
+        """
+        params = [match_query]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        return [row[0] for row in conn.execute(sql, params).fetchall()]
+    except sqlite3.Error as e:
+        print(f"Search error for '{search_text}': {e}")
         return None
 
+def get_games_data(romnames, gamedata_json: Dict, parent_lookup: Dict,
+                   db_path: str = None, rom_data_cache: Dict = None) -> Dict[str, Dict]:
+    """
+    Batch version of get_game_data - database rows are fetched in bulk, gamedata.json
+    is only consulted for the ROMs the database doesn't have
+    
+    Returns:
+        Dict of rom_name -> game data for every ROM that has data
+    """
+    results = {}
+    pending = []
+    
+    for rom in romnames:
+        if rom_data_cache and rom in rom_data_cache:
+            results[rom] = rom_data_cache[rom]
+        else:
+            pending.append(rom)
+    
+    if pending and db_path and os.path.exists(db_path):
+        db_results = get_games_data_bulk(pending, db_path)
+        results.update(db_results)
+        if rom_data_cache is not None:
+            rom_data_cache.update(db_results)
+        pending = [rom for rom in pending if rom not in db_results]
+    
+    # JSON fallback for whatever the database didn't have
+    for rom in pending:
+        game_data = get_game_data(rom, gamedata_json, parent_lookup, None, rom_data_cache)
+        if game_data:
+            results[rom] = game_data
+    
+    return results
+
 # Also UPDATE the cleanup_database_connections function:
 
 def cleanup_database_connections():
     """Clean up cached database connections - UPDATED"""
-    global _db_connection_cache
-    
-    for conn in _db_connection_cache.values():
-        try:
-            conn.close()
-        except:
-            pass
-    _db_connection_cache.clear()
+    _close_pooled_connections()
     print("Cleaned up database connections")
 
 # ADD this new function to force cache clearing when database is rebuilt:
 
 def clear_database_cache():
     """Force clear database connection cache - call this after rebuilding database"""
-    global _db_connection_cache
-    
-    for conn in _db_connection_cache.values():
-        try:
-            conn.close()
-        except:
-            pass
-    _db_connection_cache.clear()
+    _close_pooled_connections()
     print("Forced database connection cache clear")
     
 def get_game_data(romname: str, gamedata_json: Dict, parent_lookup: Dict, 
@@ -1131,136 +1767,276 @@ def _convert_gamedata_json_to_standard_format(romname: str, game_data: Dict,
     return converted_data
 
 # Fix 1: Enhanced get_default_control_actions to include all specialized controls
+DEFAULT_CONTROL_ACTIONS = MappingProxyType({
+    # Standard joystick directions
+    'P1_JOYSTICK_UP': 'Up',
+    'P1_JOYSTICK_DOWN': 'Down',
+    'P1_JOYSTICK_LEFT': 'Left',
+    'P1_JOYSTICK_RIGHT': 'Right',
+    'P2_JOYSTICK_UP': 'Up',
+    'P2_JOYSTICK_DOWN': 'Down',
+    'P2_JOYSTICK_LEFT': 'Left',
+    'P2_JOYSTICK_RIGHT': 'Right',
+    
+    # Standard buttons - extended to 12 buttons
+    'P1_BUTTON1': 'A Button',
+    'P1_BUTTON2': 'B Button',
+    'P1_BUTTON3': 'X Button',
+    'P1_BUTTON4': 'Y Button',
+    'P1_BUTTON5': 'LB Button',
+    'P1_BUTTON6': 'RB Button',
+    'P1_BUTTON7': 'LT Button',
+    'P1_BUTTON8': 'RT Button',
+    'P1_BUTTON9': 'Left Stick Button',
+    'P1_BUTTON10': 'Right Stick Button',
+    'P1_BUTTON11': 'Button 11',
+    'P1_BUTTON12': 'Button 12',
+    
+    # Mirror P1 button names for P2
+    'P2_BUTTON1': 'A Button',
+    'P2_BUTTON2': 'B Button',
+    'P2_BUTTON3': 'X Button',
+    'P2_BUTTON4': 'Y Button',
+    'P2_BUTTON5': 'LB Button',
+    'P2_BUTTON6': 'RB Button',
+    'P2_BUTTON7': 'LT Button',
+    'P2_BUTTON8': 'RT Button',
+    'P2_BUTTON9': 'Left Stick Button',
+    'P2_BUTTON10': 'Right Stick Button',
+    'P2_BUTTON11': 'Button 11',
+    'P2_BUTTON12': 'Button 12',
+    
+    # Specialized controls - EXPANDED to include all the ones in your example
+    'P1_PEDAL': 'Accelerator Pedal',
+    'P1_PEDAL2': 'Brake Pedal',  
+    'P1_AD_STICK_X': 'Steering Left/Right',
+    'P1_AD_STICK_Y': 'Lean Forward/Back',
+    'P1_AD_STICK_Z': 'Throttle Control',
+    'P1_DIAL': 'Rotary Dial',
+    'P1_DIAL_V': 'Vertical Dial',
+    'P1_PADDLE': 'Paddle Controller',  # This was missing!
+    'P1_TRACKBALL_X': 'Trackball X-Axis',
+    'P1_TRACKBALL_Y': 'Trackball Y-Axis',
+    'P1_MOUSE_X': 'Mouse X-Axis',
+    'P1_MOUSE_Y': 'Mouse Y-Axis',
+    'P1_LIGHTGUN_X': 'Light Gun X-Axis',
+    'P1_LIGHTGUN_Y': 'Light Gun Y-Axis',
+    'P1_POSITIONAL': 'Positional Control',
+    'P1_GAMBLE_HIGH': 'Gamble High',
+    'P1_GAMBLE_LOW': 'Gamble Low',
+    
+    # Player 2 specialized controls
+    'P2_PEDAL': 'Accelerator Pedal',
+    'P2_PEDAL2': 'Brake Pedal',
+    'P2_AD_STICK_X': 'Steering Left/Right',
+    'P2_AD_STICK_Y': 'Lean Forward/Back',
+    'P2_AD_STICK_Z': 'Throttle Control',
+    'P2_DIAL': 'Rotary Dial',
+    'P2_DIAL_V': 'Vertical Dial',
+    'P2_PADDLE': 'Paddle Controller',
+    'P2_TRACKBALL_X': 'Trackball X-Axis',
+    'P2_TRACKBALL_Y': 'Trackball Y-Axis',
+    
+    # System controls
+    'P1_START': 'Start Button',
+    'P1_SELECT': 'Select/Coin Button',
+    'P2_START': 'Start Button',
+    'P2_SELECT': 'Select/Coin Button',
+    
+    # Additional specialized controls
+    'P1_STEER': 'Steering Wheel',
+    'P2_STEER': 'Steering Wheel',
+    
+    # Right stick controls
+    'P1_JOYSTICKRIGHT_UP': 'Right Stick Up',
+    'P1_JOYSTICKRIGHT_DOWN': 'Right Stick Down',
+    'P1_JOYSTICKRIGHT_LEFT': 'Right Stick Left',
+    'P1_JOYSTICKRIGHT_RIGHT': 'Right Stick Right',
+    
+    # D-pad controls
+    'P1_DPAD_UP': 'D-Pad Up',
+    'P1_DPAD_DOWN': 'D-Pad Down',
+    'P1_DPAD_LEFT': 'D-Pad Left',
+    'P1_DPAD_RIGHT': 'D-Pad Right',
+    
+    # Additional arcade-specific controls
+    'P1_COIN': 'Coin',
+    'P1_SERVICE': 'Service Button',
+    'SERVICE1': 'Service Button',
+    'TEST': 'Test Button',
+    'TILT': 'Tilt',
+})
+
 def get_default_control_actions() -> Dict[str, str]:
     """Get default control action mappings - ENHANCED with all specialized controls"""
-    return {
-        # Standard joystick directions
-        'P1_JOYSTICK_UP': 'Up',
-        'P1_JOYSTICK_DOWN': 'Down',
-        'P1_JOYSTICK_LEFT': 'Left',
-        'P1_JOYSTICK_RIGHT': 'Right',
-        'P2_JOYSTICK_UP': 'Up',
-        'P2_JOYSTICK_DOWN': 'Down',
-        'P2_JOYSTICK_LEFT': 'Left',
-        'P2_JOYSTICK_RIGHT': 'Right',
-        
-        # Standard buttons - extended to 12 buttons
-        'P1_BUTTON1': 'A Button',
-        'P1_BUTTON2': 'B Button',
-        'P1_BUTTON3': 'X Button',
-        'P1_BUTTON4': 'Y Button',
-        'P1_BUTTON5': 'LB Button',
-        'P1_BUTTON6': 'RB Button',
-        'P1_BUTTON7': 'LT Button',
-        'P1_BUTTON8': 'RT Button',
-        'P1_BUTTON9': 'Left Stick Button',
-        'P1_BUTTON10': 'Right Stick Button',
-        'P1_BUTTON11': 'Button 11',
-        'P1_BUTTON12': 'Button 12',
-        
-        # Mirror P1 button names for P2
-        'P2_BUTTON1': 'A Button',
-        'P2_BUTTON2': 'B Button',
-        'P2_BUTTON3': 'X Button',
-        'P2_BUTTON4': 'Y Button',
-        'P2_BUTTON5': 'LB Button',
-        'P2_BUTTON6': 'RB Button',
-        'P2_BUTTON7': 'LT Button',
-        'P2_BUTTON8': 'RT Button',
-        'P2_BUTTON9': 'Left Stick Button',
-        'P2_BUTTON10': 'Right Stick Button',
-        'P2_BUTTON11': 'Button 11',
-        'P2_BUTTON12': 'Button 12',
-        
-        # Specialized controls - EXPANDED to include all the ones in your example
-        'P1_PEDAL': 'Accelerator Pedal',
-        'P1_PEDAL2': 'Brake Pedal',  
-        'P1_AD_STICK_X': 'Steering Left/Right',
-        'P1_AD_STICK_Y': 'Lean Forward/Back',
-        'P1_AD_STICK_Z': 'Throttle Control',
-        'P1_DIAL': 'Rotary Dial',
-        'P1_DIAL_V': 'Vertical Dial',
-        'P1_PADDLE': 'Paddle Controller',  # This was missing!
-        'P1_TRACKBALL_X': 'Trackball X-Axis',
-        'P1_TRACKBALL_Y': 'Trackball Y-Axis',
-        'P1_MOUSE_X': 'Mouse X-Axis',
-        'P1_MOUSE_Y': 'Mouse Y-Axis',
-        'P1_LIGHTGUN_X': 'Light Gun X-Axis',
-        'P1_LIGHTGUN_Y': 'Light Gun Y-Axis',
-        'P1_POSITIONAL': 'Positional Control',
-        'P1_GAMBLE_HIGH': 'Gamble High',
-        'P1_GAMBLE_LOW': 'Gamble Low',
-        
-        # Player 2 specialized controls
-        'P2_PEDAL': 'Accelerator Pedal',
-        'P2_PEDAL2': 'Brake Pedal',
-        'P2_AD_STICK_X': 'Steering Left/Right',
-        'P2_AD_STICK_Y': 'Lean Forward/Back',
-        'P2_AD_STICK_Z': 'Throttle Control',
-        'P2_DIAL': 'Rotary Dial',
-        'P2_DIAL_V': 'Vertical Dial',
-        'P2_PADDLE': 'Paddle Controller',
-        'P2_TRACKBALL_X': 'Trackball X-Axis',
-        'P2_TRACKBALL_Y': 'Trackball Y-Axis',
-        
-        # System controls
-        'P1_START': 'Start Button',
-        'P1_SELECT': 'Select/Coin Button',
-        'P2_START': 'Start Button',
-        'P2_SELECT': 'Select/Coin Button',
-        
-        # Additional specialized controls
-        'P1_STEER': 'Steering Wheel',
-        'P2_STEER': 'Steering Wheel',
-        
-        # Right stick controls
-        'P1_JOYSTICKRIGHT_UP': 'Right Stick Up',
-        'P1_JOYSTICKRIGHT_DOWN': 'Right Stick Down',
-        'P1_JOYSTICKRIGHT_LEFT': 'Right Stick Left',
-        'P1_JOYSTICKRIGHT_RIGHT': 'Right Stick Right',
-        
-        # D-pad controls
-        'P1_DPAD_UP': 'D-Pad Up',
-        'P1_DPAD_DOWN': 'D-Pad Down',
-        'P1_DPAD_LEFT': 'D-Pad Left',
-        'P1_DPAD_RIGHT': 'D-Pad Right',
-        
-        # Additional arcade-specific controls
-        'P1_COIN': 'Coin',
-        'P1_SERVICE': 'Service Button',
-        'SERVICE1': 'Service Button',
-        'TEST': 'Test Button',
-        'TILT': 'Tilt',
-    }
+    return DEFAULT_CONTROL_ACTIONS
 
 # ============================================================================
 # CONFIG FILE PARSING
 # ============================================================================
 
-def load_custom_configs(mame_dir: str) -> Dict[str, str]:
-    """Load custom configurations from cfg directory"""
-    custom_configs = {}
+# Parsed cfg results persisted between runs, keyed by cfg filename + mtime + size.
+# The whole cache is dropped when CFG_CACHE_VERSION or the mapping tables change.
+CFG_CACHE_NAME = "cfg_cache.pickle"
+CFG_CACHE_VERSION = 1
+
+_cfg_cache_lock = threading.RLock()
+_cfg_cache = {'path': None, 'entries': {}, 'dirty': False}
+_cfg_cache_flush_registered = False
+
+def get_cfg_cache_path(mame_dir: str) -> str:
+    """Get the parsed cfg cache path for a MAME directory"""
+    return os.path.join(mame_dir, "preview", "cache", CFG_CACHE_NAME)
+
+def _load_cfg_cache(mame_dir: str) -> Dict[str, Dict]:
+    """Return the parsed cfg cache entries for mame_dir, loading them from disk on first use"""
+    global _cfg_cache_flush_registered
+    
+    cache_path = get_cfg_cache_path(mame_dir)
+    if _cfg_cache['path'] == cache_path:
+        return _cfg_cache['entries']
+    
+    # Switching MAME directories - write out whatever the previous one collected
+    flush_cfg_cache()
+    
+    entries = {}
+    try:
+        with open(cache_path, 'rb') as f:
+            data = pickle.load(f)
+        # Parsed mappings go through the mapping tables, so entries from other tables are stale
+        if (data.get('version') == CFG_CACHE_VERSION and
+                data.get('tables_hash') == get_mapping_tables_hash()):
+            entries = data['entries']
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Ignoring unreadable cfg cache {cache_path}: {e}")
+    
+    _cfg_cache.update(path=cache_path, entries=entries, dirty=False)
+    
+    if not _cfg_cache_flush_registered:
+        atexit.register(flush_cfg_cache)
+        _cfg_cache_flush_registered = True
+    
+    return entries
+
+def flush_cfg_cache() -> bool:
+    """Write the parsed cfg cache to disk if anything changed"""
+    with _cfg_cache_lock:
+        cache_path = _cfg_cache['path']
+        if not cache_path or not _cfg_cache['dirty']:
+            return False
+        
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = cache_path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump({'version': CFG_CACHE_VERSION, 'tables_hash': get_mapping_tables_hash(),
+                             'entries': _cfg_cache['entries']},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+            _cfg_cache['dirty'] = False
+            return True
+        except Exception as e:
+            print(f"Error saving cfg cache: {e}")
+            return False
+
+def _get_cfg_cache_entry(mame_dir: str, filename: str) -> Tuple[Optional[Dict], str]:
+    """
+    Return (cache entry, full path) for cfg/<filename>
+    The entry is reset when the file's mtime or size changed; it is None if the file doesn't exist
+    """
+    full_path = os.path.join(mame_dir, "cfg", filename)
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        return None, full_path
+    
+    entries = _load_cfg_cache(mame_dir)
+    entry = entries.get(filename)
+    if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+        entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'parsed': {}}
+        entries[filename] = entry
+    
+    return entry, full_path
+
+def _read_cfg_file(full_path: str) -> str:
+    """Read a cfg file, handling a UTF-8 BOM"""
+    with open(full_path, "rb") as f:
+        return f.read().decode('utf-8-sig')
+
+def get_cfg_controls(mame_dir: str, rom_name: str, input_mode: str = 'xinput') -> Dict[str, str]:
+    """
+    Get the parsed control mappings of cfg/<rom_name>.cfg for an input mode
+    Unchanged files are answered from the parsed cfg cache without reading or parsing them
+    """
+    with _cfg_cache_lock:
+        entry, full_path = _get_cfg_cache_entry(mame_dir, f"{rom_name}.cfg")
+        if entry is None:
+            return {}
+        
+        controls = entry['parsed'].get(input_mode)
+        if controls is None:
+            try:
+                cfg_content = _read_cfg_file(full_path)
+            except Exception as e:
+                print(f"Error loading {rom_name}.cfg: {e}")
+                return {}
+            
+            controls = parse_cfg_controls(cfg_content, input_mode, verbose=False)
+            entry['parsed'][input_mode] = controls
+            _cfg_cache['dirty'] = True
+        
+        return dict(controls)
+
+def load_custom_configs(mame_dir: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Build a manifest of the cfg directory: ROM name -> (mtime_ns, size) of its .cfg file
+    Built with a single directory scan - file contents are loaded on demand by
+    read_custom_config() and get_cfg_controls()
+    """
+    manifest = {}
     cfg_dir = os.path.join(mame_dir, "cfg")
     
     if not os.path.exists(cfg_dir):
         print(f"Config directory not found: {cfg_dir}")
-        return custom_configs
+        return manifest
 
-    for filename in os.listdir(cfg_dir):
-        if filename.endswith(".cfg"):
-            game_name = filename[:-4]
-            full_path = os.path.join(cfg_dir, filename)
-            try:
-                # Read as binary first to handle BOM
-                with open(full_path, "rb") as f:
-                    content = f.read()
-                # Decode with UTF-8-SIG to handle BOM
-                custom_configs[game_name] = content.decode('utf-8-sig')
-            except Exception as e:
-                print(f"Error loading {filename}: {e}")
+    try:
+        with os.scandir(cfg_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".cfg"):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    manifest[entry.name[:-4]] = (stat.st_mtime_ns, stat.st_size)
+                except OSError as e:
+                    print(f"Error reading {entry.name}: {e}")
+    except OSError as e:
+        print(f"Error scanning config directory {cfg_dir}: {e}")
+        return manifest
+
+    # Forget parsed results of cfg files that no longer exist
+    with _cfg_cache_lock:
+        cache_entries = _load_cfg_cache(mame_dir)
+        stale = [filename for filename in cache_entries if filename[:-4] not in manifest]
+        for filename in stale:
+            del cache_entries[filename]
+        if stale:
+            _cfg_cache['dirty'] = True
 
-    print(f"Loaded {len(custom_configs)} custom configurations")
-    return custom_configs
+    print(f"Found {len(manifest)} custom configurations")
+    return manifest
+
+def read_custom_config(mame_dir: str, rom_name: str) -> Optional[str]:
+    """Read the raw text of cfg/<rom_name>.cfg, or None if it can't be read"""
+    try:
+        return _read_cfg_file(os.path.join(mame_dir, "cfg", f"{rom_name}.cfg"))
+    except Exception as e:
+        print(f"Error loading {rom_name}.cfg: {e}")
+        return None
 
 def load_default_config(mame_dir: str) -> Tuple[Dict[str, str], Dict[str, str]]:
     """
@@ -1269,28 +2045,30 @@ def load_default_config(mame_dir: str) -> Tuple[Dict[str, str], Dict[str, str]]:
     Returns:
         Tuple of (default_controls, original_default_controls)
     """
-    cfg_dir = os.path.join(mame_dir, "cfg")
-    default_cfg_path = os.path.join(cfg_dir, "default.cfg")
-    
-    print(f"Looking for default.cfg at: {default_cfg_path}")
-    if os.path.exists(default_cfg_path):
-        try:
-            print(f"Loading default config from: {default_cfg_path}")
-            # Read file content
-            with open(default_cfg_path, "rb") as f:
-                content = f.read()
-            
-            # Parse the default mappings using the enhanced parser
-            default_controls, original_controls = parse_default_cfg(content.decode('utf-8-sig'))
-            
-            print(f"Loaded {len(default_controls)} default control mappings")
-            return default_controls, original_controls
-        except Exception as e:
-            print(f"Error loading default config: {e}")
+    with _cfg_cache_lock:
+        entry, default_cfg_path = _get_cfg_cache_entry(mame_dir, "default.cfg")
+        
+        print(f"Looking for default.cfg at: {default_cfg_path}")
+        if entry is None:
+            print("No default.cfg found in cfg directory")
             return {}, {}
-    else:
-        print("No default.cfg found in cfg directory")
-        return {}, {}
+        
+        parsed = entry['parsed'].get('default')
+        if parsed is None:
+            try:
+                print(f"Loading default config from: {default_cfg_path}")
+                # Parse the default mappings using the enhanced parser
+                parsed = parse_default_cfg(_read_cfg_file(default_cfg_path))
+            except Exception as e:
+                print(f"Error loading default config: {e}")
+                return {}, {}
+            
+            entry['parsed']['default'] = parsed
+            _cfg_cache['dirty'] = True
+        
+        default_controls, original_controls = parsed
+        print(f"Loaded {len(default_controls)} default control mappings")
+        return dict(default_controls), dict(original_controls)
 
 def parse_default_cfg(cfg_content: str) -> Tuple[Dict[str, str], Dict[str, str]]:
     """Parse default.cfg to extract all control mappings focusing on XInput format"""
@@ -1352,12 +2130,13 @@ def parse_default_cfg(cfg_content: str) -> Tuple[Dict[str, str], Dict[str, str]]
     
     return controls, original_controls
 
-def parse_cfg_controls(cfg_content: str, input_mode: str = 'xinput') -> Dict[str, str]:
+def parse_cfg_controls(cfg_content: str, input_mode: str = 'xinput', verbose: bool = True) -> Dict[str, str]:
     """Parse MAME cfg file to extract control mappings with joystick prioritization fix"""
     controls = {}
     try:
-        print(f"Parsing CFG content of length: {len(cfg_content)}")
-        print(f"Using mapping mode: {input_mode} for parsing CFG")
+        if verbose:
+            print(f"Parsing CFG content of length: {len(cfg_content)}")
+            print(f"Using mapping mode: {input_mode} for parsing CFG")
 
         # FIXED: Enhanced mapping extractor that prioritizes joystick over D-pad
         def get_preferred_mapping(mapping_str: str) -> str:
@@ -1426,7 +2205,8 @@ def parse_cfg_controls(cfg_content: str, input_mode: str = 'xinput') -> Dict[str
         if input_elem is not None:
             # Find all port elements
             all_ports = input_elem.findall('port')
-            print(f"Found {len(all_ports)} total ports in config")
+            if verbose:
+                print(f"Found {len(all_ports)} total ports in config")
 
             # Process all port elements regardless of type
             for port in all_ports:
@@ -1451,24 +2231,28 @@ def parse_cfg_controls(cfg_content: str, input_mode: str = 'xinput') -> Dict[str
                             if (dec_newseq is None or not dec_newseq.text or dec_newseq.text.strip() == "NONE"):
                                 inc_mapping = get_preferred_mapping(inc_newseq.text.strip())
                                 controls[control_type] = inc_mapping
-                                print(f"Found increment-only mapping: {control_type} -> {inc_mapping}")
+                                if verbose:
+                                    print(f"Found increment-only mapping: {control_type} -> {inc_mapping}")
                                 mapping_found = True
                             elif dec_newseq is not None and dec_newseq.text and dec_newseq.text.strip() != "NONE":
                                 inc_mapping = get_preferred_mapping(inc_newseq.text.strip())
                                 dec_mapping = get_preferred_mapping(dec_newseq.text.strip())
                                 combined_mapping = f"{inc_mapping} ||| {dec_mapping}"
                                 controls[control_type] = combined_mapping
-                                print(f"Found directional mapping: {control_type} -> {combined_mapping}")
+                                if verbose:
+                                    print(f"Found directional mapping: {control_type} -> {combined_mapping}")
                                 mapping_found = True
                         elif dec_newseq is not None and dec_newseq.text and dec_newseq.text.strip() != "NONE":
                             dec_mapping = get_preferred_mapping(dec_newseq.text.strip())
                             controls[control_type] = dec_mapping
-                            print(f"Found decrement-only mapping: {control_type} -> {dec_mapping}")
+                            if verbose:
+                                print(f"Found decrement-only mapping: {control_type} -> {dec_mapping}")
                             mapping_found = True
                         elif std_newseq is not None and std_newseq.text and std_newseq.text.strip() != "NONE":
                             mapping = get_preferred_mapping(std_newseq.text.strip())
                             controls[control_type] = mapping
-                            print(f"Found standard mapping for special control: {control_type} -> {mapping}")
+                            if verbose:
+                                print(f"Found standard mapping for special control: {control_type} -> {mapping}")
                             mapping_found = True
 
                         # If no standard mapping types found, look for any other sequence
@@ -1479,7 +2263,8 @@ def parse_cfg_controls(cfg_content: str, input_mode: str = 'xinput') -> Dict[str
                                 if seq.text and seq.text.strip() != "NONE":
                                     mapping = get_preferred_mapping(seq.text.strip())
                                     controls[control_type] = mapping
-                                    print(f"Found {seq_type} sequence mapping for {control_type} -> {mapping}")
+                                    if verbose:
+                                        print(f"Found {seq_type} sequence mapping for {control_type} -> {mapping}")
                                     mapping_found = True
                                     break
                             
@@ -1491,7 +2276,8 @@ def parse_cfg_controls(cfg_content: str, input_mode: str = 'xinput') -> Dict[str
                         if newseq is not None and newseq.text and newseq.text.strip() != "NONE":
                             mapping = get_preferred_mapping(newseq.text.strip())
                             controls[control_type] = mapping
-                            print(f"Found standard mapping: {control_type} -> {mapping}")
+                            if verbose:
+                                print(f"Found standard mapping: {control_type} -> {mapping}")
         else:
             print("No input element found in XML")
 
@@ -1501,29 +2287,49 @@ def parse_cfg_controls(cfg_content: str, input_mode: str = 'xinput') -> Dict[str
     except Exception as e:
         print(f"Unexpected error parsing cfg: {str(e)}")
 
-    print(f"Found {len(controls)} control mappings")
+    if verbose:
+        print(f"Found {len(controls)} control mappings")
     return controls
 
 # ============================================================================
 # MAPPING CONVERSION METHODS
 # ============================================================================
 
+# Bounded memo size for mapping conversion/display (mapping, mode, friendly) keys
+MAPPING_MEMO_SIZE = 4096
+
+# MAME input sequence separators: increment/decrement pairs, then alternatives
+INC_DEC_SEPARATOR = " ||| "
+OR_SEPARATOR = " OR "
+
+@lru_cache(maxsize=MAPPING_MEMO_SIZE)
+def tokenize_mapping(mapping: str) -> Tuple[Tuple[str, ...], ...]:
+    """
+    Split a MAME input sequence into increment/decrement groups of OR alternatives
+    Example: 'KEYCODE_LEFT OR JOYCODE_1_HAT1LEFT ||| KEYCODE_RIGHT'
+             -> (('KEYCODE_LEFT', 'JOYCODE_1_HAT1LEFT'), ('KEYCODE_RIGHT',))
+    """
+    return tuple(
+        tuple(part.strip() for part in group.split(OR_SEPARATOR))
+        for group in mapping.split(INC_DEC_SEPARATOR)
+    )
+
+def _mapping_prefix(token: str) -> str:
+    """Return the input type prefix of a single token (JOYCODE, XINPUT, DINPUT, KEYCODE)"""
+    return token.split('_', 1)[0]
+
+@lru_cache(maxsize=MAPPING_MEMO_SIZE)
 def convert_mapping(mapping: str, to_mode: str = 'xinput') -> str:
     """Convert between JOYCODE, XInput, and DInput mappings with support for increment/decrement pairs"""
     if not mapping:
         return mapping
     
     # Handle special format for increment/decrement pairs
-    if " ||| " in mapping:
-        # Split into increment and decrement parts
-        inc_mapping, dec_mapping = mapping.split(" ||| ")
-        
-        # Convert each part separately
-        inc_converted = convert_single_mapping(inc_mapping, to_mode)
-        dec_converted = convert_single_mapping(dec_mapping, to_mode)
-        
-        # Return combined converted mapping
-        return f"{inc_converted} ||| {dec_converted}"
+    if INC_DEC_SEPARATOR in mapping:
+        # Convert each part separately and recombine
+        return INC_DEC_SEPARATOR.join(
+            _convert_alternatives(parts, to_mode) for parts in tokenize_mapping(mapping)
+        )
     
     # For regular mappings, use the original logic
     return convert_single_mapping(mapping, to_mode)
@@ -1531,343 +2337,325 @@ def convert_mapping(mapping: str, to_mode: str = 'xinput') -> str:
 def convert_single_mapping(mapping: str, to_mode: str) -> str:
     """Convert a mapping string between JOYCODE, XInput, and DInput formats"""
     # If mapping contains multiple options (separated by OR)
-    if " OR " in mapping:
-        parts = mapping.split(" OR ")
-        
-        # Process based on target mode
-        if to_mode == 'xinput':
-            # First look for parts that are already in XInput format
-            for part in parts:
-                part = part.strip()
-                if part.startswith('XINPUT'):
-                    return part
-            
-            # No direct XInput mapping found, try to convert JOYCODE parts
-            for part in parts:
-                if part.startswith('JOYCODE'):
-                    converted = joycode_to_xinput(part.strip())
-                    if converted.startswith('XINPUT'):
-                        return converted
-                    
-        elif to_mode == 'dinput':
-            # First look for parts that are already in DInput format
-            for part in parts:
-                part = part.strip()
-                if part.startswith('DINPUT'):
-                    return part
-            
-            # No direct DInput mapping found, try to convert JOYCODE parts
-            for part in parts:
-                if part.startswith('JOYCODE'):
-                    converted = joycode_to_dinput(part.strip())
-                    if converted.startswith('DINPUT'):
-                        return converted
-                        
-        elif to_mode == 'joycode':
-            # First look for parts that are already in JOYCODE format
-            for part in parts:
-                part = part.strip()
-                if part.startswith('JOYCODE'):
-                    return part
-            
-            # Try to convert XInput to JOYCODE
-            for part in parts:
-                if part.startswith('XINPUT'):
-                    converted = xinput_to_joycode(part.strip())
-                    if converted.startswith('JOYCODE'):
-                        return converted
-                        
-            # Try to convert DInput to JOYCODE
-            for part in parts:
-                if part.startswith('DINPUT'):
-                    converted = dinput_to_joycode(part.strip())
-                    if converted.startswith('JOYCODE'):
-                        return converted
-                    
-        # If no conversion found, return the first part
-        return parts[0].strip()
+    if OR_SEPARATOR in mapping:
+        return _convert_alternatives(tokenize_mapping(mapping)[0], to_mode)
     
     # Simple direct conversion for individual mappings
-    if mapping.startswith('JOYCODE'):
-        if to_mode == 'xinput':
-            return joycode_to_xinput(mapping)
-        elif to_mode == 'dinput':
-            return joycode_to_dinput(mapping)
-    elif mapping.startswith('XINPUT'):
-        if to_mode == 'joycode':
-            return xinput_to_joycode(mapping)
-        elif to_mode == 'dinput':
-            return xinput_to_dinput(mapping)
-    elif mapping.startswith('DINPUT'):
-        if to_mode == 'joycode':
-            return dinput_to_joycode(mapping)
-        elif to_mode == 'xinput':
-            return dinput_to_xinput(mapping)
+    table = _CONVERSION_TABLES.get((_mapping_prefix(mapping), to_mode))
+    if table is not None:
+        return table.get(mapping, mapping)
     
     # If already in the right format or if no conversion found, return as is
     return mapping
 
+def _convert_alternatives(parts: Tuple[str, ...], to_mode: str) -> str:
+    """Pick or convert the best of several OR alternatives for the target mode"""
+    if len(parts) == 1:
+        return convert_single_mapping(parts[0], to_mode)
+    
+    target_prefix = _MODE_PREFIXES.get(to_mode)
+    if target_prefix:
+        # First look for parts that are already in the target format
+        for part in parts:
+            if part.startswith(target_prefix):
+                return part
+        
+        # Then try to convert the other formats, in order of preference
+        for source_prefix in _OR_CONVERSION_SOURCES[to_mode]:
+            table = _CONVERSION_TABLES[(source_prefix, to_mode)]
+            for part in parts:
+                if part.startswith(source_prefix):
+                    converted = table.get(part, part)
+                    if converted.startswith(target_prefix):
+                        return converted
+    
+    # If no conversion found, return the first part
+    return parts[0]
+
+JOYCODE_TO_XINPUT = MappingProxyType({
+    # Updated button mappings (MAME now uses SELECT/START instead of BUTTON8/9)
+    'JOYCODE_1_BUTTON1': 'XINPUT_1_A',
+    'JOYCODE_1_BUTTON2': 'XINPUT_1_B',
+    'JOYCODE_1_BUTTON3': 'XINPUT_1_X',
+    'JOYCODE_1_BUTTON4': 'XINPUT_1_Y',
+    'JOYCODE_1_BUTTON5': 'XINPUT_1_SHOULDER_L',
+    'JOYCODE_1_BUTTON6': 'XINPUT_1_SHOULDER_R',
+    'JOYCODE_1_BUTTON7': 'XINPUT_1_TRIGGER_L',  # Was BUTTON7, now often SLIDER1
+    'JOYCODE_1_BUTTON8': 'XINPUT_1_TRIGGER_R',  # Was BUTTON8, now often SLIDER2
+    
+    # NEW: Modern MAME button names
+    'JOYCODE_1_SELECT': 'XINPUT_1_BACK',      # NEW: Replaces BUTTON8
+    'JOYCODE_1_START': 'XINPUT_1_START',      # NEW: Replaces BUTTON9
+    'JOYCODE_1_BUTTON9': 'XINPUT_1_THUMB_L',
+    'JOYCODE_1_BUTTON10': 'XINPUT_1_THUMB_R',
+    
+    # UPDATED: Hat/D-pad mappings (HAT1 instead of DPAD)
+    'JOYCODE_1_HAT1UP': 'XINPUT_1_DPAD_UP',         # NEW: Replaces HATUP
+    'JOYCODE_1_HAT1DOWN': 'XINPUT_1_DPAD_DOWN',     # NEW: Replaces HATDOWN
+    'JOYCODE_1_HAT1LEFT': 'XINPUT_1_DPAD_LEFT',     # NEW: Replaces HATLEFT
+    'JOYCODE_1_HAT1RIGHT': 'XINPUT_1_DPAD_RIGHT',   # NEW: Replaces HATRIGHT
+    
+    # Legacy D-pad mappings (for backward compatibility)
+    'JOYCODE_1_HATUP': 'XINPUT_1_DPAD_UP',
+    'JOYCODE_1_HATDOWN': 'XINPUT_1_DPAD_DOWN',
+    'JOYCODE_1_HATLEFT': 'XINPUT_1_DPAD_LEFT',
+    'JOYCODE_1_HATRIGHT': 'XINPUT_1_DPAD_RIGHT',
+    
+    # UPDATED: Slider/Trigger mappings
+    'JOYCODE_1_SLIDER1': 'XINPUT_1_TRIGGER_L',           # Often used for LT
+    'JOYCODE_1_SLIDER2': 'XINPUT_1_TRIGGER_R',           # Often used for RT
+    'JOYCODE_1_SLIDER1_NEG_SWITCH': 'XINPUT_1_TRIGGER_L',
+    'JOYCODE_1_SLIDER2_NEG_SWITCH': 'XINPUT_1_TRIGGER_R',
+    'JOYCODE_1_SLIDER2_POS_SWITCH': 'XINPUT_1_TRIGGER_R',
+    
+    # Legacy Z-axis mappings (for backward compatibility)
+    'JOYCODE_1_ZAXIS_NEG_SWITCH': 'XINPUT_1_TRIGGER_L',  # Old name
+    'JOYCODE_1_ZAXIS_POS_SWITCH': 'XINPUT_1_TRIGGER_R',  # Old name
+
+    # LEFT STICK AXIS MAPPINGS (Y-axis for up/down)
+    'JOYCODE_1_YAXIS_UP_SWITCH': 'XINPUT_1_LEFTY_NEG',      # ← MISSING!
+    'JOYCODE_1_YAXIS_DOWN_SWITCH': 'XINPUT_1_LEFTY_POS',    # ← MISSING!
+    'JOYCODE_2_YAXIS_UP_SWITCH': 'XINPUT_2_LEFTY_NEG',      # ← MISSING!
+    'JOYCODE_2_YAXIS_DOWN_SWITCH': 'XINPUT_2_LEFTY_POS',    # ← MISSING!
+    
+    # LEFT STICK SLIDER2 MAPPINGS (X-axis for left/right)
+    'JOYCODE_1_SLIDER2_LEFT_SWITCH': 'XINPUT_1_LEFTX_NEG',  # ← MISSING!
+    'JOYCODE_1_SLIDER2_RIGHT_SWITCH': 'XINPUT_1_LEFTX_POS', # ← MISSING!
+    'JOYCODE_2_SLIDER2_LEFT_SWITCH': 'XINPUT_2_LEFTX_NEG',  # ← MISSING!
+    'JOYCODE_2_SLIDER2_RIGHT_SWITCH': 'XINPUT_2_LEFTX_POS', # ← MISSING!
+    
+    # RIGHT STICK MAPPINGS (RX/RY axes)
+    'JOYCODE_1_RXAXIS_NEG_SWITCH': 'XINPUT_1_RIGHTX_NEG',   # ← MISSING!
+    'JOYCODE_1_RXAXIS_POS_SWITCH': 'XINPUT_1_RIGHTX_POS',   # ← MISSING!
+    'JOYCODE_1_RYAXIS_NEG_SWITCH': 'XINPUT_1_RIGHTY_NEG',   # ← MISSING!
+    'JOYCODE_1_RYAXIS_POS_SWITCH': 'XINPUT_1_RIGHTY_POS',   # ← MISSING!
+    'JOYCODE_2_RXAXIS_NEG_SWITCH': 'XINPUT_2_RIGHTX_NEG',   # ← MISSING!
+    'JOYCODE_2_RXAXIS_POS_SWITCH': 'XINPUT_2_RIGHTX_POS',   # ← MISSING!
+    'JOYCODE_2_RYAXIS_NEG_SWITCH': 'XINPUT_2_RIGHTY_NEG',   # ← MISSING!
+    'JOYCODE_2_RYAXIS_POS_SWITCH': 'XINPUT_2_RIGHTY_POS',   # ← MISSING!
+})
+
 def joycode_to_xinput(mapping: str) -> str:
     """Convert JOYCODE to XInput format - UPDATED for latest MAME mappings"""
-    xinput_mappings = {
-        # Updated button mappings (MAME now uses SELECT/START instead of BUTTON8/9)
-        'JOYCODE_1_BUTTON1': 'XINPUT_1_A',
-        'JOYCODE_1_BUTTON2': 'XINPUT_1_B',
-        'JOYCODE_1_BUTTON3': 'XINPUT_1_X',
-        'JOYCODE_1_BUTTON4': 'XINPUT_1_Y',
-        'JOYCODE_1_BUTTON5': 'XINPUT_1_SHOULDER_L',
-        'JOYCODE_1_BUTTON6': 'XINPUT_1_SHOULDER_R',
-        'JOYCODE_1_BUTTON7': 'XINPUT_1_TRIGGER_L',  # Was BUTTON7, now often SLIDER1
-        'JOYCODE_1_BUTTON8': 'XINPUT_1_TRIGGER_R',  # Was BUTTON8, now often SLIDER2
-        
-        # NEW: Modern MAME button names
-        'JOYCODE_1_SELECT': 'XINPUT_1_BACK',      # NEW: Replaces BUTTON8
-        'JOYCODE_1_START': 'XINPUT_1_START',      # NEW: Replaces BUTTON9
-        'JOYCODE_1_BUTTON9': 'XINPUT_1_THUMB_L',
-        'JOYCODE_1_BUTTON10': 'XINPUT_1_THUMB_R',
-        
-        # UPDATED: Hat/D-pad mappings (HAT1 instead of DPAD)
-        'JOYCODE_1_HAT1UP': 'XINPUT_1_DPAD_UP',         # NEW: Replaces HATUP
-        'JOYCODE_1_HAT1DOWN': 'XINPUT_1_DPAD_DOWN',     # NEW: Replaces HATDOWN
-        'JOYCODE_1_HAT1LEFT': 'XINPUT_1_DPAD_LEFT',     # NEW: Replaces HATLEFT
-        'JOYCODE_1_HAT1RIGHT': 'XINPUT_1_DPAD_RIGHT',   # NEW: Replaces HATRIGHT
-        
-        # Legacy D-pad mappings (for backward compatibility)
-        'JOYCODE_1_HATUP': 'XINPUT_1_DPAD_UP',
-        'JOYCODE_1_HATDOWN': 'XINPUT_1_DPAD_DOWN',
-        'JOYCODE_1_HATLEFT': 'XINPUT_1_DPAD_LEFT',
-        'JOYCODE_1_HATRIGHT': 'XINPUT_1_DPAD_RIGHT',
-        
-        # UPDATED: Slider/Trigger mappings
-        'JOYCODE_1_SLIDER1': 'XINPUT_1_TRIGGER_L',           # Often used for LT
-        'JOYCODE_1_SLIDER2': 'XINPUT_1_TRIGGER_R',           # Often used for RT
-        'JOYCODE_1_SLIDER1_NEG_SWITCH': 'XINPUT_1_TRIGGER_L',
-        'JOYCODE_1_SLIDER2_NEG_SWITCH': 'XINPUT_1_TRIGGER_R',
-        'JOYCODE_1_SLIDER2_POS_SWITCH': 'XINPUT_1_TRIGGER_R',
-        
-        # Legacy Z-axis mappings (for backward compatibility)
-        'JOYCODE_1_ZAXIS_NEG_SWITCH': 'XINPUT_1_TRIGGER_L',  # Old name
-        'JOYCODE_1_ZAXIS_POS_SWITCH': 'XINPUT_1_TRIGGER_R',  # Old name
-
-        # LEFT STICK AXIS MAPPINGS (Y-axis for up/down)
-        'JOYCODE_1_YAXIS_UP_SWITCH': 'XINPUT_1_LEFTY_NEG',      # ← MISSING!
-        'JOYCODE_1_YAXIS_DOWN_SWITCH': 'XINPUT_1_LEFTY_POS',    # ← MISSING!
-        'JOYCODE_2_YAXIS_UP_SWITCH': 'XINPUT_2_LEFTY_NEG',      # ← MISSING!
-        'JOYCODE_2_YAXIS_DOWN_SWITCH': 'XINPUT_2_LEFTY_POS',    # ← MISSING!
-        
-        # LEFT STICK SLIDER2 MAPPINGS (X-axis for left/right)
-        'JOYCODE_1_SLIDER2_LEFT_SWITCH': 'XINPUT_1_LEFTX_NEG',  # ← MISSING!
-        'JOYCODE_1_SLIDER2_RIGHT_SWITCH': 'XINPUT_1_LEFTX_POS', # ← MISSING!
-        'JOYCODE_2_SLIDER2_LEFT_SWITCH': 'XINPUT_2_LEFTX_NEG',  # ← MISSING!
-        'JOYCODE_2_SLIDER2_RIGHT_SWITCH': 'XINPUT_2_LEFTX_POS', # ← MISSING!
-        
-        # RIGHT STICK MAPPINGS (RX/RY axes)
-        'JOYCODE_1_RXAXIS_NEG_SWITCH': 'XINPUT_1_RIGHTX_NEG',   # ← MISSING!
-        'JOYCODE_1_RXAXIS_POS_SWITCH': 'XINPUT_1_RIGHTX_POS',   # ← MISSING!
-        'JOYCODE_1_RYAXIS_NEG_SWITCH': 'XINPUT_1_RIGHTY_NEG',   # ← MISSING!
-        'JOYCODE_1_RYAXIS_POS_SWITCH': 'XINPUT_1_RIGHTY_POS',   # ← MISSING!
-        'JOYCODE_2_RXAXIS_NEG_SWITCH': 'XINPUT_2_RIGHTX_NEG',   # ← MISSING!
-        'JOYCODE_2_RXAXIS_POS_SWITCH': 'XINPUT_2_RIGHTX_POS',   # ← MISSING!
-        'JOYCODE_2_RYAXIS_NEG_SWITCH': 'XINPUT_2_RIGHTY_NEG',   # ← MISSING!
-        'JOYCODE_2_RYAXIS_POS_SWITCH': 'XINPUT_2_RIGHTY_POS',   # ← MISSING!
-    }
-    
-    return xinput_mappings.get(mapping, mapping)
+    return JOYCODE_TO_XINPUT.get(mapping, mapping)
 
 # Modified functions in mame_data_utils.py for 1-based DInput buttons
 
+JOYCODE_TO_DINPUT = MappingProxyType({
+    # Standard button mappings (1-based for DInput) - CHANGED
+    'JOYCODE_1_BUTTON1': 'DINPUT_1_BUTTON1',  # Button 1 -> Button 1
+    'JOYCODE_1_BUTTON2': 'DINPUT_1_BUTTON2',  # Button 2 -> Button 2
+    'JOYCODE_1_BUTTON3': 'DINPUT_1_BUTTON3',  # Button 3 -> Button 3
+    'JOYCODE_1_BUTTON4': 'DINPUT_1_BUTTON4',  # Button 4 -> Button 4
+    'JOYCODE_1_BUTTON5': 'DINPUT_1_BUTTON5',  # Button 5 -> Button 5
+    'JOYCODE_1_BUTTON6': 'DINPUT_1_BUTTON6',  # Button 6 -> Button 6
+    'JOYCODE_1_BUTTON7': 'DINPUT_1_BUTTON7',  # Button 7 -> Button 7
+    'JOYCODE_1_BUTTON8': 'DINPUT_1_BUTTON8',  # Button 8 -> Button 8
+    'JOYCODE_1_BUTTON9': 'DINPUT_1_BUTTON9',  # Button 9 -> Button 9
+    'JOYCODE_1_BUTTON10': 'DINPUT_1_BUTTON10', # Button 10 -> Button 10
+    
+    # NEW: Modern MAME button names (keep 1-based)
+    'JOYCODE_1_SELECT': 'DINPUT_1_BUTTON8',    # Select -> Button 8
+    'JOYCODE_1_START': 'DINPUT_1_BUTTON9',     # Start -> Button 9
+    
+    # D-pad mappings (unchanged)
+    'JOYCODE_1_HAT1UP': 'DINPUT_1_POV_UP',
+    'JOYCODE_1_HAT1DOWN': 'DINPUT_1_POV_DOWN',
+    'JOYCODE_1_HAT1LEFT': 'DINPUT_1_POV_LEFT',
+    'JOYCODE_1_HAT1RIGHT': 'DINPUT_1_POV_RIGHT',
+    
+    # Legacy HAT mappings
+    'JOYCODE_1_HATUP': 'DINPUT_1_POV_UP',
+    'JOYCODE_1_HATDOWN': 'DINPUT_1_POV_DOWN',
+    'JOYCODE_1_HATLEFT': 'DINPUT_1_POV_LEFT',
+    'JOYCODE_1_HATRIGHT': 'DINPUT_1_POV_RIGHT',
+    
+    # Slider/trigger mappings (unchanged)
+    'JOYCODE_1_SLIDER1': 'DINPUT_1_SLIDER0',
+    'JOYCODE_1_SLIDER2': 'DINPUT_1_SLIDER1',
+    'JOYCODE_1_SLIDER1_NEG_SWITCH': 'DINPUT_1_SLIDER0_NEG',
+    'JOYCODE_1_SLIDER2_NEG_SWITCH': 'DINPUT_1_SLIDER1_NEG',
+    'JOYCODE_1_SLIDER2_POS_SWITCH': 'DINPUT_1_SLIDER1_POS',
+    
+    # Player 2 mappings (same pattern)
+    'JOYCODE_2_BUTTON1': 'DINPUT_2_BUTTON1',
+    'JOYCODE_2_BUTTON2': 'DINPUT_2_BUTTON2',
+    'JOYCODE_2_BUTTON3': 'DINPUT_2_BUTTON3',
+    'JOYCODE_2_BUTTON4': 'DINPUT_2_BUTTON4',
+    'JOYCODE_2_BUTTON5': 'DINPUT_2_BUTTON5',
+    'JOYCODE_2_BUTTON6': 'DINPUT_2_BUTTON6',
+    'JOYCODE_2_BUTTON7': 'DINPUT_2_BUTTON7',
+    'JOYCODE_2_BUTTON8': 'DINPUT_2_BUTTON8',
+    'JOYCODE_2_BUTTON9': 'DINPUT_2_BUTTON9',
+    'JOYCODE_2_BUTTON10': 'DINPUT_2_BUTTON10',
+    
+    # Player 2 system buttons
+    'JOYCODE_2_SELECT': 'DINPUT_2_BUTTON8',
+    'JOYCODE_2_START': 'DINPUT_2_BUTTON9',
+    
+    # Player 2 D-pad
+    'JOYCODE_2_HAT1UP': 'DINPUT_2_POV_UP',
+    'JOYCODE_2_HAT1DOWN': 'DINPUT_2_POV_DOWN',
+    'JOYCODE_2_HAT1LEFT': 'DINPUT_2_POV_LEFT',
+    'JOYCODE_2_HAT1RIGHT': 'DINPUT_2_POV_RIGHT',
+})
+
 def joycode_to_dinput(mapping: str) -> str:
     """Convert JOYCODE to DInput format - MODIFIED for 1-based buttons"""
-    dinput_mappings = {
-        # Standard button mappings (1-based for DInput) - CHANGED
-        'JOYCODE_1_BUTTON1': 'DINPUT_1_BUTTON1',  # Button 1 -> Button 1
-        'JOYCODE_1_BUTTON2': 'DINPUT_1_BUTTON2',  # Button 2 -> Button 2
-        'JOYCODE_1_BUTTON3': 'DINPUT_1_BUTTON3',  # Button 3 -> Button 3
-        'JOYCODE_1_BUTTON4': 'DINPUT_1_BUTTON4',  # Button 4 -> Button 4
-        'JOYCODE_1_BUTTON5': 'DINPUT_1_BUTTON5',  # Button 5 -> Button 5
-        'JOYCODE_1_BUTTON6': 'DINPUT_1_BUTTON6',  # Button 6 -> Button 6
-        'JOYCODE_1_BUTTON7': 'DINPUT_1_BUTTON7',  # Button 7 -> Button 7
-        'JOYCODE_1_BUTTON8': 'DINPUT_1_BUTTON8',  # Button 8 -> Button 8
-        'JOYCODE_1_BUTTON9': 'DINPUT_1_BUTTON9',  # Button 9 -> Button 9
-        'JOYCODE_1_BUTTON10': 'DINPUT_1_BUTTON10', # Button 10 -> Button 10
-        
-        # NEW: Modern MAME button names (keep 1-based)
-        'JOYCODE_1_SELECT': 'DINPUT_1_BUTTON8',    # Select -> Button 8
-        'JOYCODE_1_START': 'DINPUT_1_BUTTON9',     # Start -> Button 9
-        
-        # D-pad mappings (unchanged)
-        'JOYCODE_1_HAT1UP': 'DINPUT_1_POV_UP',
-        'JOYCODE_1_HAT1DOWN': 'DINPUT_1_POV_DOWN',
-        'JOYCODE_1_HAT1LEFT': 'DINPUT_1_POV_LEFT',
-        'JOYCODE_1_HAT1RIGHT': 'DINPUT_1_POV_RIGHT',
-        
-        # Legacy HAT mappings
-        'JOYCODE_1_HATUP': 'DINPUT_1_POV_UP',
-        'JOYCODE_1_HATDOWN': 'DINPUT_1_POV_DOWN',
-        'JOYCODE_1_HATLEFT': 'DINPUT_1_POV_LEFT',
-        'JOYCODE_1_HATRIGHT': 'DINPUT_1_POV_RIGHT',
-        
-        # Slider/trigger mappings (unchanged)
-        'JOYCODE_1_SLIDER1': 'DINPUT_1_SLIDER0',
-        'JOYCODE_1_SLIDER2': 'DINPUT_1_SLIDER1',
-        'JOYCODE_1_SLIDER1_NEG_SWITCH': 'DINPUT_1_SLIDER0_NEG',
-        'JOYCODE_1_SLIDER2_NEG_SWITCH': 'DINPUT_1_SLIDER1_NEG',
-        'JOYCODE_1_SLIDER2_POS_SWITCH': 'DINPUT_1_SLIDER1_POS',
-        
-        # Player 2 mappings (same pattern)
-        'JOYCODE_2_BUTTON1': 'DINPUT_2_BUTTON1',
-        'JOYCODE_2_BUTTON2': 'DINPUT_2_BUTTON2',
-        'JOYCODE_2_BUTTON3': 'DINPUT_2_BUTTON3',
-        'JOYCODE_2_BUTTON4': 'DINPUT_2_BUTTON4',
-        'JOYCODE_2_BUTTON5': 'DINPUT_2_BUTTON5',
-        'JOYCODE_2_BUTTON6': 'DINPUT_2_BUTTON6',
-        'JOYCODE_2_BUTTON7': 'DINPUT_2_BUTTON7',
-        'JOYCODE_2_BUTTON8': 'DINPUT_2_BUTTON8',
-        'JOYCODE_2_BUTTON9': 'DINPUT_2_BUTTON9',
-        'JOYCODE_2_BUTTON10': 'DINPUT_2_BUTTON10',
-        
-        # Player 2 system buttons
-        'JOYCODE_2_SELECT': 'DINPUT_2_BUTTON8',
-        'JOYCODE_2_START': 'DINPUT_2_BUTTON9',
-        
-        # Player 2 D-pad
-        'JOYCODE_2_HAT1UP': 'DINPUT_2_POV_UP',
-        'JOYCODE_2_HAT1DOWN': 'DINPUT_2_POV_DOWN',
-        'JOYCODE_2_HAT1LEFT': 'DINPUT_2_POV_LEFT',
-        'JOYCODE_2_HAT1RIGHT': 'DINPUT_2_POV_RIGHT',
-    }
+    return JOYCODE_TO_DINPUT.get(mapping, mapping)
+
+XINPUT_TO_JOYCODE = MappingProxyType({
+    # Standard button mappings
+    'XINPUT_1_A': 'JOYCODE_1_BUTTON1',
+    'XINPUT_1_B': 'JOYCODE_1_BUTTON2',
+    'XINPUT_1_X': 'JOYCODE_1_BUTTON3',
+    'XINPUT_1_Y': 'JOYCODE_1_BUTTON4',
+    'XINPUT_1_SHOULDER_L': 'JOYCODE_1_BUTTON5',
+    'XINPUT_1_SHOULDER_R': 'JOYCODE_1_BUTTON6',
+    
+    # UPDATED: Prefer new MAME names for SELECT/START
+    'XINPUT_1_BACK': 'JOYCODE_1_SELECT',      # NEW: Use SELECT instead of BUTTON8
+    'XINPUT_1_START': 'JOYCODE_1_START',      # NEW: Use START instead of BUTTON9
+    'XINPUT_1_THUMB_L': 'JOYCODE_1_BUTTON9',
+    'XINPUT_1_THUMB_R': 'JOYCODE_1_BUTTON10',
+    
+    # UPDATED: Prefer new HAT1 names for D-pad
+    'XINPUT_1_DPAD_UP': 'JOYCODE_1_HAT1UP',       # NEW: Use HAT1UP instead of HATUP
+    'XINPUT_1_DPAD_DOWN': 'JOYCODE_1_HAT1DOWN',   # NEW: Use HAT1DOWN instead of HATDOWN
+    'XINPUT_1_DPAD_LEFT': 'JOYCODE_1_HAT1LEFT',   # NEW: Use HAT1LEFT instead of HATLEFT
+    'XINPUT_1_DPAD_RIGHT': 'JOYCODE_1_HAT1RIGHT', # NEW: Use HAT1RIGHT instead of HATRIGHT
+    
+    # UPDATED: Prefer SLIDER2 for triggers
+    'XINPUT_1_TRIGGER_L': 'JOYCODE_1_SLIDER1',     # Often mapped to SLIDER1
+    'XINPUT_1_TRIGGER_R': 'JOYCODE_1_SLIDER2',     # NEW: Use SLIDER2 instead of ZAXIS
     
-    return dinput_mappings.get(mapping, mapping)
+    # Player 2 mappings
+    'XINPUT_2_A': 'JOYCODE_2_BUTTON1',
+    'XINPUT_2_B': 'JOYCODE_2_BUTTON2',
+    'XINPUT_2_X': 'JOYCODE_2_BUTTON3',
+    'XINPUT_2_Y': 'JOYCODE_2_BUTTON4',
+    'XINPUT_2_SHOULDER_L': 'JOYCODE_2_BUTTON5',
+    'XINPUT_2_SHOULDER_R': 'JOYCODE_2_BUTTON6',
+    'XINPUT_2_BACK': 'JOYCODE_2_SELECT',      # NEW
+    'XINPUT_2_START': 'JOYCODE_2_START',      # NEW
+    'XINPUT_2_THUMB_L': 'JOYCODE_2_BUTTON9',
+    'XINPUT_2_THUMB_R': 'JOYCODE_2_BUTTON10',
+    
+    # Player 2 D-pad
+    'XINPUT_2_DPAD_UP': 'JOYCODE_2_HAT1UP',       # NEW
+    'XINPUT_2_DPAD_DOWN': 'JOYCODE_2_HAT1DOWN',   # NEW
+    'XINPUT_2_DPAD_LEFT': 'JOYCODE_2_HAT1LEFT',   # NEW
+    'XINPUT_2_DPAD_RIGHT': 'JOYCODE_2_HAT1RIGHT', # NEW
+})
 
 def xinput_to_joycode(mapping: str) -> str:
     """Convert XInput to JOYCODE format - UPDATED for latest MAME mappings"""
-    reverse_mappings = {
-        # Standard button mappings
-        'XINPUT_1_A': 'JOYCODE_1_BUTTON1',
-        'XINPUT_1_B': 'JOYCODE_1_BUTTON2',
-        'XINPUT_1_X': 'JOYCODE_1_BUTTON3',
-        'XINPUT_1_Y': 'JOYCODE_1_BUTTON4',
-        'XINPUT_1_SHOULDER_L': 'JOYCODE_1_BUTTON5',
-        'XINPUT_1_SHOULDER_R': 'JOYCODE_1_BUTTON6',
-        
-        # UPDATED: Prefer new MAME names for SELECT/START
-        'XINPUT_1_BACK': 'JOYCODE_1_SELECT',      # NEW: Use SELECT instead of BUTTON8
-        'XINPUT_1_START': 'JOYCODE_1_START',      # NEW: Use START instead of BUTTON9
-        'XINPUT_1_THUMB_L': 'JOYCODE_1_BUTTON9',
-        'XINPUT_1_THUMB_R': 'JOYCODE_1_BUTTON10',
-        
-        # UPDATED: Prefer new HAT1 names for D-pad
-        'XINPUT_1_DPAD_UP': 'JOYCODE_1_HAT1UP',       # NEW: Use HAT1UP instead of HATUP
-        'XINPUT_1_DPAD_DOWN': 'JOYCODE_1_HAT1DOWN',   # NEW: Use HAT1DOWN instead of HATDOWN
-        'XINPUT_1_DPAD_LEFT': 'JOYCODE_1_HAT1LEFT',   # NEW: Use HAT1LEFT instead of HATLEFT
-        'XINPUT_1_DPAD_RIGHT': 'JOYCODE_1_HAT1RIGHT', # NEW: Use HAT1RIGHT instead of HATRIGHT
-        
-        # UPDATED: Prefer SLIDER2 for triggers
-        'XINPUT_1_TRIGGER_L': 'JOYCODE_1_SLIDER1',     # Often mapped to SLIDER1
-        'XINPUT_1_TRIGGER_R': 'JOYCODE_1_SLIDER2',     # NEW: Use SLIDER2 instead of ZAXIS
-        
-        # Player 2 mappings
-        'XINPUT_2_A': 'JOYCODE_2_BUTTON1',
-        'XINPUT_2_B': 'JOYCODE_2_BUTTON2',
-        'XINPUT_2_X': 'JOYCODE_2_BUTTON3',
-        'XINPUT_2_Y': 'JOYCODE_2_BUTTON4',
-        'XINPUT_2_SHOULDER_L': 'JOYCODE_2_BUTTON5',
-        'XINPUT_2_SHOULDER_R': 'JOYCODE_2_BUTTON6',
-        'XINPUT_2_BACK': 'JOYCODE_2_SELECT',      # NEW
-        'XINPUT_2_START': 'JOYCODE_2_START',      # NEW
-        'XINPUT_2_THUMB_L': 'JOYCODE_2_BUTTON9',
-        'XINPUT_2_THUMB_R': 'JOYCODE_2_BUTTON10',
-        
-        # Player 2 D-pad
-        'XINPUT_2_DPAD_UP': 'JOYCODE_2_HAT1UP',       # NEW
-        'XINPUT_2_DPAD_DOWN': 'JOYCODE_2_HAT1DOWN',   # NEW
-        'XINPUT_2_DPAD_LEFT': 'JOYCODE_2_HAT1LEFT',   # NEW
-        'XINPUT_2_DPAD_RIGHT': 'JOYCODE_2_HAT1RIGHT', # NEW
-    }
-    
-    return reverse_mappings.get(mapping, mapping)
+    return XINPUT_TO_JOYCODE.get(mapping, mapping)
+
+XINPUT_TO_DINPUT = MappingProxyType({
+    'XINPUT_1_A': 'DINPUT_1_BUTTON0',
+    'XINPUT_1_B': 'DINPUT_1_BUTTON1',
+    'XINPUT_1_X': 'DINPUT_1_BUTTON2',
+    'XINPUT_1_Y': 'DINPUT_1_BUTTON3',
+    'XINPUT_1_SHOULDER_L': 'DINPUT_1_BUTTON4',
+    'XINPUT_1_SHOULDER_R': 'DINPUT_1_BUTTON5',
+    'XINPUT_1_START': 'DINPUT_1_BUTTON6',
+    'XINPUT_1_BACK': 'DINPUT_1_BUTTON7',
+    'XINPUT_1_THUMB_L': 'DINPUT_1_BUTTON8',
+    'XINPUT_1_THUMB_R': 'DINPUT_1_BUTTON9',
+})
 
 def xinput_to_dinput(mapping: str) -> str:
     """Convert XInput to DInput format"""
-    mapping_dict = {
-        'XINPUT_1_A': 'DINPUT_1_BUTTON0',
-        'XINPUT_1_B': 'DINPUT_1_BUTTON1',
-        'XINPUT_1_X': 'DINPUT_1_BUTTON2',
-        'XINPUT_1_Y': 'DINPUT_1_BUTTON3',
-        'XINPUT_1_SHOULDER_L': 'DINPUT_1_BUTTON4',
-        'XINPUT_1_SHOULDER_R': 'DINPUT_1_BUTTON5',
-        'XINPUT_1_START': 'DINPUT_1_BUTTON6',
-        'XINPUT_1_BACK': 'DINPUT_1_BUTTON7',
-        'XINPUT_1_THUMB_L': 'DINPUT_1_BUTTON8',
-        'XINPUT_1_THUMB_R': 'DINPUT_1_BUTTON9',
-    }
+    return XINPUT_TO_DINPUT.get(mapping, mapping)
+
+DINPUT_TO_JOYCODE = MappingProxyType({
+    # Standard button mappings (1-based) - CHANGED
+    'DINPUT_1_BUTTON1': 'JOYCODE_1_BUTTON1',   # Button 1 -> Button 1
+    'DINPUT_1_BUTTON2': 'JOYCODE_1_BUTTON2',   # Button 2 -> Button 2
+    'DINPUT_1_BUTTON3': 'JOYCODE_1_BUTTON3',   # Button 3 -> Button 3
+    'DINPUT_1_BUTTON4': 'JOYCODE_1_BUTTON4',   # Button 4 -> Button 4
+    'DINPUT_1_BUTTON5': 'JOYCODE_1_BUTTON5',   # Button 5 -> Button 5
+    'DINPUT_1_BUTTON6': 'JOYCODE_1_BUTTON6',   # Button 6 -> Button 6
+    'DINPUT_1_BUTTON7': 'JOYCODE_1_BUTTON7',   # Button 7 -> Button 7
+    'DINPUT_1_BUTTON8': 'JOYCODE_1_SELECT',    # Button 8 -> SELECT
+    'DINPUT_1_BUTTON9': 'JOYCODE_1_START',     # Button 9 -> START
+    'DINPUT_1_BUTTON10': 'JOYCODE_1_BUTTON10', # Button 10 -> Button 10
+    
+    # D-pad mappings (unchanged)
+    'DINPUT_1_POV_UP': 'JOYCODE_1_HAT1UP',
+    'DINPUT_1_POV_DOWN': 'JOYCODE_1_HAT1DOWN',
+    'DINPUT_1_POV_LEFT': 'JOYCODE_1_HAT1LEFT',
+    'DINPUT_1_POV_RIGHT': 'JOYCODE_1_HAT1RIGHT',
+    
+    # Slider mappings (unchanged)
+    'DINPUT_1_SLIDER0': 'JOYCODE_1_SLIDER1',
+    'DINPUT_1_SLIDER1': 'JOYCODE_1_SLIDER2',
+    'DINPUT_1_SLIDER0_NEG': 'JOYCODE_1_SLIDER1_NEG_SWITCH',
+    'DINPUT_1_SLIDER1_NEG': 'JOYCODE_1_SLIDER2_NEG_SWITCH',
+    'DINPUT_1_SLIDER1_POS': 'JOYCODE_1_SLIDER2_POS_SWITCH',
     
-    return mapping_dict.get(mapping, mapping)
+    # Player 2 mappings
+    'DINPUT_2_BUTTON1': 'JOYCODE_2_BUTTON1',
+    'DINPUT_2_BUTTON2': 'JOYCODE_2_BUTTON2',
+    'DINPUT_2_BUTTON3': 'JOYCODE_2_BUTTON3',
+    'DINPUT_2_BUTTON4': 'JOYCODE_2_BUTTON4',
+    'DINPUT_2_BUTTON5': 'JOYCODE_2_BUTTON5',
+    'DINPUT_2_BUTTON6': 'JOYCODE_2_BUTTON6',
+    'DINPUT_2_BUTTON7': 'JOYCODE_2_BUTTON7',
+    'DINPUT_2_BUTTON8': 'JOYCODE_2_SELECT',
+    'DINPUT_2_BUTTON9': 'JOYCODE_2_START',
+    
+    # Player 2 POV/HAT
+    'DINPUT_2_POV_UP': 'JOYCODE_2_HAT1UP',
+    'DINPUT_2_POV_DOWN': 'JOYCODE_2_HAT1DOWN',
+    'DINPUT_2_POV_LEFT': 'JOYCODE_2_HAT1LEFT',
+    'DINPUT_2_POV_RIGHT': 'JOYCODE_2_HAT1RIGHT',
+})
 
 def dinput_to_joycode(mapping: str) -> str:
     """Convert DInput to JOYCODE format - MODIFIED for 1-based buttons"""
-    reverse_mappings = {
-        # Standard button mappings (1-based) - CHANGED
-        'DINPUT_1_BUTTON1': 'JOYCODE_1_BUTTON1',   # Button 1 -> Button 1
-        'DINPUT_1_BUTTON2': 'JOYCODE_1_BUTTON2',   # Button 2 -> Button 2
-        'DINPUT_1_BUTTON3': 'JOYCODE_1_BUTTON3',   # Button 3 -> Button 3
-        'DINPUT_1_BUTTON4': 'JOYCODE_1_BUTTON4',   # Button 4 -> Button 4
-        'DINPUT_1_BUTTON5': 'JOYCODE_1_BUTTON5',   # Button 5 -> Button 5
-        'DINPUT_1_BUTTON6': 'JOYCODE_1_BUTTON6',   # Button 6 -> Button 6
-        'DINPUT_1_BUTTON7': 'JOYCODE_1_BUTTON7',   # Button 7 -> Button 7
-        'DINPUT_1_BUTTON8': 'JOYCODE_1_SELECT',    # Button 8 -> SELECT
-        'DINPUT_1_BUTTON9': 'JOYCODE_1_START',     # Button 9 -> START
-        'DINPUT_1_BUTTON10': 'JOYCODE_1_BUTTON10', # Button 10 -> Button 10
-        
-        # D-pad mappings (unchanged)
-        'DINPUT_1_POV_UP': 'JOYCODE_1_HAT1UP',
-        'DINPUT_1_POV_DOWN': 'JOYCODE_1_HAT1DOWN',
-        'DINPUT_1_POV_LEFT': 'JOYCODE_1_HAT1LEFT',
-        'DINPUT_1_POV_RIGHT': 'JOYCODE_1_HAT1RIGHT',
-        
-        # Slider mappings (unchanged)
-        'DINPUT_1_SLIDER0': 'JOYCODE_1_SLIDER1',
-        'DINPUT_1_SLIDER1': 'JOYCODE_1_SLIDER2',
-        'DINPUT_1_SLIDER0_NEG': 'JOYCODE_1_SLIDER1_NEG_SWITCH',
-        'DINPUT_1_SLIDER1_NEG': 'JOYCODE_1_SLIDER2_NEG_SWITCH',
-        'DINPUT_1_SLIDER1_POS': 'JOYCODE_1_SLIDER2_POS_SWITCH',
-        
-        # Player 2 mappings
-        'DINPUT_2_BUTTON1': 'JOYCODE_2_BUTTON1',
-        'DINPUT_2_BUTTON2': 'JOYCODE_2_BUTTON2',
-        'DINPUT_2_BUTTON3': 'JOYCODE_2_BUTTON3',
-        'DINPUT_2_BUTTON4': 'JOYCODE_2_BUTTON4',
-        'DINPUT_2_BUTTON5': 'JOYCODE_2_BUTTON5',
-        'DINPUT_2_BUTTON6': 'JOYCODE_2_BUTTON6',
-        'DINPUT_2_BUTTON7': 'JOYCODE_2_BUTTON7',
-        'DINPUT_2_BUTTON8': 'JOYCODE_2_SELECT',
-        'DINPUT_2_BUTTON9': 'JOYCODE_2_START',
-        
-        # Player 2 POV/HAT
-        'DINPUT_2_POV_UP': 'JOYCODE_2_HAT1UP',
-        'DINPUT_2_POV_DOWN': 'JOYCODE_2_HAT1DOWN',
-        'DINPUT_2_POV_LEFT': 'JOYCODE_2_HAT1LEFT',
-        'DINPUT_2_POV_RIGHT': 'JOYCODE_2_HAT1RIGHT',
-    }
-    
-    return reverse_mappings.get(mapping, mapping)
+    return DINPUT_TO_JOYCODE.get(mapping, mapping)
+
+DINPUT_TO_XINPUT = MappingProxyType({
+    'DINPUT_1_BUTTON0': 'XINPUT_1_A',
+    'DINPUT_1_BUTTON1': 'XINPUT_1_B',
+    'DINPUT_1_BUTTON2': 'XINPUT_1_X',
+    'DINPUT_1_BUTTON3': 'XINPUT_1_Y',
+    'DINPUT_1_BUTTON4': 'XINPUT_1_SHOULDER_L',
+    'DINPUT_1_BUTTON5': 'XINPUT_1_SHOULDER_R',
+    'DINPUT_1_BUTTON6': 'XINPUT_1_START',
+    'DINPUT_1_BUTTON7': 'XINPUT_1_BACK',
+    'DINPUT_1_BUTTON8': 'XINPUT_1_THUMB_L',
+    'DINPUT_1_BUTTON9': 'XINPUT_1_THUMB_R',
+})
 
 def dinput_to_xinput(mapping: str) -> str:
     """Convert DInput to XInput format"""
-    mapping_dict = {
-        'DINPUT_1_BUTTON0': 'XINPUT_1_A',
-        'DINPUT_1_BUTTON1': 'XINPUT_1_B',
-        'DINPUT_1_BUTTON2': 'XINPUT_1_X',
-        'DINPUT_1_BUTTON3': 'XINPUT_1_Y',
-        'DINPUT_1_BUTTON4': 'XINPUT_1_SHOULDER_L',
-        'DINPUT_1_BUTTON5': 'XINPUT_1_SHOULDER_R',
-        'DINPUT_1_BUTTON6': 'XINPUT_1_START',
-        'DINPUT_1_BUTTON7': 'XINPUT_1_BACK',
-        'DINPUT_1_BUTTON8': 'XINPUT_1_THUMB_L',
-        'DINPUT_1_BUTTON9': 'XINPUT_1_THUMB_R',
-    }
-    
-    return mapping_dict.get(mapping, mapping)
+    return DINPUT_TO_XINPUT.get(mapping, mapping)
+
+# (source prefix, target mode) -> translation table
+_CONVERSION_TABLES = MappingProxyType({
+    ('JOYCODE', 'xinput'): JOYCODE_TO_XINPUT,
+    ('JOYCODE', 'dinput'): JOYCODE_TO_DINPUT,
+    ('XINPUT', 'joycode'): XINPUT_TO_JOYCODE,
+    ('XINPUT', 'dinput'): XINPUT_TO_DINPUT,
+    ('DINPUT', 'joycode'): DINPUT_TO_JOYCODE,
+    ('DINPUT', 'xinput'): DINPUT_TO_XINPUT,
+})
+
+_MODE_PREFIXES = MappingProxyType({
+    'xinput': 'XINPUT',
+    'dinput': 'DINPUT',
+    'joycode': 'JOYCODE',
+})
+
+# Formats tried (in order) when no OR alternative is already in the target format
+_OR_CONVERSION_SOURCES = MappingProxyType({
+    'xinput': ('JOYCODE',),
+    'dinput': ('JOYCODE',),
+    'joycode': ('XINPUT', 'DINPUT'),
+})
 
 # ============================================================================
 # DISPLAY FORMATTING METHODS
@@ -1878,35 +2666,68 @@ def extract_keycode_from_mapping(mapping: str) -> str:
     if not mapping:
         return ""
     
-    # Handle increment/decrement pairs
-    if " ||| " in mapping:
-        inc_mapping, dec_mapping = mapping.split(" ||| ")
-        inc_keycode = extract_keycode_from_mapping(inc_mapping)
-        dec_keycode = extract_keycode_from_mapping(dec_mapping)
-        
-        if inc_keycode and dec_keycode:
-            return f"{inc_keycode} | {dec_keycode}"
-        elif inc_keycode:
-            return inc_keycode
-        elif dec_keycode:
-            return dec_keycode
-        else:
-            return ""
-    
-    # Handle OR statements - look for KEYCODE part
-    if " OR " in mapping:
-        parts = mapping.split(" OR ")
+    # First KEYCODE alternative of each increment/decrement part
+    keycodes = []
+    for parts in tokenize_mapping(mapping):
         for part in parts:
-            part = part.strip()
             if part.startswith('KEYCODE_'):
-                return format_keycode_display(part)
-        return ""
-    
-    # Single mapping
-    if mapping.startswith('KEYCODE_'):
-        return format_keycode_display(mapping)
+                keycodes.append(format_keycode_display(part))
+                break
     
-    return ""
+    return " | ".join(keycodes)
+
+KEYCODE_FRIENDLY_NAMES = MappingProxyType({
+    'LCONTROL': 'Left Ctrl',
+    'RCONTROL': 'Right Ctrl',
+    'LALT': 'Left Alt',
+    'RALT': 'Right Alt', 
+    'LSHIFT': 'Left Shift',
+    'RSHIFT': 'Right Shift',
+    'SPACE': 'Spacebar',
+    'ENTER': 'Enter',
+    'BACKSPACE': 'Backspace',
+    'TAB': 'Tab',
+    'ESC': 'Escape',
+    'UP': 'Up Arrow',
+    'DOWN': 'Down Arrow',
+    'LEFT': 'Left Arrow',
+    'RIGHT': 'Right Arrow',
+    'HOME': 'Home',
+    'END': 'End',
+    'PGUP': 'Page Up',
+    'PGDN': 'Page Down',
+    'DEL': 'Delete',
+    'INSERT': 'Insert',
+    'CAPSLOCK': 'Caps Lock',
+    'NUMLOCK': 'Num Lock',
+    'SCRLOCK': 'Scroll Lock',
+    'PRTSCR': 'Print Screen',
+    'PAUSE': 'Pause',
+    'MENU': 'Menu',
+    'LWIN': 'Left Windows',
+    'RWIN': 'Right Windows',
+    # Number pad keys
+    'NUMPAD0': 'Numpad 0',
+    'NUMPAD1': 'Numpad 1',
+    'NUMPAD2': 'Numpad 2',
+    'NUMPAD3': 'Numpad 3',
+    'NUMPAD4': 'Numpad 4',
+    'NUMPAD5': 'Numpad 5',
+    'NUMPAD6': 'Numpad 6',
+    'NUMPAD7': 'Numpad 7',
+    'NUMPAD8': 'Numpad 8',
+    'NUMPAD9': 'Numpad 9',
+    'NUMPADENTER': 'Numpad Enter',
+    'NUMPADPLUS': 'Numpad +',
+    'NUMPADMINUS': 'Numpad -',
+    'NUMPADSTAR': 'Numpad *',
+    'NUMPADSLASH': 'Numpad /',
+    'NUMPADDOT': 'Numpad .',
+    # Function keys
+    'F1': 'F1', 'F2': 'F2', 'F3': 'F3', 'F4': 'F4',
+    'F5': 'F5', 'F6': 'F6', 'F7': 'F7', 'F8': 'F8',
+    'F9': 'F9', 'F10': 'F10', 'F11': 'F11', 'F12': 'F12',
+})
 
 def format_keycode_display(mapping: str, friendly_names: bool = True) -> str:
     """Format KEYCODE mapping string for display - with friendly/raw toggle"""
@@ -1920,238 +2741,185 @@ def format_keycode_display(mapping: str, friendly_names: bool = True) -> str:
     key_name = mapping.replace("KEYCODE_", "")
     
     # Make common keys more readable
-    key_mappings = {
-        'LCONTROL': 'Left Ctrl',
-        'RCONTROL': 'Right Ctrl',
-        'LALT': 'Left Alt',
-        'RALT': 'Right Alt', 
-        'LSHIFT': 'Left Shift',
-        'RSHIFT': 'Right Shift',
-        'SPACE': 'Spacebar',
-        'ENTER': 'Enter',
-        'BACKSPACE': 'Backspace',
-        'TAB': 'Tab',
-        'ESC': 'Escape',
-        'UP': 'Up Arrow',
-        'DOWN': 'Down Arrow',
-        'LEFT': 'Left Arrow',
-        'RIGHT': 'Right Arrow',
-        'HOME': 'Home',
-        'END': 'End',
-        'PGUP': 'Page Up',
-        'PGDN': 'Page Down',
-        'DEL': 'Delete',
-        'INSERT': 'Insert',
-        'CAPSLOCK': 'Caps Lock',
-        'NUMLOCK': 'Num Lock',
-        'SCRLOCK': 'Scroll Lock',
-        'PRTSCR': 'Print Screen',
-        'PAUSE': 'Pause',
-        'MENU': 'Menu',
-        'LWIN': 'Left Windows',
-        'RWIN': 'Right Windows',
-        # Number pad keys
-        'NUMPAD0': 'Numpad 0',
-        'NUMPAD1': 'Numpad 1',
-        'NUMPAD2': 'Numpad 2',
-        'NUMPAD3': 'Numpad 3',
-        'NUMPAD4': 'Numpad 4',
-        'NUMPAD5': 'Numpad 5',
-        'NUMPAD6': 'Numpad 6',
-        'NUMPAD7': 'Numpad 7',
-        'NUMPAD8': 'Numpad 8',
-        'NUMPAD9': 'Numpad 9',
-        'NUMPADENTER': 'Numpad Enter',
-        'NUMPADPLUS': 'Numpad +',
-        'NUMPADMINUS': 'Numpad -',
-        'NUMPADSTAR': 'Numpad *',
-        'NUMPADSLASH': 'Numpad /',
-        'NUMPADDOT': 'Numpad .',
-        # Function keys
-        'F1': 'F1', 'F2': 'F2', 'F3': 'F3', 'F4': 'F4',
-        'F5': 'F5', 'F6': 'F6', 'F7': 'F7', 'F8': 'F8',
-        'F9': 'F9', 'F10': 'F10', 'F11': 'F11', 'F12': 'F12',
-    }
-    
-    friendly_name = key_mappings.get(key_name, key_name)
+    friendly_name = KEYCODE_FRIENDLY_NAMES.get(key_name, key_name)
     return f"Key {friendly_name}"
 
 
 # Update the get_xinput_directional_alternatives function in mame_data_utils.py
 
+XINPUT_DIRECTIONAL_ALTERNATIVES = MappingProxyType({
+    # Standard P1 Joystick directions - show both D-pad and Left Stick options
+    'P1_JOYSTICK_UP': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG',
+    'P1_JOYSTICK_DOWN': 'XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS', 
+    'P1_JOYSTICK_LEFT': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG',
+    'P1_JOYSTICK_RIGHT': 'XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
+    
+    # P1 Left Stick directions (MISSING - this is what Black Widow uses!)
+    'P1_JOYSTICKLEFT_UP': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG',
+    'P1_JOYSTICKLEFT_DOWN': 'XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
+    'P1_JOYSTICKLEFT_LEFT': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG',
+    'P1_JOYSTICKLEFT_RIGHT': 'XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
+    
+    # P1 Right Stick directions
+    'P1_JOYSTICKRIGHT_UP': 'XINPUT_1_RIGHTY_NEG',
+    'P1_JOYSTICKRIGHT_DOWN': 'XINPUT_1_RIGHTY_POS',
+    'P1_JOYSTICKRIGHT_LEFT': 'XINPUT_1_RIGHTX_NEG', 
+    'P1_JOYSTICKRIGHT_RIGHT': 'XINPUT_1_RIGHTX_POS',
+    
+    # P1 D-pad directions (if explicitly defined)
+    'P1_DPAD_UP': 'XINPUT_1_DPAD_UP',
+    'P1_DPAD_DOWN': 'XINPUT_1_DPAD_DOWN',
+    'P1_DPAD_LEFT': 'XINPUT_1_DPAD_LEFT',
+    'P1_DPAD_RIGHT': 'XINPUT_1_DPAD_RIGHT',
+    
+    # Specialized directional controls
+    'P1_AD_STICK_X': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
+    'P1_AD_STICK_Y': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
+    'P1_AD_STICK_Z': 'XINPUT_1_TRIGGER_L | XINPUT_1_TRIGGER_R',
+    
+    # Paddle controls (typically left/right movement)
+    'P1_PADDLE': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
+    'P1_PADDLE_V': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
+    
+    # Dial controls (rotary, typically left/right)
+    'P1_DIAL': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
+    'P1_DIAL_V': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
+    
+    # Trackball (X and Y axes)
+    'P1_TRACKBALL_X': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
+    'P1_TRACKBALL_Y': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
+    
+    # Mouse controls
+    'P1_MOUSE_X': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
+    'P1_MOUSE_Y': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
+    
+    # Light Gun controls
+    'P1_LIGHTGUN_X': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
+    'P1_LIGHTGUN_Y': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
+    
+    # Positional controls
+    'P1_POSITIONAL': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
+    
+    # Steering wheel (left/right)
+    'P1_STEER': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
+    
+    # P2 Joystick directions
+    'P2_JOYSTICK_UP': 'XINPUT_2_DPAD_UP | XINPUT_2_LEFTY_NEG',
+    'P2_JOYSTICK_DOWN': 'XINPUT_2_DPAD_DOWN | XINPUT_2_LEFTY_POS',
+    'P2_JOYSTICK_LEFT': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG',
+    'P2_JOYSTICK_RIGHT': 'XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
+    
+    # P2 Left Stick directions
+    'P2_JOYSTICKLEFT_UP': 'XINPUT_2_DPAD_UP | XINPUT_2_LEFTY_NEG',
+    'P2_JOYSTICKLEFT_DOWN': 'XINPUT_2_DPAD_DOWN | XINPUT_2_LEFTY_POS',
+    'P2_JOYSTICKLEFT_LEFT': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG',
+    'P2_JOYSTICKLEFT_RIGHT': 'XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
+    
+    # P2 Right Stick directions  
+    'P2_JOYSTICKRIGHT_UP': 'XINPUT_2_RIGHTY_NEG',
+    'P2_JOYSTICKRIGHT_DOWN': 'XINPUT_2_RIGHTY_POS',
+    'P2_JOYSTICKRIGHT_LEFT': 'XINPUT_2_RIGHTX_NEG',
+    'P2_JOYSTICKRIGHT_RIGHT': 'XINPUT_2_RIGHTX_POS',
+    
+    # P2 Specialized controls
+    'P2_AD_STICK_X': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG | XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
+    'P2_AD_STICK_Y': 'XINPUT_2_DPAD_UP | XINPUT_2_LEFTY_NEG | XINPUT_2_DPAD_DOWN | XINPUT_2_LEFTY_POS',
+    'P2_PADDLE': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG | XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
+    'P2_DIAL': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG | XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
+    'P2_TRACKBALL_X': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG | XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
+    'P2_TRACKBALL_Y': 'XINPUT_2_DPAD_UP | XINPUT_2_LEFTY_NEG | XINPUT_2_DPAD_DOWN | XINPUT_2_LEFTY_POS',
+})
+
 def get_xinput_directional_alternatives(control_name: str) -> str:
     """
     Get XInput alternatives for directional controls showing both D-pad and analog options
     ENHANCED: Now includes P1_JOYSTICKLEFT_* controls and specialized controls
     Returns a formatted string with multiple XInput options
     """
-    directional_mappings = {
-        # Standard P1 Joystick directions - show both D-pad and Left Stick options
-        'P1_JOYSTICK_UP': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG',
-        'P1_JOYSTICK_DOWN': 'XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS', 
-        'P1_JOYSTICK_LEFT': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG',
-        'P1_JOYSTICK_RIGHT': 'XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
-        
-        # P1 Left Stick directions (MISSING - this is what Black Widow uses!)
-        'P1_JOYSTICKLEFT_UP': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG',
-        'P1_JOYSTICKLEFT_DOWN': 'XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
-        'P1_JOYSTICKLEFT_LEFT': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG',
-        'P1_JOYSTICKLEFT_RIGHT': 'XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
-        
-        # P1 Right Stick directions
-        'P1_JOYSTICKRIGHT_UP': 'XINPUT_1_RIGHTY_NEG',
-        'P1_JOYSTICKRIGHT_DOWN': 'XINPUT_1_RIGHTY_POS',
-        'P1_JOYSTICKRIGHT_LEFT': 'XINPUT_1_RIGHTX_NEG', 
-        'P1_JOYSTICKRIGHT_RIGHT': 'XINPUT_1_RIGHTX_POS',
-        
-        # P1 D-pad directions (if explicitly defined)
-        'P1_DPAD_UP': 'XINPUT_1_DPAD_UP',
-        'P1_DPAD_DOWN': 'XINPUT_1_DPAD_DOWN',
-        'P1_DPAD_LEFT': 'XINPUT_1_DPAD_LEFT',
-        'P1_DPAD_RIGHT': 'XINPUT_1_DPAD_RIGHT',
-        
-        # Specialized directional controls
-        'P1_AD_STICK_X': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
-        'P1_AD_STICK_Y': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
-        'P1_AD_STICK_Z': 'XINPUT_1_TRIGGER_L | XINPUT_1_TRIGGER_R',
-        
-        # Paddle controls (typically left/right movement)
-        'P1_PADDLE': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
-        'P1_PADDLE_V': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
-        
-        # Dial controls (rotary, typically left/right)
-        'P1_DIAL': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
-        'P1_DIAL_V': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
-        
-        # Trackball (X and Y axes)
-        'P1_TRACKBALL_X': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
-        'P1_TRACKBALL_Y': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
-        
-        # Mouse controls
-        'P1_MOUSE_X': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
-        'P1_MOUSE_Y': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
-        
-        # Light Gun controls
-        'P1_LIGHTGUN_X': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
-        'P1_LIGHTGUN_Y': 'XINPUT_1_DPAD_UP | XINPUT_1_LEFTY_NEG | XINPUT_1_DPAD_DOWN | XINPUT_1_LEFTY_POS',
-        
-        # Positional controls
-        'P1_POSITIONAL': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
-        
-        # Steering wheel (left/right)
-        'P1_STEER': 'XINPUT_1_DPAD_LEFT | XINPUT_1_LEFTX_NEG | XINPUT_1_DPAD_RIGHT | XINPUT_1_LEFTX_POS',
-        
-        # P2 Joystick directions
-        'P2_JOYSTICK_UP': 'XINPUT_2_DPAD_UP | XINPUT_2_LEFTY_NEG',
-        'P2_JOYSTICK_DOWN': 'XINPUT_2_DPAD_DOWN | XINPUT_2_LEFTY_POS',
-        'P2_JOYSTICK_LEFT': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG',
-        'P2_JOYSTICK_RIGHT': 'XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
-        
-        # P2 Left Stick directions
-        'P2_JOYSTICKLEFT_UP': 'XINPUT_2_DPAD_UP | XINPUT_2_LEFTY_NEG',
-        'P2_JOYSTICKLEFT_DOWN': 'XINPUT_2_DPAD_DOWN | XINPUT_2_LEFTY_POS',
-        'P2_JOYSTICKLEFT_LEFT': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG',
-        'P2_JOYSTICKLEFT_RIGHT': 'XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
-        
-        # P2 Right Stick directions  
-        'P2_JOYSTICKRIGHT_UP': 'XINPUT_2_RIGHTY_NEG',
-        'P2_JOYSTICKRIGHT_DOWN': 'XINPUT_2_RIGHTY_POS',
-        'P2_JOYSTICKRIGHT_LEFT': 'XINPUT_2_RIGHTX_NEG',
-        'P2_JOYSTICKRIGHT_RIGHT': 'XINPUT_2_RIGHTX_POS',
-        
-        # P2 Specialized controls
-        'P2_AD_STICK_X': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG | XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
-        'P2_AD_STICK_Y': 'XINPUT_2_DPAD_UP | XINPUT_2_LEFTY_NEG | XINPUT_2_DPAD_DOWN | XINPUT_2_LEFTY_POS',
-        'P2_PADDLE': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG | XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
-        'P2_DIAL': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG | XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
-        'P2_TRACKBALL_X': 'XINPUT_2_DPAD_LEFT | XINPUT_2_LEFTX_NEG | XINPUT_2_DPAD_RIGHT | XINPUT_2_LEFTX_POS',
-        'P2_TRACKBALL_Y': 'XINPUT_2_DPAD_UP | XINPUT_2_LEFTY_NEG | XINPUT_2_DPAD_DOWN | XINPUT_2_LEFTY_POS',
-    }
-    
-    return directional_mappings.get(control_name, '')
+    return XINPUT_DIRECTIONAL_ALTERNATIVES.get(control_name, '')
 
 # Also update the DInput version
+DINPUT_DIRECTIONAL_ALTERNATIVES = MappingProxyType({
+    # P1 Joystick directions - show both D-Pad and Stick options with clear names
+    'P1_JOYSTICK_UP': 'D-Pad Up | Left Stick Up',
+    'P1_JOYSTICK_DOWN': 'D-Pad Down | Left Stick Down', 
+    'P1_JOYSTICK_LEFT': 'D-Pad Left | Left Stick Left',
+    'P1_JOYSTICK_RIGHT': 'D-Pad Right | Left Stick Right',
+    
+    # P1 Left Stick directions (MISSING - this is what Black Widow uses!)
+    'P1_JOYSTICKLEFT_UP': 'D-Pad Up | Left Stick Up',
+    'P1_JOYSTICKLEFT_DOWN': 'D-Pad Down | Left Stick Down',
+    'P1_JOYSTICKLEFT_LEFT': 'D-Pad Left | Left Stick Left',
+    'P1_JOYSTICKLEFT_RIGHT': 'D-Pad Right | Left Stick Right',
+    
+    # P1 Right Stick directions (if they exist)
+    'P1_JOYSTICKRIGHT_UP': 'Right Stick Up',
+    'P1_JOYSTICKRIGHT_DOWN': 'Right Stick Down',
+    'P1_JOYSTICKRIGHT_LEFT': 'Right Stick Left', 
+    'P1_JOYSTICKRIGHT_RIGHT': 'Right Stick Right',
+    
+    # Specialized directional controls with friendly names
+    'P1_AD_STICK_X': 'D-Pad Left/Right | Left Stick Left/Right',
+    'P1_AD_STICK_Y': 'D-Pad Up/Down | Left Stick Up/Down',
+    'P1_AD_STICK_Z': 'Left Trigger | Right Trigger',
+    
+    # Paddle controls
+    'P1_PADDLE': 'D-Pad Left/Right | Left Stick Left/Right',
+    'P1_PADDLE_V': 'D-Pad Up/Down | Left Stick Up/Down',
+    
+    # Dial controls
+    'P1_DIAL': 'D-Pad Left/Right | Left Stick Left/Right',
+    'P1_DIAL_V': 'D-Pad Up/Down | Left Stick Up/Down',
+    
+    # Trackball
+    'P1_TRACKBALL_X': 'D-Pad Left/Right | Left Stick Left/Right',
+    'P1_TRACKBALL_Y': 'D-Pad Up/Down | Left Stick Up/Down',
+    
+    # Mouse controls
+    'P1_MOUSE_X': 'D-Pad Left/Right | Left Stick Left/Right',
+    'P1_MOUSE_Y': 'D-Pad Up/Down | Left Stick Up/Down',
+    
+    # Light Gun
+    'P1_LIGHTGUN_X': 'D-Pad Left/Right | Left Stick Left/Right',
+    'P1_LIGHTGUN_Y': 'D-Pad Up/Down | Left Stick Up/Down',
+    
+    # Positional and Steering
+    'P1_POSITIONAL': 'D-Pad Left/Right | Left Stick Left/Right',
+    'P1_STEER': 'D-Pad Left/Right | Left Stick Left/Right',
+    
+    # P2 Joystick directions
+    'P2_JOYSTICK_UP': 'D-Pad Up | Left Stick Up',
+    'P2_JOYSTICK_DOWN': 'D-Pad Down | Left Stick Down',
+    'P2_JOYSTICK_LEFT': 'D-Pad Left | Left Stick Left',
+    'P2_JOYSTICK_RIGHT': 'D-Pad Right | Left Stick Right',
+    
+    # P2 Left Stick directions
+    'P2_JOYSTICKLEFT_UP': 'D-Pad Up | Left Stick Up',
+    'P2_JOYSTICKLEFT_DOWN': 'D-Pad Down | Left Stick Down',
+    'P2_JOYSTICKLEFT_LEFT': 'D-Pad Left | Left Stick Left',
+    'P2_JOYSTICKLEFT_RIGHT': 'D-Pad Right | Left Stick Right',
+    
+    # P2 Right Stick directions
+    'P2_JOYSTICKRIGHT_UP': 'Right Stick Up',
+    'P2_JOYSTICKRIGHT_DOWN': 'Right Stick Down',
+    'P2_JOYSTICKRIGHT_LEFT': 'Right Stick Left',
+    'P2_JOYSTICKRIGHT_RIGHT': 'Right Stick Right',
+    
+    # P2 Specialized controls
+    'P2_AD_STICK_X': 'D-Pad Left/Right | Left Stick Left/Right',
+    'P2_AD_STICK_Y': 'D-Pad Up/Down | Left Stick Up/Down',
+    'P2_PADDLE': 'D-Pad Left/Right | Left Stick Left/Right',
+    'P2_DIAL': 'D-Pad Left/Right | Left Stick Left/Right',
+    'P2_TRACKBALL_X': 'D-Pad Left/Right | Left Stick Left/Right',
+    'P2_TRACKBALL_Y': 'D-Pad Up/Down | Left Stick Up/Down',
+})
+
 def get_dinput_directional_alternatives(control_name: str) -> str:
     """
     Get DInput alternatives for directional controls with CLEAR, USER-FRIENDLY names
     ENHANCED: Now includes P1_JOYSTICKLEFT_* controls and specialized controls
     """
-    directional_mappings = {
-        # P1 Joystick directions - show both D-Pad and Stick options with clear names
-        'P1_JOYSTICK_UP': 'D-Pad Up | Left Stick Up',
-        'P1_JOYSTICK_DOWN': 'D-Pad Down | Left Stick Down', 
-        'P1_JOYSTICK_LEFT': 'D-Pad Left | Left Stick Left',
-        'P1_JOYSTICK_RIGHT': 'D-Pad Right | Left Stick Right',
-        
-        # P1 Left Stick directions (MISSING - this is what Black Widow uses!)
-        'P1_JOYSTICKLEFT_UP': 'D-Pad Up | Left Stick Up',
-        'P1_JOYSTICKLEFT_DOWN': 'D-Pad Down | Left Stick Down',
-        'P1_JOYSTICKLEFT_LEFT': 'D-Pad Left | Left Stick Left',
-        'P1_JOYSTICKLEFT_RIGHT': 'D-Pad Right | Left Stick Right',
-        
-        # P1 Right Stick directions (if they exist)
-        'P1_JOYSTICKRIGHT_UP': 'Right Stick Up',
-        'P1_JOYSTICKRIGHT_DOWN': 'Right Stick Down',
-        'P1_JOYSTICKRIGHT_LEFT': 'Right Stick Left', 
-        'P1_JOYSTICKRIGHT_RIGHT': 'Right Stick Right',
-        
-        # Specialized directional controls with friendly names
-        'P1_AD_STICK_X': 'D-Pad Left/Right | Left Stick Left/Right',
-        'P1_AD_STICK_Y': 'D-Pad Up/Down | Left Stick Up/Down',
-        'P1_AD_STICK_Z': 'Left Trigger | Right Trigger',
-        
-        # Paddle controls
-        'P1_PADDLE': 'D-Pad Left/Right | Left Stick Left/Right',
-        'P1_PADDLE_V': 'D-Pad Up/Down | Left Stick Up/Down',
-        
-        # Dial controls
-        'P1_DIAL': 'D-Pad Left/Right | Left Stick Left/Right',
-        'P1_DIAL_V': 'D-Pad Up/Down | Left Stick Up/Down',
-        
-        # Trackball
-        'P1_TRACKBALL_X': 'D-Pad Left/Right | Left Stick Left/Right',
-        'P1_TRACKBALL_Y': 'D-Pad Up/Down | Left Stick Up/Down',
-        
-        # Mouse controls
-        'P1_MOUSE_X': 'D-Pad Left/Right | Left Stick Left/Right',
-        'P1_MOUSE_Y': 'D-Pad Up/Down | Left Stick Up/Down',
-        
-        # Light Gun
-        'P1_LIGHTGUN_X': 'D-Pad Left/Right | Left Stick Left/Right',
-        'P1_LIGHTGUN_Y': 'D-Pad Up/Down | Left Stick Up/Down',
-        
-        # Positional and Steering
-        'P1_POSITIONAL': 'D-Pad Left/Right | Left Stick Left/Right',
-        'P1_STEER': 'D-Pad Left/Right | Left Stick Left/Right',
-        
-        # P2 Joystick directions
-        'P2_JOYSTICK_UP': 'D-Pad Up | Left Stick Up',
-        'P2_JOYSTICK_DOWN': 'D-Pad Down | Left Stick Down',
-        'P2_JOYSTICK_LEFT': 'D-Pad Left | Left Stick Left',
-        'P2_JOYSTICK_RIGHT': 'D-Pad Right | Left Stick Right',
-        
-        # P2 Left Stick directions
-        'P2_JOYSTICKLEFT_UP': 'D-Pad Up | Left Stick Up',
-        'P2_JOYSTICKLEFT_DOWN': 'D-Pad Down | Left Stick Down',
-        'P2_JOYSTICKLEFT_LEFT': 'D-Pad Left | Left Stick Left',
-        'P2_JOYSTICKLEFT_RIGHT': 'D-Pad Right | Left Stick Right',
-        
-        # P2 Right Stick directions
-        'P2_JOYSTICKRIGHT_UP': 'Right Stick Up',
-        'P2_JOYSTICKRIGHT_DOWN': 'Right Stick Down',
-        'P2_JOYSTICKRIGHT_LEFT': 'Right Stick Left',
-        'P2_JOYSTICKRIGHT_RIGHT': 'Right Stick Right',
-        
-        # P2 Specialized controls
-        'P2_AD_STICK_X': 'D-Pad Left/Right | Left Stick Left/Right',
-        'P2_AD_STICK_Y': 'D-Pad Up/Down | Left Stick Up/Down',
-        'P2_PADDLE': 'D-Pad Left/Right | Left Stick Left/Right',
-        'P2_DIAL': 'D-Pad Left/Right | Left Stick Left/Right',
-        'P2_TRACKBALL_X': 'D-Pad Left/Right | Left Stick Left/Right',
-        'P2_TRACKBALL_Y': 'D-Pad Up/Down | Left Stick Up/Down',
-    }
-    
-    return directional_mappings.get(control_name, '')
+    return DINPUT_DIRECTIONAL_ALTERNATIVES.get(control_name, '')
 
 def get_friendly_xinput_alternatives(xinput_mapping: str) -> str:
     """
@@ -2193,6 +2961,33 @@ def get_friendly_xinput_alternatives(xinput_mapping: str) -> str:
     
     return ' | '.join(friendly_parts)
 
+XINPUT_FRIENDLY_NAMES = MappingProxyType({
+    "A": "A Button",
+    "B": "B Button", 
+    "X": "X Button",
+    "Y": "Y Button",
+    "SHOULDER_L": "LB Button",
+    "SHOULDER_R": "RB Button",
+    "TRIGGER_L": "Left Trigger",
+    "TRIGGER_R": "Right Trigger",
+    "THUMB_L": "Left Stick Button",
+    "THUMB_R": "Right Stick Button",
+    "DPAD_UP": "D-Pad Up",
+    "DPAD_DOWN": "D-Pad Down",
+    "DPAD_LEFT": "D-Pad Left",
+    "DPAD_RIGHT": "D-Pad Right",
+    "LEFTX_NEG": "Left Stick Left",
+    "LEFTX_POS": "Left Stick Right",
+    "LEFTY_NEG": "Left Stick Up",
+    "LEFTY_POS": "Left Stick Down",
+    "RIGHTX_NEG": "Right Stick Left",
+    "RIGHTX_POS": "Right Stick Right",
+    "RIGHTY_NEG": "Right Stick Up",
+    "RIGHTY_POS": "Right Stick Down",
+    "START": "Start Button",
+    "BACK": "Back Button"
+})
+
 def get_friendly_xinput_name(mapping: str, friendly_names: bool = True) -> str:
     """Convert an XINPUT mapping code into a human-friendly button/stick name - with toggle"""
     if not mapping or not mapping.startswith('XINPUT_'):
@@ -2206,35 +3001,9 @@ def get_friendly_xinput_name(mapping: str, friendly_names: bool = True) -> str:
     if len(parts) < 3:
         return mapping
     action = parts[2]
-    
-    friendly_map = {
-        "A": "A Button",
-        "B": "B Button", 
-        "X": "X Button",
-        "Y": "Y Button",
-        "SHOULDER_L": "LB Button",
-        "SHOULDER_R": "RB Button",
-        "TRIGGER_L": "Left Trigger",
-        "TRIGGER_R": "Right Trigger",
-        "THUMB_L": "Left Stick Button",
-        "THUMB_R": "Right Stick Button",
-        "DPAD_UP": "D-Pad Up",
-        "DPAD_DOWN": "D-Pad Down",
-        "DPAD_LEFT": "D-Pad Left",
-        "DPAD_RIGHT": "D-Pad Right",
-        "LEFTX_NEG": "Left Stick Left",
-        "LEFTX_POS": "Left Stick Right",
-        "LEFTY_NEG": "Left Stick Up",
-        "LEFTY_POS": "Left Stick Down",
-        "RIGHTX_NEG": "Right Stick Left",
-        "RIGHTX_POS": "Right Stick Right",
-        "RIGHTY_NEG": "Right Stick Up",
-        "RIGHTY_POS": "Right Stick Down",
-        "START": "Start Button",
-        "BACK": "Back Button"
-    }
-    return friendly_map.get(action, action)
+    return XINPUT_FRIENDLY_NAMES.get(action, action)
 
+@lru_cache(maxsize=MAPPING_MEMO_SIZE)
 def get_friendly_dinput_name(mapping: str, friendly_names: bool = True) -> str:
     """Convert a DINPUT mapping code into a human-friendly name - COMPLETE VERSION"""
     if not mapping or not mapping.startswith('DINPUT_'):
@@ -2335,6 +3104,7 @@ def get_friendly_dinput_name(mapping: str, friendly_names: bool = True) -> str:
     # Fallback
     return f"DInput {player_num} {action}"
 
+@lru_cache(maxsize=MAPPING_MEMO_SIZE)
 def format_joycode_display(mapping: str, friendly_names: bool = True) -> str:
     """Format JOYCODE mapping string for display - with friendly/raw toggle."""
     if not mapping or not "JOYCODE" in mapping:
@@ -2411,6 +3181,7 @@ def format_joycode_display(mapping: str, friendly_names: bool = True) -> str:
             
     return mapping
 
+@lru_cache(maxsize=MAPPING_MEMO_SIZE)
 def format_mapping_display(mapping: str, input_mode: str = 'xinput', friendly_names: bool = True) -> str:
     """Format the mapping string for display using friendly names for the current input mode - with toggle."""
     
@@ -2419,8 +3190,8 @@ def format_mapping_display(mapping: str, input_mode: str = 'xinput', friendly_na
         return mapping
     
     # Handle OR statements by finding matching parts
-    if " OR " in mapping:
-        parts = mapping.split(" OR ")
+    if OR_SEPARATOR in mapping:
+        parts = mapping.split(OR_SEPARATOR)
         
         # Find part matching the current input mode
         for part in parts:
@@ -2437,13 +3208,6 @@ def format_mapping_display(mapping: str, input_mode: str = 'xinput', friendly_na
             elif input_mode == 'keycode' and "KEYCODE" in part:
                 mapping = part
                 break
-        
-        # If no matching part found, use the first keycode part in keycode mode
-        if " OR " in mapping and input_mode == 'keycode':
-            for part in parts:
-                if "KEYCODE" in part.strip():
-                    mapping = part.strip()
-                    break
     
     # Format based on the current input mode
     if input_mode == 'keycode':
@@ -2495,203 +3259,200 @@ def format_mapping_display(mapping: str, input_mode: str = 'xinput', friendly_na
 # DATA PROCESSING METHODS
 # ============================================================================
 
+DEFAULT_MAME_MAPPINGS = MappingProxyType({
+    'xinput': MappingProxyType({
+        # ===== EXISTING MAPPINGS (keep these) =====
+        'P1_BUTTON1': 'XINPUT_1_A',
+        'P1_BUTTON2': 'XINPUT_1_B', 
+        'P1_BUTTON3': 'XINPUT_1_X',
+        'P1_BUTTON4': 'XINPUT_1_Y',
+        'P1_BUTTON5': 'XINPUT_1_SHOULDER_L',
+        'P1_BUTTON6': 'XINPUT_1_SHOULDER_R',
+        'P1_BUTTON7': 'XINPUT_1_TRIGGER_L',      # ← ADD MISSING
+        'P1_BUTTON8': 'XINPUT_1_TRIGGER_R',      # ← ADD MISSING
+        'P1_BUTTON9': 'XINPUT_1_THUMB_L',
+        'P1_BUTTON10': 'XINPUT_1_THUMB_R',
+        
+        # ===== MISSING SYSTEM CONTROLS =====
+        'P1_START': 'XINPUT_1_START',            # ← ADD MISSING
+        'P1_SELECT': 'XINPUT_1_BACK',            # ← ADD MISSING
+        
+        # Directional Controls (existing)
+        'P1_JOYSTICK_UP': 'XINPUT_1_LEFTY_NEG',     # ← FIXED: was DPAD_UP
+        'P1_JOYSTICK_DOWN': 'XINPUT_1_LEFTY_POS',   # ← FIXED: was DPAD_DOWN  
+        'P1_JOYSTICK_LEFT': 'XINPUT_1_LEFTX_NEG',   # ← FIXED: was DPAD_LEFT
+        'P1_JOYSTICK_RIGHT': 'XINPUT_1_LEFTX_POS',  # ← FIXED: was DPAD_RIGHT
+        
+        'P1_JOYSTICKLEFT_UP': 'XINPUT_1_LEFTY_NEG',
+        'P1_JOYSTICKLEFT_DOWN': 'XINPUT_1_LEFTY_POS',
+        'P1_JOYSTICKLEFT_LEFT': 'XINPUT_1_LEFTX_NEG',
+        'P1_JOYSTICKLEFT_RIGHT': 'XINPUT_1_LEFTX_POS',
+        'P1_JOYSTICKRIGHT_UP': 'XINPUT_1_RIGHTY_NEG',
+        'P1_JOYSTICKRIGHT_DOWN': 'XINPUT_1_RIGHTY_POS',
+        'P1_JOYSTICKRIGHT_LEFT': 'XINPUT_1_RIGHTX_NEG',
+        'P1_JOYSTICKRIGHT_RIGHT': 'XINPUT_1_RIGHTX_POS',
+        
+        # ===== MISSING D-PAD EXPLICIT CONTROLS =====
+        'P1_DPAD_UP': 'XINPUT_1_DPAD_UP',           # ← ADD MISSING
+        'P1_DPAD_DOWN': 'XINPUT_1_DPAD_DOWN',       # ← ADD MISSING
+        'P1_DPAD_LEFT': 'XINPUT_1_DPAD_LEFT',       # ← ADD MISSING
+        'P1_DPAD_RIGHT': 'XINPUT_1_DPAD_RIGHT',     # ← ADD MISSING
+        
+        # Specialized Controls (existing - keep these)
+        'P1_PEDAL': 'XINPUT_1_TRIGGER_R',
+        'P1_PEDAL2': 'XINPUT_1_TRIGGER_L',
+        'P1_AD_STICK_X': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
+        'P1_AD_STICK_Y': 'XINPUT_1_LEFTY_NEG ||| XINPUT_1_LEFTY_POS',
+        'P1_AD_STICK_Z': 'XINPUT_1_TRIGGER_L ||| XINPUT_1_TRIGGER_R',
+        'P1_DIAL': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
+        'P1_DIAL_V': 'XINPUT_1_LEFTY_NEG ||| XINPUT_1_LEFTY_POS',
+        'P1_PADDLE': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
+        'P1_TRACKBALL_X': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
+        'P1_TRACKBALL_Y': 'XINPUT_1_LEFTY_NEG ||| XINPUT_1_LEFTY_POS',
+        'P1_MOUSE_X': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
+        'P1_MOUSE_Y': 'XINPUT_1_LEFTY_NEG ||| XINPUT_1_LEFTY_POS',
+        'P1_LIGHTGUN_X': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
+        'P1_LIGHTGUN_Y': 'XINPUT_1_LEFTY_NEG ||| XINPUT_1_LEFTY_POS',
+        'P1_POSITIONAL': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
+        'P1_STEER': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
+        
+        # ===== MISSING GAMBLING CONTROLS =====
+        'P1_GAMBLE_HIGH': 'XINPUT_1_SHOULDER_R',    # ← ADD MISSING (uses BUTTON6)
+        'P1_GAMBLE_LOW': 'XINPUT_1_SHOULDER_L',     # ← ADD MISSING (uses BUTTON5)
+    }),
+    'dinput': MappingProxyType({
+        # Player 1 Standard Buttons (1-based for DInput) - CHANGED
+        'P1_BUTTON1': 'DINPUT_1_BUTTON1',  # Button 1 -> Button 1
+        'P1_BUTTON2': 'DINPUT_1_BUTTON2',  # Button 2 -> Button 2
+        'P1_BUTTON3': 'DINPUT_1_BUTTON3',  # Button 3 -> Button 3
+        'P1_BUTTON4': 'DINPUT_1_BUTTON4',  # Button 4 -> Button 4
+        'P1_BUTTON5': 'DINPUT_1_BUTTON5',  # Button 5 -> Button 5
+        'P1_BUTTON6': 'DINPUT_1_BUTTON6',  # Button 6 -> Button 6
+        'P1_BUTTON7': 'DINPUT_1_BUTTON7',  # Button 7 -> Button 7
+        'P1_BUTTON8': 'DINPUT_1_BUTTON8',  # Button 8 -> Button 8
+        'P1_BUTTON9': 'DINPUT_1_BUTTON9',  # Button 9 -> Button 9
+        'P1_BUTTON10': 'DINPUT_1_BUTTON10', # Button 10 -> Button 10
+        
+        # Player 1 Directional Controls (unchanged)
+        'P1_JOYSTICK_UP': 'DINPUT_1_POV_UP',
+        'P1_JOYSTICK_DOWN': 'DINPUT_1_POV_DOWN',
+        'P1_JOYSTICK_LEFT': 'DINPUT_1_POV_LEFT',
+        'P1_JOYSTICK_RIGHT': 'DINPUT_1_POV_RIGHT',
+        'P1_JOYSTICKLEFT_UP': 'DINPUT_1_YAXIS_NEG',
+        'P1_JOYSTICKLEFT_DOWN': 'DINPUT_1_YAXIS_POS',
+        'P1_JOYSTICKLEFT_LEFT': 'DINPUT_1_XAXIS_NEG',
+        'P1_JOYSTICKLEFT_RIGHT': 'DINPUT_1_XAXIS_POS',
+        'P1_JOYSTICKRIGHT_UP': 'DINPUT_1_RYAXIS_NEG',
+        'P1_JOYSTICKRIGHT_DOWN': 'DINPUT_1_RYAXIS_POS',
+        'P1_JOYSTICKRIGHT_LEFT': 'DINPUT_1_RXAXIS_NEG',
+        'P1_JOYSTICKRIGHT_RIGHT': 'DINPUT_1_RXAXIS_POS',
+        
+        # Player 1 System Controls (changed to match 1-based)
+        'P1_START': 'DINPUT_1_BUTTON9',    # Start -> Button 9
+        'P1_SELECT': 'DINPUT_1_BUTTON10',  # Select -> Button 10
+        
+        # Player 1 Specialized Controls (unchanged)
+        'P1_PEDAL': 'DINPUT_1_ZAXIS_POS',
+        'P1_PEDAL2': 'DINPUT_1_ZAXIS_NEG',
+        'P1_AD_STICK_X': 'DINPUT_1_XAXIS_NEG ||| DINPUT_1_XAXIS_POS',
+        'P1_AD_STICK_Y': 'DINPUT_1_YAXIS_NEG ||| DINPUT_1_YAXIS_POS',
+        'P1_DIAL': 'DINPUT_1_XAXIS_NEG ||| DINPUT_1_XAXIS_POS',
+        'P1_PADDLE': 'DINPUT_1_XAXIS_NEG ||| DINPUT_1_XAXIS_POS',
+        'P1_TRACKBALL_X': 'DINPUT_1_XAXIS_NEG ||| DINPUT_1_XAXIS_POS',
+        'P1_TRACKBALL_Y': 'DINPUT_1_YAXIS_NEG ||| DINPUT_1_YAXIS_POS',
+        
+        # Player 2 Controls (same 1-based pattern)
+        'P2_BUTTON1': 'DINPUT_2_BUTTON1',
+        'P2_BUTTON2': 'DINPUT_2_BUTTON2',
+        'P2_BUTTON3': 'DINPUT_2_BUTTON3',
+        'P2_BUTTON4': 'DINPUT_2_BUTTON4',
+        'P2_BUTTON5': 'DINPUT_2_BUTTON5',
+        'P2_BUTTON6': 'DINPUT_2_BUTTON6',
+        'P2_JOYSTICK_UP': 'DINPUT_2_POV_UP',
+        'P2_JOYSTICK_DOWN': 'DINPUT_2_POV_DOWN',
+        'P2_JOYSTICK_LEFT': 'DINPUT_2_POV_LEFT',
+        'P2_JOYSTICK_RIGHT': 'DINPUT_2_POV_RIGHT',
+        'P2_START': 'DINPUT_2_BUTTON9',
+        'P2_SELECT': 'DINPUT_2_BUTTON10',
+    }),
+    'keycode': MappingProxyType({
+        # Player 1 Standard Buttons (common keyboard defaults)
+        'P1_BUTTON1': 'KEYCODE_LCONTROL',  # Ctrl = Fire/Primary
+        'P1_BUTTON2': 'KEYCODE_LALT',      # Alt = Jump/Secondary  
+        'P1_BUTTON3': 'KEYCODE_SPACE',     # Space = Action
+        'P1_BUTTON4': 'KEYCODE_LSHIFT',    # Shift = Run/Modifier
+        'P1_BUTTON5': 'KEYCODE_Z',         # Z = Button 5
+        'P1_BUTTON6': 'KEYCODE_X',         # X = Button 6
+        'P1_BUTTON7': 'KEYCODE_C',         # C = Button 7
+        'P1_BUTTON8': 'KEYCODE_V',         # V = Button 8
+        'P1_BUTTON9': 'KEYCODE_B',         # B = Button 9
+        'P1_BUTTON10': 'KEYCODE_N',        # N = Button 10
+        
+        # Player 1 Directional Controls (Arrow Keys)
+        'P1_JOYSTICK_UP': 'KEYCODE_UP',
+        'P1_JOYSTICK_DOWN': 'KEYCODE_DOWN',
+        'P1_JOYSTICK_LEFT': 'KEYCODE_LEFT',
+        'P1_JOYSTICK_RIGHT': 'KEYCODE_RIGHT',
+        'P1_JOYSTICKLEFT_UP': 'KEYCODE_UP',
+        'P1_JOYSTICKLEFT_DOWN': 'KEYCODE_DOWN',
+        'P1_JOYSTICKLEFT_LEFT': 'KEYCODE_LEFT',
+        'P1_JOYSTICKLEFT_RIGHT': 'KEYCODE_RIGHT',
+        
+        # Player 1 System Controls
+        'P1_START': 'KEYCODE_1',           # 1 = Start/Coin
+        'P1_SELECT': 'KEYCODE_5',          # 5 = Coin
+        
+        # Player 1 Specialized Controls (use same directional keys)
+        'P1_AD_STICK_X': 'KEYCODE_LEFT ||| KEYCODE_RIGHT',
+        'P1_AD_STICK_Y': 'KEYCODE_UP ||| KEYCODE_DOWN',
+        'P1_DIAL': 'KEYCODE_LEFT ||| KEYCODE_RIGHT',
+        'P1_PADDLE': 'KEYCODE_LEFT ||| KEYCODE_RIGHT',
+        'P1_TRACKBALL_X': 'KEYCODE_LEFT ||| KEYCODE_RIGHT',
+        'P1_TRACKBALL_Y': 'KEYCODE_UP ||| KEYCODE_DOWN',
+        'P1_PEDAL': 'KEYCODE_LCONTROL',
+        'P1_PEDAL2': 'KEYCODE_LALT',
+        
+        # Player 2 Controls (WASD + different keys)
+        'P2_BUTTON1': 'KEYCODE_A',         # A = P2 Fire
+        'P2_BUTTON2': 'KEYCODE_S',         # S = P2 Secondary
+        'P2_BUTTON3': 'KEYCODE_Q',         # Q = P2 Button 3
+        'P2_BUTTON4': 'KEYCODE_W',         # W = P2 Button 4
+        'P2_BUTTON5': 'KEYCODE_E',         # E = P2 Button 5
+        'P2_BUTTON6': 'KEYCODE_D',         # D = P2 Button 6
+        'P2_JOYSTICK_UP': 'KEYCODE_R',     # R = P2 Up
+        'P2_JOYSTICK_DOWN': 'KEYCODE_F',   # F = P2 Down
+        'P2_JOYSTICK_LEFT': 'KEYCODE_D',   # D = P2 Left
+        'P2_JOYSTICK_RIGHT': 'KEYCODE_G',  # G = P2 Right
+        'P2_START': 'KEYCODE_2',           # 2 = P2 Start
+        'P2_SELECT': 'KEYCODE_6',          # 6 = P2 Coin
+    }),
+    'joycode': MappingProxyType({
+        # Player 1 Standard Buttons
+        'P1_BUTTON1': 'JOYCODE_1_BUTTON1',
+        'P1_BUTTON2': 'JOYCODE_1_BUTTON2',
+        'P1_BUTTON3': 'JOYCODE_1_BUTTON3',
+        'P1_BUTTON4': 'JOYCODE_1_BUTTON4',
+        'P1_BUTTON5': 'JOYCODE_1_BUTTON5',
+        'P1_BUTTON6': 'JOYCODE_1_BUTTON6',
+        'P1_BUTTON7': 'JOYCODE_1_BUTTON7',
+        'P1_BUTTON8': 'JOYCODE_1_BUTTON8',
+        
+        # Player 1 Directional Controls
+        'P1_JOYSTICK_UP': 'JOYCODE_1_HAT1UP',
+        'P1_JOYSTICK_DOWN': 'JOYCODE_1_HAT1DOWN',
+        'P1_JOYSTICK_LEFT': 'JOYCODE_1_HAT1LEFT',
+        'P1_JOYSTICK_RIGHT': 'JOYCODE_1_HAT1RIGHT',
+        
+        # Player 1 System Controls
+        'P1_START': 'JOYCODE_1_START',
+        'P1_SELECT': 'JOYCODE_1_SELECT',
+    }),
+})
+
 def get_default_mame_mappings(input_mode: str = 'xinput') -> Dict[str, str]:
     """Get MAME's default control mappings - ENHANCED with missing system controls"""
-    
-    if input_mode == 'xinput':
-        return {
-            # ===== EXISTING MAPPINGS (keep these) =====
-            'P1_BUTTON1': 'XINPUT_1_A',
-            'P1_BUTTON2': 'XINPUT_1_B', 
-            'P1_BUTTON3': 'XINPUT_1_X',
-            'P1_BUTTON4': 'XINPUT_1_Y',
-            'P1_BUTTON5': 'XINPUT_1_SHOULDER_L',
-            'P1_BUTTON6': 'XINPUT_1_SHOULDER_R',
-            'P1_BUTTON7': 'XINPUT_1_TRIGGER_L',      # ← ADD MISSING
-            'P1_BUTTON8': 'XINPUT_1_TRIGGER_R',      # ← ADD MISSING
-            'P1_BUTTON9': 'XINPUT_1_THUMB_L',
-            'P1_BUTTON10': 'XINPUT_1_THUMB_R',
-            
-            # ===== MISSING SYSTEM CONTROLS =====
-            'P1_START': 'XINPUT_1_START',            # ← ADD MISSING
-            'P1_SELECT': 'XINPUT_1_BACK',            # ← ADD MISSING
-            
-            # Directional Controls (existing)
-            'P1_JOYSTICK_UP': 'XINPUT_1_LEFTY_NEG',     # ← FIXED: was DPAD_UP
-            'P1_JOYSTICK_DOWN': 'XINPUT_1_LEFTY_POS',   # ← FIXED: was DPAD_DOWN  
-            'P1_JOYSTICK_LEFT': 'XINPUT_1_LEFTX_NEG',   # ← FIXED: was DPAD_LEFT
-            'P1_JOYSTICK_RIGHT': 'XINPUT_1_LEFTX_POS',  # ← FIXED: was DPAD_RIGHT
-            
-            'P1_JOYSTICKLEFT_UP': 'XINPUT_1_LEFTY_NEG',
-            'P1_JOYSTICKLEFT_DOWN': 'XINPUT_1_LEFTY_POS',
-            'P1_JOYSTICKLEFT_LEFT': 'XINPUT_1_LEFTX_NEG',
-            'P1_JOYSTICKLEFT_RIGHT': 'XINPUT_1_LEFTX_POS',
-            'P1_JOYSTICKRIGHT_UP': 'XINPUT_1_RIGHTY_NEG',
-            'P1_JOYSTICKRIGHT_DOWN': 'XINPUT_1_RIGHTY_POS',
-            'P1_JOYSTICKRIGHT_LEFT': 'XINPUT_1_RIGHTX_NEG',
-            'P1_JOYSTICKRIGHT_RIGHT': 'XINPUT_1_RIGHTX_POS',
-            
-            # ===== MISSING D-PAD EXPLICIT CONTROLS =====
-            'P1_DPAD_UP': 'XINPUT_1_DPAD_UP',           # ← ADD MISSING
-            'P1_DPAD_DOWN': 'XINPUT_1_DPAD_DOWN',       # ← ADD MISSING
-            'P1_DPAD_LEFT': 'XINPUT_1_DPAD_LEFT',       # ← ADD MISSING
-            'P1_DPAD_RIGHT': 'XINPUT_1_DPAD_RIGHT',     # ← ADD MISSING
-            
-            # Specialized Controls (existing - keep these)
-            'P1_PEDAL': 'XINPUT_1_TRIGGER_R',
-            'P1_PEDAL2': 'XINPUT_1_TRIGGER_L',
-            'P1_AD_STICK_X': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
-            'P1_AD_STICK_Y': 'XINPUT_1_LEFTY_NEG ||| XINPUT_1_LEFTY_POS',
-            'P1_AD_STICK_Z': 'XINPUT_1_TRIGGER_L ||| XINPUT_1_TRIGGER_R',
-            'P1_DIAL': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
-            'P1_DIAL_V': 'XINPUT_1_LEFTY_NEG ||| XINPUT_1_LEFTY_POS',
-            'P1_PADDLE': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
-            'P1_TRACKBALL_X': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
-            'P1_TRACKBALL_Y': 'XINPUT_1_LEFTY_NEG ||| XINPUT_1_LEFTY_POS',
-            'P1_MOUSE_X': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
-            'P1_MOUSE_Y': 'XINPUT_1_LEFTY_NEG ||| XINPUT_1_LEFTY_POS',
-            'P1_LIGHTGUN_X': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
-            'P1_LIGHTGUN_Y': 'XINPUT_1_LEFTY_NEG ||| XINPUT_1_LEFTY_POS',
-            'P1_POSITIONAL': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
-            'P1_STEER': 'XINPUT_1_LEFTX_NEG ||| XINPUT_1_LEFTX_POS',
-            
-            # ===== MISSING GAMBLING CONTROLS =====
-            'P1_GAMBLE_HIGH': 'XINPUT_1_SHOULDER_R',    # ← ADD MISSING (uses BUTTON6)
-            'P1_GAMBLE_LOW': 'XINPUT_1_SHOULDER_L',     # ← ADD MISSING (uses BUTTON5)
-        }
-    
-    elif input_mode == 'dinput':
-        return {
-            # Player 1 Standard Buttons (1-based for DInput) - CHANGED
-            'P1_BUTTON1': 'DINPUT_1_BUTTON1',  # Button 1 -> Button 1
-            'P1_BUTTON2': 'DINPUT_1_BUTTON2',  # Button 2 -> Button 2
-            'P1_BUTTON3': 'DINPUT_1_BUTTON3',  # Button 3 -> Button 3
-            'P1_BUTTON4': 'DINPUT_1_BUTTON4',  # Button 4 -> Button 4
-            'P1_BUTTON5': 'DINPUT_1_BUTTON5',  # Button 5 -> Button 5
-            'P1_BUTTON6': 'DINPUT_1_BUTTON6',  # Button 6 -> Button 6
-            'P1_BUTTON7': 'DINPUT_1_BUTTON7',  # Button 7 -> Button 7
-            'P1_BUTTON8': 'DINPUT_1_BUTTON8',  # Button 8 -> Button 8
-            'P1_BUTTON9': 'DINPUT_1_BUTTON9',  # Button 9 -> Button 9
-            'P1_BUTTON10': 'DINPUT_1_BUTTON10', # Button 10 -> Button 10
-            
-            # Player 1 Directional Controls (unchanged)
-            'P1_JOYSTICK_UP': 'DINPUT_1_POV_UP',
-            'P1_JOYSTICK_DOWN': 'DINPUT_1_POV_DOWN',
-            'P1_JOYSTICK_LEFT': 'DINPUT_1_POV_LEFT',
-            'P1_JOYSTICK_RIGHT': 'DINPUT_1_POV_RIGHT',
-            'P1_JOYSTICKLEFT_UP': 'DINPUT_1_YAXIS_NEG',
-            'P1_JOYSTICKLEFT_DOWN': 'DINPUT_1_YAXIS_POS',
-            'P1_JOYSTICKLEFT_LEFT': 'DINPUT_1_XAXIS_NEG',
-            'P1_JOYSTICKLEFT_RIGHT': 'DINPUT_1_XAXIS_POS',
-            'P1_JOYSTICKRIGHT_UP': 'DINPUT_1_RYAXIS_NEG',
-            'P1_JOYSTICKRIGHT_DOWN': 'DINPUT_1_RYAXIS_POS',
-            'P1_JOYSTICKRIGHT_LEFT': 'DINPUT_1_RXAXIS_NEG',
-            'P1_JOYSTICKRIGHT_RIGHT': 'DINPUT_1_RXAXIS_POS',
-            
-            # Player 1 System Controls (changed to match 1-based)
-            'P1_START': 'DINPUT_1_BUTTON9',    # Start -> Button 9
-            'P1_SELECT': 'DINPUT_1_BUTTON10',  # Select -> Button 10
-            
-            # Player 1 Specialized Controls (unchanged)
-            'P1_PEDAL': 'DINPUT_1_ZAXIS_POS',
-            'P1_PEDAL2': 'DINPUT_1_ZAXIS_NEG',
-            'P1_AD_STICK_X': 'DINPUT_1_XAXIS_NEG ||| DINPUT_1_XAXIS_POS',
-            'P1_AD_STICK_Y': 'DINPUT_1_YAXIS_NEG ||| DINPUT_1_YAXIS_POS',
-            'P1_DIAL': 'DINPUT_1_XAXIS_NEG ||| DINPUT_1_XAXIS_POS',
-            'P1_PADDLE': 'DINPUT_1_XAXIS_NEG ||| DINPUT_1_XAXIS_POS',
-            'P1_TRACKBALL_X': 'DINPUT_1_XAXIS_NEG ||| DINPUT_1_XAXIS_POS',
-            'P1_TRACKBALL_Y': 'DINPUT_1_YAXIS_NEG ||| DINPUT_1_YAXIS_POS',
-            
-            # Player 2 Controls (same 1-based pattern)
-            'P2_BUTTON1': 'DINPUT_2_BUTTON1',
-            'P2_BUTTON2': 'DINPUT_2_BUTTON2',
-            'P2_BUTTON3': 'DINPUT_2_BUTTON3',
-            'P2_BUTTON4': 'DINPUT_2_BUTTON4',
-            'P2_BUTTON5': 'DINPUT_2_BUTTON5',
-            'P2_BUTTON6': 'DINPUT_2_BUTTON6',
-            'P2_JOYSTICK_UP': 'DINPUT_2_POV_UP',
-            'P2_JOYSTICK_DOWN': 'DINPUT_2_POV_DOWN',
-            'P2_JOYSTICK_LEFT': 'DINPUT_2_POV_LEFT',
-            'P2_JOYSTICK_RIGHT': 'DINPUT_2_POV_RIGHT',
-            'P2_START': 'DINPUT_2_BUTTON9',
-            'P2_SELECT': 'DINPUT_2_BUTTON10',
-        }
-    
-    elif input_mode == 'keycode':
-        return {
-            # Player 1 Standard Buttons (common keyboard defaults)
-            'P1_BUTTON1': 'KEYCODE_LCONTROL',  # Ctrl = Fire/Primary
-            'P1_BUTTON2': 'KEYCODE_LALT',      # Alt = Jump/Secondary  
-            'P1_BUTTON3': 'KEYCODE_SPACE',     # Space = Action
-            'P1_BUTTON4': 'KEYCODE_LSHIFT',    # Shift = Run/Modifier
-            'P1_BUTTON5': 'KEYCODE_Z',         # Z = Button 5
-            'P1_BUTTON6': 'KEYCODE_X',         # X = Button 6
-            'P1_BUTTON7': 'KEYCODE_C',         # C = Button 7
-            'P1_BUTTON8': 'KEYCODE_V',         # V = Button 8
-            'P1_BUTTON9': 'KEYCODE_B',         # B = Button 9
-            'P1_BUTTON10': 'KEYCODE_N',        # N = Button 10
-            
-            # Player 1 Directional Controls (Arrow Keys)
-            'P1_JOYSTICK_UP': 'KEYCODE_UP',
-            'P1_JOYSTICK_DOWN': 'KEYCODE_DOWN',
-            'P1_JOYSTICK_LEFT': 'KEYCODE_LEFT',
-            'P1_JOYSTICK_RIGHT': 'KEYCODE_RIGHT',
-            'P1_JOYSTICKLEFT_UP': 'KEYCODE_UP',
-            'P1_JOYSTICKLEFT_DOWN': 'KEYCODE_DOWN',
-            'P1_JOYSTICKLEFT_LEFT': 'KEYCODE_LEFT',
-            'P1_JOYSTICKLEFT_RIGHT': 'KEYCODE_RIGHT',
-            
-            # Player 1 System Controls
-            'P1_START': 'KEYCODE_1',           # 1 = Start/Coin
-            'P1_SELECT': 'KEYCODE_5',          # 5 = Coin
-            
-            # Player 1 Specialized Controls (use same directional keys)
-            'P1_AD_STICK_X': 'KEYCODE_LEFT ||| KEYCODE_RIGHT',
-            'P1_AD_STICK_Y': 'KEYCODE_UP ||| KEYCODE_DOWN',
-            'P1_DIAL': 'KEYCODE_LEFT ||| KEYCODE_RIGHT',
-            'P1_PADDLE': 'KEYCODE_LEFT ||| KEYCODE_RIGHT',
-            'P1_TRACKBALL_X': 'KEYCODE_LEFT ||| KEYCODE_RIGHT',
-            'P1_TRACKBALL_Y': 'KEYCODE_UP ||| KEYCODE_DOWN',
-            'P1_PEDAL': 'KEYCODE_LCONTROL',
-            'P1_PEDAL2': 'KEYCODE_LALT',
-            
-            # Player 2 Controls (WASD + different keys)
-            'P2_BUTTON1': 'KEYCODE_A',         # A = P2 Fire
-            'P2_BUTTON2': 'KEYCODE_S',         # S = P2 Secondary
-            'P2_BUTTON3': 'KEYCODE_Q',         # Q = P2 Button 3
-            'P2_BUTTON4': 'KEYCODE_W',         # W = P2 Button 4
-            'P2_BUTTON5': 'KEYCODE_E',         # E = P2 Button 5
-            'P2_BUTTON6': 'KEYCODE_D',         # D = P2 Button 6
-            'P2_JOYSTICK_UP': 'KEYCODE_R',     # R = P2 Up
-            'P2_JOYSTICK_DOWN': 'KEYCODE_F',   # F = P2 Down
-            'P2_JOYSTICK_LEFT': 'KEYCODE_D',   # D = P2 Left
-            'P2_JOYSTICK_RIGHT': 'KEYCODE_G',  # G = P2 Right
-            'P2_START': 'KEYCODE_2',           # 2 = P2 Start
-            'P2_SELECT': 'KEYCODE_6',          # 6 = P2 Coin
-        }
-    
-    else:  # joycode fallback
-        return {
-            # Player 1 Standard Buttons
-            'P1_BUTTON1': 'JOYCODE_1_BUTTON1',
-            'P1_BUTTON2': 'JOYCODE_1_BUTTON2',
-            'P1_BUTTON3': 'JOYCODE_1_BUTTON3',
-            'P1_BUTTON4': 'JOYCODE_1_BUTTON4',
-            'P1_BUTTON5': 'JOYCODE_1_BUTTON5',
-            'P1_BUTTON6': 'JOYCODE_1_BUTTON6',
-            'P1_BUTTON7': 'JOYCODE_1_BUTTON7',
-            'P1_BUTTON8': 'JOYCODE_1_BUTTON8',
-            
-            # Player 1 Directional Controls
-            'P1_JOYSTICK_UP': 'JOYCODE_1_HAT1UP',
-            'P1_JOYSTICK_DOWN': 'JOYCODE_1_HAT1DOWN',
-            'P1_JOYSTICK_LEFT': 'JOYCODE_1_HAT1LEFT',
-            'P1_JOYSTICK_RIGHT': 'JOYCODE_1_HAT1RIGHT',
-            
-            # Player 1 System Controls
-            'P1_START': 'JOYCODE_1_START',
-            'P1_SELECT': 'JOYCODE_1_SELECT',
-        }
+    # joycode is the fallback for any other mode
+    return DEFAULT_MAME_MAPPINGS.get(input_mode, DEFAULT_MAME_MAPPINGS['joycode'])
 
 def apply_default_mame_mappings(game_data: Dict, input_mode: str = 'xinput', 
                                friendly_names: bool = True) -> Dict:
@@ -3023,14 +3784,7 @@ def _set_display_name_for_label(label: Dict, input_mode: str, friendly_names: bo
 
 def cleanup_database_connections():
     """Clean up cached database connections"""
-    global _db_connection_cache
-    
-    for conn in _db_connection_cache.values():
-        try:
-            conn.close()
-        except:
-            pass
-    _db_connection_cache.clear()
+    _close_pooled_connections()
     print("Cleaned up database connections")
 
 def format_control_name_for_mode(control_name: str, input_mode: str) -> str:
@@ -3088,7 +3842,6 @@ def filter_xinput_controls(game_data: Dict) -> Dict:
         return game_data
             
     # Make a copy to avoid modifying the original
-    import copy
     filtered_data = copy.deepcopy(game_data)
         
     # Define strictly which controls are valid in XInput mode
@@ -3120,16 +3873,275 @@ def filter_xinput_controls(game_data: Dict) -> Dict:
     
     return filtered_data
 
-def load_rom_exclusion_list(mame_dir: str) -> Set[str]:
+def process_game_data(rom_name: str, game_data: Dict, mame_dir: str, settings: CacheSettings,
+                      default_controls: Dict, original_default_controls: Dict) -> Optional[Dict]:
     """
-    Load ROM exclusion list from settings/excluded_roms.txt
-    Each line should contain one ROM name to exclude
+    Apply cfg mappings, MAME defaults and the XInput-only filter for the given cache settings
+    Works on a copy, so raw game data held in rom_data_cache is never modified
     """
-    settings_dir = os.path.join(mame_dir, "preview", "settings")
-    exclusion_file = os.path.join(settings_dir, "excluded_roms.txt")
-    excluded_roms = set()
+    if not game_data:
+        return None
+    
+    game_data = copy.deepcopy(game_data)
+    
+    cfg_controls = {
+        control: convert_mapping(mapping, settings.input_mode)
+        for control, mapping in get_cfg_controls(mame_dir, rom_name, settings.input_mode).items()
+    }
+    
+    game_data = update_game_data_with_custom_mappings(
+        game_data,
+        cfg_controls,
+        default_controls,
+        original_default_controls,
+        settings.input_mode,
+        settings.friendly_names
+    )
+    
+    if settings.xinput_only_mode:
+        game_data = filter_xinput_controls(game_data)
+    
+    return game_data
+
+# Bump when process_game_data's output changes for the same inputs
+GAME_DATA_PROCESSING_VERSION = 1
+
+# path -> ((mtime_ns, size), sha1 of the contents)
+_file_hash_cache = {}
+_file_hash_lock = threading.Lock()
+
+def _file_content_hash(path: str) -> str:
+    """Hash a file's contents, re-reading it only after its mtime or size changed; '' if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ''
+    
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _file_hash_lock:
+        cached = _file_hash_cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+    
+    try:
+        with open(path, 'rb') as f:
+            content_hash = hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return ''
+    
+    with _file_hash_lock:
+        _file_hash_cache[path] = (signature, content_hash)
+    return content_hash
+
+@lru_cache(maxsize=1)
+def get_mapping_tables_hash() -> str:
+    """Hash of every mapping table that feeds processed game data"""
+    tables = (
+        DEFAULT_CONTROL_ACTIONS, _CONVERSION_TABLES, KEYCODE_FRIENDLY_NAMES, XINPUT_FRIENDLY_NAMES,
+        XINPUT_DIRECTIONAL_ALTERNATIVES, DINPUT_DIRECTIONAL_ALTERNATIVES, DEFAULT_MAME_MAPPINGS
+    )
+    return hashlib.sha1(repr(tables).encode('utf-8')).hexdigest()
+
+def get_game_input_files(mame_dir: str, rom_name: str) -> List[str]:
+    """Files a ROM's processed game data is built from: its cfg, default.cfg and gamedata.json"""
+    cfg_dir = os.path.join(mame_dir, "cfg")
+    return [
+        os.path.join(cfg_dir, f"{rom_name}.cfg"),
+        os.path.join(cfg_dir, "default.cfg"),
+        os.path.join(mame_dir, "preview", "settings", "gamedata.json")
+    ]
+
+def compute_game_input_hash(rom_name: str, game_data: Dict, mame_dir: str) -> str:
+    """
+    Hash everything process_game_data depends on besides the cache settings:
+    the ROM's gamedata entry, its cfg, default.cfg and the mapping tables
+    """
+    digest = hashlib.sha1(f"{GAME_DATA_PROCESSING_VERSION}|{get_mapping_tables_hash()}|".encode('utf-8'))
+    digest.update(json.dumps(game_data, sort_keys=True, default=str).encode('utf-8'))
+    cfg_dir = os.path.join(mame_dir, "cfg")
+    for filename in (f"{rom_name}.cfg", "default.cfg"):
+        digest.update(_file_content_hash(os.path.join(cfg_dir, filename)).encode('utf-8'))
+    return digest.hexdigest()
+
+def get_processed_game_data(rom_name: str, settings: CacheSettings, game_cache: GameDataCache,
+                            load_game_data, mame_dir: str, default_controls: Dict,
+                            original_default_controls: Dict, write_to_disk: bool = True) -> Optional[Dict]:
+    """
+    Get processed game data from game_cache, processing and storing it when there is
+    no entry for these settings built from the current inputs
+    load_game_data(rom_name) supplies the raw game data
+    """
+    raw_game_data = load_game_data(rom_name)
+    if not raw_game_data:
+        return None
+    
+    input_hash = compute_game_input_hash(rom_name, raw_game_data, mame_dir)
+    game_data = game_cache.get(rom_name, settings, input_hash)
+    if game_data is not None:
+        return game_data
+    
+    game_data = process_game_data(rom_name, raw_game_data, mame_dir, settings,
+                                  default_controls, original_default_controls)
+    if game_data:
+        game_cache.put(rom_name, settings, game_data, input_hash,
+                       get_game_input_files(mame_dir, rom_name), write_to_disk=write_to_disk)
+    return game_data
+
+# ROMs handed to a precache worker process per task
+PRECACHE_CHUNK_SIZE = 32
+
+# Below this many ROMs starting worker processes costs more than it saves
+PRECACHE_MIN_POOL_ROMS = 200
+
+# Shared inputs of a precache worker, loaded once per process by _init_precache_worker
+_precache_worker_state = {}
+
+def _init_precache_worker(mame_dir: str, settings: CacheSettings, quiet: bool = False):
+    """Load the inputs every ROM shares (default.cfg) once for this process"""
+    global _cfg_cache_flush_registered
+    
+    if quiet:
+        # Worker processes would otherwise interleave per-ROM debug output with the progress display
+        sys.stdout = open(os.devnull, 'w')
+        # Only the parent process writes cfg_cache.pickle
+        _cfg_cache_flush_registered = True
+    
+    default_controls, original_default_controls = load_default_config(mame_dir)
+    _precache_worker_state.update(
+        mame_dir=mame_dir,
+        settings=settings,
+        default_controls=default_controls,
+        original_default_controls=original_default_controls
+    )
+
+def _precache_worker(chunk: List[Tuple[str, Dict]]) -> List[Tuple[str, Optional[Dict], Optional[str]]]:
+    """Process a chunk of (rom_name, raw game data); returns (rom_name, processed data, error) per ROM"""
+    state = _precache_worker_state
+    results = []
+    for rom_name, raw_game_data in chunk:
+        try:
+            game_data = process_game_data(rom_name, raw_game_data, state['mame_dir'], state['settings'],
+                                          state['default_controls'], state['original_default_controls'])
+            results.append((rom_name, game_data, None if game_data else "no game data"))
+        except Exception as e:
+            results.append((rom_name, None, str(e)))
+    return results
+
+def precache_games(rom_names, mame_dir: str, settings: CacheSettings, game_cache: GameDataCache,
+                   load_game_data, workers: Optional[int] = None, progress=None,
+                   cancelled=None) -> Dict[str, int]:
+    """
+    Process and store many ROMs, skipping those whose cache entry is still valid
+    Raw game data is loaded here with load_game_data(rom_name); from PRECACHE_MIN_POOL_ROMS ROMs on,
+    processing runs on a pool of worker processes that each load the shared inputs once and keep
+    their per-ROM debug output to themselves.
+    progress(done, total, failed) is called once before processing starts and as ROMs complete.
+    cancelled() is checked between ROMs; once it returns True no further ROMs are started.
+    Returns counts of 'cached', 'skipped', 'missing', 'failed' and 'cancelled' ROMs
+    """
+    rom_names = list(rom_names)
+    counts = {'cached': 0, 'skipped': 0, 'missing': 0, 'failed': 0, 'cancelled': 0}
+    input_hashes = {}
+    pending = []
+    
+    for index, rom_name in enumerate(rom_names):
+        if cancelled and cancelled():
+            counts['cancelled'] = len(rom_names) - index
+            return counts
+        raw_game_data = load_game_data(rom_name)
+        if not raw_game_data:
+            counts['missing'] += 1
+            continue
+        input_hash = compute_game_input_hash(rom_name, raw_game_data, mame_dir)
+        if game_cache.contains(rom_name, settings, input_hash, record_access=False):
+            counts['skipped'] += 1
+            continue
+        input_hashes[rom_name] = input_hash
+        pending.append((rom_name, raw_game_data))
+    
+    chunks = [pending[i:i + PRECACHE_CHUNK_SIZE] for i in range(0, len(pending), PRECACHE_CHUNK_SIZE)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+    if progress and pending:
+        progress(0, len(pending), 0)
+    
+    def store_results(results):
+        for rom_name, game_data, error in results:
+            if game_data and game_cache.put(rom_name, settings, game_data, input_hashes[rom_name],
+                                            get_game_input_files(mame_dir, rom_name)):
+                counts['cached'] += 1
+            else:
+                counts['failed'] += 1
+                print(f"Could not precache {rom_name}: {error or 'cache write failed'}")
+        if progress:
+            progress(counts['cached'] + counts['failed'], len(pending), counts['failed'])
+    
+    if len(pending) >= PRECACHE_MIN_POOL_ROMS:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_precache_worker,
+                                 initargs=(mame_dir, settings, True)) as pool:
+            futures = {pool.submit(_precache_worker, chunk): len(chunk) for chunk in chunks}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                store_results(future.result())
+                if cancelled and cancelled():
+                    # Chunks already running finish; the queued ones are dropped
+                    for queued in futures:
+                        queued.cancel()
+            counts['cancelled'] = sum(size for future, size in futures.items() if future.cancelled())
+    elif chunks:
+        _init_precache_worker(mame_dir, settings)
+        for index, chunk in enumerate(chunks):
+            if cancelled and cancelled():
+                counts['cancelled'] = sum(len(rest) for rest in chunks[index:])
+                break
+            store_results(_precache_worker(chunk))
+    
+    return counts
+
+# Exclusion list edits are held in memory and written once they stop arriving for this long (seconds)
+EXCLUSION_SAVE_DELAY = 1.0
+
+EXCLUSION_FILE_HEADER = (
+    "# ROM Exclusion List\n"
+    "# Add one ROM name per line to exclude it from the GUI\n"
+    "# Lines starting with # are treated as comments\n"
+    "# Example:\n"
+    "# badrom1\n"
+    "# badrom2\n"
+    "\n"
+)
+
+_exclusion_lock = threading.RLock()
+# exclusion file path -> {'roms': set, 'signature': (mtime_ns, size) or None, 'dirty': bool, 'timer': Timer}
+_exclusion_lists = {}
+_exclusion_flush_registered = False
+
+def get_exclusion_list_path(mame_dir: str) -> str:
+    """Get the path of settings/excluded_roms.txt for a MAME directory"""
+    return os.path.join(mame_dir, "preview", "settings", "excluded_roms.txt")
+
+def _exclusion_file_signature(exclusion_file: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(exclusion_file)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+def _get_exclusion_entry(mame_dir: str) -> Dict[str, Any]:
+    """
+    Return the in-memory exclusion list for mame_dir, re-reading the file only when its mtime or size changed
+    Unsaved edits take precedence over changes made to the file in the meantime
+    """
+    global _exclusion_flush_registered
+    
+    exclusion_file = get_exclusion_list_path(mame_dir)
+    signature = _exclusion_file_signature(exclusion_file)
+    entry = _exclusion_lists.get(exclusion_file)
+    if entry is not None and (entry['dirty'] or entry['signature'] == signature):
+        return entry
     
-    if os.path.exists(exclusion_file):
+    excluded_roms = set()
+    if signature is not None:
         try:
             with open(exclusion_file, 'r', encoding='utf-8') as f:
                 for line in f:
@@ -3143,34 +4155,34 @@ def load_rom_exclusion_list(mame_dir: str) -> Set[str]:
                 print(f"Sample excluded ROMs: {list(excluded_roms)[:5]}")
         except Exception as e:
             print(f"Error loading ROM exclusion list: {e}")
-    else:
+    elif entry is None:
         print(f"No ROM exclusion list found at: {exclusion_file}")
         print("Create 'excluded_roms.txt' in the settings folder to exclude specific ROMs")
     
-    return excluded_roms
-
-def save_rom_exclusion_list(mame_dir: str, excluded_roms: Set[str]) -> bool:
-    """
-    Save ROM exclusion list to settings/excluded_roms.txt
-    """
-    settings_dir = os.path.join(mame_dir, "settings")
-    exclusion_file = os.path.join(settings_dir, "excluded_roms.txt")
+    if entry is None:
+        entry = _exclusion_lists[exclusion_file] = {'roms': excluded_roms, 'signature': signature,
+                                                    'dirty': False, 'timer': None}
+    else:
+        entry.update(roms=excluded_roms, signature=signature)
+    
+    if not _exclusion_flush_registered:
+        atexit.register(flush_exclusion_list)
+        _exclusion_flush_registered = True
     
+    return entry
+
+def _write_exclusion_file(exclusion_file: str, excluded_roms: Set[str]) -> bool:
+    """Atomically replace the exclusion file with the given ROMs"""
     try:
         # Create settings directory if it doesn't exist
-        os.makedirs(settings_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(exclusion_file), exist_ok=True)
         
-        with open(exclusion_file, 'w', encoding='utf-8') as f:
-            f.write("# ROM Exclusion List\n")
-            f.write("# Add one ROM name per line to exclude it from the GUI\n")
-            f.write("# Lines starting with # are treated as comments\n")
-            f.write("# Example:\n")
-            f.write("# badrom1\n")
-            f.write("# badrom2\n")
-            f.write("\n")
-            
+        temp_path = exclusion_file + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(EXCLUSION_FILE_HEADER)
             for rom_name in sorted(excluded_roms):
                 f.write(f"{rom_name}\n")
+        os.replace(temp_path, exclusion_file)
         
         print(f"Saved {len(excluded_roms)} ROMs to exclusion list: {exclusion_file}")
         return True
@@ -3178,103 +4190,274 @@ def save_rom_exclusion_list(mame_dir: str, excluded_roms: Set[str]) -> bool:
         print(f"Error saving ROM exclusion list: {e}")
         return False
 
-def scan_roms_directory(mame_dir: str, use_exclusion_list: bool = True) -> Set[str]:
-    """Scan the roms directory for available games with improved path handling and exclusion support"""
+def _schedule_exclusion_save(exclusion_file: str, entry: Dict[str, Any]):
+    """Mark the list dirty and (re)start its save timer"""
+    entry['dirty'] = True
+    if entry['timer'] is not None:
+        entry['timer'].cancel()
+    timer = threading.Timer(EXCLUSION_SAVE_DELAY, flush_exclusion_list, args=(exclusion_file,))
+    timer.daemon = True
+    entry['timer'] = timer
+    timer.start()
+
+def flush_exclusion_list(exclusion_file: Optional[str] = None) -> bool:
+    """Write pending exclusion list edits to disk now (all lists when exclusion_file is None)"""
+    with _exclusion_lock:
+        paths = [exclusion_file] if exclusion_file else list(_exclusion_lists)
+        success = True
+        for path in paths:
+            entry = _exclusion_lists.get(path)
+            if entry is None or not entry['dirty']:
+                continue
+            if entry['timer'] is not None:
+                entry['timer'].cancel()
+                entry['timer'] = None
+            
+            if _write_exclusion_file(path, entry['roms']):
+                entry['dirty'] = False
+                # Remember our own write so it isn't read back as an external change
+                entry['signature'] = _exclusion_file_signature(path)
+            else:
+                success = False
+        return success
+
+def load_rom_exclusion_list(mame_dir: str) -> Set[str]:
+    """
+    Load ROM exclusion list from settings/excluded_roms.txt
+    Each line should contain one ROM name to exclude; the file is only re-read after it changes
+    """
+    with _exclusion_lock:
+        return set(_get_exclusion_entry(mame_dir)['roms'])
+
+def save_rom_exclusion_list(mame_dir: str, excluded_roms: Set[str]) -> bool:
+    """
+    Save ROM exclusion list to settings/excluded_roms.txt immediately
+    """
+    with _exclusion_lock:
+        entry = _get_exclusion_entry(mame_dir)
+        entry['roms'] = set(excluded_roms)
+        entry['dirty'] = True
+        return flush_exclusion_list(get_exclusion_list_path(mame_dir))
+
+# Files in the roms folder with these extensions are never ROMs
+NON_ROM_EXTENSIONS = frozenset(['.txt', '.ini', '.cfg', '.bat', '.exe', '.dll'])
+
+# Persisted result of the last ROM folder scan, reused while the folders are unchanged
+ROM_MANIFEST_NAME = "rom_manifest.pickle"
+ROM_MANIFEST_VERSION = 1
+
+# When the same ROM exists in several forms in one folder, the first type listed wins
+ROM_TYPE_PRIORITY = ('zip', '7z', 'folder')
+
+def rom_name_from_filename(filename: str, is_dir: bool = False) -> Optional[str]:
+    """Get the ROM name for an entry in a roms folder, or None if it isn't a ROM"""
+    if is_dir:
+        return filename
+    base_name, extension = os.path.splitext(filename)
+    if extension.lower() in NON_ROM_EXTENSIONS:
+        return None
+    return base_name
+
+def get_rom_paths(mame_dir: str) -> List[str]:
+    """
+    Get the ROM folders from the rompath setting in mame.ini (';'-separated, relative
+    paths are relative to the MAME directory). Falls back to <mame_dir>/roms.
+    """
+    rom_paths = []
+    for ini_path in (os.path.join(mame_dir, "mame.ini"), os.path.join(mame_dir, "ini", "mame.ini")):
+        if not os.path.isfile(ini_path):
+            continue
+        try:
+            with open(ini_path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    parts = line.strip().split(None, 1)
+                    if len(parts) == 2 and parts[0].lower() == 'rompath':
+                        for path in parts[1].strip().strip('"').split(';'):
+                            path = os.path.expandvars(os.path.expanduser(path.strip().strip('"')))
+                            if path:
+                                rom_paths.append(os.path.normpath(os.path.join(mame_dir, path)))
+                        break
+        except Exception as e:
+            print(f"Error reading rompath from {ini_path}: {e}")
+        break
     
-    roms_dir = os.path.join(mame_dir, "roms")
-    available_roms = set()
+    if not rom_paths:
+        rom_paths = [os.path.join(mame_dir, "roms")]
     
-    if not os.path.exists(roms_dir):
-        print(f"ROMs directory not found: {roms_dir}")
-        return available_roms
+    # Keep the order, drop duplicates
+    return list(dict.fromkeys(rom_paths))
 
-    # Load exclusion list if enabled
-    excluded_roms = set()
-    if use_exclusion_list:
-        excluded_roms = load_rom_exclusion_list(mame_dir)
+def get_rom_manifest_path(mame_dir: str) -> str:
+    """Get the ROM manifest path for a MAME directory"""
+    return os.path.join(mame_dir, "preview", "cache", ROM_MANIFEST_NAME)
 
-    rom_count = 0
-    excluded_count = 0
+def _get_folder_mtimes(folders: List[str]) -> Dict[str, Optional[int]]:
+    """Folder -> mtime_ns (None for missing folders)"""
+    mtimes = {}
+    for folder in folders:
+        try:
+            mtimes[folder] = os.stat(folder).st_mtime_ns
+        except OSError:
+            mtimes[folder] = None
+    return mtimes
 
-    try:
-        for filename in os.listdir(roms_dir):
-            # Skip directories and non-ROM files
-            full_path = os.path.join(roms_dir, filename)
-            if os.path.isdir(full_path):
-                continue
-                
-            # Skip files with known non-ROM extensions
-            extension = os.path.splitext(filename)[1].lower()
-            if extension in ['.txt', '.ini', '.cfg', '.bat', '.exe', '.dll']:
-                continue
-                
-            # Strip common ROM extensions
-            base_name = os.path.splitext(filename)[0]
-            
-            # Check if ROM is in exclusion list
-            if use_exclusion_list and base_name in excluded_roms:
-                excluded_count += 1
-                if excluded_count <= 5:  # Print first 5 excluded ROMs as sample
-                    print(f"Excluded ROM: {base_name}")
+def _scan_rom_folder(folder: str, roms: Dict[str, Dict[str, Any]]):
+    """Add the ROMs of one folder to roms, keeping entries from earlier folders"""
+    found = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            # is_dir() uses the d_type from the directory listing - no extra stat
+            is_dir = entry.is_dir()
+            rom_name = rom_name_from_filename(entry.name, is_dir)
+            if not rom_name or rom_name in roms:
                 continue
             
-            available_roms.add(base_name)
-            rom_count += 1
+            rom_type = 'folder' if is_dir else os.path.splitext(entry.name)[1].lower().lstrip('.')
+            previous = found.get(rom_name)
+            if previous is not None and not _rom_type_preferred(rom_type, previous['type']):
+                continue
             
-            if rom_count <= 5:  # Print first 5 ROMs as sample
-                print(f"Found ROM: {base_name}")
-        
-        print(f"Total ROMs found: {len(available_roms)}")
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            found[rom_name] = {
+                'path': entry.path,
+                'type': rom_type,
+                'size': 0 if is_dir else stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+            }
+    roms.update(found)
+
+def _rom_type_preferred(rom_type: str, other_type: str) -> bool:
+    """True if rom_type should replace other_type for the same ROM name"""
+    def rank(t):
+        return ROM_TYPE_PRIORITY.index(t) if t in ROM_TYPE_PRIORITY else len(ROM_TYPE_PRIORITY)
+    return rank(rom_type) < rank(other_type)
+
+def scan_rom_manifest(mame_dir: str, force: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Get ROM name -> {'path', 'type' (zip/7z/folder/...), 'size', 'mtime_ns'} for every rompath folder
+    Returns the persisted manifest without scanning when the rompath folders and their mtimes
+    are unchanged (adding, removing or renaming ROMs changes a folder's mtime)
+    """
+    rom_paths = get_rom_paths(mame_dir)
+    folder_mtimes = _get_folder_mtimes(rom_paths)
+    manifest_path = get_rom_manifest_path(mame_dir)
+    
+    if not force:
+        try:
+            with open(manifest_path, 'rb') as f:
+                manifest = pickle.load(f)
+            if (manifest.get('version') == ROM_MANIFEST_VERSION and
+                    manifest.get('folder_mtimes') == folder_mtimes):
+                return manifest['roms']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Ignoring unreadable ROM manifest: {e}")
+    
+    roms = {}
+    for folder in rom_paths:
+        if folder_mtimes[folder] is None:
+            print(f"ROMs directory not found: {folder}")
+            continue
+        try:
+            _scan_rom_folder(folder, roms)
+        except OSError as e:
+            print(f"Error scanning ROMs directory {folder}: {e}")
+    
+    try:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump({'version': ROM_MANIFEST_VERSION, 'folder_mtimes': folder_mtimes, 'roms': roms},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, manifest_path)
+    except Exception as e:
+        print(f"Error saving ROM manifest: {e}")
+    
+    return roms
+
+def scan_roms_directory(mame_dir: str, use_exclusion_list: bool = True) -> Set[str]:
+    """Scan the rompath folders for available games, with exclusion support"""
+    available_roms = set(scan_rom_manifest(mame_dir))
+    
+    if use_exclusion_list and available_roms:
+        excluded_count = len(available_roms)
+        available_roms -= load_rom_exclusion_list(mame_dir)
+        excluded_count -= len(available_roms)
         if excluded_count > 0:
             print(f"Total ROMs excluded: {excluded_count}")
-        if len(available_roms) > 0:
-            print(f"Sample of available ROMs: {list(available_roms)[:5]}")
-        else:
-            print("WARNING: No ROMs were found!")
-    except Exception as e:
-        print(f"Error scanning ROMs directory: {e}")
+    
+    print(f"Total ROMs found: {len(available_roms)}")
+    if not available_roms:
+        print("WARNING: No ROMs were found!")
     
     return available_roms
 
+def add_roms_to_exclusion_list(mame_dir: str, rom_names) -> int:
+    """
+    Add ROMs to the exclusion list in one go
+    The file is written once after EXCLUSION_SAVE_DELAY; returns how many ROMs were newly excluded
+    """
+    with _exclusion_lock:
+        entry = _get_exclusion_entry(mame_dir)
+        added = set(rom_names) - entry['roms']
+        if added:
+            entry['roms'] |= added
+            _schedule_exclusion_save(get_exclusion_list_path(mame_dir), entry)
+        return len(added)
+
+def remove_roms_from_exclusion_list(mame_dir: str, rom_names) -> int:
+    """
+    Remove ROMs from the exclusion list in one go
+    The file is written once after EXCLUSION_SAVE_DELAY; returns how many ROMs were removed
+    """
+    with _exclusion_lock:
+        entry = _get_exclusion_entry(mame_dir)
+        removed = entry['roms'] & set(rom_names)
+        if removed:
+            entry['roms'] -= removed
+            _schedule_exclusion_save(get_exclusion_list_path(mame_dir), entry)
+        return len(removed)
+
 def add_rom_to_exclusion_list(mame_dir: str, rom_name: str) -> bool:
     """
     Add a single ROM to the exclusion list
     """
-    excluded_roms = load_rom_exclusion_list(mame_dir)
-    excluded_roms.add(rom_name)
-    return save_rom_exclusion_list(mame_dir, excluded_roms)
+    add_roms_to_exclusion_list(mame_dir, [rom_name])
+    return True
 
 def remove_rom_from_exclusion_list(mame_dir: str, rom_name: str) -> bool:
     """
     Remove a single ROM from the exclusion list
     """
-    excluded_roms = load_rom_exclusion_list(mame_dir)
-    if rom_name in excluded_roms:
-        excluded_roms.remove(rom_name)
-        return save_rom_exclusion_list(mame_dir, excluded_roms)
-    return False
+    return remove_roms_from_exclusion_list(mame_dir, [rom_name]) > 0
 
 def is_rom_excluded(mame_dir: str, rom_name: str) -> bool:
     """
     Check if a ROM is in the exclusion list
     """
-    excluded_roms = load_rom_exclusion_list(mame_dir)
-    return rom_name in excluded_roms
+    with _exclusion_lock:
+        return rom_name in _get_exclusion_entry(mame_dir)['roms']
 
 def get_exclusion_list_stats(mame_dir: str) -> Dict[str, Any]:
     """
     Get statistics about the exclusion list
     """
-    excluded_roms = load_rom_exclusion_list(mame_dir)
-    settings_dir = os.path.join(mame_dir, "settings")
-    exclusion_file = os.path.join(settings_dir, "excluded_roms.txt")
-    
-    stats = {
-        'total_excluded': len(excluded_roms),
-        'exclusion_file_exists': os.path.exists(exclusion_file),
-        'exclusion_file_path': exclusion_file,
-        'sample_excluded': list(excluded_roms)[:10] if excluded_roms else []
-    }
+    exclusion_file = get_exclusion_list_path(mame_dir)
+    with _exclusion_lock:
+        entry = _get_exclusion_entry(mame_dir)
+        excluded_roms = entry['roms']
+        
+        stats = {
+            'total_excluded': len(excluded_roms),
+            'exclusion_file_exists': os.path.exists(exclusion_file),
+            'exclusion_file_path': exclusion_file,
+            'pending_save': entry['dirty'],
+            'sample_excluded': list(excluded_roms)[:10] if excluded_roms else []
+        }
     
     return stats
 
@@ -3282,6 +4465,201 @@ def get_exclusion_list_stats(mame_dir: str) -> Dict[str, Any]:
 # HELPER FUNCTIONS FOR DATA ANALYSIS
 # ============================================================================
 
+# Control name fragments that mark a ROM as specialized / analog
+SPECIALIZED_CONTROL_TYPES = (
+    "TRACKBALL", "LIGHTGUN", "MOUSE", "DIAL", "PADDLE", 
+    "POSITIONAL", "GAMBLE", "AD_STICK"
+)
+ANALOG_CONTROL_TYPES = (
+    "AD_STICK", "DIAL", "PADDLE", "PEDAL", "POSITIONAL"
+)
+_SPECIALIZED_CONTROL_RE = re.compile("|".join(SPECIALIZED_CONTROL_TYPES))
+_ANALOG_CONTROL_RE = re.compile("|".join(ANALOG_CONTROL_TYPES))
+
+# Generic action names
+GENERIC_ACTION_NAMES = frozenset([
+    "A Button", "B Button", "X Button", "Y Button", 
+    "LB Button", "RB Button", "LT Button", "RT Button",
+    "Up", "Down", "Left", "Right"
+])
+
+def classify_control_labels(labels) -> Dict[str, bool]:
+    """
+    Classify a ROM from its (control_name, action) labels
+    
+    Returns:
+        Dict with has_buttons, is_specialized, is_analog and generic_actions_only flags
+    """
+    flags = {
+        'has_buttons': False,
+        'is_specialized': False,
+        'is_analog': False,
+        'generic_actions_only': True
+    }
+    
+    for control_name, action in labels:
+        if "BUTTON" in control_name:
+            flags['has_buttons'] = True
+        if not flags['is_specialized'] and _SPECIALIZED_CONTROL_RE.search(control_name):
+            flags['is_specialized'] = True
+        if not flags['is_analog'] and _ANALOG_CONTROL_RE.search(control_name):
+            flags['is_analog'] = True
+        if action not in GENERIC_ACTION_NAMES:
+            flags['generic_actions_only'] = False
+    
+    return flags
+
+def classify_raw_controls(controls: Dict) -> Dict[str, bool]:
+    """
+    Classify a ROM from its raw gamedata.json controls
+    
+    Returns:
+        Dict with has_controls, has_named_controls and has_mixed_controls flags.
+        Mixed means some P1_BUTTON1-8 (with tag/mask) have a custom name and some don't.
+    """
+    flags = {
+        'has_controls': bool(controls),
+        'has_named_controls': False,
+        'has_mixed_controls': False
+    }
+    
+    if not controls or not isinstance(controls, dict):
+        return flags
+    
+    for control_data in controls.values():
+        if isinstance(control_data, dict) and (control_data.get('name') or '').strip():
+            flags['has_named_controls'] = True
+            break
+    
+    buttons_with_names = 0
+    buttons_without_names = 0
+    for i in range(1, 9):
+        control_data = controls.get(f"P1_BUTTON{i}")
+        if control_data and isinstance(control_data, dict) and ('tag' in control_data or 'mask' in control_data):
+            if (control_data.get('name') or '').strip():
+                buttons_with_names += 1
+            else:
+                buttons_without_names += 1
+    
+    flags['has_mixed_controls'] = (
+        buttons_with_names + buttons_without_names >= 2
+        and buttons_with_names > 0 and buttons_without_names > 0
+    )
+    return flags
+
+# SQL conditions on game_traits (aliased t, LEFT JOINed to the scanned ROMs) per sidebar category
+ROM_CATEGORY_CONDITIONS = {
+    'with_controls': "t.has_controls = 1",
+    'missing': "t.rom_name IS NULL OR t.has_controls = 0",
+    'generic': "t.has_controls = 1 AND t.has_named_controls = 0",
+    'custom_actions': "t.has_controls = 1 AND t.has_named_controls = 1",
+    'mixed_controls': "t.has_mixed_controls = 1",
+    'clones': "t.is_clone = 1",
+    'no_buttons': "t.has_controls = 1 AND t.has_buttons = 0",
+    'specialized': "t.has_controls = 1 AND t.is_specialized = 1",
+    'analog': "t.has_controls = 1 AND t.is_analog = 1",
+    'multiplayer': "t.has_controls = 1 AND t.player_count > 1",
+    'singleplayer': "t.has_controls = 1 AND t.player_count = 1"
+}
+
+def _load_scanned_roms(conn: sqlite3.Connection, available_roms) -> bool:
+    """
+    Put the scanned ROM set in a temp table so it can be joined against game_traits
+    
+    Returns False if the database has no game_traits table (built by an older version)
+    """
+    has_traits = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'game_traits'"
+    ).fetchone()
+    if not has_traits:
+        return False
+    
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS scanned_roms (rom_name TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM scanned_roms")
+    conn.executemany("INSERT OR IGNORE INTO scanned_roms VALUES (?)", ((rom,) for rom in available_roms))
+    # Only the temp table was written, but end the transaction so no read lock is held
+    conn.commit()
+    return True
+
+def get_game_traits(available_roms, db_path: str) -> Optional[Dict[str, Dict]]:
+    """
+    Get the precomputed game_traits of the scanned ROMs in one query
+    
+    Returns:
+        Dict of rom_name -> traits dict (ROMs without a traits row are omitted),
+        or None if the database has no traits
+    """
+    if not db_path or not os.path.exists(db_path):
+        return None
+    
+    try:
+        conn = get_db_connection(db_path)
+        if not _load_scanned_roms(conn, available_roms):
+            return None
+        
+        rows = conn.execute("""
+            SELECT t.* FROM scanned_roms s
+            JOIN game_traits t ON t.rom_name = s.rom_name
+        """).fetchall()
+        return {row['rom_name']: dict(row) for row in rows}
+    except sqlite3.Error as e:
+        print(f"Database error reading game traits: {e}")
+        return None
+
+def get_category_roms_from_db(category: str, available_roms, db_path: str) -> Optional[List[str]]:
+    """
+    Get the sorted scanned ROMs that fall in a sidebar category with one indexed SELECT
+    
+    Returns None if the category isn't backed by game_traits or the database lacks them
+    """
+    condition = ROM_CATEGORY_CONDITIONS.get(category)
+    if condition is None or not db_path or not os.path.exists(db_path):
+        return None
+    
+    try:
+        conn = get_db_connection(db_path)
+        if not _load_scanned_roms(conn, available_roms):
+            return None
+        
+        rows = conn.execute(f"""
+            SELECT s.rom_name FROM scanned_roms s
+            LEFT JOIN game_traits t ON t.rom_name = s.rom_name
+            WHERE {condition}
+            ORDER BY s.rom_name
+        """).fetchall()
+        return [row[0] for row in rows]
+    except sqlite3.Error as e:
+        print(f"Database error reading category {category}: {e}")
+        return None
+
+def get_category_counts_from_db(available_roms, db_path: str) -> Optional[Dict[str, int]]:
+    """
+    Count the scanned ROMs in every game_traits-backed category with a single SELECT
+    
+    Returns None if the database lacks game_traits
+    """
+    if not db_path or not os.path.exists(db_path):
+        return None
+    
+    try:
+        conn = get_db_connection(db_path)
+        if not _load_scanned_roms(conn, available_roms):
+            return None
+        
+        categories = list(ROM_CATEGORY_CONDITIONS)
+        sums = ", ".join(
+            f"SUM(CASE WHEN {ROM_CATEGORY_CONDITIONS[category]} THEN 1 ELSE 0 END)"
+            for category in categories
+        )
+        row = conn.execute(f"""
+            SELECT {sums} FROM scanned_roms s
+            LEFT JOIN game_traits t ON t.rom_name = s.rom_name
+        """).fetchone()
+        return {category: (count or 0) for category, count in zip(categories, row)}
+    except sqlite3.Error as e:
+        print(f"Database error counting categories: {e}")
+        return None
+
 def identify_generic_controls(available_roms: Set[str], gamedata_json: Dict, 
                              parent_lookup: Dict, db_path: str = None, 
                              rom_data_cache: Dict = None) -> Tuple[List[Tuple[str, str]], List[str]]:
@@ -3298,9 +4676,12 @@ def identify_generic_controls(available_roms: Set[str], gamedata_json: Dict,
                     return True
         return False
     
-    for rom_name in sorted(available_roms):
+    sorted_roms = sorted(available_roms)
+    games_data = get_games_data(sorted_roms, gamedata_json, parent_lookup, db_path, rom_data_cache)
+    
+    for rom_name in sorted_roms:
         # First check if game data exists at all
-        game_data = get_game_data(rom_name, gamedata_json, parent_lookup, db_path, rom_data_cache)
+        game_data = games_data.get(rom_name)
         if not game_data:
             missing_control_games.append(rom_name)
             continue
@@ -3335,10 +4716,7 @@ def find_unmatched_roms(available_roms: Set[str], gamedata_json: Dict,
                        parent_lookup: Dict, db_path: str = None, 
                        rom_data_cache: Dict = None) -> Set[str]:
     """Find ROMs that don't have matching control data"""
-    matched_roms = set()
-    for rom in available_roms:
-        if get_game_data(rom, gamedata_json, parent_lookup, db_path, rom_data_cache):
-            matched_roms.add(rom)
+    matched_roms = set(get_games_data(available_roms, gamedata_json, parent_lookup, db_path, rom_data_cache))
     return available_roms - matched_roms
 
 def categorize_roms_by_controls(available_roms: Set[str], gamedata_json: Dict, 
@@ -3359,14 +4737,16 @@ def categorize_roms_by_controls(available_roms: Set[str], gamedata_json: Dict,
         'singleplayer': []
     }
     
-    # Generic action names
-    generic_actions = [
-        "A Button", "B Button", "X Button", "Y Button", 
-        "LB Button", "RB Button", "LT Button", "RT Button",
-        "Up", "Down", "Left", "Right"
-    ]
+    sorted_roms = sorted(available_roms)
     
-    for rom in sorted(available_roms):
+    # Precomputed flags from gamedata.db - only ROMs without a traits row are analyzed here
+    traits = get_game_traits(sorted_roms, db_path) or {}
+    games_data = get_games_data(
+        [rom for rom in sorted_roms if rom not in traits],
+        gamedata_json, parent_lookup, db_path, rom_data_cache
+    )
+    
+    for rom in sorted_roms:
         # Check if ROM is a clone
         if rom in parent_lookup:
             categories['clone_roms'].append(rom)
@@ -3376,75 +4756,39 @@ def categorize_roms_by_controls(available_roms: Set[str], gamedata_json: Dict,
             categories['custom_config'].append(rom)
         
         # Check if ROM has control data
-        game_data = get_game_data(rom, gamedata_json, parent_lookup, db_path, rom_data_cache)
-        if game_data:
-            categories['with_controls'].append(rom)
+        if rom in traits:
+            flags = traits[rom]
+            player_count = flags['player_count']
+        else:
+            game_data = games_data.get(rom)
+            if not game_data:
+                categories['missing_controls'].append(rom)
+                continue
             
-            # Check player count
             player_count = int(game_data.get('numPlayers', 1))
-            if player_count == 1:
-                categories['singleplayer'].append(rom)
-            elif player_count > 1:
-                categories['multiplayer'].append(rom)
-            
-            # Analyze control types
-            has_specialized = False
-            has_analog = False
-            has_buttons = False
-            
-            specialized_types = [
-                "TRACKBALL", "LIGHTGUN", "MOUSE", "DIAL", "PADDLE", 
-                "POSITIONAL", "GAMBLE", "AD_STICK"
-            ]
-            
-            analog_types = [
-                "AD_STICK", "DIAL", "PADDLE", "PEDAL", "POSITIONAL"
-            ]
-            
-            # Check controls for each player
-            for player in game_data.get('players', []):
-                for label in player.get('labels', []):
-                    control_name = label['name']
-                    
-                    # Check for buttons
-                    if "BUTTON" in control_name:
-                        has_buttons = True
-                    
-                    # Check for specialized controls
-                    for specialized_type in specialized_types:
-                        if specialized_type in control_name:
-                            has_specialized = True
-                            break
-                            
-                    # Check for analog controls
-                    for analog_type in analog_types:
-                        if analog_type in control_name:
-                            has_analog = True
-                            break
-            
-            # Add to appropriate categories
-            if has_specialized:
-                categories['specialized'].append(rom)
-            if has_analog:
-                categories['analog'].append(rom)
-            if not has_buttons:
-                categories['no_buttons'].append(rom)
-                
-            # Check if controls are generic
-            has_custom_controls = False
-            for player in game_data.get('players', []):
-                for label in player.get('labels', []):
-                    action = label['value']
-                    if action not in generic_actions:
-                        has_custom_controls = True
-                        break
-                if has_custom_controls:
-                    break
-            
-            if not has_custom_controls:
-                categories['generic_controls'].append(rom)
-        else:
-            categories['missing_controls'].append(rom)
+            flags = classify_control_labels(
+                (label['name'], label['value'])
+                for player in game_data.get('players', [])
+                for label in player.get('labels', [])
+            )
+        
+        categories['with_controls'].append(rom)
+        
+        # Check player count
+        if player_count == 1:
+            categories['singleplayer'].append(rom)
+        elif player_count > 1:
+            categories['multiplayer'].append(rom)
+        
+        # Add to appropriate categories
+        if flags['is_specialized']:
+            categories['specialized'].append(rom)
+        if flags['is_analog']:
+            categories['analog'].append(rom)
+        if not flags['has_buttons']:
+            categories['no_buttons'].append(rom)
+        if flags['generic_actions_only']:
+            categories['generic_controls'].append(rom)
     
     return categories
 
@@ -3452,50 +4796,12 @@ def categorize_roms_by_controls(available_roms: Set[str], gamedata_json: Dict,
 # CACHE MANAGEMENT
 # ============================================================================
 
-def clean_cache_directory(cache_dir: str, max_age_days: int = 7, max_files: int = 100) -> bool:
-    """Clean old cache files to prevent unlimited growth"""
+def clean_cache_directory(cache_dir: str, max_age_days: int = DEFAULT_CACHE_MAX_AGE_DAYS,
+                          max_size_mb: int = DEFAULT_CACHE_MAX_SIZE_MB) -> bool:
+    """Evict least recently used cache entries until the cache fits in max_size_mb"""
     try:
-        # Skip if directory doesn't exist
-        if not os.path.exists(cache_dir):
-            print("No cache directory found. Skipping cleanup.")
-            return True
-            
-        # Get all cache files with their modification times
-        cache_files = []
-        for filename in os.listdir(cache_dir):
-            if filename.endswith('_cache.json'):
-                filepath = os.path.join(cache_dir, filename)
-                mtime = os.path.getmtime(filepath)
-                cache_files.append((filepath, mtime))
-        
-        if not cache_files:
-            print("No cache files found. Skipping cleanup.")
-            return True
-        
-        # If we have more than max_files, remove oldest files
-        if len(cache_files) > max_files:
-            # Sort by modification time (oldest first)
-            cache_files.sort(key=lambda x: x[1])
-            # Delete oldest files beyond our limit
-            files_to_remove = cache_files[:(len(cache_files) - max_files)]
-            for filepath, _ in files_to_remove:
-                try:
-                    os.remove(filepath)
-                    print(f"Removed old cache file: {os.path.basename(filepath)}")
-                except Exception as e:
-                    print(f"Error removing {os.path.basename(filepath)}: {e}")
-                    
-        # Remove any files older than max_age_days
-        cutoff_time = time.time() - (max_age_days * 86400)  # 86400 seconds in a day
-        for filepath, mtime in cache_files:
-            if mtime < cutoff_time:
-                try:
-                    os.remove(filepath)
-                    print(f"Removed expired cache file: {os.path.basename(filepath)}")
-                except Exception as e:
-                    print(f"Error removing {os.path.basename(filepath)}: {e}")
-                    
-        print(f"Cache cleanup complete. Directory: {cache_dir}")
+        removed = get_game_cache(cache_dir).evict(max_size_mb * 1024 * 1024, max_age_days)
+        print(f"Cache cleanup complete: {removed} entries removed from {cache_dir}")
         return True
     except Exception as e:
         print(f"Error cleaning cache: {e}")
@@ -3504,35 +4810,23 @@ def clean_cache_directory(cache_dir: str, max_age_days: int = 7, max_files: int
 def perform_cache_clear(cache_dir: str, all_files: bool = True, rom_name: str = None) -> bool:
     """Perform the actual cache clearing operation"""
     try:
-        if not os.path.exists(cache_dir):
-            print("No cache directory found.")
-            return False
+        game_cache = get_game_cache(cache_dir)
         
         if all_files:
-            # Clear all cache files
-            deleted_count = 0
-            for filename in os.listdir(cache_dir):
-                if filename.endswith('_cache.json'):
-                    try:
-                        os.remove(os.path.join(cache_dir, filename))
-                        deleted_count += 1
-                    except Exception as e:
-                        print(f"Error deleting {filename}: {e}")
-            
-            print(f"Cleared all cache files: {deleted_count} files deleted")
+            # Clear all cache entries
+            deleted_count = game_cache.invalidate()
+            print(f"Cleared all cache entries: {deleted_count} entries deleted")
             return deleted_count > 0
         elif rom_name:
             # Clear cache for specific ROM
-            cache_file = os.path.join(cache_dir, f"{rom_name}_cache.json")
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
+            if game_cache.invalidate(rom_name):
                 print(f"Cleared cache for ROM: {rom_name}")
                 return True
             else:
-                print(f"No cache file found for ROM: {rom_name}")
+                print(f"No cache entry found for ROM: {rom_name}")
                 return False
         
         return False
     except Exception as e:
         print(f"Error clearing cache: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,306 @@
+# mame_file_watcher.py
+"""
+Filesystem change watcher for the MAME roms, cfg and settings folders
+Uses inotify on Linux and falls back to polling directory snapshots everywhere else
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+# kind:   caller-defined folder kind ('rom', 'cfg', 'settings', ...)
+# action: 'added', 'removed', 'modified', or 'rescan' when individual events were lost
+FileChange = namedtuple('FileChange', ['kind', 'action', 'name', 'directory', 'is_dir'])
+
+# How often the polling backend re-reads the watched folders (seconds)
+WATCH_POLL_INTERVAL = 2.0
+
+# Changes are delivered once a folder has been quiet for this long (seconds)
+WATCH_DEBOUNCE = 0.5
+
+# ...but never held back longer than this while changes keep arriving (seconds)
+WATCH_MAX_DELAY = 3.0
+
+# ============================================================================
+# INOTIFY BACKEND (Linux)
+# ============================================================================
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+INOTIFY_WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+def _load_inotify_libc():
+    """Return libc if it exposes inotify, otherwise None"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+class _InotifyBackend:
+    """Kernel change notifications for a set of folders"""
+
+    name = "inotify"
+
+    def __init__(self, libc, folders: List[Tuple[str, str]]):
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.folders = folders
+        self.watches = {}
+        for kind, directory in folders:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), INOTIFY_WATCH_MASK)
+            if wd < 0:
+                print(f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self.watches[wd] = (kind, directory)
+
+        if not self.watches:
+            os.close(self.fd)
+            raise OSError("No folders could be watched")
+
+    def poll(self, timeout: float) -> List[Tuple]:
+        """Wait up to timeout seconds and return raw (kind, action, name, directory, is_dir) tuples"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changes = []
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            wd, mask, _cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # The kernel dropped events - every folder has to be re-read
+                changes.extend((kind, 'rescan', None, directory, False) for kind, directory in self.folders)
+                continue
+
+            watch = self.watches.get(wd)
+            if watch is None or not name:
+                continue
+
+            kind, directory = watch
+            is_dir = bool(mask & IN_ISDIR)
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                changes.append((kind, 'added', name, directory, is_dir))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                changes.append((kind, 'removed', name, directory, is_dir))
+            elif mask & (IN_CLOSE_WRITE | IN_ATTRIB):
+                changes.append((kind, 'modified', name, directory, is_dir))
+
+        return changes
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+# ============================================================================
+# POLLING BACKEND
+# ============================================================================
+
+def _snapshot_folder(directory: str) -> Dict[str, Tuple[bool, int, int]]:
+    """name -> (is_dir, mtime_ns, size) for every entry of a folder"""
+    snapshot = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                    stat = entry.stat()
+                    snapshot[entry.name] = (is_dir, stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return snapshot
+
+def _folder_mtime(directory: str) -> Optional[int]:
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+class _PollingBackend:
+    """Periodic directory snapshots diffed against the previous pass"""
+
+    name = "polling"
+
+    def __init__(self, folders: List[Tuple[str, str]], interval: float, names_only_kinds=()):
+        self.folders = folders
+        self.interval = interval
+        # Folders where only additions/removals matter are skipped while their mtime is unchanged
+        self.names_only_kinds = set(names_only_kinds)
+        self.snapshots = {directory: _snapshot_folder(directory) for _, directory in folders}
+        self.folder_mtimes = {directory: _folder_mtime(directory) for _, directory in folders}
+        self.next_poll = time.monotonic() + interval
+
+    def poll(self, timeout: float) -> List[Tuple]:
+        """Wait up to timeout seconds and return raw (kind, action, name, directory, is_dir) tuples"""
+        delay = self.next_poll - time.monotonic()
+        if delay > 0:
+            time.sleep(min(delay, timeout))
+            if time.monotonic() < self.next_poll:
+                return []
+        self.next_poll = time.monotonic() + self.interval
+
+        changes = []
+        for kind, directory in self.folders:
+            if kind in self.names_only_kinds:
+                mtime = _folder_mtime(directory)
+                if mtime == self.folder_mtimes[directory]:
+                    continue
+                self.folder_mtimes[directory] = mtime
+
+            old = self.snapshots[directory]
+            new = _snapshot_folder(directory)
+            self.snapshots[directory] = new
+
+            for name, info in new.items():
+                previous = old.get(name)
+                if previous is None:
+                    changes.append((kind, 'added', name, directory, info[0]))
+                elif previous[1:] != info[1:] and kind not in self.names_only_kinds:
+                    changes.append((kind, 'modified', name, directory, info[0]))
+            for name, info in old.items():
+                if name not in new:
+                    changes.append((kind, 'removed', name, directory, info[0]))
+
+        return changes
+
+    def close(self):
+        pass
+
+# ============================================================================
+# WATCHER
+# ============================================================================
+
+class FileWatcher:
+    """
+    Watch folders on a background thread and deliver batches of FileChange to a callback
+
+    folders is a list of (kind, directory) pairs; the kind is passed back in every change.
+    The callback runs on the watcher thread - GUI code must hand the batch over to its own thread.
+    """
+
+    def __init__(self, folders: List[Tuple[str, str]], callback: Callable[[List[FileChange]], None],
+                 poll_interval: float = WATCH_POLL_INTERVAL, debounce: float = WATCH_DEBOUNCE,
+                 names_only_kinds=('rom',), use_inotify: bool = True):
+        self.folders = [(kind, os.path.abspath(directory)) for kind, directory in folders
+                        if os.path.isdir(directory)]
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.names_only_kinds = names_only_kinds
+        self.use_inotify = use_inotify
+        self.backend = None
+        self._pending = {}
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> bool:
+        """Start watching; returns False if there is nothing to watch"""
+        if not self.folders:
+            print("File watcher: no folders to watch")
+            return False
+
+        libc = _load_inotify_libc() if self.use_inotify else None
+        if libc is not None:
+            try:
+                self.backend = _InotifyBackend(libc, self.folders)
+            except OSError as e:
+                print(f"File watcher: inotify unavailable ({e}), falling back to polling")
+        if self.backend is None:
+            self.backend = _PollingBackend(self.folders, self.poll_interval, self.names_only_kinds)
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self._thread.start()
+        print(f"File watcher started ({self.backend.name}) for {len(self.folders)} folders")
+        return True
+
+    def stop(self):
+        """Stop the watcher thread and release the backend"""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.poll_interval + 1.0)
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+
+    def _queue_change(self, kind: str, action: str, name: Optional[str], directory: str, is_dir: bool):
+        """Coalesce a raw change with anything already pending for the same entry"""
+        key = (directory, name)
+        previous = self._pending.get(key)
+
+        if previous is not None:
+            if previous.action == 'added' and action == 'removed':
+                # Created and deleted within one batch - nothing to report
+                del self._pending[key]
+                return
+            if previous.action == 'added' and action == 'modified':
+                action = 'added'
+            elif previous.action == 'removed' and action == 'added':
+                action = 'modified'
+
+        self._pending[key] = FileChange(kind, action, name, directory, is_dir)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                raw_changes = self.backend.poll(self.debounce / 2)
+            except Exception as e:
+                print(f"File watcher error: {e}")
+                time.sleep(self.poll_interval)
+                continue
+
+            now = time.monotonic()
+            if raw_changes:
+                if not self._pending:
+                    self._first_change = now
+                for change in raw_changes:
+                    self._queue_change(*change)
+                self._last_change = now
+
+            if self._pending and (now - self._last_change >= self.debounce or
+                                  now - self._first_change >= WATCH_MAX_DELAY):
+                batch = list(self._pending.values())
+                self._pending.clear()
+                try:
+                    self.callback(batch)
+                except Exception as e:
+                    print(f"File watcher callback error: {e}")
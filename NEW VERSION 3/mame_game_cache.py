@@ -0,0 +1,622 @@
+# mame_game_cache.py
+"""
+Processed game data cache shared by the Tk GUI, the PyQt preview and the CLI
+A bounded in-memory LRU tier sits in front of a single SQLite store, preview/cache/game_cache.db
+
+Each ROM has one row per (input_mode, friendly_names, xinput_only_mode) variant, so toggling
+settings switches between entries instead of discarding them. A variant records a hash of the
+inputs it was built from and the stat signatures of the input files:
+- producers that know the input hash (GUI, precache) only reuse a variant with the same hash
+- the preview, which starts without loading gamedata, reuses it while the input files are unchanged
+
+The store also keeps a usage index (last access and access count per ROM) and hit/miss counters.
+evict() uses them to keep the store within a byte budget, least recently used ROMs first,
+while the most frequently played ROMs stay pinned.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Settings that change how a ROM's controls are processed; with the ROM name they form the cache key
+CacheSettings = namedtuple('CacheSettings', ['input_mode', 'friendly_names', 'xinput_only_mode'])
+
+DEFAULT_CACHE_SETTINGS = CacheSettings('xinput', True, True)
+
+VALID_INPUT_MODES = ('joycode', 'xinput', 'dinput', 'keycode')
+
+# Processed games kept in memory per cache directory
+GAME_CACHE_MEMORY_ENTRIES = 256
+
+GAME_CACHE_DB_NAME = "game_cache.db"
+GAME_CACHE_SCHEMA_VERSION = 2
+GAME_CACHE_COMPRESS_LEVEL = 6
+
+# How long a writer waits for another process (GUI, --precache) holding the store (seconds)
+GAME_CACHE_BUSY_TIMEOUT = 10.0
+
+# Per-ROM JSON files written by earlier versions; imported into the store once and removed
+LEGACY_CACHE_FILE_SUFFIX = "_cache.json"
+
+# Eviction limits used when cache_settings.json doesn't set them
+DEFAULT_CACHE_MAX_AGE_DAYS = 9999
+DEFAULT_CACHE_MAX_SIZE_MB = 32
+
+# ROMs looked up at least this often are pinned, up to CACHE_MAX_PINNED_ROMS of the most used ones
+CACHE_PIN_MIN_ACCESSES = 5
+CACHE_MAX_PINNED_ROMS = 50
+
+# Usage and hit/miss counts are written in batches: once this many ROMs are pending or the interval has passed
+USAGE_FLUSH_ENTRIES = 32
+USAGE_FLUSH_INTERVAL = 30.0
+
+GAME_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS game_cache (
+    rom_name TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    input_hash TEXT,
+    input_files TEXT NOT NULL,
+    cached_timestamp REAL NOT NULL,
+    data_size INTEGER NOT NULL DEFAULT 0,
+    data BLOB NOT NULL,
+    PRIMARY KEY (rom_name, variant)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rom_usage (
+    rom_name TEXT PRIMARY KEY,
+    last_access REAL NOT NULL,
+    access_count INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS cache_counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Limits for evict(), from cache_settings.json
+CacheLimits = namedtuple('CacheLimits', ['max_age_days', 'max_size_mb', 'auto_cleanup'])
+
+DEFAULT_CACHE_LIMITS = CacheLimits(DEFAULT_CACHE_MAX_AGE_DAYS, DEFAULT_CACHE_MAX_SIZE_MB, True)
+
+def get_game_cache_db_path(cache_dir: str) -> str:
+    """Get the cache store for a cache directory"""
+    return os.path.join(cache_dir, GAME_CACHE_DB_NAME)
+
+def load_cache_settings(settings_dir: str) -> CacheSettings:
+    """Read the cache-relevant settings from control_config_settings.json"""
+    settings_path = os.path.join(settings_dir, "control_config_settings.json")
+    try:
+        with open(settings_path, 'r') as f:
+            settings = json.load(f)
+    except FileNotFoundError:
+        return DEFAULT_CACHE_SETTINGS
+    except Exception as e:
+        print(f"Error loading cache settings: {e}, using defaults")
+        return DEFAULT_CACHE_SETTINGS
+
+    input_mode = settings.get('input_mode', DEFAULT_CACHE_SETTINGS.input_mode)
+    if input_mode not in VALID_INPUT_MODES:
+        print(f"Invalid input mode '{input_mode}' in settings, using default: {DEFAULT_CACHE_SETTINGS.input_mode}")
+        input_mode = DEFAULT_CACHE_SETTINGS.input_mode
+
+    # The GUI saves 'show_friendly_names'; older settings files used 'friendly_names'
+    friendly_names = settings.get('show_friendly_names',
+                                  settings.get('friendly_names', DEFAULT_CACHE_SETTINGS.friendly_names))
+    xinput_only_mode = settings.get('xinput_only_mode', DEFAULT_CACHE_SETTINGS.xinput_only_mode)
+
+    return CacheSettings(input_mode, bool(friendly_names), bool(xinput_only_mode))
+
+def load_cache_limits(settings_dir: str) -> CacheLimits:
+    """Read the eviction limits from cache_settings.json"""
+    settings_path = os.path.join(settings_dir, "cache_settings.json")
+    try:
+        with open(settings_path, 'r') as f:
+            settings = json.load(f)
+        return CacheLimits(
+            int(settings.get('max_age_days', DEFAULT_CACHE_LIMITS.max_age_days)),
+            int(settings.get('max_size_mb', DEFAULT_CACHE_LIMITS.max_size_mb)),
+            bool(settings.get('auto_cleanup_enabled', DEFAULT_CACHE_LIMITS.auto_cleanup))
+        )
+    except FileNotFoundError:
+        return DEFAULT_CACHE_LIMITS
+    except Exception as e:
+        print(f"Error loading cache limits: {e}, using defaults")
+        return DEFAULT_CACHE_LIMITS
+
+def get_file_signatures(paths: Iterable[str]) -> Dict[str, Optional[list]]:
+    """path -> [mtime_ns, size], or None for files that don't exist"""
+    signatures = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signatures[path] = [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            signatures[path] = None
+    return signatures
+
+def _variant_id(settings: CacheSettings) -> str:
+    return f"{settings.input_mode}|{int(settings.friendly_names)}|{int(settings.xinput_only_mode)}"
+
+def _variant_settings(variant: Dict) -> CacheSettings:
+    return CacheSettings(
+        variant.get('input_mode'),
+        variant.get('friendly_names', True),
+        variant.get('xinput_only_mode', True)
+    )
+
+def _encode_game_data(game_data: Dict) -> str:
+    return json.dumps(game_data, separators=(',', ':'))
+
+def _read_legacy_variants(cache_path: str) -> Dict[str, Dict]:
+    """Read the variants of a per-ROM JSON cache file (2.0 single variant or 3.0 variants)"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache_data = json.load(f)
+    except Exception:
+        return {}
+
+    if not isinstance(cache_data, dict):
+        return {}
+    if isinstance(cache_data.get('variants'), dict):
+        return cache_data['variants']
+    if isinstance(cache_data.get('game_data'), dict):
+        return {_variant_id(_variant_settings(cache_data)): dict(cache_data, input_hash=None, input_files={})}
+    return {}
+
+class GameDataCache:
+    """
+    Two-tier cache of processed game data for one cache directory
+
+    Game data is held as encoded JSON, so every get() returns a private copy the caller may modify
+    and memory hits look exactly like store hits. Every store write is a single atomic statement.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = GAME_CACHE_MEMORY_ENTRIES):
+        self.cache_dir = cache_dir
+        self.db_path = get_game_cache_db_path(cache_dir)
+        self.max_entries = max_entries
+        # (rom, *settings) -> {'input_hash', 'input_files', 'cached_timestamp', 'text', 'dirty'}
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = None
+        self._conn_pid = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        # Not yet written to the usage index: rom -> [last_access, access_count], counter -> increment
+        self._pending_usage = {}
+        self._pending_counters = {}
+        self._last_usage_flush = 0.0
+
+    @staticmethod
+    def make_key(rom_name: str, settings: CacheSettings) -> Tuple:
+        return (rom_name,) + tuple(settings)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, rom_name: str, settings: CacheSettings, input_hash: Optional[str] = None,
+            record_access: bool = True) -> Optional[Dict]:
+        """
+        Return processed game data for rom_name under settings, or None on a miss
+        With input_hash the entry must have been built from the same inputs; without it the
+        entry is trusted while its input files are unchanged
+        Bulk jobs pass record_access=False so they don't count as plays or skew the hit rate
+        """
+        entry = self._lookup(rom_name, settings, input_hash, record_access)
+        if entry is None:
+            return None
+        return json.loads(entry['text'])
+
+    def contains(self, rom_name: str, settings: CacheSettings, input_hash: Optional[str] = None,
+                 record_access: bool = True) -> bool:
+        """Check for a valid entry without decoding it"""
+        return self._lookup(rom_name, settings, input_hash, record_access) is not None
+
+    def has_rom(self, rom_name: str) -> bool:
+        """Check whether any variant of a ROM is stored"""
+        with self._lock:
+            if any(key[0] == rom_name for key in self._entries):
+                return True
+            try:
+                row = self._connect().execute(
+                    "SELECT 1 FROM game_cache WHERE rom_name = ? LIMIT 1", (rom_name,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"Error reading game cache: {e}")
+                return False
+            return row is not None
+
+    def put(self, rom_name: str, settings: CacheSettings, game_data: Dict, input_hash: Optional[str] = None,
+            input_files: Iterable[str] = (), write_to_disk: bool = True) -> bool:
+        """
+        Store processed game data built from inputs identified by input_hash
+        input_files are the files the data was built from; write_to_disk=False defers the store write to save_to_disk()
+        """
+        entry = {
+            'input_hash': input_hash,
+            'input_files': get_file_signatures(input_files),
+            'cached_timestamp': time.time(),
+            'text': _encode_game_data(game_data),
+            'dirty': True
+        }
+        self._remember(self.make_key(rom_name, settings), entry)
+
+        if write_to_disk:
+            return self.save_to_disk(rom_name, settings)
+        return True
+
+    def save_to_disk(self, rom_name: str, settings: CacheSettings) -> bool:
+        """Write an entry that was put() with write_to_disk=False; does nothing if it is already stored"""
+        with self._lock:
+            entry = self._entries.get(self.make_key(rom_name, settings))
+            if entry is None or not entry['dirty']:
+                return False
+
+            data = zlib.compress(entry['text'].encode('utf-8'), GAME_CACHE_COMPRESS_LEVEL)
+            try:
+                self._connect().execute(
+                    "INSERT OR REPLACE INTO game_cache "
+                    "(rom_name, variant, input_hash, input_files, cached_timestamp, data_size, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (rom_name, _variant_id(settings), entry['input_hash'], json.dumps(entry['input_files']),
+                     entry['cached_timestamp'], len(data), data)
+                )
+            except sqlite3.Error as e:
+                print(f"Warning: Could not save cache for {rom_name}: {e}")
+                return False
+
+            entry['dirty'] = False
+            return True
+
+    def clear_memory(self, rom_name: Optional[str] = None):
+        """Drop memory entries for one ROM, or all of them"""
+        with self._lock:
+            if rom_name is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == rom_name]:
+                del self._entries[key]
+
+    def invalidate(self, rom_name: Optional[str] = None) -> int:
+        """Drop memory and stored entries for one ROM, or all of them; returns the number of stored entries removed"""
+        with self._lock:
+            self.clear_memory(rom_name)
+            try:
+                conn = self._connect()
+                if rom_name is not None:
+                    return conn.execute("DELETE FROM game_cache WHERE rom_name = ?", (rom_name,)).rowcount
+                removed = conn.execute("DELETE FROM game_cache").rowcount
+                # Give the space back when everything is cleared
+                conn.execute("VACUUM")
+                return removed
+            except sqlite3.Error as e:
+                print(f"Error clearing game cache: {e}")
+                return 0
+
+    def evict(self, max_bytes: int, max_age_days: int = DEFAULT_CACHE_MAX_AGE_DAYS) -> int:
+        """
+        Remove ROMs not used for max_age_days, then least recently used ROMs until the stored
+        data fits in max_bytes. Pinned ROMs are never evicted. Returns the number of variants removed
+        """
+        with self._lock:
+            self.flush_usage()
+            try:
+                conn = self._connect()
+                pinned = self._pinned_roms(conn)
+                # One row per ROM, least recently used first; never looked up counts from when it was cached
+                rows = conn.execute(
+                    "SELECT c.rom_name, SUM(c.data_size), COALESCE(u.last_access, MAX(c.cached_timestamp)) "
+                    "FROM game_cache c LEFT JOIN rom_usage u ON u.rom_name = c.rom_name "
+                    "GROUP BY c.rom_name ORDER BY 3"
+                ).fetchall()
+            except sqlite3.Error as e:
+                print(f"Error reading game cache index: {e}")
+                return 0
+
+            total_bytes = sum(size for _, size, _ in rows)
+            cutoff = time.time() - max_age_days * 86400
+            victims = []
+            for rom_name, size, last_access in rows:
+                if total_bytes <= max_bytes and last_access >= cutoff:
+                    break
+                if rom_name in pinned:
+                    continue
+                victims.append((rom_name,))
+                total_bytes -= size
+
+            if not victims:
+                return 0
+
+            try:
+                with conn:
+                    conn.execute("BEGIN")
+                    removed = conn.executemany("DELETE FROM game_cache WHERE rom_name = ?", victims).rowcount
+                    conn.execute(
+                        "INSERT INTO cache_counters (name, value) VALUES ('evicted_roms', ?) "
+                        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (len(victims),)
+                    )
+            except sqlite3.Error as e:
+                print(f"Error evicting game cache entries: {e}")
+                return 0
+
+            for (rom_name,) in victims:
+                self.clear_memory(rom_name)
+            return removed
+
+    def flush_usage(self):
+        """Write pending access times and hit/miss counts to the store"""
+        with self._lock:
+            self._last_usage_flush = time.monotonic()
+            if not self._pending_usage and not self._pending_counters:
+                return
+
+            usage = [(rom, last, count) for rom, (last, count) in self._pending_usage.items()]
+            counters = list(self._pending_counters.items())
+            try:
+                conn = self._connect()
+                with conn:
+                    conn.execute("BEGIN")
+                    conn.executemany(
+                        "INSERT INTO rom_usage (rom_name, last_access, access_count) VALUES (?, ?, ?) "
+                        "ON CONFLICT(rom_name) DO UPDATE SET last_access = MAX(last_access, excluded.last_access), "
+                        "access_count = access_count + excluded.access_count", usage
+                    )
+                    conn.executemany(
+                        "INSERT INTO cache_counters (name, value) VALUES (?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", counters
+                    )
+            except sqlite3.Error as e:
+                print(f"Warning: Could not save cache usage: {e}")
+                return
+
+            self._pending_usage.clear()
+            self._pending_counters.clear()
+
+    def reset_stats(self):
+        """Zero the stored hit/miss and eviction counters"""
+        with self._lock:
+            self._pending_counters.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            try:
+                self._connect().execute("DELETE FROM cache_counters")
+            except sqlite3.Error as e:
+                print(f"Error resetting cache statistics: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Size of the store plus hit/miss counters across every process that used it"""
+        with self._lock:
+            self.flush_usage()
+            try:
+                conn = self._connect()
+                entries, roms, data_bytes = conn.execute(
+                    "SELECT COUNT(*), COUNT(DISTINCT rom_name), COALESCE(SUM(data_size), 0) FROM game_cache"
+                ).fetchone()
+                counters = dict(conn.execute("SELECT name, value FROM cache_counters").fetchall())
+                pinned = len(self._pinned_roms(conn))
+            except sqlite3.Error as e:
+                print(f"Error reading game cache: {e}")
+                entries = roms = data_bytes = pinned = 0
+                counters = {}
+
+        try:
+            file_bytes = os.path.getsize(self.db_path)
+        except OSError:
+            file_bytes = 0
+
+        hits = counters.get('hits', 0)
+        disk_hits = counters.get('disk_hits', 0)
+        misses = counters.get('misses', 0)
+        lookups = hits + disk_hits + misses
+        return {
+            'entries': entries,
+            'roms': roms,
+            'pinned_roms': pinned,
+            'data_bytes': data_bytes,
+            'file_bytes': file_bytes,
+            'memory_entries': len(self._entries),
+            'hits': hits,
+            'disk_hits': disk_hits,
+            'misses': misses,
+            'lookups': lookups,
+            'hit_rate': (hits + disk_hits) / lookups if lookups else 0.0,
+            'evicted_roms': counters.get('evicted_roms', 0)
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self.flush_usage()
+                try:
+                    self._conn.close()
+                except sqlite3.Error:
+                    pass
+            self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the store on first use (and again in a forked child process)"""
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=GAME_CACHE_BUSY_TIMEOUT,
+                               isolation_level=None, check_same_thread=False)
+        # WAL lets the preview read while the GUI or --precache writes
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 1:
+            # Version 1 had no size column or usage index - keep its entries
+            conn.execute("ALTER TABLE game_cache ADD COLUMN data_size INTEGER NOT NULL DEFAULT 0")
+            conn.execute("UPDATE game_cache SET data_size = LENGTH(data)")
+        elif version != GAME_CACHE_SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS game_cache")
+        if version != GAME_CACHE_SCHEMA_VERSION:
+            conn.executescript(GAME_CACHE_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {GAME_CACHE_SCHEMA_VERSION}")
+
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        self._import_legacy_files()
+        return conn
+
+    def _import_legacy_files(self):
+        """Move per-ROM JSON cache files from earlier versions into the store"""
+        try:
+            filenames = [name for name in os.listdir(self.cache_dir) if name.endswith(LEGACY_CACHE_FILE_SUFFIX)]
+        except OSError:
+            return
+        if not filenames:
+            return
+
+        rows = []
+        for filename in filenames:
+            cache_path = os.path.join(self.cache_dir, filename)
+            rom_name = filename[:-len(LEGACY_CACHE_FILE_SUFFIX)]
+            for variant_id, variant in _read_legacy_variants(cache_path).items():
+                if not isinstance(variant.get('game_data'), dict):
+                    continue
+                data = zlib.compress(_encode_game_data(variant['game_data']).encode('utf-8'),
+                                     GAME_CACHE_COMPRESS_LEVEL)
+                rows.append((rom_name, variant_id, variant.get('input_hash'),
+                             json.dumps(variant.get('input_files') or {}),
+                             variant.get('cached_timestamp', time.time()), len(data), data))
+
+        try:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO game_cache "
+                    "(rom_name, variant, input_hash, input_files, cached_timestamp, data_size, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        except sqlite3.Error as e:
+            print(f"Error importing legacy cache files: {e}")
+            return
+
+        for filename in filenames:
+            try:
+                os.remove(os.path.join(self.cache_dir, filename))
+            except OSError:
+                pass
+        print(f"Imported {len(rows)} cached variants from {len(filenames)} legacy cache files")
+
+    def _lookup(self, rom_name: str, settings: CacheSettings, input_hash: Optional[str],
+                record_access: bool) -> Optional[Dict]:
+        key = self.make_key(rom_name, settings)
+        with self._lock:
+            entry = self._entries.get(key)
+            from_disk = entry is None
+            if from_disk:
+                entry = self._read_entry(rom_name, settings)
+
+            if entry is None or not self._is_valid(entry, input_hash):
+                self.misses += 1
+                if record_access:
+                    self._record_access(rom_name, 'misses')
+                return None
+
+            if from_disk:
+                self.disk_hits += 1
+                self._remember(key, entry)
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            if record_access:
+                self._record_access(rom_name, 'disk_hits' if from_disk else 'hits')
+
+            if input_hash is not None:
+                # Same inputs but the files were touched - record the new signatures for the preview
+                signatures = get_file_signatures(entry['input_files'])
+                if signatures != entry['input_files']:
+                    entry['input_files'] = signatures
+                    entry['dirty'] = True
+                    self.save_to_disk(rom_name, settings)
+            return entry
+
+    def _record_access(self, rom_name: str, counter: str):
+        usage = self._pending_usage.setdefault(rom_name, [0.0, 0])
+        usage[0] = time.time()
+        usage[1] += 1
+        self._pending_counters[counter] = self._pending_counters.get(counter, 0) + 1
+
+        # A short-lived preview process writes its first lookup straight away
+        if (len(self._pending_usage) >= USAGE_FLUSH_ENTRIES or
+                time.monotonic() - self._last_usage_flush >= USAGE_FLUSH_INTERVAL):
+            self.flush_usage()
+
+    @staticmethod
+    def _pinned_roms(conn: sqlite3.Connection) -> set:
+        """The most frequently looked up ROMs, which eviction leaves alone"""
+        return {row[0] for row in conn.execute(
+            "SELECT rom_name FROM rom_usage WHERE access_count >= ? "
+            "ORDER BY access_count DESC, last_access DESC LIMIT ?",
+            (CACHE_PIN_MIN_ACCESSES, CACHE_MAX_PINNED_ROMS)
+        )}
+
+    @staticmethod
+    def _is_valid(entry: Dict, input_hash: Optional[str]) -> bool:
+        if input_hash is not None:
+            return entry['input_hash'] == input_hash
+        return get_file_signatures(entry['input_files']) == entry['input_files']
+
+    def _remember(self, key: Tuple, entry: Dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _read_entry(self, rom_name: str, settings: CacheSettings) -> Optional[Dict]:
+        """Single indexed lookup of a variant in the store"""
+        try:
+            row = self._connect().execute(
+                "SELECT input_hash, input_files, cached_timestamp, data FROM game_cache "
+                "WHERE rom_name = ? AND variant = ?", (rom_name, _variant_id(settings))
+            ).fetchone()
+            if row is None:
+                return None
+            return {
+                'input_hash': row[0],
+                'input_files': json.loads(row[1]),
+                'cached_timestamp': row[2],
+                'text': zlib.decompress(row[3]).decode('utf-8'),
+                'dirty': False
+            }
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            print(f"Ignoring unreadable cache entry for {rom_name}: {e}")
+            return None
+
+# ============================================================================
+# SHARED INSTANCES
+# ============================================================================
+
+_game_caches = {}
+_game_caches_lock = threading.Lock()
+
+def get_game_cache(cache_dir: str) -> GameDataCache:
+    """Get the process-wide cache for a cache directory"""
+    cache_dir = os.path.abspath(cache_dir)
+    with _game_caches_lock:
+        cache = _game_caches.get(cache_dir)
+        if cache is None:
+            cache = _game_caches[cache_dir] = GameDataCache(cache_dir)
+        return cache
+
+def flush_game_caches():
+    """Write pending usage of every shared cache; registered to run at exit"""
+    with _game_caches_lock:
+        caches = list(_game_caches.values())
+    for cache in caches:
+        if cache._conn is not None:
+            cache.flush_usage()
+
+atexit.register(flush_game_caches)
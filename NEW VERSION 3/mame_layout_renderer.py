@@ -0,0 +1,529 @@
+# mame_layout_renderer.py
+"""
+Widget-free renderer for control preview images
+
+resolve_layout reads everything a preview image depends on (label positions, text, bezel and logo
+settings, artwork paths) from the preview folder, and render_layout_image paints it with QPainter
+straight into a QImage - the same layers, fonts, colours and label geometry PreviewWindow.save_image
+draws, without building a QMainWindow or a QLabel per control. It only needs a QGuiApplication,
+so exports run on the offscreen platform and never touch the screen.
+"""
+
+import json
+import os
+import time
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import (QBrush, QColor, QFont, QFontDatabase, QFontInfo, QFontMetrics, QGuiApplication,
+                         QImage, QLinearGradient, QPainter, QPen)
+
+from mame_controls_preview import (find_bezel_image, find_logo_image, get_button_prefix_for_control,
+                                   get_button_prefix_from_mapping, register_application_font)
+
+# Everything besides game data that decides what a preview image looks like
+LayoutSettings = namedtuple('LayoutSettings', [
+    'positions',        # control name -> [x, y] before the text y_offset is applied
+    'text_settings',
+    'bezel_settings',   # bezel_visible plus the directional mode settings
+    'logo_settings',
+    'background_path',
+    'bezel_path',
+    'logo_path',
+    'fonts_dir'
+])
+
+# Canvas size when there is no real screen to take it from (the offscreen platform)
+DEFAULT_RENDER_SIZE = (1920, 1080)
+
+# Same defaults PreviewWindow starts from when a settings file is missing
+DEFAULT_TEXT_SETTINGS = {
+    "font_family": "Arial",
+    "font_size": 28,
+    "bold_strength": 2,
+    "use_uppercase": False,
+    "y_offset": -40,
+    "show_button_prefix": True,
+    "prefix_color": "#FFC107",
+    "action_color": "#FFFFFF",
+    "use_prefix_gradient": False,
+    "use_action_gradient": False,
+    "prefix_gradient_start": "#FFC107",
+    "prefix_gradient_end": "#FF5722",
+    "action_gradient_start": "#2196F3",
+    "action_gradient_end": "#4CAF50"
+}
+
+DEFAULT_BEZEL_SETTINGS = {
+    "bezel_visible": False,
+    "joystick_visible": True,
+    "auto_show_directionals_for_directional_only": True,
+    "directional_mode": "show_all",
+    "hide_specialized_with_directional": False
+}
+
+DEFAULT_LOGO_SETTINGS = {
+    "logo_visible": True,
+    "custom_position": True,
+    "x_position": 20,
+    "y_position": 20,
+    "width_percentage": 15,
+    "height_percentage": 15,
+    "maintain_aspect": True,
+    "keep_horizontally_centered": False
+}
+
+STANDARD_DIRECTIONAL_TYPES = ["JOYSTICK", "JOYSTICKLEFT", "JOYSTICKRIGHT", "DPAD"]
+SPECIALIZED_DIRECTIONAL_TYPES = ["DIAL", "PADDLE", "TRACKBALL", "MOUSE", "LIGHTGUN",
+                                 "AD_STICK", "PEDAL", "POSITIONAL"]
+BUTTON_TYPES = ["BUTTON", "START", "SELECT", "GAMBLE"]
+
+NO_BUTTONS_CONTROL = "NO_BUTTONS_NOTIFICATION"
+NO_BUTTONS_TEXT = "NB: No Buttons Used"
+
+# Scaled artwork kept per process; the shared default background is redrawn for every ROM of a batch
+ARTWORK_CACHE_SIZE = 4
+
+# Label geometry shared with the preview's label classes
+LABEL_LEFT_MARGIN = 10
+NO_BUTTONS_PADDING = 60
+MAX_ACTION_LENGTH = 50
+
+# How long check_against_preview lets a preview window finish its deferred setup (seconds)
+PREVIEW_SETTLE_TIME = 2.0
+
+# ============================================================================
+# SETTINGS
+# ============================================================================
+
+def _load_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _load_first(paths: List[str]) -> Optional[Dict]:
+    for path in paths:
+        if os.path.exists(path):
+            return _load_json(path)
+    return None
+
+def get_layout_mapping(rom_name: str, game_data: Dict) -> Optional[str]:
+    """The shared mapping whose saved positions apply to this ROM, if it has one"""
+    mappings = game_data.get('mappings')
+    if mappings is None and isinstance(game_data.get(rom_name), dict):
+        mappings = game_data[rom_name].get('mappings')
+    if isinstance(mappings, list):
+        return mappings[0] if mappings else None
+    return mappings or None
+
+def load_layout_positions(rom_name: str, game_data: Dict, mame_dir: str) -> Dict:
+    """Saved label positions with ROM-specific over mapping over global, read-only (no migration)"""
+    preview_dir = os.path.join(mame_dir, "preview")
+    settings_dir = os.path.join(preview_dir, "settings")
+
+    positions = {}
+    positions.update(_load_first([
+        os.path.join(settings_dir, "global_positions.json"),
+        os.path.join(preview_dir, "global_positions.json"),
+        os.path.join(mame_dir, "global_positions.json")
+    ]) or {})
+
+    mapping = get_layout_mapping(rom_name, game_data)
+    if mapping:
+        positions.update(_load_json(os.path.join(settings_dir, f"{mapping}_positions.json")) or {})
+
+    positions.update(_load_first([
+        os.path.join(settings_dir, f"{rom_name}_positions.json"),
+        os.path.join(preview_dir, f"{rom_name}_positions.json")
+    ]) or {})
+    return positions
+
+def resolve_layout(rom_name: str, game_data: Dict, mame_dir: str, show_bezel: bool = True,
+                   show_logo: bool = True) -> LayoutSettings:
+    """Read the layout PreviewWindow would open with for rom_name; show_bezel/show_logo can only hide"""
+    preview_dir = os.path.join(mame_dir, "preview")
+    settings_dir = os.path.join(preview_dir, "settings")
+
+    text_settings = dict(DEFAULT_TEXT_SETTINGS)
+    text_settings.update(_load_first([
+        os.path.join(settings_dir, "text_appearance_settings.json"),
+        os.path.join(preview_dir, "global_text_settings.json")
+    ]) or {})
+
+    bezel_settings = dict(DEFAULT_BEZEL_SETTINGS)
+    bezel_settings.update(_load_json(os.path.join(settings_dir, "bezel_settings.json")) or {})
+    bezel_settings["bezel_visible"] = bool(bezel_settings.get("bezel_visible")) and show_bezel
+
+    logo_settings = dict(DEFAULT_LOGO_SETTINGS)
+    logo_settings.update(_load_first([
+        os.path.join(settings_dir, "logo_settings.json"),
+        os.path.join(preview_dir, f"{rom_name}_logo.json"),
+        os.path.join(preview_dir, "global_logo.json"),
+        os.path.join(mame_dir, "logo_settings.json")
+    ]) or {})
+    logo_settings["logo_visible"] = bool(logo_settings.get("logo_visible")) and show_logo
+
+    # The preview always ends up on the shared transparent default background
+    background_path = os.path.join(preview_dir, "images", "default.png")
+
+    return LayoutSettings(
+        positions=load_layout_positions(rom_name, game_data, mame_dir),
+        text_settings=text_settings,
+        bezel_settings=bezel_settings,
+        logo_settings=logo_settings,
+        background_path=background_path if os.path.exists(background_path) else None,
+        bezel_path=find_bezel_image(preview_dir, rom_name) if bezel_settings["bezel_visible"] else None,
+        logo_path=find_logo_image(preview_dir, rom_name) if logo_settings["logo_visible"] else None,
+        fonts_dir=os.path.join(preview_dir, "fonts")
+    )
+
+def get_render_size(screen_index: int = 1) -> Tuple[int, int]:
+    """Size of the screen a preview would fill, or DEFAULT_RENDER_SIZE without a real screen"""
+    screens = QGuiApplication.screens()
+    if QGuiApplication.platformName() == "offscreen" or not screens:
+        return DEFAULT_RENDER_SIZE
+    screen = screens[screen_index - 1] if 0 < screen_index <= len(screens) else screens[0]
+    return screen.geometry().width(), screen.geometry().height()
+
+# ============================================================================
+# FONTS
+# ============================================================================
+
+def _register_font_families(font_path: str) -> List[str]:
+    font_id = register_application_font(font_path)
+    return QFontDatabase.applicationFontFamilies(font_id) if font_id >= 0 else []
+
+def load_layout_font(text_settings: Dict, fonts_dir: Optional[str]) -> QFont:
+    """The label font, registering a matching file from preview/fonts like the preview does"""
+    font_family = text_settings.get("font_family", "Arial")
+    font_size = text_settings.get("font_size", 28)
+    bold = text_settings.get("bold_strength", 2) > 0
+
+    font_files = []
+    if fonts_dir and os.path.isdir(fonts_dir):
+        font_files = [os.path.join(fonts_dir, name) for name in sorted(os.listdir(fonts_dir))
+                      if name.lower().endswith(('.ttf', '.otf'))]
+
+    # A font file named after the family
+    family = font_family
+    for font_path in font_files:
+        base_name = os.path.splitext(os.path.basename(font_path))[0].lower()
+        if base_name == font_family.lower() or font_family.lower() in base_name or base_name in font_family.lower():
+            families = _register_font_families(font_path)
+            if families:
+                family = families[0]
+                break
+
+    font = QFont(family, font_size)
+    font.setBold(bold)
+    if QFontInfo(font).family() == family:
+        return font
+
+    # Qt substituted it - look for a font file whose family contains the requested name
+    for font_path in font_files:
+        for candidate in _register_font_families(font_path):
+            if font_family.lower() in candidate.lower() or candidate.lower() in font_family.lower():
+                font = QFont(candidate, font_size)
+                font.setBold(bold)
+                font.setStyleStrategy(QFont.PreferMatch)
+                return font
+    return font
+
+# ============================================================================
+# LABELS
+# ============================================================================
+
+def _is_standard_directional(control_name: str) -> bool:
+    return any(control_type in control_name for control_type in STANDARD_DIRECTIONAL_TYPES)
+
+def _is_specialized_directional(control_name: str) -> bool:
+    return any(control_type in control_name for control_type in SPECIALIZED_DIRECTIONAL_TYPES)
+
+def _truncate(text: str) -> str:
+    if len(text) <= MAX_ACTION_LENGTH:
+        return text
+    return text[:MAX_ACTION_LENGTH - 1] + "›"
+
+def _control_prefix(control: Dict, use_xinput: bool) -> str:
+    mapping = control.get('mapping')
+    if mapping and mapping != "NONE":
+        prefix = get_button_prefix_from_mapping(mapping, use_xinput)
+        if not prefix and 'DINPUT_' in mapping:
+            button_num = mapping.replace('DINPUT_1_BUTTON', '')
+            if button_num.isdigit():
+                prefix = f"B{button_num}"
+        return prefix
+    return get_button_prefix_for_control(control['name'])
+
+def _word_wrap_height(metrics: QFontMetrics, text: str) -> int:
+    """Height a word-wrapping QLabel gives itself for text (QLabel's own width heuristic)"""
+    flags = Qt.AlignLeft | Qt.TextWordWrap
+    width = metrics.averageCharWidth() * 80
+    rect = metrics.boundingRect(0, 0, width, 2000, flags, text)
+    if rect.height() < 4 * metrics.lineSpacing() and rect.width() > width / 2:
+        rect = metrics.boundingRect(0, 0, width // 2, 2000, flags, text)
+    if rect.height() < 2 * metrics.lineSpacing() and rect.width() > width / 4:
+        rect = metrics.boundingRect(0, 0, width // 4, 2000, flags, text)
+    return rect.height()
+
+def layout_labels(game_data: Dict, layout: LayoutSettings, metrics: QFontMetrics,
+                  size: Tuple[int, int]) -> List[Dict]:
+    """
+    Player 1 labels as the preview places them: text, top-left position, height and visibility
+    Each entry has name, text, x, y, height and visible
+    """
+    text_settings = layout.text_settings
+    bezel_settings = layout.bezel_settings
+    y_offset = text_settings.get("y_offset", -40)
+    use_uppercase = text_settings.get("use_uppercase", False)
+    show_button_prefix = text_settings.get("show_button_prefix", True)
+    use_xinput = game_data.get('input_mode') == 'xinput' if game_data else True
+
+    controls = []
+    for player in game_data.get('players', []):
+        if player['number'] == 1:
+            controls.extend(player.get('labels', []))
+
+    # Directional-only games can show their directionals even when the mode hides them
+    directional_count = sum(1 for control in controls if _is_standard_directional(control['name']))
+    has_buttons = any(not _is_standard_directional(control['name'])
+                      and any(control_type in control['name'] for control_type in BUTTON_TYPES)
+                      for control in controls)
+    auto_show = (directional_count > 0 and not has_buttons
+                 and bezel_settings.get("auto_show_directionals_for_directional_only", True))
+    directional_mode = bezel_settings.get("directional_mode", "show_all")
+
+    labels = []
+    grid_x, grid_y = 0, 0
+    for control in controls:
+        control_name = control['name']
+        prefix = _control_prefix(control, use_xinput)
+
+        action = control['value'].upper() if use_uppercase else control['value']
+        text = _truncate(action)
+        if show_button_prefix and prefix:
+            text = f"{prefix}: {text}"
+
+        if control_name in layout.positions:
+            x, y = layout.positions[control_name]
+        else:
+            x, y = 100 + grid_x * 150, 100 + grid_y * 40
+            grid_x = (grid_x + 1) % 5
+            if grid_x == 0:
+                grid_y += 1
+
+        visible = True
+        if _is_standard_directional(control_name):
+            visible = directional_mode not in ("hide_standard", "hide_all") or auto_show
+        elif _is_specialized_directional(control_name):
+            visible = directional_mode not in ("hide_specialized", "hide_all") or auto_show
+
+        labels.append({'name': control_name, 'text': text, 'x': int(x), 'y': int(y) + y_offset,
+                       'height': metrics.height(), 'visible': visible})
+
+    # Games without buttons say so once every directional is hidden
+    directionals = [label for label in labels
+                    if _is_standard_directional(label['name']) or _is_specialized_directional(label['name'])]
+    if not has_buttons and directionals and not any(label['visible'] for label in directionals):
+        text = NO_BUTTONS_TEXT.upper() if use_uppercase else NO_BUTTONS_TEXT
+        # Unlike the control labels the notification keeps word wrap on, which sets its height
+        height = _word_wrap_height(metrics, text)
+        if NO_BUTTONS_CONTROL in layout.positions:
+            x, y = layout.positions[NO_BUTTONS_CONTROL]
+            y += y_offset
+        else:
+            x = (size[0] - metrics.horizontalAdvance(text) - NO_BUTTONS_PADDING) // 2
+            y = (size[1] - height) // 2
+        labels.append({'name': NO_BUTTONS_CONTROL, 'text': text, 'x': int(x), 'y': int(y),
+                       'height': height, 'visible': True})
+
+    return labels
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+
+@lru_cache(maxsize=ARTWORK_CACHE_SIZE)
+def _scaled_artwork(path: str, mtime: float, width: int, height: int, aspect_mode) -> Optional[QImage]:
+    image = QImage(path)
+    if image.isNull():
+        return None
+    return image.scaled(width, height, aspect_mode, Qt.SmoothTransformation)
+
+def load_scaled_artwork(path: str, width: int, height: int, aspect_mode=Qt.KeepAspectRatio) -> Optional[QImage]:
+    """Artwork scaled to fit width x height, or None if it cannot be read; cached until the file changes"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    return _scaled_artwork(path, mtime, width, height, aspect_mode)
+
+def _text_pen(metrics: QFontMetrics, text: str, x: int, y: int, use_gradient: bool,
+              color: str, gradient_start: str, gradient_end: str):
+    """Solid colour or a top-to-bottom gradient over the text's bounding box"""
+    if not use_gradient:
+        return QColor(color)
+    rect = metrics.boundingRect(text)
+    rect.moveLeft(x)
+    rect.moveTop(y - metrics.ascent())
+    gradient = QLinearGradient(rect.left(), rect.top(), rect.left(), rect.bottom())
+    gradient.setColorAt(0, QColor(gradient_start))
+    gradient.setColorAt(1, QColor(gradient_end))
+    return QPen(QBrush(gradient), 1)
+
+def _draw_label(painter: QPainter, metrics: QFontMetrics, label: Dict, text_settings: Dict):
+    x = label['x'] + LABEL_LEFT_MARGIN
+    y = int(label['y'] + (label['height'] + metrics.ascent() - metrics.descent()) / 2)
+    use_action_gradient = text_settings.get("use_action_gradient", False)
+
+    if ": " in label['text']:
+        prefix, action = label['text'].split(": ", 1)
+        prefix_text = f"{prefix}: "
+        painter.setPen(_text_pen(metrics, prefix_text, x, y, text_settings.get("use_prefix_gradient", False),
+                                 text_settings.get("prefix_color", "#FFC107"),
+                                 text_settings.get("prefix_gradient_start", "#FFC107"),
+                                 text_settings.get("prefix_gradient_end", "#FF5722")))
+        painter.drawText(x, y, prefix_text)
+        x += metrics.horizontalAdvance(prefix_text)
+    else:
+        action = label['text']
+
+    painter.setPen(_text_pen(metrics, action, x, y, use_action_gradient,
+                             text_settings.get("action_color", "#FFFFFF"),
+                             text_settings.get("action_gradient_start", "#2196F3"),
+                             text_settings.get("action_gradient_end", "#4CAF50")))
+    painter.drawText(x, y, action)
+
+def _place_logo(logo_path: str, logo_settings: Dict, size: Tuple[int, int]) -> Tuple[Optional[QImage], int, int]:
+    width, height = size
+    target_width = int(float(logo_settings.get("width_percentage", 15)) / 100 * width)
+    target_height = int(float(logo_settings.get("height_percentage", 15)) / 100 * height)
+    aspect = Qt.KeepAspectRatio if logo_settings.get("maintain_aspect", True) else Qt.IgnoreAspectRatio
+    scaled = load_scaled_artwork(logo_path, target_width, target_height, aspect)
+    if scaled is None:
+        return None, 0, 0
+
+    if logo_settings.get("logo_position", "") == "center":
+        x = (width - scaled.width()) // 2
+        y = (height - scaled.height()) // 2
+    elif logo_settings.get("keep_horizontally_centered", False):
+        x = (width - scaled.width()) // 2
+        y = logo_settings.get("y_position", 20)
+    else:
+        x = logo_settings.get("x_position", 20)
+        y = logo_settings.get("y_position", 20)
+    return scaled, int(x), int(y)
+
+def render_layout_image(game_data: Dict, layout: LayoutSettings, size: Optional[Tuple[int, int]] = None,
+                        font: Optional[QFont] = None) -> QImage:
+    """
+    Paint the preview for game_data into a transparent ARGB image of size (default get_render_size())
+    Layers go background, bezel, logo, then the control labels, as in PreviewWindow.save_image
+    """
+    width, height = size or get_render_size()
+    font = font or load_layout_font(layout.text_settings, layout.fonts_dir)
+    metrics = QFontMetrics(font)
+
+    image = QImage(width, height, QImage.Format_ARGB32)
+    image.fill(Qt.transparent)
+
+    painter = QPainter(image)
+    try:
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+        if layout.background_path:
+            background = load_scaled_artwork(layout.background_path, width, height, Qt.IgnoreAspectRatio)
+            if background is not None:
+                painter.drawImage(0, 0, background)
+
+        if layout.bezel_path and layout.bezel_settings.get("bezel_visible", False):
+            bezel = load_scaled_artwork(layout.bezel_path, width, height)
+            if bezel is not None:
+                painter.drawImage((width - bezel.width()) // 2, (height - bezel.height()) // 2, bezel)
+
+        if layout.logo_path and layout.logo_settings.get("logo_visible", True):
+            logo, x, y = _place_logo(layout.logo_path, layout.logo_settings, (width, height))
+            if logo is not None:
+                painter.drawImage(x, y, logo)
+
+        painter.setFont(font)
+        for label in layout_labels(game_data, layout, metrics, (width, height)):
+            if label['visible']:
+                _draw_label(painter, metrics, label, layout.text_settings)
+    finally:
+        painter.end()
+    return image
+
+def save_layout_image(image: QImage, output_path: str, image_format: str = "png") -> bool:
+    """Write a rendered image; jpg/bmp have no alpha, so those get the preview's black canvas behind"""
+    image_format = image_format.lower()
+    if image_format in ("jpg", "jpeg", "bmp"):
+        flattened = QImage(image.size(), QImage.Format_RGB32)
+        flattened.fill(Qt.black)
+        painter = QPainter(flattened)
+        painter.drawImage(0, 0, image)
+        painter.end()
+        image = flattened
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    if image.save(output_path, "JPG" if image_format == "jpeg" else image_format.upper()):
+        print(f"Image saved successfully to {output_path}")
+        return True
+    print(f"Failed to save image to {output_path}")
+    return False
+
+def export_layout_image(rom_name: str, game_data: Dict, mame_dir: str, output_path: str,
+                        image_format: str = "png", show_bezel: bool = True, show_logo: bool = True,
+                        size: Optional[Tuple[int, int]] = None) -> bool:
+    """Resolve, render and save one ROM's preview image; needs a QGuiApplication in this process"""
+    layout = resolve_layout(rom_name, game_data, mame_dir, show_bezel=show_bezel, show_logo=show_logo)
+    return save_layout_image(render_layout_image(game_data, layout, size), output_path, image_format)
+
+# ============================================================================
+# CHECKS
+# ============================================================================
+
+def count_differing_pixels(first: QImage, second: QImage) -> int:
+    """Number of pixels whose ARGB value differs; every pixel counts when the sizes differ"""
+    if first.size() != second.size():
+        return max(first.width() * first.height(), second.width() * second.height())
+
+    pixels = []
+    for image in (first, second):
+        image = image.convertToFormat(QImage.Format_ARGB32)
+        bits = image.constBits()
+        bits.setsize(image.byteCount())
+        pixels.append(memoryview(bytes(bits)).cast('I'))
+    return sum(1 for a, b in zip(*pixels) if a != b)
+
+def check_against_preview(rom_name: str, game_data: Dict, mame_dir: str) -> int:
+    """
+    Render rom_name both ways - a clean PreviewWindow painted as save_image does, and
+    render_layout_image on the settings files - and return how many pixels differ (0 when they agree)
+    Needs a QApplication in this process
+    """
+    from PyQt5.QtWidgets import QApplication
+    from mame_controls_preview import PreviewWindow
+
+    window = PreviewWindow(rom_name, game_data, mame_dir, hide_buttons=True, clean_mode=True)
+    try:
+        window.show()
+        # The window places its bezel and logo and resizes its labels on timers after it appears
+        deadline = time.monotonic() + PREVIEW_SETTLE_TIME
+        while time.monotonic() < deadline:
+            QApplication.processEvents()
+            time.sleep(0.01)
+
+        expected = window.render_canvas_image()
+        layout = resolve_layout(rom_name, game_data, mame_dir)
+        actual = render_layout_image(game_data, layout, (expected.width(), expected.height()))
+        return count_differing_pixels(expected, actual)
+    finally:
+        window.close()
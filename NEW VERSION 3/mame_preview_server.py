@@ -0,0 +1,404 @@
+# mame_preview_server.py
+"""
+Resident preview server (--serve) and its client (--show)
+
+The server keeps the Qt application, registered fonts, gamedata and the game cache loaded, so a
+pause-to-preview costs one local socket round trip instead of a process start that imports PyQt5.
+It listens on 127.0.0.1 and publishes its port and a per-run token in preview/cache/preview_server.json.
+A request that arrives while a preview with the same options is open switches that window to the new
+game in place (PreviewWindow.load_game) instead of building another one.
+The client half only uses the standard library, so --show starts as fast as Python does.
+"""
+
+import atexit
+import json
+import os
+import re
+import secrets
+import socket
+import sys
+import time
+import traceback
+from typing import Dict, Optional
+
+PREVIEW_SERVER_INFO_NAME = "preview_server.json"
+
+# How long the client waits to reach the server, and for a requested preview to appear (seconds)
+PREVIEW_CONNECT_TIMEOUT = 0.5
+PREVIEW_SHOW_TIMEOUT = 15.0
+
+# The server exits after this long without a request while no preview is open (seconds),
+# and when the MAME it was started alongside has exited (checked every MAME_CHECK_INTERVAL)
+PREVIEW_SERVER_IDLE_TIMEOUT = 60 * 60
+MAME_CHECK_INTERVAL = 5.0
+
+# mame.exe, mame64.exe, mamearcade64 ... but not "mame controls.exe"
+MAME_PROCESS_NAME = re.compile(r'^mame\w*(\.exe)?$', re.IGNORECASE)
+
+# What the client waits for after a request:
+# 'closed' - the preview was dismissed (keeps MAME paused like the old blocking launch)
+# 'shown'  - the preview is on screen
+# 'sent'   - nothing, fire and forget
+PREVIEW_WAIT_MODES = ('closed', 'shown', 'sent')
+
+def get_server_info_path(mame_dir: str) -> str:
+    """Where a running server publishes its port and token"""
+    return os.path.join(mame_dir, "preview", "cache", PREVIEW_SERVER_INFO_NAME)
+
+def read_server_info(mame_dir: str) -> Optional[Dict]:
+    """Port, token and pid of the server for mame_dir, or None if none was started"""
+    try:
+        with open(get_server_info_path(mame_dir), 'r') as f:
+            info = json.load(f)
+        if isinstance(info.get('port'), int) and info.get('token'):
+            return info
+    except (OSError, ValueError):
+        pass
+    return None
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+def send_server_command(mame_dir: str, request: Dict, wait: str = 'shown') -> Optional[Dict]:
+    """
+    Send one request to the running preview server and return its final reply
+    Returns None only when no server could be reached, so callers know to fall back
+    """
+    info = read_server_info(mame_dir)
+    if info is None:
+        return None
+
+    try:
+        sock = socket.create_connection(('127.0.0.1', info['port']), timeout=PREVIEW_CONNECT_TIMEOUT)
+    except OSError:
+        # Stale info file from a server that is gone
+        return None
+
+    with sock:
+        try:
+            sock.sendall((json.dumps(dict(request, token=info['token'], wait=wait)) + "\n").encode('utf-8'))
+            if wait == 'sent':
+                return {'status': 'sent'}
+
+            sock.settimeout(PREVIEW_SHOW_TIMEOUT)
+            with sock.makefile('r', encoding='utf-8') as replies:
+                for line in replies:
+                    reply = json.loads(line)
+                    status = reply.get('status')
+                    if status != 'shown' or wait == 'shown':
+                        return reply
+                    # The preview is up - wait for as long as it stays open
+                    sock.settimeout(None)
+            # No final reply - the server went away, taking any preview it showed with it
+            return {'status': 'error', 'message': "server closed the connection", 'dropped': True}
+        except ConnectionError as e:
+            return {'status': 'error', 'message': str(e), 'dropped': True}
+        except (OSError, ValueError) as e:
+            # The request may already be on screen, so this must not fall back to a second preview
+            return {'status': 'error', 'message': str(e)}
+
+def request_preview(mame_dir: str, rom_name: str, clean_mode: bool = False, hide_buttons: bool = False,
+                    screen: int = 1, wait: str = 'closed') -> Optional[Dict]:
+    """Ask the preview server to show rom_name; None when no server is running"""
+    return send_server_command(mame_dir, {
+        'command': 'show',
+        'game': rom_name,
+        'clean_mode': clean_mode,
+        'hide_buttons': hide_buttons,
+        'screen': screen
+    }, wait)
+
+def parse_screen(value) -> Optional[int]:
+    """Screen number of a show request (1 when not given), or None if it isn't a positive integer"""
+    if value is None:
+        return 1
+    if isinstance(value, bool):
+        return None
+    try:
+        screen = int(value)
+    except (TypeError, ValueError):
+        return None
+    return screen if screen >= 1 else None
+
+def is_server_running(mame_dir: str) -> bool:
+    reply = send_server_command(mame_dir, {'command': 'ping'})
+    return reply is not None and reply.get('status') == 'ok'
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+def is_mame_running() -> Optional[bool]:
+    """Whether a MAME process is running, or None when psutil isn't available to tell"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    for proc in psutil.process_iter(['name']):
+        if MAME_PROCESS_NAME.match(proc.info.get('name') or ''):
+            return True
+    return False
+
+class PreviewServer:
+    """Accepts preview requests on a QTcpServer and shows them with a resident MAMEControlConfig"""
+
+    def __init__(self, mame_dir: str, config):
+        from PyQt5.QtCore import QTimer
+        from PyQt5.QtNetwork import QTcpServer
+
+        self.mame_dir = mame_dir
+        self.config = config
+        self.token = secrets.token_hex(16)
+        self.info_path = get_server_info_path(mame_dir)
+        self.server = QTcpServer()
+        self.server.newConnection.connect(self._on_new_connection)
+        self.current_window = None
+        # (clean_mode, hide_buttons, screen) the open preview was created with
+        self._window_options = None
+        self._window_serial = 0
+        # window serial -> sockets waiting for that preview to close
+        self._waiting = {}
+
+        # Nothing stops a server that MAME spawned, so it stops itself
+        self.idle_timer = QTimer()
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(int(PREVIEW_SERVER_IDLE_TIMEOUT * 1000))
+        self.idle_timer.timeout.connect(self._on_idle_timeout)
+        self.mame_timer = QTimer()
+        self.mame_timer.setInterval(int(MAME_CHECK_INTERVAL * 1000))
+        self.mame_timer.timeout.connect(self._check_mame_running)
+
+    def start(self) -> bool:
+        from PyQt5.QtNetwork import QHostAddress
+
+        if not self.server.listen(QHostAddress.LocalHost, 0):
+            print(f"❌ Preview server could not listen: {self.server.errorString()}")
+            return False
+
+        info = {'port': self.server.serverPort(), 'token': self.token, 'pid': os.getpid()}
+        try:
+            os.makedirs(os.path.dirname(self.info_path), exist_ok=True)
+            temp_path = f"{self.info_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(info, f)
+            os.replace(temp_path, self.info_path)
+        except OSError as e:
+            print(f"❌ Could not publish preview server info: {e}")
+            self.server.close()
+            return False
+
+        atexit.register(self.stop)
+        print(f"🛰️  Preview server listening on 127.0.0.1:{info['port']}")
+
+        self.idle_timer.start()
+        # Only follow MAME's lifetime when there is a MAME to follow (not when started by hand)
+        if is_mame_running():
+            self.mame_timer.start()
+        return True
+
+    def stop(self):
+        """Stop listening and withdraw the info file if it is still ours"""
+        from PyQt5 import sip
+
+        # At exit Qt may already have deleted the server
+        if not sip.isdeleted(self.server):
+            self.server.close()
+        info = read_server_info(self.mame_dir)
+        if info and info.get('pid') == os.getpid():
+            try:
+                os.remove(self.info_path)
+            except OSError:
+                pass
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            sock.readyRead.connect(lambda sock=sock: self._on_ready_read(sock))
+            sock.disconnected.connect(sock.deleteLater)
+
+    def _on_ready_read(self, sock):
+        while sock.canReadLine():
+            line = bytes(sock.readLine()).decode('utf-8', 'replace')
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self._finish(sock, {'status': 'error', 'message': "malformed request"})
+                return
+            if not isinstance(request, dict) or request.get('token') != self.token:
+                self._finish(sock, {'status': 'error', 'message': "invalid token"})
+                return
+            # PyQt5 aborts the process on an exception escaping a slot, so one bad request
+            # must not take the server down
+            try:
+                self._handle_request(sock, request)
+            except Exception as e:
+                print(f"❌ Preview request {request.get('command')!r} failed: {e}")
+                traceback.print_exc()
+                self._finish(sock, {'status': 'error', 'message': str(e)})
+
+    def _handle_request(self, sock, request: Dict):
+        command = request.get('command')
+        wait = request.get('wait', 'shown')
+        self.idle_timer.start()
+
+        if command == 'show' and parse_screen(request.get('screen')) is None:
+            self._finish(sock, {'status': 'error', 'message': f"invalid screen {request.get('screen')!r}"})
+        elif command == 'ping':
+            self._finish(sock, {'status': 'ok', 'pid': os.getpid()})
+        elif command == 'show':
+            start_time = time.perf_counter()
+            serial = self.show_game(request)
+            if serial is None:
+                self._finish(sock, {'status': 'error', 'message': f"no preview for {request.get('game')}"})
+                return
+            reply = {'status': 'shown', 'elapsed_ms': round((time.perf_counter() - start_time) * 1000, 1)}
+            print(f"⚡ Preview for {request.get('game')} shown in {reply['elapsed_ms']} ms")
+            if wait == 'closed':
+                self._reply(sock, reply)
+                self._waiting.setdefault(serial, []).append(sock)
+            else:
+                self._finish(sock, reply)
+        elif command == 'close':
+            self.close_current()
+            self._finish(sock, {'status': 'ok'})
+        else:
+            self._finish(sock, {'status': 'error', 'message': f"unknown command {command!r}"})
+
+    def show_game(self, request: Dict) -> Optional[int]:
+        """Show the requested game, switching the open preview in place when it can; returns its serial"""
+        rom_name = request.get('game')
+        if not rom_name:
+            return None
+
+        options = (bool(request.get('clean_mode', False)), bool(request.get('hide_buttons', False)),
+                   parse_screen(request.get('screen')))
+        if self._can_reuse_window(options):
+            return self.switch_game(rom_name)
+
+        self.close_current()
+        clean_mode, self.config.hide_preview_buttons, self.config.preferred_preview_screen = options
+        window = self.config.show_preview_standalone(rom_name, clean_mode=clean_mode, standalone=False)
+        if window is None:
+            return None
+
+        self._window_serial += 1
+        self.current_window = window
+        self._window_options = options
+        window.destroyed.connect(lambda _=None, window=window: self._on_preview_closed(window))
+        return self._window_serial
+
+    def _can_reuse_window(self, options) -> bool:
+        from PyQt5 import sip
+
+        window = self.current_window
+        return (window is not None and not sip.isdeleted(window) and window.isVisible()
+                and options == self._window_options)
+
+    def switch_game(self, rom_name: str) -> Optional[int]:
+        """Load another game into the open preview; whoever waited on the previous game is told it closed"""
+        window = self.current_window
+        game_data = self.config.load_preview_game_data(rom_name)
+        if not game_data or not window.load_game(rom_name, game_data):
+            return None
+
+        self._release_waiting(self._window_serial)
+        self._window_serial += 1
+        window.activateWindow()
+        window.raise_()
+        return self._window_serial
+
+    def close_current(self):
+        from PyQt5 import sip
+
+        window, self.current_window = self.current_window, None
+        if window is not None and not sip.isdeleted(window):
+            window.close()
+        self._release_waiting(self._window_serial)
+
+    def _on_preview_closed(self, window):
+        if window is self.current_window:
+            self.current_window = None
+            self.idle_timer.start()
+            self._release_waiting(self._window_serial)
+
+    def _on_idle_timeout(self):
+        from PyQt5 import sip
+
+        window = self.current_window
+        if window is not None and not sip.isdeleted(window) and window.isVisible():
+            # Someone is looking at a preview - the idle time counts from when it closes
+            return
+        print(f"💤 No preview requests for {PREVIEW_SERVER_IDLE_TIMEOUT / 60:g} minutes, stopping preview server")
+        self.shutdown()
+
+    def _check_mame_running(self):
+        if is_mame_running() is False:
+            print("MAME has exited, stopping preview server")
+            self.shutdown()
+
+    def shutdown(self):
+        """Close any preview and leave the event loop (run_preview_server then stops the server)"""
+        from PyQt5.QtWidgets import QApplication
+
+        self.idle_timer.stop()
+        self.mame_timer.stop()
+        self.close_current()
+        self.stop()
+        QApplication.instance().quit()
+
+    def _release_waiting(self, serial: int):
+        for sock in self._waiting.pop(serial, []):
+            self._finish(sock, {'status': 'closed'})
+
+    @staticmethod
+    def _reply(sock, reply: Dict):
+        from PyQt5 import sip
+
+        if not sip.isdeleted(sock):
+            sock.write((json.dumps(reply) + "\n").encode('utf-8'))
+            sock.flush()
+
+    def _finish(self, sock, reply: Dict):
+        from PyQt5 import sip
+
+        self._reply(sock, reply)
+        if not sip.isdeleted(sock):
+            sock.disconnectFromHost()
+
+def run_preview_server(mame_dir: str) -> int:
+    """Run the resident preview server until it is stopped, idles out or MAME exits"""
+    if is_server_running(mame_dir):
+        print("Preview server is already running")
+        return 0
+
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    from mame_controls_pyqt import MAMEControlConfig
+    # Import the preview module now rather than on the first request
+    import mame_controls_preview  # noqa: F401
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    app.setApplicationName("MAME Control Preview")
+    # Closing a preview must not end the server
+    app.setQuitOnLastWindowClosed(False)
+
+    config = MAMEControlConfig(preview_only=True)
+    config.mame_dir = mame_dir
+    config.preview_dir = os.path.join(mame_dir, "preview")
+    config.cache_dir = os.path.join(config.preview_dir, "cache")
+
+    server = PreviewServer(mame_dir, config)
+    if not server.start():
+        return 1
+
+    # Let Python's signal handlers (Ctrl+C, SIGTERM) run while Qt owns the main loop
+    signal_timer = QTimer()
+    signal_timer.timeout.connect(lambda: None)
+    signal_timer.start(500)
+
+    try:
+        return app.exec_()
+    finally:
+        server.stop()
@@ -196,6 +196,12 @@ def run_pyinstaller_packaging():
             "--hidden-import=mame_controls_preview",
             "--hidden-import=mame_data_utils",
             "--hidden-import=mame_utils",
+            "--hidden-import=mame_file_watcher",
+            "--hidden-import=mame_game_cache",
+            "--hidden-import=mame_preview_server",
+            "--hidden-import=mame_batch_export",
+            "--hidden-import=mame_layout_renderer",
+            "--hidden-import=PyQt5.QtNetwork",
             "--collect-all=psutil",  # Ensure psutil is included
             main_script
         ]
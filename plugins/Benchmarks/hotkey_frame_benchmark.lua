@@ -0,0 +1,85 @@
+-- Per-frame cost of the controls plugin's frame_done callback, against a mocked MAME API
+--
+-- Usage (stock Lua 5.1+ or LuaJIT, run from this repo's plugins folder):
+--   lua "Benchmarks/hotkey_frame_benchmark.lua" "MAME v279" [frames]
+--
+-- Loads <plugin>/controls/init.lua with fake emu/manager objects, assigns a single key and a
+-- two-key combo, then calls the registered frame callback with nothing pressed - the state it
+-- spends nearly all of a session in. Reports the time per frame and how many input API calls
+-- each frame made. The config file and any process launches are redirected, so nothing on disk
+-- outside a temp file is touched.
+
+local plugin = arg[1] or "MAME v279"
+local frames = tonumber(arg[2]) or 1000000
+local WARMUP_FRAMES = 10000
+
+package.path = plugin .. "/?.lua;" .. plugin .. "/?/init.lua;" .. package.path
+
+-- Keep the plugin's config in a temp file and never start the real exe
+local config_path = os.tmpname()
+local real_open = io.open
+io.open = function(path, mode)
+    if type(path) == "string" and path:match("controls_config%.cfg$") then
+        path = config_path
+    end
+    return real_open(path, mode)
+end
+os.execute = function() return true end
+
+local file = real_open(config_path, "w")
+file:write("single_assign=KEYCODE_F9\n")
+file:write("hotkey1=JOYCODE_1_BUTTON10\n")
+file:write("hotkey2=JOYCODE_1_BUTTON6\n")
+file:close()
+
+-- Mocked input manager: counts calls, parses tokens the way a tokenizer would, nothing pressed
+local calls = { seq_from_tokens = 0, seq_pressed = 0 }
+local input = {}
+function input:seq_from_tokens(tokens)
+    calls.seq_from_tokens = calls.seq_from_tokens + 1
+    local seq = {}
+    for token in tokens:gmatch("%S+") do
+        seq[#seq + 1] = token
+    end
+    return seq
+end
+function input:seq_pressed(seq)
+    calls.seq_pressed = calls.seq_pressed + 1
+    return false
+end
+
+local frame_done
+emu = {
+    romname = function() return "pacman" end,
+    register_frame_done = function(callback) frame_done = callback end,
+    register_menu = function() end,
+    register_pause = function() end,
+    register_start = function() end,
+    register_stop = function() end
+}
+manager = { machine = { input = input } }
+
+local saved_print = print
+print = function() end
+local exports = dofile(plugin .. "/controls/init.lua")
+exports.startplugin()
+print = saved_print
+assert(frame_done, "plugin did not register a frame callback")
+
+for _ = 1, WARMUP_FRAMES do
+    frame_done()
+end
+
+calls.seq_from_tokens, calls.seq_pressed = 0, 0
+local start = os.clock()
+for _ = 1, frames do
+    frame_done()
+end
+local elapsed = os.clock() - start
+
+os.remove(config_path)
+
+print(string.format("%s: %d frames in %.3f s", plugin, frames, elapsed))
+print(string.format("  %.1f ns per frame", elapsed / frames * 1e9))
+print(string.format("  seq_from_tokens per frame: %.3f", calls.seq_from_tokens / frames))
+print(string.format("  seq_pressed per frame:     %.3f", calls.seq_pressed / frames))
@@ -6,6 +6,8 @@ exports.description = "MAME Controls Display with Precaching, Persistent Config,
 exports.license = "MIT"
 exports.author = { name = "Custom" }
 
+local launcher = require('controls/launcher')
+
 --[[ 
 CONTROLLER BUTTON MAPPING REFERENCE:
 
@@ -163,6 +165,16 @@ function exports.startplugin()
     -- Load configuration on startup
     load_config()
     
+    -- Precache and preview run detached and are polled from the frame callback,
+    -- so MAME never waits on the exe
+    local controls_launcher = launcher.new()
+    local PRECACHE_TIMEOUT = 120
+    local queued_precache = nil
+    
+    -- Start the resident preview server so pause-to-preview doesn't pay for a PyQt start-up
+    -- (it exits straight away if one is already running)
+    controls_launcher:run("--serve")
+    
     -- Menu state
     local menu_state = "main" -- "main", "config", "select_single", "select_hotkey1", "select_hotkey2"
     local selection_index = 1
@@ -195,22 +207,62 @@ function exports.startplugin()
             return 
         end
         
+        -- One precache at a time; the latest ROM asked for goes next
+        if controls_launcher:busy("precache") then
+            print("Precache already running, queued: " .. game_name)
+            queued_precache = game_name
+            return
+        end
+        
         -- Log to file for debugging
-        os.execute("echo Game detected: " .. game_name .. " > C:\\mame_plugin_log.txt")
+        local log_file = io.open("C:\\mame_plugin_log.txt", "w")
+        if log_file then
+            log_file:write("Game detected: " .. game_name .. "\n")
+            log_file:close()
+        end
         
-        -- Use the precache option to load data in background (updated path and executable)
-        local command = string.format('"preview\\mame controls.exe" --precache --game %s', game_name)
         print("Pre-caching controls for: " .. game_name)
         
-        -- Try to run the precache command
-        local result = os.execute(command)
-        if result then
-            -- Mark as precached
-            current_rom = game_name
-            rom_precached = true
-            print("Precaching complete for: " .. game_name)
-        else
+        -- Claim the ROM now so the periodic timer doesn't start it again while it runs
+        current_rom = game_name
+        local started = controls_launcher:start("precache", string.format("--precache --game %s", game_name),
+            function(ok)
+                if ok and current_rom == game_name then
+                    -- Mark as precached
+                    rom_precached = true
+                    print("Precaching complete for: " .. game_name)
+                elseif not ok then
+                    print("Precaching failed for: " .. game_name)
+                    -- Let the periodic timer try it again
+                    if current_rom == game_name then
+                        current_rom = nil
+                    end
+                end
+                
+                local next_rom = queued_precache
+                queued_precache = nil
+                if next_rom and next_rom ~= game_name then
+                    precache_controls(next_rom)
+                end
+            end, PRECACHE_TIMEOUT)
+        
+        if not started then
             print("Precaching failed for: " .. game_name)
+            current_rom = nil
+        end
+    end
+
+    -- Let MAME run again once the controls are dismissed
+    local function finish_show()
+        showing_controls = false
+        
+        -- Unpause MAME if it was paused by the user
+        if user_paused and emu.unpause then
+            print("Unpausing MAME after controls")
+            emu.unpause()
+            user_paused = false
+        elseif emu.unpause then
+            emu.unpause()
         end
     end
 
@@ -246,32 +298,27 @@ function exports.startplugin()
             end
             
             -- Choose command based on Lightning Mode setting
-            local command
+            local args
             if config.lightning_mode then
                 -- Lightning Mode: Fast image-only display
-                command = string.format('"preview\\mame controls.exe" --image-only --game %s', game_name)
-                -- command = string.format('python "preview\\mame_controls_main.py" --image-only --game %s', game_name)
+                args = string.format("--image-only --game %s", game_name)
                 print("Using Lightning Mode (fast image-only)")
             else
                 -- Normal Mode: Full preview with screen selection
-                command = string.format('"preview\\mame controls.exe" --preview-only --game %s --clean-preview --screen 1', game_name)
-                -- command = string.format('python "preview\\mame_controls_main.py" --preview-only --game %s --clean-preview --screen 1', game_name)
+                args = string.format("--show %s --clean-preview --screen 1", game_name)
                 print("Using Normal Mode (full preview)")
             end
             
-            print("Running: " .. command)
-            os.execute(command)
-            
-            -- Reset showing flag after command completes
-            showing_controls = false
+            -- The exe reports "done" once the preview is closed; the frame callback picks it up
+            local started = controls_launcher:start("show", args, function(ok, code)
+                if not ok then
+                    print("Controls preview ended with an error (" .. tostring(code) .. ")")
+                end
+                finish_show()
+            end)
             
-            -- Unpause MAME if it was paused by the user
-            if user_paused and emu.unpause then
-                print("Unpausing MAME after controls")
-                emu.unpause()
-                user_paused = false
-            elseif emu.unpause then
-                emu.unpause()
+            if not started then
+                finish_show()
             end
         else
             print("No valid ROM name available, cannot show controls")
@@ -544,6 +591,9 @@ function exports.startplugin()
 
     -- Add frame done callback to check for key combinations
     emu.register_frame_done(function()
+        -- Pick up finished precache/preview jobs (runs while paused too, which is when a preview is open)
+        controls_launcher:tick()
+        
         -- Only check if we have necessary components
         if not manager or not manager.machine then
             return false
@@ -703,6 +753,9 @@ function exports.startplugin()
         current_rom = nil
         showing_controls = false
         last_show_time = 0
+        queued_precache = nil
+        -- Any preview or precache still running belongs to the game that just stopped
+        controls_launcher:cancel_all()
         print("Controls plugin reset for next game")
     end)
     
@@ -6,11 +6,12 @@ exports.description = "MAME Controls Display with ViewSwitch-style Input Assignm
 exports.license = "MIT"
 exports.author = { name = "Custom" }
 
+local launcher = require('controls/launcher')
+
 function exports.startplugin()
     -- Variables to track key state
     local single_key_pressed = false
-    local hotkey1_pressed = false
-    local hotkey2_pressed = false
+    local combo_pressed = false
     
     -- Cooldown variables to prevent immediate re-triggering
     local last_show_time = 0
@@ -44,11 +45,18 @@ function exports.startplugin()
         hotkey1 = nil,
         hotkey2 = nil,
         show_on_pause = false,
-        lightning_mode = false
+        lightning_mode = false,
+        -- Check the hotkeys every N frames (1 = every frame)
+        hotkey_poll_frames = 3
     }
     
     local config = {}
     
+    -- Input sequences compiled from the config tokens; rebuilt on the next check after the
+    -- config changes or a new machine starts, instead of being parsed every frame
+    local hotkey_seqs = nil
+    local hotkey_frame = 0
+    
     -- Input assignment state (ViewSwitch-style polling)
     local input_poll = nil  -- Will hold polling state when active
     local commonui = nil    -- Will be loaded when needed
@@ -92,7 +100,9 @@ function exports.startplugin()
             file:write("hotkey2=" .. (config.hotkey2 or "nil") .. "\n")
             file:write("show_on_pause=" .. tostring(config.show_on_pause or false) .. "\n")
             file:write("lightning_mode=" .. tostring(config.lightning_mode or false) .. "\n")
+            file:write("hotkey_poll_frames=" .. tostring(config.hotkey_poll_frames) .. "\n")
             file:close()
+            hotkey_seqs = nil
             print("Configuration saved to: " .. config_file_path)
             return true
         else
@@ -120,6 +130,8 @@ function exports.startplugin()
                         if value ~= "nil" then
                             if key == "show_on_pause" or key == "lightning_mode" then
                                 config[key] = (value:lower() == "true")
+                            elseif key == "hotkey_poll_frames" then
+                                config[key] = math.max(1, math.floor(tonumber(value) or default_config.hotkey_poll_frames))
                             else
                                 config[key] = value
                             end
@@ -133,11 +145,22 @@ function exports.startplugin()
             print("No configuration file found, using defaults")
             save_config()
         end
+        hotkey_seqs = nil
     end
     
     -- Load configuration on startup
     load_config()
     
+    -- Precache and preview run detached and are polled from the frame callback,
+    -- so MAME never waits on the exe
+    local controls_launcher = launcher.new()
+    local PRECACHE_TIMEOUT = 120
+    local queued_precache = nil
+    
+    -- Start the resident preview server so pause-to-preview doesn't pay for a PyQt start-up
+    -- (it exits straight away if one is already running)
+    controls_launcher:run("--serve")
+    
     -- Function to convert input code to readable name (improved)
     local function format_input_name(input_code)
         if not input_code then return "Not Set" end
@@ -227,18 +250,58 @@ function exports.startplugin()
             return 
         end
         
-        os.execute("echo Game detected: " .. game_name .. " > C:\\mame_plugin_log.txt")
+        -- One precache at a time; the latest ROM asked for goes next
+        if controls_launcher:busy("precache") then
+            print("Precache already running, queued: " .. game_name)
+            queued_precache = game_name
+            return
+        end
+        
+        local log_file = io.open("C:\\mame_plugin_log.txt", "w")
+        if log_file then
+            log_file:write("Game detected: " .. game_name .. "\n")
+            log_file:close()
+        end
         
-        local command = string.format('"preview\\mame controls.exe" --precache --game %s', game_name)
         print("Pre-caching controls for: " .. game_name)
+        -- Claim the ROM now so the periodic timer doesn't start it again while it runs
+        current_rom = game_name
+        local started = controls_launcher:start("precache", string.format("--precache --game %s", game_name),
+            function(ok)
+                if ok and current_rom == game_name then
+                    rom_precached = true
+                    print("Precaching complete for: " .. game_name)
+                elseif not ok then
+                    print("Precaching failed for: " .. game_name)
+                    -- Let the periodic timer try it again
+                    if current_rom == game_name then
+                        current_rom = nil
+                    end
+                end
+                
+                local next_rom = queued_precache
+                queued_precache = nil
+                if next_rom and next_rom ~= game_name then
+                    precache_controls(next_rom)
+                end
+            end, PRECACHE_TIMEOUT)
         
-        local result = os.execute(command)
-        if result then
-            current_rom = game_name
-            rom_precached = true
-            print("Precaching complete for: " .. game_name)
-        else
+        if not started then
             print("Precaching failed for: " .. game_name)
+            current_rom = nil
+        end
+    end
+
+    -- Let MAME run again once the controls are dismissed
+    local function finish_show()
+        showing_controls = false
+        
+        if user_paused and emu.unpause then
+            print("Unpausing MAME after controls")
+            emu.unpause()
+            user_paused = false
+        elseif emu.unpause then
+            emu.unpause()
         end
     end
 
@@ -267,26 +330,25 @@ function exports.startplugin()
                 emu.pause()
             end
             
-            local command
+            local args
             if config.lightning_mode then
-                command = string.format('"preview\\mame controls.exe" --image-only --game %s', game_name)
+                args = string.format("--image-only --game %s", game_name)
                 print("Using Lightning Mode (fast image-only)")
             else
-                command = string.format('"preview\\mame controls.exe" --preview-only --game %s --clean-preview --screen 1', game_name)
+                args = string.format("--show %s --clean-preview --screen 1", game_name)
                 print("Using Normal Mode (full preview)")
             end
             
-            print("Running: " .. command)
-            os.execute(command)
-            
-            showing_controls = false
+            -- The exe reports "done" once the preview is closed; the frame callback picks it up
+            local started = controls_launcher:start("show", args, function(ok, code)
+                if not ok then
+                    print("Controls preview ended with an error (" .. tostring(code) .. ")")
+                end
+                finish_show()
+            end)
             
-            if user_paused and emu.unpause then
-                print("Unpausing MAME after controls")
-                emu.unpause()
-                user_paused = false
-            elseif emu.unpause then
-                emu.unpause()
+            if not started then
+                finish_show()
             end
         else
             print("No valid ROM name available, cannot show controls")
@@ -535,33 +597,59 @@ function exports.startplugin()
         return false
     end
 
+    -- Compile the configured tokens into input sequences once
+    local function compile_hotkeys(input)
+        local function compile(token)
+            if not token then
+                return nil
+            end
+            return input:seq_from_tokens(token)
+        end
+        
+        hotkey_seqs = { single = compile(config.single_assign) }
+        -- The combo only counts when both halves are set
+        if config.hotkey1 and config.hotkey2 then
+            hotkey_seqs.hotkey1 = compile(config.hotkey1)
+            hotkey_seqs.hotkey2 = compile(config.hotkey2)
+        end
+        hotkey_seqs.any = (hotkey_seqs.single ~= nil) or (hotkey_seqs.hotkey1 ~= nil and hotkey_seqs.hotkey2 ~= nil)
+        return hotkey_seqs
+    end
+
     -- Frame callback for hotkey checking
     emu.register_frame_done(function()        
-        if not manager or not manager.machine then
+        -- Runs while paused too, which is when a preview is open
+        controls_launcher:tick()
+        
+        -- Skip hotkey detection if we're in polling mode
+        if input_poll then
             return false
         end
         
-        local machine = manager.machine
-        if not machine.input then
+        -- Only look at the inputs every hotkey_poll_frames frames
+        hotkey_frame = hotkey_frame + 1
+        if hotkey_frame < config.hotkey_poll_frames then
             return false
         end
+        hotkey_frame = 0
         
-        -- Skip hotkey detection if we're in polling mode
-        if input_poll then
+        if not manager or not manager.machine then
             return false
         end
         
-        -- Regular hotkey detection
-        local input = machine.input
+        local input = manager.machine.input
+        if not input or not input.seq_pressed then
+            return false
+        end
+        
+        local seqs = hotkey_seqs or compile_hotkeys(input)
+        if not seqs.any then
+            return false
+        end
         
         -- Check Single Assignment (if configured)
-        if config.single_assign and input.seq_pressed then
-            local single_key_state = false
-            local seq = input:seq_from_tokens(config.single_assign)
-            if seq then
-                single_key_state = input:seq_pressed(seq)
-            end
-            
+        if seqs.single then
+            local single_key_state = input:seq_pressed(seqs.single)
             if single_key_state and not single_key_pressed then
                 print("Single assignment activated: " .. config.single_assign)
                 show_controls()
@@ -569,24 +657,14 @@ function exports.startplugin()
             single_key_pressed = single_key_state
         end
         
-        -- Check Hotkey Combination (if both configured)
-        if config.hotkey1 and config.hotkey2 and input.seq_pressed then
-            local hotkey1_state = false
-            local hotkey2_state = false
-            
-            local seq1 = input:seq_from_tokens(config.hotkey1)
-            if seq1 then hotkey1_state = input:seq_pressed(seq1) end
-            
-            local seq2 = input:seq_from_tokens(config.hotkey2)
-            if seq2 then hotkey2_state = input:seq_pressed(seq2) end
-            
-            if hotkey1_state and hotkey2_state and (not hotkey1_pressed or not hotkey2_pressed) then
+        -- Check Hotkey Combination (if both configured); the second key is only read while the first is down
+        if seqs.hotkey1 and seqs.hotkey2 then
+            local combo_state = input:seq_pressed(seqs.hotkey1) and input:seq_pressed(seqs.hotkey2)
+            if combo_state and not combo_pressed then
                 print("Hotkey combo activated: " .. config.hotkey1 .. " + " .. config.hotkey2)
                 show_controls()
             end
-            
-            hotkey1_pressed = hotkey1_state
-            hotkey2_pressed = hotkey2_state
+            combo_pressed = combo_state
         end
         
         return false
@@ -629,6 +707,8 @@ function exports.startplugin()
         print("Registering start handler")
         emu.register_start(function()
             rom_precached = false
+            -- Sequences belong to the previous machine's input manager
+            hotkey_seqs = nil
             
             if not has_timer then
                 local game_name = emu.romname()
@@ -662,6 +742,12 @@ function exports.startplugin()
         showing_controls = false
         last_show_time = 0
         input_poll = nil  -- Clear any active polling
+        hotkey_seqs = nil
+        single_key_pressed = false
+        combo_pressed = false
+        queued_precache = nil
+        -- Any preview or precache still running belongs to the game that just stopped
+        controls_launcher:cancel_all()
         print("Controls plugin reset for next game")
     end)
     
@@ -686,6 +772,7 @@ function exports.startplugin()
     print("Hotkey 2: " .. (config.hotkey2 and format_input_name(config.hotkey2) or "None"))
     print("Show on Pause: " .. tostring(config.show_on_pause))
     print("Lightning Mode: " .. tostring(config.lightning_mode))
+    print("Hotkey poll rate: every " .. config.hotkey_poll_frames .. " frame(s)")
 end
 
 return exports
\ No newline at end of file
@@ -0,0 +1,164 @@
+-- Non-blocking launcher for "mame controls.exe" jobs
+--
+-- Jobs are started detached and report back through a status file that the exe writes
+-- when given --status-file ("running <pid>" on start, "done <exit code>" on exit).
+-- poll() checks those files from the frame callback, so the emulation thread never waits
+-- on a child process. Nothing in here touches emu or manager: spawn, clock and the status
+-- directory can all be passed to new(), which lets the plugin logic run under a stock Lua
+-- interpreter with a mocked MAME API.
+local launcher = {}
+
+local is_windows = package.config:sub(1, 1) == "\\"
+
+launcher.EXE = '"preview\\mame controls.exe"'
+launcher.STATUS_DIR = "preview/cache"
+
+-- Seconds a job may take to report "running" before it is treated as failed to launch
+launcher.START_TIMEOUT = 30
+-- Check status files every N frames rather than on every frame
+launcher.POLL_FRAMES = 15
+
+local Launcher = {}
+Launcher.__index = Launcher
+
+-- Start a command without waiting for it
+function launcher.default_spawn(command)
+    if is_windows then
+        return os.execute('start "" /B ' .. command)
+    end
+    return os.execute(command .. " >/dev/null 2>&1 &")
+end
+
+-- State and exit code from a status file, or nil while there is none
+function launcher.read_status(path)
+    local file = io.open(path, "r")
+    if not file then
+        return nil
+    end
+    local line = file:read("*l")
+    file:close()
+    if not line then
+        return nil
+    end
+    local state, code = line:match("^(%a+)%s*(%-?%d*)")
+    return state, tonumber(code)
+end
+
+function launcher.new(options)
+    options = options or {}
+    local self = setmetatable({}, Launcher)
+    self.exe = options.exe or launcher.EXE
+    self.status_dir = options.status_dir or launcher.STATUS_DIR
+    self.spawn = options.spawn or launcher.default_spawn
+    self.clock = options.clock or os.time
+    self.start_timeout = options.start_timeout or launcher.START_TIMEOUT
+    self.poll_frames = options.poll_frames or launcher.POLL_FRAMES
+    -- Keeps status files of this MAME session apart from leftovers of an earlier one
+    self.session = tostring(options.session or os.time())
+    self.jobs = {}
+    self.serial = 0
+    self.frames = 0
+    return self
+end
+
+-- Fire and forget, for jobs nobody waits on (the preview server)
+function Launcher:run(args)
+    return self.spawn(self.exe .. " " .. args)
+end
+
+function Launcher:busy(kind)
+    return self.jobs[kind] ~= nil
+end
+
+-- Start a tracked job; on_done(ok, exit_code) is called from poll() once it finishes.
+-- timeout (seconds after it started running) is optional - a preview stays open as long
+-- as the user wants. Returns false if a job of this kind is still running or the spawn failed.
+function Launcher:start(kind, args, on_done, timeout)
+    if self.jobs[kind] then
+        return false
+    end
+
+    self.serial = self.serial + 1
+    local path = string.format("%s/controls_%s_%s_%d.status", self.status_dir, kind, self.session, self.serial)
+    os.remove(path)
+
+    local command = string.format('%s %s --status-file "%s"', self.exe, args, path)
+    print("Launching: " .. command)
+    if not self.spawn(command) then
+        print("Could not launch: " .. command)
+        return false
+    end
+
+    self.jobs[kind] = {
+        kind = kind,
+        path = path,
+        on_done = on_done,
+        timeout = timeout,
+        started = self.clock(),
+        running = false
+    }
+    return true
+end
+
+-- Forget a job without waiting for it (the game stopped)
+function Launcher:cancel(kind)
+    local job = self.jobs[kind]
+    if job then
+        self.jobs[kind] = nil
+        os.remove(job.path)
+    end
+end
+
+function Launcher:cancel_all()
+    for kind in pairs(self.jobs) do
+        self:cancel(kind)
+    end
+end
+
+-- Check every pending job once
+function Launcher:poll()
+    local now = self.clock()
+    local finished = {}
+    for kind, job in pairs(self.jobs) do
+        local state, code = launcher.read_status(job.path)
+        if state == "done" then
+            table.insert(finished, {job, code == 0, code})
+        elseif state == "running" then
+            if not job.running then
+                job.running = true
+                job.started = now
+            end
+            if job.timeout and now - job.started > job.timeout then
+                print("Controls " .. kind .. " job timed out")
+                table.insert(finished, {job, false, nil})
+            end
+        elseif now - job.started > self.start_timeout then
+            print("Controls " .. kind .. " job never started")
+            table.insert(finished, {job, false, nil})
+        end
+    end
+
+    -- Callbacks run after the scan, as they may start the next job of the same kind
+    for _, entry in ipairs(finished) do
+        local job = entry[1]
+        self.jobs[job.kind] = nil
+        os.remove(job.path)
+        if job.on_done then
+            job.on_done(entry[2], entry[3])
+        end
+    end
+end
+
+-- Call once per frame; polls every poll_frames frames while jobs are pending
+function Launcher:tick()
+    if next(self.jobs) == nil then
+        return
+    end
+    self.frames = self.frames + 1
+    if self.frames >= self.poll_frames then
+        self.frames = 0
+        self:poll()
+    end
+end
+
+return launcher